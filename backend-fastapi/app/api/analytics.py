@@ -1,6 +1,7 @@
 """Analytics API endpoints"""
 from fastapi import APIRouter, Depends
 from app.core.auth import get_current_user_id
+from app.middleware.rate_limiter import rate_limit
 from app.services.analytics_service import AnalyticsService
 from app.models.analytics import AnalyticsOverviewResponse
 
@@ -8,6 +9,7 @@ router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
 
 @router.get("/overview", response_model=AnalyticsOverviewResponse)
+@rate_limit("analytics")
 async def get_analytics_overview(
     user_id: str = Depends(get_current_user_id)
 ):
@@ -35,6 +37,7 @@ async def get_analytics_overview(
 
 
 @router.get("/flashcard-difficulty")
+@rate_limit("analytics")
 async def get_flashcard_difficulty(
     limit: int = 20,
     user_id: str = Depends(get_current_user_id)
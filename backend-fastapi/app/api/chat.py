@@ -12,7 +12,9 @@ from app.models.chat import (
 )
 from app.services.chat_service import ChatService
 from app.core.auth import get_current_user_id
-from app.core.firebase import get_firestore_client
+from app.middleware.rate_limiter import rate_limit
+from app.middleware.concurrency_limiter import concurrency_limit
+from app.services.user_service import UserService
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
@@ -23,6 +25,7 @@ def get_chat_service():
 
 
 @router.post("/start", response_model=StartConversationResponse)
+@rate_limit("rag_chat")
 async def start_conversation(
     request: StartConversationRequest,
     user_id: str = Depends(get_current_user_id),
@@ -51,6 +54,8 @@ async def start_conversation(
 
 
 @router.post("/{conversation_id}/message", response_model=SendMessageResponse)
+@rate_limit("rag_chat")
+@concurrency_limit("llm")
 async def send_message(
     conversation_id: str,
     request: SendMessageRequest,
@@ -60,14 +65,8 @@ async def send_message(
     """
     Send a message in a conversation and get AI response.
     """
-    # ... (existing code) ...
-    # Get user's LLM model preference
-    db = get_firestore_client()
-    profile_doc = db.collection("profiles").document(user_id).get()
-    model_name = None
-    if profile_doc.exists:
-        profile_data = profile_doc.to_dict()
-        model_name = profile_data.get("llm_model")
+    # Get user's LLM model preference (cached profile lookup)
+    model_name = await UserService().get_preferred_model(user_id)
     
     try:
         result = await chat_service.send_message(
@@ -94,6 +93,8 @@ async def send_message(
 
 
 @router.post("/{conversation_id}/stream")
+@rate_limit("rag_chat")
+@concurrency_limit("llm")
 async def stream_message(
     conversation_id: str,
     request: SendMessageRequest,
@@ -104,13 +105,8 @@ async def stream_message(
     Stream a message in a conversation.
     Returns SSE stream of text chunks.
     """
-    # Get user's LLM model preference
-    db = get_firestore_client()
-    profile_doc = db.collection("profiles").document(user_id).get()
-    model_name = None
-    if profile_doc.exists:
-        profile_data = profile_doc.to_dict()
-        model_name = profile_data.get("llm_model")
+    # Get user's LLM model preference (cached profile lookup)
+    model_name = await UserService().get_preferred_model(user_id)
 
     async def event_generator():
         try:
@@ -130,6 +126,7 @@ async def stream_message(
 
 
 @router.get("/conversations", response_model=List[ConversationListItem])
+@rate_limit("rag_chat")
 async def list_conversations(
     user_id: str = Depends(get_current_user_id),
     chat_service: ChatService = Depends(get_chat_service)
@@ -148,6 +145,7 @@ async def list_conversations(
 
 
 @router.get("/{conversation_id}", response_model=ConversationDetail)
+@rate_limit("rag_chat")
 async def get_conversation(
     conversation_id: str,
     user_id: str = Depends(get_current_user_id),
@@ -175,6 +173,7 @@ async def get_conversation(
 
 
 @router.delete("/{conversation_id}", status_code=status.HTTP_204_NO_CONTENT)
+@rate_limit("rag_chat")
 async def delete_conversation(
     conversation_id: str,
     user_id: str = Depends(get_current_user_id),
@@ -1,6 +1,7 @@
 """Documents API routes"""
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from app.core.auth import verify_firebase_token, AuthenticatedUser
+from app.middleware.rate_limiter import rate_limit
 from app.models.documents import UploadProcessRequest, UploadProcessResponse
 from app.services.document_service import DocumentService
 from app.core.exceptions import NotFoundError, UnauthorizedError
@@ -9,6 +10,7 @@ router = APIRouter(prefix="/api/documents", tags=["documents"])
 
 
 @router.post("/upload-process", response_model=UploadProcessResponse)
+@rate_limit("document_upload")
 async def upload_process(
     request: UploadProcessRequest,
     background_tasks: BackgroundTasks,
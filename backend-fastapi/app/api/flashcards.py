@@ -1,14 +1,20 @@
 """Flashcards API routes"""
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from app.core.auth import verify_firebase_token, AuthenticatedUser
+from app.middleware.concurrency_limiter import concurrency_limit
 from app.models.flashcards import (
     GenerateFlashcardsRequest, GenerateFlashcardsResponse,
     ReviewFlashcardRequest, ReviewFlashcardResponse,
-    FlashcardItem, RecommendNextIntervalRequest, RecommendNextIntervalResponse
+    ReviewBatchRequest, ReviewBatchResponse,
+    RescheduleRequest, RescheduleResponse,
+    FlashcardItem, DueFlashcard, RecommendNextIntervalRequest, RecommendNextIntervalResponse
 )
 from app.services.flashcard_service import FlashcardService
+from app.services.due_queue import get_due_queue
 from app.services.ml_prediction_service import MLPredictionService
 from app.core.exceptions import NotFoundError, UnauthorizedError
+from app.core.responses import json_array_response, project
 
 router = APIRouter(prefix="/api/flashcards", tags=["flashcards"])
 
@@ -19,15 +25,43 @@ async def get_flashcards(
 ):
     """
     Get all flashcards for the current user.
+
+    Streamed as an orjson-encoded array; compressed by CompressionMiddleware.
     """
     try:
         flashcard_service = FlashcardService()
-        return await flashcard_service.get_all_flashcards(user.uid)
+        cards = flashcard_service.iter_flashcards(user.uid)
+        return await json_array_response(project(card, FlashcardItem) for card in cards)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/due", response_model=list[DueFlashcard])
+async def get_due_flashcards(
+    limit: int = Query(50, ge=1, le=500, description="Page size"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    user: AuthenticatedUser = Depends(verify_firebase_token)
+):
+    """
+    Get the current user's cards due for review, most overdue first.
+
+    When more cards are due, the X-Next-Cursor response header holds the
+    cursor for the next page.
+    """
+    try:
+        cards, next_cursor = await get_due_queue().get_due(user.uid, limit=limit, cursor=cursor)
+        response = await json_array_response([project(card, DueFlashcard) for card in cards])
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return response
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/generate", response_model=GenerateFlashcardsResponse)
+@concurrency_limit("llm")
 async def generate_flashcards(
     request: GenerateFlashcardsRequest,
     user: AuthenticatedUser = Depends(verify_firebase_token)
@@ -75,6 +109,45 @@ async def review_flashcard(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/review-batch", response_model=ReviewBatchResponse)
+async def review_flashcards_batch(
+    request: ReviewBatchRequest,
+    user: AuthenticatedUser = Depends(verify_firebase_token)
+):
+    """
+    Submit several reviews at once (e.g. an offline study session).
+
+    Reviews are applied in order per card; reviews of missing or foreign
+    cards are reported per item without failing the batch.
+    """
+    try:
+        flashcard_service = FlashcardService()
+        result = await flashcard_service.review_flashcards_batch(
+            user_id=user.uid,
+            reviews=[review.model_dump() for review in request.reviews]
+        )
+        return ReviewBatchResponse(**result)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/reschedule", response_model=RescheduleResponse)
+async def reschedule_overdue_flashcards(
+    request: RescheduleRequest,
+    user: AuthenticatedUser = Depends(verify_firebase_token)
+):
+    """
+    Spread the current user's overdue cards over the next `days` days,
+    most overdue first (e.g. after a vacation).
+    """
+    try:
+        flashcard_service = FlashcardService()
+        result = await flashcard_service.spread_overdue_flashcards(user.uid, request.days)
+        return RescheduleResponse(**result)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/recommend-next", response_model=RecommendNextIntervalResponse)
 async def recommend_next_interval(
     request: RecommendNextIntervalRequest,
@@ -84,24 +157,10 @@ async def recommend_next_interval(
     Get recommended next interval from ML model and SM-2.
     """
     try:
-        # 1. Calculate SM-2 interval (Rule-based)
-        # Simplified logic matching FlashcardService
-        current_interval = request.current_interval
-        # Assume current ease is 2.5 if we don't have it, or we should pass it.
-        # For this estimation, we'll assume standard behavior.
-        current_ease = 2.5 
-        
-        rating = request.rating
-        
-        if rating == 1:  # Again
-            sm2_interval = 0
-        else:
-            if current_interval == 0:
-                sm2_interval = 1
-            elif current_interval == 1:
-                sm2_interval = 6
-            else:
-                sm2_interval = int(current_interval * current_ease)
+        # 1. Calculate SM-2 interval (Rule-based, shared scheduling engine)
+        from app.services.scheduling import sm2_step
+        sm2_intervals, _ = sm2_step([request.current_interval], [request.ease_factor], [request.rating])
+        sm2_interval = int(sm2_intervals[0])
         
         # 2. Get ML prediction
         ml_service = MLPredictionService()
@@ -110,7 +169,8 @@ async def recommend_next_interval(
         return RecommendNextIntervalResponse(
             ml_interval=ml_interval,
             sm2_interval=sm2_interval,
-            difference=(ml_interval - sm2_interval) if ml_interval is not None else None
+            difference=(ml_interval - sm2_interval) if ml_interval is not None else None,
+            model_version=ml_service.model_version if ml_interval is not None else None
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
 from app.core.auth import verify_firebase_token, AuthenticatedUser
+from app.middleware.concurrency_limiter import concurrency_limit
 from app.models.graph import ExtractGraphRequest, ExtractGraphResponse, GraphData
 from app.services.graph_service import GraphService
+from app.core.responses import json_object_response
 
 router = APIRouter(prefix="/api/graph", tags=["graph"])
 
 @router.post("/extract", response_model=ExtractGraphResponse)
+@concurrency_limit("llm")
 async def extract_graph(
     request: ExtractGraphRequest,
     user: AuthenticatedUser = Depends(verify_firebase_token)
@@ -27,9 +30,14 @@ async def get_graph(
 ):
     """
     Get the user's entire knowledge graph.
+
+    Nodes and edges are streamed as orjson-encoded arrays.
     """
     try:
         graph_service = GraphService()
-        return await graph_service.get_graph(user.uid)
+        return await json_object_response({
+            "nodes": graph_service.iter_graph_nodes(user.uid),
+            "edges": graph_service.iter_graph_edges(user.uid),
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,36 +1,82 @@
 """Notes API routes"""
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Header, Query
+from starlette.concurrency import run_in_threadpool
 from app.core.auth import verify_firebase_token, AuthenticatedUser
+from app.middleware.rate_limiter import rate_limit
+from app.middleware.concurrency_limiter import concurrency_limit
 from app.models.notes import (
     AIQARequest, AIQAResponse, AIQASource,
     ReindexRequest, ReindexResponse,
     TranslateRequest, TranslateResponse,
     TerminologyRequest, TerminologyResponse, TerminologyItem,
-    NoteItem
+    NoteSummary, NoteContent
 )
 from app.services.rag_service import RAGService
 from app.services.note_service import NoteService
 from app.services.user_service import UserService
 from app.core.exceptions import NotFoundError, UnauthorizedError
+from app.core.responses import json_array_response, json_etag_response, project
 
 router = APIRouter(prefix="/api/notes", tags=["notes"])
 
 
-@router.get("/", response_model=list[NoteItem])
+@router.get("/", response_model=list[NoteSummary])
 async def get_notes(
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size (all notes if omitted)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
     user: AuthenticatedUser = Depends(verify_firebase_token)
 ):
     """
-    Get all notes for the current user.
+    List the current user's notes (metadata only, ordered by ID).
+
+    Content is fetched per note from GET /api/notes/{note_id}/content.
+    When `limit` is given and more notes remain, the X-Next-Cursor response
+    header holds the cursor for the next page.
+    """
+    try:
+        note_service = NoteService()
+        notes = note_service.iter_note_summaries(user.uid, limit=limit, cursor=cursor)
+
+        if limit is None:
+            return await json_array_response(project(note, NoteSummary) for note in notes)
+
+        page = await run_in_threadpool(lambda: [project(note, NoteSummary) for note in notes])
+        response = await json_array_response(page)
+        if len(page) == limit:
+            response.headers["X-Next-Cursor"] = page[-1]["id"]
+        return response
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{note_id}/content", response_model=NoteContent)
+async def get_note_content(
+    note_id: str,
+    if_none_match: Optional[str] = Header(None),
+    user: AuthenticatedUser = Depends(verify_firebase_token)
+):
+    """
+    Get the bilingual content of a single note.
+
+    Responses carry an ETag; send it back in If-None-Match to get an empty
+    304 when the note has not changed.
     """
     try:
         note_service = NoteService()
-        return await note_service.get_all_notes(user.uid)
+        note = await note_service.get_note_content(user.uid, note_id)
+        return json_etag_response(project(note, NoteContent), if_none_match)
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UnauthorizedError as e:
+        raise HTTPException(status_code=403, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/ai-qa", response_model=AIQAResponse)
+@rate_limit("rag_chat")
+@concurrency_limit("llm")
 async def ai_qa(
     request: AIQARequest,
     user: AuthenticatedUser = Depends(verify_firebase_token)
@@ -111,6 +157,7 @@ async def reindex_note(
 
 
 @router.post("/ai-translate", response_model=TranslateResponse)
+@concurrency_limit("llm")
 async def ai_translate(
     request: TranslateRequest,
     user: AuthenticatedUser = Depends(verify_firebase_token)
@@ -121,7 +168,7 @@ async def ai_translate(
     try:
         note_service = NoteService()
         user_service = UserService()
-        
+
         # Get user's preferred model
         model_name = await user_service.get_preferred_model(user.uid)
 
@@ -141,6 +188,7 @@ async def ai_translate(
 
 
 @router.post("/ai-terminology", response_model=TerminologyResponse)
+@concurrency_limit("llm")
 async def ai_terminology(
     request: TerminologyRequest,
     user: AuthenticatedUser = Depends(verify_firebase_token)
@@ -151,7 +199,7 @@ async def ai_terminology(
     try:
         note_service = NoteService()
         user_service = UserService()
-        
+
         # Get user's preferred model
         model_name = await user_service.get_preferred_model(user.uid)
 
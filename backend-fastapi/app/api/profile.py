@@ -0,0 +1,41 @@
+"""Profile API routes"""
+from fastapi import APIRouter, Depends, HTTPException
+from app.core.auth import get_current_user_id
+from app.models.profile import UpdatePreferencesRequest, PreferencesResponse
+from app.services.user_service import UserService
+
+router = APIRouter(prefix="/api/profile", tags=["profile"])
+
+
+@router.get("/preferences", response_model=PreferencesResponse)
+async def get_preferences(
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Get the current user's profile preferences.
+    """
+    try:
+        settings = await UserService().get_user_settings(user_id)
+        return PreferencesResponse(**settings)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.patch("/preferences", response_model=PreferencesResponse)
+async def update_preferences(
+    request: UpdatePreferencesRequest,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Update profile preferences.
+
+    Writes through to Firestore and invalidates the cached profile, so the
+    next AI request uses the new model.
+    """
+    try:
+        settings = await UserService().update_user_settings(
+            user_id, request.model_dump(exclude_unset=True)
+        )
+        return PreferencesResponse(**settings)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -20,7 +20,12 @@ class Settings(BaseSettings):
     firebase_credentials_json: Optional[str] = Field(default=None)
     firebase_client_email: Optional[str] = None
     firebase_private_key: Optional[str] = None
-    
+
+    # Auth (ID token verification)
+    auth_token_cache_size: int = 10000  # Max verified tokens kept in memory
+    auth_check_revoked: bool = False  # Opt-in: verify revocation on every request (disables cache)
+    auth_cert_refresh_seconds: int = 3600  # Background refresh interval for public certs
+
     # LLM
     llm_provider: str = "google_ai"  # "google_ai" or "vertex_ai"
     llm_model: str = "gemini-2.5-flash"
@@ -52,7 +57,30 @@ class Settings(BaseSettings):
 
     # ML Models
     flashcard_model_endpoint_id: Optional[str] = None
+    ml_model_path: Optional[str] = None  # Defaults to local_model_artifacts/model.compiled, else model.joblib
+    ml_prediction_table_path: Optional[str] = None  # Defaults to local_model_artifacts/model.table.npz
+    ml_model_reload_interval_seconds: int = 30  # Artifact change polling (0 = load once, no hot reload)
+    ml_batch_max_size: int = 64  # Rows that flush a prediction micro-batch immediately
+    ml_batch_max_wait_ms: float = 2.0  # Longest wait for a busy worker before a queued batch is dispatched
+    ml_batch_workers: int = 2  # Threads running batched model.predict
     
+    # Request logging
+    request_log_sample_rate: float = 1.0  # Fraction of non-5xx requests logged (5xx always logged)
+
+    # Profile cache
+    profile_cache_l1_ttl_seconds: int = 15  # In-process TTL (bounds cross-replica staleness)
+    profile_cache_ttl_seconds: int = 300  # Redis TTL
+    profile_cache_size: int = 10000  # Max in-process entries
+
+    # Due-card queue (Redis sorted-set mirror)
+    due_queue_ttl_seconds: int = 86400  # Idle queues are rebuilt from Firestore after this
+
+    # Firestore reads
+    firestore_read_budget_per_request: int = 0  # Max documents read per request (0 = no cap)
+
+    # Response compression
+    response_compression_min_bytes: int = 1024  # Smaller bodies are sent uncompressed
+
     # Worker Service (GKE Autopilot)
     worker_service_url: Optional[str] = None  # URL of document worker service
 
@@ -64,6 +92,25 @@ class Settings(BaseSettings):
     rate_limit_rag_chat: int = 20  # RAG/Chat endpoints
     rate_limit_analytics: int = 30  # Analytics endpoints
     rate_limit_document_upload: int = 10  # Document upload
+
+    # Rate Limiting burst (requests allowed back-to-back before the per-minute pace applies)
+    rate_limit_rag_chat_burst: int = 5
+    rate_limit_analytics_burst: int = 10
+    rate_limit_document_upload_burst: int = 3
+
+    # In-process pre-limiter: local buckets hold slack * quota / replicas
+    rate_limit_replicas: int = 1  # Backend replica count (keep in sync with HPA maxReplicas)
+    rate_limit_local_slack: float = 1.5  # Headroom before a replica rejects without Redis
+
+    # Concurrency limits for LLM-backed endpoints (in-flight requests)
+    llm_max_in_flight_per_user: int = 2  # Across all replicas (Redis semaphore)
+    llm_max_in_flight_per_replica: int = 32
+    llm_user_queue_timeout_seconds: float = 0.0  # 0 = reject immediately when the user is at the cap
+    llm_replica_queue_timeout_seconds: float = 5.0  # Wait this long for a free replica slot
+    llm_lease_seconds: int = 60  # Per-user lease TTL, renewed while the request runs
+    # X-Forwarded-For entries appended after the client's by our own proxies. The GKE
+    # GCE Ingress (GCLB) appends "<client-ip>, <lb-ip>", so the client is 1 from the end
+    forwarded_for_trusted_hops: int = 1
     
     @classmethod
     def settings_customise_sources(
@@ -1,40 +1,190 @@
 """Firebase Authentication middleware"""
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from firebase_admin import auth
+from app.config import get_settings
 
+logger = logging.getLogger(__name__)
 
 security = HTTPBearer()
 
 
-from typing import Optional
+from typing import Optional, Tuple
 
 class AuthenticatedUser:
     """Represents an authenticated user from Firebase"""
-    
+
     def __init__(self, uid: str, email: Optional[str] = None):
         self.uid = uid
         self.email = email
 
 
+class VerifiedTokenCache:
+    """
+    Bounded LRU of verified ID tokens.
+
+    Keys are SHA-256 hashes of the raw token (the token itself is never stored),
+    values are (uid, email, exp). An entry is served only until the token's own
+    `exp` claim, so a cache hit never extends the lifetime of a token.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[str, Optional[str], float]]" = OrderedDict()
+
+    @staticmethod
+    def hash_token(token: str) -> str:
+        """Hash a raw ID token into a cache key."""
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[AuthenticatedUser]:
+        """Return the cached user for a token, or None if missing/expired."""
+        key = self.hash_token(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        uid, email, exp = entry
+        if exp <= time.time():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return AuthenticatedUser(uid=uid, email=email)
+
+    def put(self, token: str, uid: str, email: Optional[str], exp: float) -> None:
+        """Cache a verified token until its expiry."""
+        if self.max_size <= 0 or exp <= time.time():
+            return
+
+        key = self.hash_token(token)
+        self._entries[key] = (uid, email, exp)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Singleton instance
+_token_cache: Optional[VerifiedTokenCache] = None
+
+
+def get_token_cache() -> VerifiedTokenCache:
+    """Get or create the process-wide verified token cache."""
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = VerifiedTokenCache(max_size=get_settings().auth_token_cache_size)
+    return _token_cache
+
+
+def get_cached_user_id(authorization: Optional[str]) -> Optional[str]:
+    """
+    Resolve a user ID from an Authorization header using only the verified
+    token cache. Never verifies; returns None for tokens not seen yet.
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    user = get_token_cache().get(token)
+    return user.uid if user else None
+
+
+# Google's signing certs for Firebase ID tokens (firebase_admin._token_gen.ID_TOKEN_CERT_URI)
+ID_TOKEN_CERT_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+
+_cert_request_fallback_logged = False
+
+
+def _firebase_cert_request():
+    """
+    The cache-controlled transport firebase_admin verifies tokens with.
+
+    Private API: firebase-admin is pinned in requirements.txt, re-check on upgrade.
+    """
+    # pylint: disable=protected-access
+    return auth._get_client(None)._token_verifier.request
+
+
+def prefetch_public_certs() -> bool:
+    """
+    Fetch Google's ID token signing certs through firebase_admin's own
+    cache-controlled session, so verification on the request path finds them warm.
+
+    If firebase_admin's internals change, falls back to a plain google-auth
+    request (logged once): it no longer warms the verifier's cache, but
+    never stops the refresh task.
+
+    Blocking; call via asyncio.to_thread.
+    """
+    global _cert_request_fallback_logged
+    try:
+        try:
+            request = _firebase_cert_request()
+        except AttributeError as e:
+            if not _cert_request_fallback_logged:
+                _cert_request_fallback_logged = True
+                logger.warning(f"⚠️  firebase_admin has no cert transport to warm ({e}); using a plain request")
+            from google.auth.transport.requests import Request
+            request = Request()
+        request(url=ID_TOKEN_CERT_URL, method="GET")
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️  Failed to prefetch Firebase public certs: {e}")
+        return False
+
+
+async def refresh_public_certs_periodically(interval_seconds: int) -> None:
+    """Background task: keep the public cert cache warm until cancelled."""
+    while True:
+        await asyncio.to_thread(prefetch_public_certs)
+        await asyncio.sleep(interval_seconds)
+
+
 async def verify_firebase_token(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> AuthenticatedUser:
     """
     Verify Firebase ID token and return authenticated user.
     Use as a FastAPI dependency in route handlers.
-    
+
+    Verified tokens are cached until expiry, so repeat requests with the same
+    token skip signature verification. Misses are verified in a worker thread.
+    With AUTH_CHECK_REVOKED enabled every request is verified against Firebase.
+
     Example:
         @app.get("/protected")
         async def protected_route(user: AuthenticatedUser = Depends(verify_firebase_token)):
             return {"user_id": user.uid}
     """
     token = credentials.credentials
-    
+    settings = get_settings()
+    check_revoked = settings.auth_check_revoked
+    token_cache = get_token_cache()
+
+    if not check_revoked:
+        cached_user = token_cache.get(token)
+        if cached_user is not None:
+            return cached_user
+
     try:
-        decoded_token = auth.verify_id_token(token)
+        decoded_token = await asyncio.to_thread(
+            auth.verify_id_token, token, check_revoked=check_revoked
+        )
         uid = decoded_token["uid"]
         email = decoded_token.get("email")
+        exp = decoded_token.get("exp")
+        if exp is not None:
+            token_cache.put(token, uid, email, float(exp))
         return AuthenticatedUser(uid=uid, email=email)
     except auth.InvalidIdTokenError as e:
         print(f"❌ Auth Error: {str(e)}")
@@ -56,7 +206,7 @@ async def get_current_user_id(
     """
     Get the current user's ID from the authenticated user.
     Convenience dependency for endpoints that only need the user ID.
-    
+
     Example:
         @app.get("/protected")
         async def protected_route(user_id: str = Depends(get_current_user_id)):
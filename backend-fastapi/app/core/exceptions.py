@@ -19,3 +19,8 @@ class UnauthorizedError(LearningAierException):
 class ValidationError(LearningAierException):
     """Validation error"""
     pass
+
+
+class ReadBudgetExceededError(LearningAierException):
+    """Request exceeded its Firestore read budget"""
+    pass
@@ -0,0 +1,196 @@
+"""
+Request-scoped Firestore document loader.
+
+Deduplicates and batches document reads within one request: loads issued in
+the same event-loop tick are coalesced into a single `get_all` call, and every
+document is fetched at most once per request. The loader also counts the
+documents read from Firestore (including query results passed through
+`track_reads`) so read amplification is visible and can be capped.
+"""
+import asyncio
+import logging
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from app.core.firebase import get_firestore_client
+from app.core.exceptions import ReadBudgetExceededError
+
+logger = logging.getLogger(__name__)
+
+_current_loader: ContextVar[Optional["DocumentLoader"]] = ContextVar("firestore_loader", default=None)
+
+
+class DocumentLoader:
+    """Per-request batching and memoizing loader for Firestore documents."""
+
+    def __init__(self, max_reads: int = 0):
+        """
+        Args:
+            max_reads: Read budget for the request (0 disables the cap)
+        """
+        self.max_reads = max_reads
+        self.reads = 0
+        self.batches = 0
+        self._results: Dict[str, asyncio.Future] = {}
+        self._queue: List[Any] = []
+        self._dispatch_scheduled = False
+        self._tasks: set = set()
+
+    def prefetch(self, refs: Iterable[Any]) -> None:
+        """Queue document loads without waiting, so they join the next batch."""
+        for ref in refs:
+            self._enqueue(ref)
+
+    async def load(self, ref: Any) -> Any:
+        """Return the DocumentSnapshot for `ref` (fetched at most once per request)."""
+        return await self._enqueue(ref)
+
+    async def load_many(self, refs: Iterable[Any]) -> List[Any]:
+        """Return snapshots for `refs`, fetched in a single batch."""
+        futures = [self._enqueue(ref) for ref in refs]
+        return list(await asyncio.gather(*futures))
+
+    def clear(self, ref: Any) -> None:
+        """Forget a memoized document, e.g. after writing to it."""
+        self._results.pop(ref.path, None)
+
+    def record_reads(self, count: int) -> None:
+        """Count documents read outside the loader (e.g. query results)."""
+        self.reads += count
+        self._check_budget()
+
+    def _enqueue(self, ref: Any) -> asyncio.Future:
+        future = self._results.get(ref.path)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # Prefetched loads may never be awaited; don't warn about their errors
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._results[ref.path] = future
+        self._queue.append((ref, future))
+
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            loop.call_soon(self._start_dispatch)
+        return future
+
+    def _start_dispatch(self) -> None:
+        task = asyncio.ensure_future(self._dispatch())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self) -> None:
+        batch, self._queue = self._queue, []
+        self._dispatch_scheduled = False
+        if not batch:
+            return
+
+        try:
+            self.record_reads(len(batch))
+            self.batches += 1
+            refs = [ref for ref, _ in batch]
+            snapshots = await asyncio.to_thread(self._get_all, refs)
+        except Exception as e:
+            for ref, future in batch:
+                self._results.pop(ref.path, None)
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for ref, future in batch:
+            if not future.done():
+                future.set_result(snapshots[ref.path])
+
+    @staticmethod
+    def _get_all(refs: List[Any]) -> Dict[str, Any]:
+        """Fetch `refs` in one RPC, keyed by document path."""
+        snapshots = {
+            snapshot.reference.path: snapshot
+            for snapshot in get_firestore_client().get_all(refs)
+        }
+        for ref in refs:
+            if ref.path not in snapshots:
+                snapshots[ref.path] = ref.get()
+        return snapshots
+
+    def _check_budget(self) -> None:
+        if self.max_reads and self.reads > self.max_reads:
+            logger.warning(f"Firestore read budget exceeded: {self.reads} > {self.max_reads}")
+            raise ReadBudgetExceededError(
+                f"Request exceeded Firestore read budget ({self.reads} > {self.max_reads})"
+            )
+
+
+def get_document_loader() -> Optional[DocumentLoader]:
+    """Loader for the current request, or None outside a request."""
+    return _current_loader.get()
+
+
+def set_document_loader(loader: Optional[DocumentLoader]):
+    """Install `loader` for the current context; returns a reset token."""
+    return _current_loader.set(loader)
+
+
+def reset_document_loader(token) -> None:
+    _current_loader.reset(token)
+
+
+async def load_document(ref: Any) -> Any:
+    """
+    Fetch a document through the request loader when there is one.
+
+    Outside a request (background workers, scripts) this is a plain
+    threaded `ref.get()`.
+    """
+    loader = get_document_loader()
+    if loader is None:
+        return await asyncio.to_thread(ref.get)
+    return await loader.load(ref)
+
+
+async def load_many_documents(refs: Iterable[Any]) -> List[Any]:
+    """
+    Fetch several documents, in one batch through the request loader.
+
+    Outside a request this is a single threaded `get_all`.
+    """
+    refs = list(refs)
+    loader = get_document_loader()
+    if loader is None:
+        snapshots = await asyncio.to_thread(DocumentLoader._get_all, refs)
+        return [snapshots[ref.path] for ref in refs]
+    return await loader.load_many(refs)
+
+
+def prefetch_documents(refs: Iterable[Any]) -> None:
+    """Start loading `refs` in one batch; a no-op outside a request."""
+    loader = get_document_loader()
+    if loader is not None:
+        loader.prefetch(refs)
+
+
+def forget_document(ref: Any) -> None:
+    """Drop a memoized document after writing to it; a no-op outside a request."""
+    loader = get_document_loader()
+    if loader is not None:
+        loader.clear(ref)
+
+
+def track_reads(documents: Iterable[Any]) -> Iterator[Any]:
+    """
+    Pass query results through, counting them against the request loader.
+
+    The loader is captured when called, so the returned iterator can be
+    consumed from a worker thread.
+    """
+    loader = get_document_loader()
+    if loader is None:
+        return iter(documents)
+    return _counted(documents, loader)
+
+
+def _counted(documents: Iterable[Any], loader: DocumentLoader) -> Iterator[Any]:
+    for document in documents:
+        loader.record_reads(1)
+        yield document
@@ -0,0 +1,128 @@
+"""Fast JSON responses: orjson encoding, streamed arrays and ETags"""
+import hashlib
+import itertools
+from typing import Any, Dict, Iterable, Iterator, Optional, Type
+import orjson
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response, StreamingResponse
+
+# Flush streamed JSON in chunks of roughly this size
+STREAM_CHUNK_BYTES = 64 * 1024
+
+_EXHAUSTED = object()
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Fallback for Firestore values orjson does not know (timestamps, references)."""
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to JSON bytes with orjson."""
+    return orjson.dumps(obj, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def project(data: Dict[str, Any], model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Reduce a raw document dict to the fields `model` declares, keyed by alias.
+
+    Produces the same shape FastAPI's response_model serialization would,
+    without per-item validation.
+    """
+    projected = {}
+    for name, field in model.model_fields.items():
+        key = field.alias or name
+        if key in data:
+            projected[key] = data[key]
+        elif name in data:
+            projected[key] = data[name]
+        elif field.is_required():
+            projected[key] = None
+        else:
+            projected[key] = field.get_default(call_default_factory=True)
+    return projected
+
+
+def iter_json_array(items: Iterable[Any]) -> Iterator[bytes]:
+    """Encode `items` as a single JSON array, yielded in ~64KB chunks."""
+    buffer = bytearray(b"[")
+    first = True
+    for item in items:
+        if not first:
+            buffer += b","
+        buffer += dumps(item)
+        first = False
+        if len(buffer) >= STREAM_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b"]"
+    yield bytes(buffer)
+
+
+def iter_json_object(arrays: Dict[str, Iterable[Any]]) -> Iterator[bytes]:
+    """Encode {key: [items...], ...} with every array streamed."""
+    yield b"{"
+    for index, (key, items) in enumerate(arrays.items()):
+        prefix = b"," if index else b""
+        yield prefix + dumps(key) + b":"
+        yield from iter_json_array(items)
+    yield b"}"
+
+
+async def _primed(items: Iterable[Any]) -> Iterator[Any]:
+    """
+    Pull the first item (in a worker thread) before the response starts, so a
+    failing query still surfaces as an HTTP error instead of a truncated body.
+    """
+    iterator = iter(items)
+    first = await run_in_threadpool(next, iterator, _EXHAUSTED)
+    if first is _EXHAUSTED:
+        return iter(())
+    return itertools.chain([first], iterator)
+
+
+async def json_array_response(items: Iterable[Any]) -> StreamingResponse:
+    """
+    Stream a (possibly blocking, e.g. Firestore) iterable as a JSON array.
+
+    Sync iterables are consumed in Starlette's threadpool, so the event loop
+    never blocks on Firestore paging and the full list is never held in memory.
+    """
+    return StreamingResponse(iter_json_array(await _primed(items)), media_type="application/json")
+
+
+async def json_object_response(arrays: Dict[str, Iterable[Any]]) -> StreamingResponse:
+    """Stream an object whose values are large arrays, e.g. {"nodes": [...], "edges": [...]}."""
+    primed = {key: await _primed(items) for key, items in arrays.items()}
+    return StreamingResponse(iter_json_object(primed), media_type="application/json")
+
+
+def compute_etag(body: bytes) -> str:
+    """Strong ETag derived from the response body."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an If-None-Match header (weak comparison, as RFC 9110 requires)."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def json_etag_response(content: Any, if_none_match: Optional[str] = None) -> Response:
+    """
+    JSON response carrying an ETag; 304 Not Modified if the client already has it.
+
+    Cache-Control "private, no-cache" lets the browser keep the body but makes
+    it revalidate on every use.
+    """
+    body = dumps(content)
+    etag = compute_etag(body)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
@@ -3,21 +3,30 @@ from functools import lru_cache
 from app.config import get_settings
 
 
+def check_vertex_config():
+    """
+    Validate the Vertex AI settings without importing the SDK.
+
+    Cheap enough for startup, so a misconfigured deployment fails fast.
+    """
+    if not get_settings().vertex_project_id:
+        raise ValueError(
+            "VERTEX_PROJECT_ID is required when using Vertex AI provider. "
+            "Please set it in your .env.local file."
+        )
+
+
 @lru_cache()
 def init_vertex_ai():
     """
-    Initialize Vertex AI SDK.
+    Initialize Vertex AI SDK (once per process; a failed attempt is retried).
     
     Uses Application Default Credentials (ADC) from the environment.
-    This should be called during application startup if using Vertex AI.
+    Warmed up after startup (app.main.deferred_warm_up) and called again by
+    VertexLLMClient, so requests never use an uninitialized SDK.
     """
     settings = get_settings()
-    
-    if not settings.vertex_project_id:
-        raise ValueError(
-            "VERTEX_PROJECT_ID is required when using Vertex AI provider. "
-            "Please set it in your .env.local file."
-        )
+    check_vertex_config()
     
     try:
         import vertexai
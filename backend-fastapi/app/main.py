@@ -1,11 +1,11 @@
 """FastAPI application initialization"""
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.config import get_settings
-from app.api import notes, documents, flashcards, graph, chat, analytics
-import time
-import json
+from app.api import notes, documents, flashcards, graph, chat, analytics, profile
+import asyncio
+import importlib
 import logging
 
 # Configure logging
@@ -15,6 +15,35 @@ logging.basicConfig(
 )
 
 
+# Imported in the background after startup; everything else loads on first use
+DEFERRED_WARM_UP_MODULES = {
+    "google_ai": ["app.services.google_ai_llm_service"],
+    "vertex_ai": ["app.services.vertex_llm_service"],
+}
+DEFERRED_WARM_UP_COMMON = ["pinecone"]
+
+
+async def deferred_warm_up(settings) -> None:
+    """
+    Initialize Vertex AI (if configured) and import the LLM and vector SDKs
+    in a worker thread, after the app is already serving.
+    """
+    if settings.llm_provider == "vertex_ai":
+        try:
+            from app.core.vertex import init_vertex_ai
+            await asyncio.to_thread(init_vertex_ai)
+        except Exception as e:
+            print(f"❌ Vertex AI initialization failed: {e}")
+
+    modules = DEFERRED_WARM_UP_MODULES.get(settings.llm_provider, []) + DEFERRED_WARM_UP_COMMON
+    for module in modules:
+        try:
+            await asyncio.to_thread(importlib.import_module, module)
+        except Exception as e:
+            print(f"⚠️  Warm-up import of {module} failed: {e}")
+    print(f"✅ Deferred warm-up complete: {', '.join(modules)}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events"""
@@ -39,16 +68,18 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"❌ Firebase initialization failed: {e}")
         raise
-    
-    # Initialize Vertex AI if configured
+
+    # Fail fast on a misconfigured Vertex AI setup; the SDK itself loads after startup
     if settings.llm_provider == "vertex_ai":
-        try:
-            from app.core.vertex import init_vertex_ai
-            init_vertex_ai()
-        except Exception as e:
-            print(f"❌ Vertex AI initialization failed: {e}")
-            raise
-    
+        from app.core.vertex import check_vertex_config
+        check_vertex_config()
+
+    # Prefetch Firebase public certs and keep them warm for token verification
+    from app.core.auth import refresh_public_certs_periodically
+    cert_refresh_task = asyncio.create_task(
+        refresh_public_certs_periodically(settings.auth_cert_refresh_seconds)
+    )
+
     # Initialize and test Redis connection
     try:
         from app.services.cache_service import get_cache_service
@@ -66,10 +97,24 @@ async def lifespan(app: FastAPI):
         print(f"⚠️  Redis initialization warning: {e}")
     
     print("="*80)
+
+    # Heavy SDKs are not needed to pass the readiness probe: load them after
+    # startup so the first AI request does not pay for them either
+    deferred_warm_up_task = asyncio.create_task(deferred_warm_up(settings))
+
+    # Load the interval model once per process and hot-reload it when the
+    # artifact is swapped
+    from app.services.model_registry import get_model_registry
+    model_watch_task = asyncio.create_task(get_model_registry().watch())
     
     yield  # Server runs here
     
-    # Shutdown (if needed in the future)
+    # Shutdown
+    deferred_warm_up_task.cancel()
+    model_watch_task.cancel()
+    cert_refresh_task.cancel()
+    from app.services.ml_prediction_service import get_prediction_batcher
+    get_prediction_batcher().shutdown()
     print("👋 Shutting down LearningAier API")
 
 
@@ -87,10 +132,31 @@ app.include_router(flashcards.router)
 app.include_router(graph.router)
 app.include_router(chat.router)
 app.include_router(analytics.router)
+app.include_router(profile.router)
 
 
-# CORS middleware
+# Request-scoped Firestore loader (innermost, so it wraps only the endpoint)
+from app.middleware.firestore_loader import add_firestore_loader
+add_firestore_loader(app)
 
+# Concurrency limiter middleware (inside the rate limiter, so rejected requests never queue)
+from app.middleware.concurrency_limiter import add_concurrency_limiter
+add_concurrency_limiter(app)
+
+# Rate limiter middleware
+from app.middleware.rate_limiter import add_rate_limiter
+add_rate_limiter(app)
+
+# gzip/brotli compression for large responses
+from app.middleware.compression import add_compression
+add_compression(app)
+
+# Structured request logging (outside everything but CORS, so it times the whole stack)
+from app.middleware.request_logging import add_request_logging
+add_request_logging(app)
+
+# CORS middleware (added last, so it is outermost: rate-limit and overload
+# rejections from the inner middleware still carry CORS headers)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -103,71 +169,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "ETag", "X-Next-Cursor", "X-Firestore-Reads",
+        "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset", "Retry-After",
+    ],
 )
 
-# Rate limiter middleware
-from app.middleware.rate_limiter import add_rate_limiter
-add_rate_limiter(app)
-
-# Request/Response Logging Middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    # Skip logging for streaming endpoints to avoid consuming request body
-    if request.url.path.endswith("/stream"):
-        return await call_next(request)
-
-    start_time = time.time()
-    
-    # Log request
-    print(f"\n{'='*80}")
-    print(f"🔵 INCOMING REQUEST")
-    print(f"{'='*80}")
-    print(f"📍 Method: {request.method}")
-    print(f"🔗 URL: {request.url}")
-    print(f"👤 Client: {request.client.host if request.client else 'Unknown'}")
-    
-    # Log headers (excluding sensitive auth tokens)
-    headers_to_log = {k: v for k, v in request.headers.items() if k.lower() not in ['authorization']}
-    if 'authorization' in dict(request.headers):
-        headers_to_log['authorization'] = 'Bearer ***' 
-    print(f"📋 Headers: {json.dumps(headers_to_log, indent=2)}")
-    
-    # Log request body for POST/PUT requests
-    if request.method in ["POST", "PUT", "PATCH"]:
-        try:
-            body = await request.body()
-            if body:
-                body_str = body.decode()
-                try:
-                    body_json = json.loads(body_str)
-                    print(f"📦 Request Body:")
-                    print(json.dumps(body_json, indent=2))
-                except:
-                    print(f"📦 Request Body (raw): {body_str[:500]}")
-                
-                # Re-create request with body for downstream processing
-                async def receive():
-                    return {"type": "http.request", "body": body}
-                request._receive = receive
-        except Exception as e:
-            print(f"⚠️  Could not read request body: {e}")
-    
-    # Process request
-    response = await call_next(request)
-    
-    # Calculate duration
-    duration = time.time() - start_time
-    
-    # Log response
-    print(f"\n{'='*80}")
-    print(f"🟢 OUTGOING RESPONSE")
-    print(f"{'='*80}")
-    print(f"📊 Status Code: {response.status_code}")
-    print(f"⏱️  Duration: {duration:.3f}s")
-    print(f"{'='*80}\n")
-    
-    return response
-
 
 @app.get("/")
 async def root():
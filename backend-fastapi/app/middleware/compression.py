@@ -0,0 +1,172 @@
+"""Negotiated gzip/brotli response compression middleware."""
+import logging
+import zlib
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import get_settings
+
+try:
+    import brotli
+except ImportError:  # Optional: fall back to gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick "br" or "gzip" from an Accept-Encoding header (brotli preferred)."""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(token.strip().lower())
+
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """Streaming compressor with a common interface for gzip and brotli."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+            self._gzip = None
+        else:
+            self._br = None
+            self._gzip = zlib.compressobj(gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._br.process(data) if self._br else self._gzip.compress(data)
+
+    def finish(self) -> bytes:
+        return self._br.finish() if self._br else self._gzip.flush()
+
+
+class CompressionMiddleware:
+    """
+    Compress responses of at least `minimum_size` bytes with the best encoding
+    the client accepts (brotli if installed, else gzip).
+
+    Works with streamed bodies: chunks are buffered only until the size
+    threshold is crossed, then compressed as they flow. Server-sent events,
+    responses that already carry a Content-Encoding, and responses without a
+    body (204, 304, HEAD) pass through untouched.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: Optional[int] = None,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        if minimum_size is None:
+            minimum_size = get_settings().response_compression_min_bytes
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, encoding, self, head=scope["method"] == "HEAD")
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Per-request state for CompressionMiddleware."""
+
+    def __init__(self, send: Send, encoding: str, config: CompressionMiddleware, head: bool = False):
+        self._send = send
+        self.encoding = encoding
+        self.config = config
+        self.head = head
+        self.start_message: Optional[Message] = None
+        self.pending = bytearray()
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            if (
+                "content-encoding" in headers
+                or headers.get("content-type", "").startswith("text/event-stream")
+                # No body to compress; Content-Length describes the GET or cached response
+                or self.head
+                or message["status"] in (204, 304)
+            ):
+                self.passthrough = True
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            self.pending += body
+            if more_body and len(self.pending) < self.config.minimum_size:
+                # Not enough bytes yet to decide
+                return
+            if len(self.pending) < self.config.minimum_size:
+                await self._send_uncompressed(more_body)
+                return
+            await self._start_compression(more_body)
+            return
+
+        data = self.compressor.compress(body)
+        if not more_body:
+            data += self.compressor.finish()
+        if data or not more_body:
+            await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    async def _send_uncompressed(self, more_body: bool) -> None:
+        self.passthrough = True
+        headers = MutableHeaders(scope=self.start_message)
+        if not more_body:
+            headers["Content-Length"] = str(len(self.pending))
+        await self._send(self.start_message)
+        await self._send({"type": "http.response.body", "body": bytes(self.pending), "more_body": more_body})
+
+    async def _start_compression(self, more_body: bool) -> None:
+        self.compressor = _Compressor(self.encoding, self.config.gzip_level, self.config.brotli_quality)
+        data = self.compressor.compress(bytes(self.pending))
+        self.pending.clear()
+
+        headers = MutableHeaders(scope=self.start_message)
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if more_body:
+            if "content-length" in headers:
+                del headers["Content-Length"]
+        else:
+            data += self.compressor.finish()
+            headers["Content-Length"] = str(len(data))
+
+        await self._send(self.start_message)
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+
+def add_compression(app):
+    """Add gzip/brotli compression middleware to FastAPI app."""
+    app.add_middleware(CompressionMiddleware)
+    logger.info(f"✅ Compression middleware added (brotli: {'yes' if brotli else 'no'})")
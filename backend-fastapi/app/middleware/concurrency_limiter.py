@@ -0,0 +1,307 @@
+"""Concurrency admission control for expensive (LLM-backed) endpoints."""
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.auth import get_cached_user_id
+from app.middleware.routing import get_route_marker
+from app.services.cache_service import get_cache_service
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+# Acquire a lease in a per-user Redis semaphore.
+#
+# KEYS[1]  sorted set of lease ids scored by lease expiry (ms, Redis clock)
+# ARGV[1]  lease id
+# ARGV[2]  max concurrent leases
+# ARGV[3]  lease duration in ms
+#
+# Expired leases (crashed replicas, lost releases) are dropped before counting.
+ACQUIRE_LEASE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now + tonumber(ARGV[3]), ARGV[1])
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+# Extend a lease that is still held. ARGV[1] lease id, ARGV[2] lease duration in ms.
+RENEW_LEASE_LUA = """
+if not redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+    return 0
+end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+redis.call('ZADD', KEYS[1], now + tonumber(ARGV[2]), ARGV[1])
+redis.call('PEXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+@dataclass(frozen=True)
+class ConcurrencyQuota:
+    """Max in-flight requests per user (across replicas) and per replica."""
+    per_user: int
+    per_replica: int
+    user_queue_timeout: float  # seconds to wait for a user slot, 0 = fail fast
+    replica_queue_timeout: float  # seconds to wait for a replica slot, 0 = fail fast
+
+
+def concurrency_limit(category: str):
+    """
+    Declare the concurrency quota category for a route.
+
+    Example:
+        @router.post("/generate")
+        @concurrency_limit("llm")
+        async def generate_flashcards(...):
+            ...
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.concurrency_limit_category = category
+        return endpoint
+    return decorator
+
+
+class RedisLeaseSemaphore:
+    """
+    Distributed counting semaphore built on a Redis sorted set of leases.
+
+    Leases expire on their own, so a replica that dies mid-request can never
+    leak a slot for longer than `lease_seconds`. Holders renew in the
+    background while the request (e.g. an SSE stream) is still running.
+
+    If Redis is unavailable the semaphore degrades to per-process counts.
+    """
+
+    def __init__(self, lease_seconds: int = 60, poll_interval: float = 0.1):
+        self.cache_service = get_cache_service()
+        self.lease_ms = lease_seconds * 1000
+        self.poll_interval = poll_interval
+        self._acquire_script = None
+        self._renew_script = None
+        self._local_counts: Dict[str, int] = {}
+
+    async def acquire(self, key: str, limit: int, timeout: float) -> Optional[str]:
+        """
+        Take a lease on `key`, waiting up to `timeout` seconds.
+
+        Returns:
+            Lease id, or None if the semaphore stayed full
+        """
+        lease_id = uuid.uuid4().hex
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            acquired = await self._try_acquire(key, lease_id, limit)
+            if acquired:
+                return acquired
+            if loop.time() + self.poll_interval > deadline:
+                return None
+            await asyncio.sleep(self.poll_interval)
+
+    async def renew(self, key: str, lease_id: str) -> bool:
+        client = self._client()
+        if client is None or lease_id.startswith("local:"):
+            return True
+        if self._renew_script is None:
+            self._renew_script = client.register_script(RENEW_LEASE_LUA)
+        try:
+            return bool(await self._renew_script(keys=[key], args=[lease_id, self.lease_ms]))
+        except Exception as e:
+            logger.error(f"Lease renew failed for {key}: {e}")
+            return False
+
+    async def release(self, key: str, lease_id: str) -> None:
+        if lease_id.startswith("local:"):
+            self._local_counts[key] = max(0, self._local_counts.get(key, 1) - 1)
+            if not self._local_counts[key]:
+                del self._local_counts[key]
+            return
+
+        client = self._client()
+        if client is None:
+            return
+        try:
+            await client.zrem(key, lease_id)
+        except Exception as e:
+            # The lease expires on its own
+            logger.error(f"Lease release failed for {key}: {e}")
+
+    def _client(self):
+        if not self.cache_service.enabled:
+            return None
+        return self.cache_service.client
+
+    async def _try_acquire(self, key: str, lease_id: str, limit: int) -> Optional[str]:
+        client = self._client()
+        if client is not None:
+            if self._acquire_script is None:
+                self._acquire_script = client.register_script(ACQUIRE_LEASE_LUA)
+            try:
+                acquired = await self._acquire_script(keys=[key], args=[lease_id, limit, self.lease_ms])
+                return lease_id if acquired else None
+            except Exception as e:
+                logger.error(f"Lease acquire failed for {key}, using local count: {e}")
+
+        # Redis unavailable: enforce the limit per process
+        if self._local_counts.get(key, 0) >= limit:
+            return None
+        self._local_counts[key] = self._local_counts.get(key, 0) + 1
+        return f"local:{lease_id}"
+
+
+def client_address(scope: Scope, headers: Headers, trusted_hops: int) -> str:
+    """
+    Address of the client that sent the request.
+
+    Behind a load balancer the socket peer is the proxy. Each of our
+    `trusted_hops` proxies appends to X-Forwarded-For after the address it
+    received the request from; the GKE GCE Ingress appends
+    "<client-ip>, <lb-ip>" (one trusted hop). Entries further left are
+    supplied by the client and can be forged, so the address is taken at that
+    depth from the end.
+    """
+    forwarded = [entry.strip() for entry in headers.get("x-forwarded-for", "").split(",") if entry.strip()]
+    if forwarded:
+        return forwarded[max(len(forwarded) - 1 - trusted_hops, 0)]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class ConcurrencyLimiterMiddleware:
+    """
+    Admission controller bounding in-flight requests on declared routes.
+
+    Routes opt in with `@concurrency_limit(category)`. A request must get:
+    1. a per-user lease from a Redis semaphore (users are identified from the
+       verified token cache; unseen tokens get a lease per client address), and
+    2. a slot in this replica's in-process semaphore.
+
+    Either step waits up to its queue timeout and otherwise answers 429 at once,
+    keeping tail latency bounded for everyone else. Slots are held until the
+    response body has been fully sent, so SSE streams count while they stream.
+
+    Pure ASGI so that streaming responses pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.settings = get_settings()
+        self.quotas = {
+            "llm": ConcurrencyQuota(
+                per_user=self.settings.llm_max_in_flight_per_user,
+                per_replica=self.settings.llm_max_in_flight_per_replica,
+                user_queue_timeout=self.settings.llm_user_queue_timeout_seconds,
+                replica_queue_timeout=self.settings.llm_replica_queue_timeout_seconds,
+            ),
+        }
+        self.user_semaphore = RedisLeaseSemaphore(lease_seconds=self.settings.llm_lease_seconds)
+        self.replica_semaphores = {
+            category: asyncio.Semaphore(quota.per_replica)
+            for category, quota in self.quotas.items()
+        }
+        logger.info(f"✅ Concurrency limiter initialized with quotas: {self.quotas}")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        category = get_route_marker(scope, "concurrency_limit_category")
+        if category is None or category not in self.quotas:
+            await self.app(scope, receive, send)
+            return
+
+        quota = self.quotas[category]
+        headers = Headers(scope=scope)
+        user_id = get_cached_user_id(headers.get("authorization"))
+
+        # 1. Per-user lease (shared across replicas). Tokens not verified yet
+        # (first request with a fresh token, or invalid ones) count against
+        # the client address instead, so they cannot bypass the cap.
+        if user_id:
+            user_key = f"inflight:{category}:{user_id}"
+        else:
+            address = client_address(scope, headers, self.settings.forwarded_for_trusted_hops)
+            user_key = f"inflight:{category}:ip:{address}"
+        lease_id = await self.user_semaphore.acquire(user_key, quota.per_user, quota.user_queue_timeout)
+        if lease_id is None:
+            logger.warning(f"⚠️  Concurrency limit reached for {user_key} on {scope['path']}")
+            await self._reject(scope, receive, send, "user", quota.per_user)
+            return
+
+        renew_task = None
+        try:
+            # 2. Per-replica slot
+            replica_semaphore = self.replica_semaphores[category]
+            if not await self._acquire_replica_slot(replica_semaphore, quota.replica_queue_timeout):
+                logger.warning(f"⚠️  Replica concurrency limit reached on {scope['path']}")
+                await self._reject(scope, receive, send, "replica", quota.per_replica)
+                return
+
+            try:
+                if lease_id:
+                    renew_task = asyncio.create_task(self._renew_periodically(user_key, lease_id))
+                await self.app(scope, receive, send)
+            finally:
+                replica_semaphore.release()
+        finally:
+            if renew_task:
+                renew_task.cancel()
+            if lease_id:
+                await self.user_semaphore.release(user_key, lease_id)
+
+    @staticmethod
+    async def _acquire_replica_slot(semaphore: asyncio.Semaphore, timeout: float) -> bool:
+        if timeout <= 0:
+            if semaphore.locked():
+                return False
+            await semaphore.acquire()
+            return True
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _renew_periodically(self, key: str, lease_id: str) -> None:
+        interval = self.user_semaphore.lease_ms / 1000 / 3
+        while True:
+            await asyncio.sleep(interval)
+            await self.user_semaphore.renew(key, lease_id)
+
+    @staticmethod
+    async def _reject(scope: Scope, receive: Receive, send: Send, scope_name: str, limit: int) -> None:
+        response = JSONResponse(
+            status_code=429,
+            content={
+                "error": "Too many concurrent requests",
+                "message": (
+                    "Too many requests in progress for this user. Please wait for them to finish."
+                    if scope_name == "user"
+                    else "Server is busy. Please try again shortly."
+                ),
+                "limit": limit,
+                "scope": scope_name,
+                "retry_after": 1
+            },
+            headers={"Retry-After": "1"}
+        )
+        await response(scope, receive, send)
+
+
+def add_concurrency_limiter(app):
+    """Add concurrency limiter middleware to FastAPI app."""
+    app.add_middleware(ConcurrencyLimiterMiddleware)
+    logger.info("✅ Concurrency limiter middleware added")
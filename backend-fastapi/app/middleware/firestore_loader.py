@@ -0,0 +1,51 @@
+"""Install a request-scoped Firestore DocumentLoader and report its read count."""
+import logging
+from typing import Optional
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import get_settings
+from app.core.firestore_loader import DocumentLoader, reset_document_loader, set_document_loader
+
+logger = logging.getLogger(__name__)
+
+
+class FirestoreLoaderMiddleware:
+    """
+    Give every HTTP request its own DocumentLoader.
+
+    The loader is available to services via get_document_loader() and to
+    outer middleware (access logging) via scope["state"]["firestore_loader"].
+    The number of documents read before the response starts is returned in
+    the X-Firestore-Reads header.
+    """
+
+    def __init__(self, app: ASGIApp, max_reads: Optional[int] = None):
+        self.app = app
+        if max_reads is None:
+            max_reads = get_settings().firestore_read_budget_per_request
+        self.max_reads = max_reads
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        loader = DocumentLoader(max_reads=self.max_reads)
+        scope.setdefault("state", {})["firestore_loader"] = loader
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Firestore-Reads"] = str(loader.reads)
+            await send(message)
+
+        token = set_document_loader(loader)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            reset_document_loader(token)
+
+
+def add_firestore_loader(app):
+    """Add request-scoped Firestore loader middleware to FastAPI app (innermost)."""
+    app.add_middleware(FirestoreLoaderMiddleware)
+    logger.info("✅ Firestore loader middleware added")
@@ -1,139 +1,307 @@
 """Rate limiting middleware using Redis."""
 import logging
-from typing import Callable
-from fastapi import Request, Response, HTTPException
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+from fastapi import Request, Response
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
+from app.core.auth import get_cached_user_id
+from app.middleware.routing import get_route_marker
 from app.services.cache_service import get_cache_service
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
 
+# GCRA (generic cell rate algorithm) in a single atomic round-trip.
+#
+# KEYS[1]  per-user quota key, stores the theoretical arrival time (TAT) in ms
+# ARGV[1]  emission interval in ms (period / rate)
+# ARGV[2]  burst tolerance in ms (emission interval * burst)
+#
+# Returns {allowed, remaining, retry_after_ms, reset_after_ms}.
+# Uses the Redis server clock so all replicas agree on "now".
+GCRA_LUA = """
+local emission_interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+
+local new_tat = tat + emission_interval
+local diff = now - (new_tat - tolerance)
+
+if diff < 0 then
+    return {0, 0, -diff, tat - now}
+end
+
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return {1, math.floor(diff / emission_interval), 0, new_tat - now}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitQuota:
+    """Sustained `rate` requests per `period_seconds`, allowing `burst` back-to-back."""
+    rate: int
+    burst: int
+    period_seconds: int = 60
+
+    @property
+    def emission_interval_ms(self) -> int:
+        # Whole milliseconds keep every value in the Lua script an integer
+        return max(1, round(self.period_seconds * 1000 / self.rate))
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Outcome of a single GCRA check."""
+    allowed: bool
+    remaining: int
+    retry_after: int  # seconds, rounded up
+    reset_after: int  # seconds until the bucket is full again, rounded up
+
+
+class LocalPreLimiter:
+    """
+    In-process token buckets that shed clear violators before Redis.
+
+    Each replica sees roughly 1/replicas of a user's traffic, so a bucket holds
+    `slack * burst / replicas` tokens and refills at `slack * rate / replicas`.
+    A user who empties it is over quota on this replica alone and is rejected
+    without I/O; everyone else goes on to Redis for the exact GCRA decision.
+    Redis denials are remembered until their retry-after so repeat offenders
+    are also answered locally.
+
+    Buckets are approximate and per-process; they never allow a request that
+    Redis would reject.
+    """
+
+    def __init__(self, replicas: int = 1, slack: float = 1.5, max_keys: int = 50000):
+        self.scale = slack / max(1, replicas)
+        self.max_keys = max_keys
+        # key -> [tokens, updated_at, blocked_until] (monotonic seconds)
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    def check(self, key: str, quota: RateLimitQuota) -> Optional[RateLimitResult]:
+        """
+        Take a token for `key`.
+
+        Returns:
+            A denied RateLimitResult for clear violators, None otherwise
+        """
+        now = time.monotonic()
+        capacity = max(1.0, quota.burst * self.scale)
+        refill_per_second = quota.rate * self.scale / quota.period_seconds
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [capacity, now, 0.0]
+            self._buckets[key] = bucket
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * refill_per_second)
+            bucket[1] = now
+
+        if bucket[2] > now:
+            return self._denied(bucket[2] - now, capacity, bucket[0], refill_per_second)
+
+        if bucket[0] < 1.0:
+            return self._denied(
+                (1.0 - bucket[0]) / refill_per_second, capacity, bucket[0], refill_per_second
+            )
+
+        bucket[0] -= 1.0
+        return None
+
+    def block(self, key: str, seconds: float) -> None:
+        """Reject `key` locally for `seconds` (after Redis denied it)."""
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket[2] = time.monotonic() + seconds
+
+    @staticmethod
+    def _denied(wait: float, capacity: float, tokens: float, refill_per_second: float) -> RateLimitResult:
+        return RateLimitResult(
+            allowed=False,
+            remaining=0,
+            retry_after=max(1, math.ceil(wait)),
+            reset_after=math.ceil((capacity - tokens) / refill_per_second),
+        )
+
+
+def rate_limit(category: str):
+    """
+    Declare the rate limit quota category for a route.
+
+    Example:
+        @router.post("/ai-qa")
+        @rate_limit("rag_chat")
+        async def ai_qa(...):
+            ...
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.rate_limit_category = category
+        return endpoint
+    return decorator
+
+
 class RateLimiterMiddleware(BaseHTTPMiddleware):
     """
-    Redis-based sliding window rate limiter.
-    
-    Rate limits are configurable per endpoint category:
-    - RAG/Chat endpoints: 20 requests/minute (default)
-    - Analytics endpoints: 30 requests/minute (default)
-    - Document upload: 10 requests/minute (default)
+    Redis-based GCRA rate limiter.
+
+    Routes opt in with the `@rate_limit(category)` decorator. Quotas are
+    configurable per category (requests per minute plus burst):
+    - rag_chat: 20 requests/minute (default)
+    - analytics: 30 requests/minute (default)
+    - document_upload: 10 requests/minute (default)
+
+    Users are identified from the verified token cache, so the limiter never
+    verifies tokens itself. Requests whose token has not been verified yet are
+    passed through to the auth dependency.
+
+    A LocalPreLimiter runs first and rejects clear violators without a Redis
+    round-trip.
     """
-    
+
     def __init__(self, app):
         super().__init__(app)
         self.cache_service = get_cache_service()
         self.settings = get_settings()
-        
-        # Define rate limits for endpoint categories (requests per minute)
-        self.rate_limits = {
-            # RAG and Chat endpoints
-            "/api/notes/ai-qa": self.settings.rate_limit_rag_chat,
-            "/api/chat": self.settings.rate_limit_rag_chat,
-            
-            # Analytics endpoints
-            "/api/analytics": self.settings.rate_limit_analytics,
-            
-            # Document upload
-            "/api/documents/upload": self.settings.rate_limit_document_upload,
+        self._gcra_script = None
+        self.local_limiter = LocalPreLimiter(
+            replicas=self.settings.rate_limit_replicas,
+            slack=self.settings.rate_limit_local_slack,
+        )
+
+        self.quotas = {
+            "rag_chat": RateLimitQuota(
+                rate=self.settings.rate_limit_rag_chat,
+                burst=self.settings.rate_limit_rag_chat_burst,
+            ),
+            "analytics": RateLimitQuota(
+                rate=self.settings.rate_limit_analytics,
+                burst=self.settings.rate_limit_analytics_burst,
+            ),
+            "document_upload": RateLimitQuota(
+                rate=self.settings.rate_limit_document_upload,
+                burst=self.settings.rate_limit_document_upload_burst,
+            ),
         }
-        
-        logger.info(f"✅ Rate limiter initialized with limits: {self.rate_limits}")
-    
+
+        logger.info(f"✅ Rate limiter initialized with quotas: {self.quotas}")
+
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """Process request with rate limiting."""
-        
+
         # Skip rate limiting for health checks and non-API endpoints
         if not request.url.path.startswith("/api/"):
             return await call_next(request)
-        
-        if request.url.path in ["/api/health", "/health", "/"]:
+
+        category = get_route_marker(request.scope, "rate_limit_category")
+        if category is None or category not in self.quotas:
+            # No rate limit declared for this route
             return await call_next(request)
-        
-        # Get user_id from request (assuming it's set by auth middleware)
-        user_id = getattr(request.state, "user_id", None)
+
+        user_id = get_cached_user_id(request.headers.get("authorization"))
         if not user_id:
-            # No user_id means authentication hasn't been performed yet
-            # Let the request through, auth middleware will handle it
+            # Token not verified yet, let the auth dependency handle it
             return await call_next(request)
-        
-        # Determine rate limit for this endpoint
-        limit = self._get_rate_limit(request.url.path)
-        if limit is None:
-            # No rate limit configured for this endpoint
+
+        quota = self.quotas[category]
+        local_key = f"{category}:{user_id}"
+
+        # Clear violators are rejected in-process, without touching Redis
+        result = self.local_limiter.check(local_key, quota)
+        if result is not None:
+            return self._too_many_requests(request, user_id, quota, result)
+
+        result = await self._check_rate_limit(user_id, category, quota)
+        if result is None:
+            # Redis unavailable, fail open
             return await call_next(request)
-        
-        # Check rate limit
-        is_allowed, retry_after = await self._check_rate_limit(user_id, request.url.path, limit)
-        
-        if not is_allowed:
-            logger.warning(
-                f"⚠️  Rate limit exceeded for user {user_id} on {request.url.path}. "
-                f"Limit: {limit}/min, retry after: {retry_after}s"
-            )
-            return JSONResponse(
-                status_code=429,
-                content={
-                    "error": "Rate limit exceeded",
-                    "message": f"Too many requests. Please try again in {retry_after} seconds.",
-                    "retry_after": retry_after,
-                    "limit": limit,
-                    "window": "60 seconds"
-                },
-                headers={"Retry-After": str(retry_after)}
-            )
-        
+
+        if not result.allowed:
+            self.local_limiter.block(local_key, result.retry_after)
+            return self._too_many_requests(request, user_id, quota, result)
+
         # Process request
         response = await call_next(request)
-        
-        # Add rate limit headers
-        response.headers["X-Rate-Limit"] = str(limit)
-        response.headers["X-Rate-Limit-Window"] = "60"
-        
+        response.headers.update(self._rate_limit_headers(quota, result))
         return response
-    
-    def _get_rate_limit(self, path: str) -> int | None:
-        """Get rate limit for a given path."""
-        # Check for exact match first
-        if path in self.rate_limits:
-            return self.rate_limits[path]
-        
-        # Check for prefix match (e.g., /api/chat/* matches /api/chat)
-        for endpoint_prefix, limit in self.rate_limits.items():
-            if path.startswith(endpoint_prefix):
-                return limit
-        
-        return None
-    
-    async def _check_rate_limit(self, user_id: str, endpoint: str, limit: int) -> tuple[bool, int]:
+
+    def _too_many_requests(
+        self, request: Request, user_id: str, quota: RateLimitQuota, result: RateLimitResult
+    ) -> JSONResponse:
+        logger.warning(
+            f"⚠️  Rate limit exceeded for user {user_id} on {request.url.path}. "
+            f"Quota: {quota.rate}/{quota.period_seconds}s (burst {quota.burst}), "
+            f"retry after: {result.retry_after}s"
+        )
+        return JSONResponse(
+            status_code=429,
+            content={
+                "error": "Rate limit exceeded",
+                "message": f"Too many requests. Please try again in {result.retry_after} seconds.",
+                "retry_after": result.retry_after,
+                "limit": quota.rate,
+                "window": f"{quota.period_seconds} seconds"
+            },
+            headers={
+                "Retry-After": str(result.retry_after),
+                **self._rate_limit_headers(quota, result),
+            }
+        )
+
+    @staticmethod
+    def _rate_limit_headers(quota: RateLimitQuota, result: RateLimitResult) -> dict:
+        return {
+            "X-RateLimit-Limit": str(quota.rate),
+            "X-RateLimit-Remaining": str(result.remaining),
+            "X-RateLimit-Reset": str(result.reset_after),
+        }
+
+    async def _check_rate_limit(
+        self, user_id: str, category: str, quota: RateLimitQuota
+    ) -> Optional[RateLimitResult]:
         """
-        Check if request is within rate limit using sliding window.
-        
+        Run the GCRA script for (user, category) in one Redis round-trip.
+
         Returns:
-            (is_allowed, retry_after_seconds)
+            RateLimitResult, or None if Redis is unavailable
         """
-        if not self.cache_service.enabled:
-            # Redis not available, allow request
-            return True, 0
-        
-        # Create rate limit key with current minute window
-        # Use timestamp to create rolling window
-        import time
-        current_minute = int(time.time() / 60)
-        cache_key = f"rate:{user_id}:{endpoint}:{current_minute}"
-        
-        # Increment counter
-        count = await self.cache_service.increment(cache_key, amount=1, ttl_seconds=120)
-        
-        if count > limit:
-            # Rate limit exceeded
-            # Calculate retry_after (seconds until next window)
-            current_time = time.time()
-            next_window = (current_minute + 1) * 60
-            retry_after = int(next_window - current_time)
-            return False, max(1, retry_after)
-        
-        return True, 0
+        client = self.cache_service.client
+        if not self.cache_service.enabled or client is None:
+            return None
+
+        if self._gcra_script is None:
+            self._gcra_script = client.register_script(GCRA_LUA)
+
+        emission_interval = quota.emission_interval_ms
+        try:
+            allowed, remaining, retry_after_ms, reset_after_ms = await self._gcra_script(
+                keys=[f"ratelimit:{category}:{user_id}"],
+                args=[emission_interval, emission_interval * quota.burst],
+            )
+        except Exception as e:
+            logger.error(f"Rate limit check failed for {user_id}: {e}")
+            return None
+
+        return RateLimitResult(
+            allowed=bool(allowed),
+            remaining=int(remaining),
+            retry_after=max(1, math.ceil(float(retry_after_ms) / 1000)) if not allowed else 0,
+            reset_after=math.ceil(float(reset_after_ms) / 1000),
+        )
 
 
 def add_rate_limiter(app):
@@ -0,0 +1,112 @@
+"""Structured access logging middleware (one JSON line per request)."""
+import json
+import logging
+import random
+import sys
+import time
+from typing import Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.middleware.routing import find_route
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def get_access_logger() -> logging.Logger:
+    """
+    Logger that writes bare JSON lines to stdout.
+
+    Cloud Logging parses a stdout line that is a JSON object as a structured
+    entry, so no prefix is added and records do not propagate to the root
+    handler.
+    """
+    access_logger = logging.getLogger("learningaier.access")
+    if not access_logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        access_logger.addHandler(handler)
+        access_logger.setLevel(logging.INFO)
+        access_logger.propagate = False
+    return access_logger
+
+
+class RequestLoggingMiddleware:
+    """
+    Pure ASGI access logger.
+
+    Emits one JSON line per request with method, route template, status,
+    duration, request/response sizes and Firestore document reads. Bodies are
+    never buffered or parsed: sizes are counted as the chunks stream through.
+    Successful requests are sampled at REQUEST_LOG_SAMPLE_RATE; 5xx responses
+    are always logged.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: Optional[float] = None):
+        self.app = app
+        if sample_rate is None:
+            sample_rate = get_settings().request_log_sample_rate
+        self.sample_rate = sample_rate
+        self.access_logger = get_access_logger()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        request_bytes = 0
+        response_bytes = 0
+
+        async def receive_wrapper() -> Message:
+            nonlocal request_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                request_bytes += len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            if status_code >= 500 or random.random() < self.sample_rate:
+                self._log(scope, status_code, start, request_bytes, response_bytes)
+
+    def _log(
+        self, scope: Scope, status_code: int, start: float, request_bytes: int, response_bytes: int
+    ) -> None:
+        route = scope.get("route") or find_route(scope)
+        if status_code >= 500:
+            severity = "ERROR"
+        elif status_code >= 400:
+            severity = "WARNING"
+        else:
+            severity = "INFO"
+        record = {
+            "severity": severity,
+            "message": "request",
+            "method": scope["method"],
+            "route": getattr(route, "path", None),
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+            "request_bytes": request_bytes,
+            "response_bytes": response_bytes,
+        }
+        loader = scope.get("state", {}).get("firestore_loader")
+        if loader is not None:
+            record["firestore_reads"] = loader.reads
+        self.access_logger.info(json.dumps(record, separators=(",", ":")))
+
+
+def add_request_logging(app):
+    """Add structured request logging middleware to FastAPI app (outermost)."""
+    app.add_middleware(RequestLoggingMiddleware)
+    logger.info("✅ Request logging middleware added")
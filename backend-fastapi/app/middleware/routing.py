@@ -0,0 +1,25 @@
+"""Route lookup helpers for middleware that runs before the router."""
+from typing import Optional
+from starlette.routing import BaseRoute, Match
+from starlette.types import Scope
+
+
+def find_route(scope: Scope) -> Optional[BaseRoute]:
+    """Return the app route that fully matches this request scope, if any."""
+    app = scope.get("app")
+    router = getattr(app, "router", None)
+    if router is None:
+        return None
+
+    for route in router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route
+    return None
+
+
+def get_route_marker(scope: Scope, name: str) -> Optional[str]:
+    """Read a marker set on the matched endpoint by a route decorator (e.g. @rate_limit)."""
+    route = find_route(scope)
+    endpoint = getattr(route, "endpoint", None)
+    return getattr(endpoint, name, None)
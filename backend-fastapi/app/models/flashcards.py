@@ -1,5 +1,6 @@
 """Pydantic models for flashcard-related requests and responses"""
-from pydantic import BaseModel, Field
+from datetime import datetime
+from pydantic import AwareDatetime, BaseModel, Field
 from typing import List, Literal, Optional
 
 
@@ -16,6 +17,19 @@ class FlashcardItem(BaseModel):
     context: Optional[str] = None
 
 
+class DueFlashcard(BaseModel):
+    """Flashcard due for review"""
+    id: str
+    term: str
+    definition: str
+    context: Optional[str] = None
+    note_id: Optional[str] = None
+    status: Optional[str] = None
+    interval: int = 0
+    ease_factor: float = 2.5
+    next_review: datetime
+
+
 class GenerateFlashcardsResponse(BaseModel):
     """Response model for generated flashcards"""
     flashcards: List[FlashcardItem]
@@ -37,11 +51,51 @@ class ReviewFlashcardResponse(BaseModel):
     ease_factor: float
 
 
+class ReviewBatchItem(BaseModel):
+    """Single review in a batch, e.g. recorded offline"""
+    flashcard_id: str
+    rating: Literal[1, 2, 3, 4]
+    reviewed_at: Optional[AwareDatetime] = None  # Defaults to submission time
+
+
+class ReviewBatchRequest(BaseModel):
+    """Request model for submitting several reviews at once (applied in order)"""
+    reviews: List[ReviewBatchItem] = Field(min_length=1, max_length=200)
+
+
+class ReviewBatchResult(BaseModel):
+    """Outcome of one review in a batch"""
+    flashcard_id: str
+    success: bool
+    next_review: Optional[str] = None  # ISO date string
+    interval: Optional[int] = None
+    ease_factor: Optional[float] = None
+    error: Optional[str] = None
+
+
+class ReviewBatchResponse(BaseModel):
+    """Response model for batch review submission"""
+    results: List[ReviewBatchResult]  # Same order as the request
+    reviewed: int
+
+
+class RescheduleRequest(BaseModel):
+    """Request model for spreading overdue cards over the coming days"""
+    days: int = Field(default=7, ge=1, le=60)
+
+
+class RescheduleResponse(BaseModel):
+    """Response model for bulk rescheduling"""
+    rescheduled: int
+    days: int
+
+
 class RecommendNextIntervalRequest(BaseModel):
     """Request model for ML interval recommendation"""
     flashcard_id: str
     rating: Literal[1, 2, 3, 4]
     current_interval: int
+    ease_factor: float = Field(default=2.5, ge=1.3)
     category: str = "General"
     word_count: int = 10
     review_sequence_number: int = 1
@@ -53,3 +107,4 @@ class RecommendNextIntervalResponse(BaseModel):
     ml_interval: Optional[int]
     sm2_interval: int
     difference: Optional[int]
+    model_version: Optional[str] = None  # Model that produced ml_interval
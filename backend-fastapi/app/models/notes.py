@@ -1,5 +1,6 @@
 """Pydantic models for note-related requests and responses"""
 from pydantic import BaseModel, Field
+from datetime import datetime
 from typing import List, Optional
 
 
@@ -67,14 +68,20 @@ class TerminologyResponse(BaseModel):
     terms: List[TerminologyItem]
 
 
-class NoteItem(BaseModel):
-    """Note item model"""
+class NoteSummary(BaseModel):
+    """Note metadata for list views (no content)"""
+    id: str
+    title: str
+    folder_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    word_count: Optional[int] = None
+
+
+class NoteContent(BaseModel):
+    """Full bilingual content of a single note"""
     id: str
     title: str
     content_md_en: Optional[str] = None
     content_md_zh: Optional[str] = None
-    user_id: str
-    folder_id: Optional[str] = None
-    
-    class Config:
-        extra = "ignore"
+    updated_at: Optional[datetime] = None
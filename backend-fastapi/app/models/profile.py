@@ -0,0 +1,17 @@
+"""Pydantic models for user profile settings"""
+from pydantic import BaseModel
+from typing import Optional
+
+
+class UpdatePreferencesRequest(BaseModel):
+    """Request model for updating profile preferences (unset fields are left unchanged)"""
+    llm_provider: Optional[str] = None
+    llm_model: Optional[str] = None
+    preferred_language: Optional[str] = None
+
+
+class PreferencesResponse(BaseModel):
+    """Current profile preferences"""
+    llm_provider: Optional[str] = None
+    llm_model: Optional[str] = None
+    preferred_language: Optional[str] = None
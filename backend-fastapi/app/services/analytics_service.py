@@ -1,7 +1,6 @@
 """Analytics service for querying BigQuery data"""
 from typing import Dict, List, Any
 import logging
-from google.cloud import bigquery
 from google.api_core.exceptions import NotFound
 from app.config import get_settings
 from app.services.cache_service import get_cache_service
@@ -27,6 +26,9 @@ class AnalyticsService:
 
         
         try:
+            # Lazy: google.cloud.bigquery is the slowest import in the app
+            from google.cloud import bigquery
+
             self.client = bigquery.Client(project=self.project_id)
             print("  ✅ BigQuery client initialized successfully")
         except Exception as e:
@@ -80,6 +82,8 @@ class AnalyticsService:
             WHERE user_id = @user_id
             """
             
+            from google.cloud import bigquery
+
             job_config = bigquery.QueryJobConfig(
                 query_parameters=[
                     bigquery.ScalarQueryParameter("user_id", "STRING", user_id)
@@ -186,6 +190,8 @@ class AnalyticsService:
             LIMIT @limit
             """
             
+            from google.cloud import bigquery
+
             job_config = bigquery.QueryJobConfig(
                 query_parameters=[
                     bigquery.ScalarQueryParameter("user_id", "STRING", user_id),
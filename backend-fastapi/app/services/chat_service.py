@@ -2,6 +2,7 @@
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from app.core.firebase import get_firestore_client
+from app.core.firestore_loader import load_document
 from app.services.llm_service import LLMService
 from app.services.vector_service import VectorService
 from app.services.rag_service import RAGService
@@ -16,6 +17,10 @@ class ChatService:
         self.llm_service = LLMService()
         self.vector_service = VectorService()
         self.rag_service = RAGService()
+
+    def conversation_ref(self, user_id: str, conversation_id: str):
+        """Reference to a conversation document."""
+        return self.db.collection("users").document(user_id).collection("conversations").document(conversation_id)
     
     async def start_conversation(
         self,
@@ -68,8 +73,8 @@ class ChatService:
         Yields chunks of text.
         """
         # 1. Load conversation metadata
-        conv_ref = self.db.collection("users").document(user_id).collection("conversations").document(conversation_id)
-        conv_doc = conv_ref.get()
+        conv_ref = self.conversation_ref(user_id, conversation_id)
+        conv_doc = await load_document(conv_ref)
         
         if not conv_doc.exists:
             raise ValueError(f"Conversation {conversation_id} not found")
@@ -215,8 +220,8 @@ Student's question: {user_message}"""
             Dict with 'answer' and 'sources'
         """
         # 1. Load conversation metadata
-        conv_ref = self.db.collection("users").document(user_id).collection("conversations").document(conversation_id)
-        conv_doc = conv_ref.get()
+        conv_ref = self.conversation_ref(user_id, conversation_id)
+        conv_doc = await load_document(conv_ref)
         
         if not conv_doc.exists:
             raise ValueError(f"Conversation {conversation_id} not found")
@@ -395,7 +400,7 @@ Student's question: {user_message}"""
             .document(conversation_id)
         )
         
-        conv_doc = conv_ref.get()
+        conv_doc = await load_document(conv_ref)
         if not conv_doc.exists:
             raise ValueError(f"Conversation {conversation_id} not found")
         
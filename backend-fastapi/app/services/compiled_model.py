@@ -0,0 +1,411 @@
+"""
+Tree ensembles compiled to flat NumPy arrays.
+
+`compile_model` flattens a fitted XGBoost classifier or scikit-learn tree
+ensemble (RandomForest, ExtraTrees, DecisionTree) into contiguous node
+arrays: split feature, threshold, left/right child, missing-value direction
+and leaf value. `CompiledForest.predict` then walks every tree for every row
+at once, one level per step, so inference is a handful of NumPy gathers
+instead of a call into XGBoost or one Python-level tree object per estimator.
+
+The compiled artifact is a directory of `.npy` files plus `meta.json`, loaded
+with `np.load(mmap_mode="r")`: loading is near-instant, needs neither xgboost
+nor scikit-learn, and the pages are shared by every worker on a host.
+Predictions match the source model exactly (same comparisons, same float
+precision, same accumulation order); `scripts/compile_model.py` verifies this
+when compiling.
+
+NumPy is imported by this module, so import it lazily from request paths
+(see scripts/benchmark_startup.py).
+"""
+import hashlib
+import json
+import math
+import os
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+ARRAYS = ("feature", "threshold", "left", "right", "missing_left", "value", "roots", "tree_group")
+
+# How leaf values combine into a prediction
+KIND_XGBOOST = "xgboost"  # Sum of leaf margins per output group, plus base margin
+KIND_FOREST = "forest"  # Mean of per-tree class probabilities
+
+
+class CompiledForest:
+    """
+    A tree ensemble as flat node arrays.
+
+    Node i splits on `feature[i]` at `threshold[i]`. Leaves point to themselves
+    (left[i] == right[i] == i), so walking `max_depth` levels lands every row
+    on a leaf of every tree.
+
+    When every tree has at most 64 leaves, exit leaves are found without
+    walking the trees (QuickScorer): a split that sends x right rules out the
+    leaves of its left subtree, and the exit leaf is the leftmost leaf not
+    ruled out. Per feature, the leaves ruled out by all splits at or below a
+    value are precomputed as one 64-bit mask per tree, so a row costs one
+    `searchsorted` and one mask AND per feature.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        self.arrays = arrays
+        self.meta = meta
+        self.kind: str = meta["kind"]
+        self.classes = np.asarray(meta["classes"])
+        self.n_features: int = meta["n_features"]
+        self.max_depth: int = meta["max_depth"]
+        self.version: str = meta["version"]
+        self.feature_names: Optional[List[str]] = meta.get("feature_names")
+        self._feature = arrays["feature"]
+        self._threshold = arrays["threshold"]
+        self._missing_left = arrays["missing_left"]
+        self._value = arrays["value"]
+        self._roots = arrays["roots"]
+        self._tree_group = arrays["tree_group"]
+        # Interleaved children: node i goes to _children[2 * i + go_right]
+        self._children = np.column_stack([arrays["left"], arrays["right"]]).ravel()
+        self._groups = [np.flatnonzero(self._tree_group == g) for g in range(int(meta["n_groups"]))]
+        self._exit_tables = self._build_exit_tables()
+
+    @property
+    def n_trees(self) -> int:
+        return len(self._roots)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.arrays.values())
+
+    def leaves(self, X: Any) -> np.ndarray:
+        """Leaf node reached in every tree: [n_samples, n_trees]."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected [n_samples, {self.n_features}] features, got {X.shape}")
+        # Both libraries compare float32 features; thresholds are stored as float32
+        # (see _sklearn_trees), so the comparisons are exact
+        if self._exit_tables is not None:
+            return self._exit_leaves(X)
+        flat = X.ravel()
+        has_missing = bool(np.isnan(flat).any())
+        row_offset = (np.arange(len(X), dtype=np.int32) * self.n_features)[:, None]
+        node = np.repeat(self._roots[None, :], len(X), axis=0)
+        for _ in range(self.max_depth):
+            x = np.take(flat, row_offset + np.take(self._feature, node))
+            threshold = np.take(self._threshold, node)
+            # NaN compares False, so missing values go left unless overridden below
+            go_right = x > threshold if self.meta["left_if_equal"] else x >= threshold
+            if has_missing:
+                go_right = np.where(np.isnan(x), ~np.take(self._missing_left, node), go_right)
+            node = np.take(self._children, 2 * node + go_right)
+        return node
+
+    def _exit_leaves(self, X: np.ndarray) -> np.ndarray:
+        features, masks, leaf_nodes = self._exit_tables
+        # Go-right rule: x >= t (XGBoost) or x > t (scikit-learn)
+        side = "left" if self.meta["left_if_equal"] else "right"
+        remaining = np.full((len(X), self.n_trees), np.iinfo(np.uint64).max, dtype=np.uint64)
+        for feature, thresholds, offset in features:
+            x = X[:, feature]
+            # Row k of a feature's table: leaves left after its first k thresholds
+            # sent x right; the last row is for missing values
+            rank = np.searchsorted(thresholds, x, side=side)
+            rank = np.where(np.isnan(x), len(thresholds) + 1, rank)
+            remaining &= masks[rank + offset]
+        lowest = remaining & (~remaining + np.uint64(1))
+        position = np.frexp(lowest.astype(np.float64))[1] - 1
+        return leaf_nodes[np.arange(self.n_trees) * 64 + position]
+
+    def _build_exit_tables(self):
+        """Per-feature leaf masks for _exit_leaves, or None if a tree has more than 64 leaves."""
+        left, right = np.asarray(self.arrays["left"]), np.asarray(self.arrays["right"])
+        is_leaf = left == np.arange(len(left))
+        leaf_nodes = np.zeros((self.n_trees, 64), dtype=np.int64)
+        left_leaves = np.zeros(len(left), dtype=np.uint64)  # Bits of each split's left-subtree leaves
+        tree_of = np.zeros(len(left), dtype=np.int64)
+
+        for tree, root in enumerate(self._roots):
+            # Pre-order, left subtree first: leaves come out left to right
+            preorder, stack = [], [int(root)]
+            while stack:
+                node = stack.pop()
+                preorder.append(node)
+                if not is_leaf[node]:
+                    stack += [int(right[node]), int(left[node])]
+            leaves = [node for node in preorder if is_leaf[node]]
+            if len(leaves) > 64:
+                return None
+            leaf_nodes[tree, :len(leaves)] = leaves
+            tree_of[preorder] = tree
+
+            # Each subtree's leaves are contiguous: (first leaf position, leaf count)
+            span = {node: (i, 1) for i, node in enumerate(leaves)}
+            for node in reversed(preorder):
+                if not is_leaf[node]:
+                    first, count = span[int(left[node])]
+                    span[node] = (first, count + span[int(right[node])][1])
+                    left_leaves[node] = np.uint64(((1 << count) - 1) << first)
+
+        feature, threshold = np.asarray(self._feature), np.asarray(self._threshold)
+        missing_left = np.asarray(self._missing_left)
+        everything = np.iinfo(np.uint64).max
+        features, tables, offset = [], [], 0
+        for column in range(self.n_features):
+            nodes = np.flatnonzero(~is_leaf & (feature == column))
+            if nodes.size == 0:
+                continue
+            thresholds = np.unique(threshold[nodes])
+            table = np.full((len(thresholds) + 2, self.n_trees), everything, dtype=np.uint64)
+            remaining = table[0].copy()
+            by_threshold = nodes[np.argsort(threshold[nodes], kind="stable")]
+            rank = np.searchsorted(thresholds, threshold[by_threshold])
+            # Rows for thresholds shared by several nodes are complete after the last one
+            for node, k in zip(by_threshold, rank):
+                remaining[tree_of[node]] &= ~left_leaves[node]
+                table[k + 1] = remaining
+            # Missing values go right wherever the split's default direction is right
+            for node in nodes[~missing_left[nodes]]:
+                table[-1, tree_of[node]] &= ~left_leaves[node]
+            features.append((column, thresholds, offset))
+            tables.append(table)
+            offset += len(table)
+        masks = np.concatenate(tables) if tables else np.zeros((0, self.n_trees), dtype=np.uint64)
+        return features, masks, leaf_nodes.ravel()
+
+    def decision_function(self, X: Any) -> np.ndarray:
+        """
+        Raw ensemble output: [n_samples, n_outputs].
+
+        XGBoost: margins (float32, like XGBoost). Forests: class probabilities.
+        """
+        values = self._value[self.leaves(X)]  # [n_samples, n_trees, n_values]
+        n = len(values)
+        if self.kind == KIND_XGBOOST:
+            # XGBoost adds trees one by one to the base margin in float32;
+            # cumsum accumulates in the same order, so the sums match bit for bit
+            margin = np.empty((n, len(self._groups)), dtype=np.float32)
+            for group, trees in enumerate(self._groups):
+                base = np.full((n, 1), self.meta["base_margin"][group], dtype=np.float32)
+                terms = np.concatenate([base, values[:, trees, 0]], axis=1)
+                margin[:, group] = np.cumsum(terms, axis=1, dtype=np.float32)[:, -1]
+            return margin
+
+        # scikit-learn sums per-tree probabilities in tree order, then divides
+        return np.cumsum(values, axis=1)[:, -1, :] / self.n_trees
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        return self._proba(self.decision_function(X))
+
+    def _proba(self, output: np.ndarray) -> np.ndarray:
+        if self.kind != KIND_XGBOOST:
+            return output
+        if output.shape[1] == 1:
+            positive = np.float32(1) / (np.float32(1) + np.exp(-output[:, 0]))
+            return np.column_stack([np.float32(1) - positive, positive])
+        shifted = np.exp(output - output.max(axis=1, keepdims=True))
+        return shifted / shifted.sum(axis=1, keepdims=True)
+
+    def predict(self, X: Any) -> np.ndarray:
+        """Class labels, like the source model's `predict`."""
+        output = self.decision_function(X)
+        if self.kind == KIND_XGBOOST and output.shape[1] == 1:
+            index = (self._proba(output)[:, 1] > 0.5).astype(np.int64)
+        else:
+            index = output.argmax(axis=1)
+        return self.classes[index]
+
+    def save(self, path: str) -> None:
+        """Write the artifact directory (one .npy per array, plus meta.json)."""
+        os.makedirs(path, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(self.arrays[name]))
+        with open(os.path.join(path, META_FILE), "w") as f:
+            json.dump(self.meta, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = "r") -> "CompiledForest":
+        """Load an artifact directory, memory-mapping the arrays."""
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled model format: {meta.get('format_version')}")
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in ARRAYS}
+        return cls(arrays, meta)
+
+
+def is_compiled_artifact(path: str) -> bool:
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, META_FILE))
+
+
+def compile_model(model: Any, version: Optional[str] = None) -> CompiledForest:
+    """
+    Flatten a fitted tree ensemble.
+
+    Args:
+        model: XGBClassifier, or a scikit-learn forest/decision-tree classifier
+        version: Version to report (defaults to a hash of the compiled arrays)
+
+    Raises:
+        ValueError: Unsupported model or objective
+    """
+    if hasattr(model, "get_booster"):
+        trees, meta = _xgboost_trees(model)
+    elif hasattr(model, "estimators_") or hasattr(model, "tree_"):
+        trees, meta = _sklearn_trees(model)
+    else:
+        raise ValueError(f"Cannot compile {type(model).__name__}: expected an XGBoost or scikit-learn tree classifier")
+
+    arrays = _flatten(trees)
+    meta.update(
+        format_version=FORMAT_VERSION,
+        source=type(model).__name__,
+        max_depth=max(tree["depth"] for tree in trees),
+    )
+    meta["version"] = version or _hash_arrays(arrays, meta)
+    return CompiledForest(arrays, meta)
+
+
+def _xgboost_trees(model: Any):
+    booster = model.get_booster()
+    learner = json.loads(booster.save_raw("json"))["learner"]
+    objective = learner["objective"]["name"]
+    if objective not in ("binary:logistic", "multi:softprob", "multi:softmax"):
+        raise ValueError(f"Unsupported XGBoost objective: {objective}")
+    gbtree = learner["gradient_booster"]
+    if gbtree["name"] != "gbtree":
+        raise ValueError(f"Unsupported XGBoost booster: {gbtree['name']}")
+
+    model_param = learner["learner_model_param"]
+    n_groups = max(int(model_param["num_class"]), 1)
+    base_score = [float(v) for v in str(model_param["base_score"]).strip("[]").split(",")]
+    if len(base_score) == 1:
+        base_score = base_score * n_groups
+    if objective == "binary:logistic":
+        # base_score is a probability; the margin starts at its logit, which
+        # XGBoost computes as -logf(1/p - 1) in float32 (correctly rounded log)
+        one = np.float32(1)
+        base_margin = [float(np.float32(-math.log(one / np.float32(p) - one))) for p in base_score]
+    else:
+        base_margin = base_score
+
+    trees = []
+    for raw, group in zip(gbtree["model"]["trees"], gbtree["model"]["tree_info"]):
+        if raw.get("categories_nodes"):
+            raise ValueError("Categorical splits are not supported")
+        left = np.asarray(raw["left_children"], dtype=np.int64)
+        leaf = left == -1
+        trees.append({
+            "feature": np.asarray(raw["split_indices"], dtype=np.int64),
+            # Leaves store their (learning-rate scaled) weight in split_conditions
+            "threshold": np.asarray(raw["split_conditions"], dtype=np.float32),
+            "left": left,
+            "right": np.asarray(raw["right_children"], dtype=np.int64),
+            "missing_left": np.asarray(raw["default_left"], dtype=bool),
+            "value": np.where(leaf, np.asarray(raw["split_conditions"], dtype=np.float32), 0)[:, None],
+            "group": int(group),
+        })
+    for tree in trees:
+        tree["depth"] = _depth(tree["left"], tree["right"])
+
+    meta = {
+        "kind": KIND_XGBOOST,
+        "left_if_equal": False,  # XGBoost goes left when x < split
+        "n_features": int(model_param["num_feature"]),
+        "n_groups": n_groups,
+        "base_margin": base_margin,
+        "classes": np.asarray(getattr(model, "classes_", np.arange(max(n_groups, 2)))).tolist(),
+        "feature_names": booster.feature_names,
+    }
+    return trees, meta
+
+
+def _sklearn_trees(model: Any):
+    if not hasattr(model, "classes_") or getattr(model, "n_outputs_", 1) != 1:
+        raise ValueError("Only single-output scikit-learn classifiers are supported")
+    estimators = model.estimators_ if hasattr(model, "estimators_") else [model]
+
+    trees = []
+    for estimator in estimators:
+        tree = estimator.tree_
+        left = tree.children_left.astype(np.int64)
+        value = tree.value[:, 0, :].astype(np.float64)
+        # DecisionTreeClassifier.predict_proba normalizes leaf values the same way
+        normalizer = value.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0] = 1
+        missing_left = getattr(tree, "missing_go_to_left", None)
+        trees.append({
+            "feature": np.where(left == -1, 0, tree.feature).astype(np.int64),
+            "threshold": _float32_floor(tree.threshold),
+            "left": left,
+            "right": tree.children_right.astype(np.int64),
+            "missing_left": (
+                np.asarray(missing_left, dtype=bool) if missing_left is not None
+                else np.zeros(len(left), dtype=bool)
+            ),
+            "value": value / normalizer,
+            "group": 0,
+            "depth": _depth(left, tree.children_right),
+        })
+
+    feature_names = getattr(model, "feature_names_in_", None)
+    meta = {
+        "kind": KIND_FOREST,
+        "left_if_equal": True,  # scikit-learn goes left when x <= threshold
+        "n_features": int(model.n_features_in_),
+        "n_groups": 1,
+        "classes": np.asarray(model.classes_).tolist(),
+        "feature_names": list(feature_names) if feature_names is not None else None,
+    }
+    return trees, meta
+
+
+def _float32_floor(threshold: np.ndarray) -> np.ndarray:
+    """
+    Largest float32 <= each float64 threshold.
+
+    scikit-learn compares float32 features against float64 thresholds; for a
+    float32 x, `x <= t` holds exactly when `x <= _float32_floor(t)`.
+    """
+    rounded = threshold.astype(np.float32)
+    too_high = rounded.astype(np.float64) > threshold
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+
+def _depth(left: np.ndarray, right: np.ndarray) -> int:
+    """Number of splits on the longest root-to-leaf path."""
+    depth, level = 0, [0]
+    while True:
+        level = [child for node in level if left[node] != -1 for child in (left[node], right[node])]
+        if not level:
+            return depth
+        depth += 1
+
+
+def _flatten(trees: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Concatenate per-tree node arrays, offsetting child indices; leaves point to themselves."""
+    offsets = np.cumsum([0] + [len(tree["left"]) for tree in trees[:-1]])
+    lefts, rights = [], []
+    for tree, offset in zip(trees, offsets):
+        nodes = np.arange(len(tree["left"])) + offset
+        leaf = tree["left"] == -1
+        lefts.append(np.where(leaf, nodes, tree["left"] + offset))
+        rights.append(np.where(leaf, nodes, tree["right"] + offset))
+    return {
+        "feature": np.concatenate([tree["feature"] for tree in trees]).astype(np.int32),
+        "threshold": np.concatenate([tree["threshold"] for tree in trees]).astype(np.float32),
+        "left": np.concatenate(lefts).astype(np.int32),
+        "right": np.concatenate(rights).astype(np.int32),
+        "missing_left": np.concatenate([tree["missing_left"] for tree in trees]).astype(bool),
+        "value": np.concatenate([tree["value"] for tree in trees]),
+        "roots": offsets.astype(np.int32),
+        "tree_group": np.asarray([tree["group"] for tree in trees], dtype=np.int32),
+    }
+
+
+def _hash_arrays(arrays: Dict[str, np.ndarray], meta: Dict[str, Any]) -> str:
+    digest = hashlib.sha256(json.dumps(meta, sort_keys=True).encode())
+    for name in ARRAYS:
+        digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+    return digest.hexdigest()[:12]
@@ -0,0 +1,257 @@
+"""
+Per-user queue of due flashcards.
+
+Firestore is the source of truth: flashcards are indexed on
+(user_id ASC, next_review ASC), so "due now" is a range query. For hot users
+the queue is also materialized in Redis as a sorted set `due:{uid}` of card
+IDs scored by `next_review` (epoch seconds), which makes fetching the next N
+due cards O(log n + N).
+
+The sorted set is built lazily on first read and kept current by the review
+and generation paths (`schedule`). Updates are only applied while the set is
+materialized (marked by `due:{uid}:ready`); otherwise the next read rebuilds
+it from Firestore. Entries that are stale (card deleted or rescheduled outside
+the API) are dropped when the cards are hydrated.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from app.config import get_settings
+from app.core.firebase import get_firestore_client
+from app.core.firestore_loader import load_many_documents, track_reads
+from app.services.cache_service import get_cache_service
+
+logger = logging.getLogger(__name__)
+
+# Cards written per Redis pipeline while materializing
+MATERIALIZE_CHUNK = 1000
+
+
+def to_score(when: datetime) -> float:
+    """Sorted-set score for a due date."""
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when.timestamp()
+
+
+def encode_cursor(score: float, card_id: str) -> str:
+    """Opaque cursor pointing just after (score, card_id)."""
+    return f"{score!r}:{card_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """
+    Raises:
+        ValueError: Malformed cursor
+    """
+    score, separator, card_id = cursor.partition(":")
+    if not separator or not card_id:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return float(score), card_id
+
+
+class DueQueue:
+    """Due-card queue backed by Firestore with a Redis sorted-set mirror."""
+
+    KEY_PREFIX = "due:"
+
+    def __init__(self, ttl_seconds: int = 86400):
+        self.ttl_seconds = ttl_seconds
+
+    def _key(self, user_id: str) -> str:
+        return f"{self.KEY_PREFIX}{user_id}"
+
+    def _ready_key(self, user_id: str) -> str:
+        return f"{self.KEY_PREFIX}{user_id}:ready"
+
+    async def get_due(
+        self,
+        user_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        now: Optional[datetime] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Cards due at or before `now`, most overdue first.
+
+        Args:
+            user_id: Owner of the cards
+            limit: Page size
+            cursor: Cursor returned with the previous page
+
+        Returns:
+            (cards, next cursor or None when there are no more due cards)
+
+        Raises:
+            ValueError: Malformed cursor
+        """
+        now = now or datetime.now(timezone.utc)
+        after = decode_cursor(cursor) if cursor else None
+
+        entries = await self._redis_due(user_id, limit, after, now)
+        if entries is None:
+            return await asyncio.to_thread(self._firestore_due, user_id, limit, after, now)
+
+        # Hydrate in one get_all, dropping stale entries
+        snapshots = await load_many_documents(
+            get_firestore_client().collection("flashcards").document(card_id) for card_id, _ in entries
+        )
+        cards, stale = [], {}
+        for (card_id, score), snapshot in zip(entries, snapshots):
+            card = snapshot.to_dict() if snapshot.exists else None
+            if card is None or card.get("user_id") != user_id:
+                stale[card_id] = None
+            elif not isinstance(card.get("next_review"), datetime) or abs(to_score(card["next_review"]) - score) > 0.001:
+                stale[card_id] = card.get("next_review")
+            else:
+                cards.append({**card, "id": card_id})
+        if stale:
+            await self.schedule(user_id, stale)
+
+        next_cursor = None
+        if len(entries) == limit:
+            last_id, last_score = entries[-1]
+            next_cursor = encode_cursor(last_score, last_id)
+        return cards, next_cursor
+
+    async def schedule(self, user_id: str, due: Dict[str, Optional[datetime]]) -> None:
+        """
+        Record new due dates ({card_id: next_review}; None removes the card).
+
+        A no-op unless the user's queue is materialized in Redis.
+        """
+        client = get_cache_service().client
+        if client is None or not due:
+            return
+        try:
+            if not await client.exists(self._ready_key(user_id)):
+                return
+            pipe = client.pipeline(transaction=False)
+            additions = {card_id: to_score(when) for card_id, when in due.items() if isinstance(when, datetime)}
+            removals = [card_id for card_id, when in due.items() if not isinstance(when, datetime)]
+            if additions:
+                pipe.zadd(self._key(user_id), additions)
+            if removals:
+                pipe.zrem(self._key(user_id), *removals)
+            await pipe.execute()
+        except Exception as e:
+            # Drop the mirror so the next read rebuilds it instead of serving stale data
+            logger.error(f"Due queue update failed for {user_id}: {e}")
+            await get_cache_service().delete(self._ready_key(user_id))
+
+    async def invalidate(self, user_id: str) -> None:
+        """Drop the user's Redis mirror; the next read rebuilds it."""
+        await get_cache_service().delete(self._ready_key(user_id))
+
+    async def _redis_due(
+        self,
+        user_id: str,
+        limit: int,
+        after: Optional[Tuple[float, str]],
+        now: datetime,
+    ) -> Optional[List[Tuple[str, float]]]:
+        """(card_id, score) entries from Redis, or None to fall back to Firestore."""
+        client = get_cache_service().client
+        if client is None:
+            return None
+        try:
+            if not await client.exists(self._ready_key(user_id)):
+                await self._materialize(client, user_id)
+
+            key, max_score = self._key(user_id), to_score(now)
+            min_score = after[0] if after else "-inf"
+            entries: List[Tuple[str, float]] = []
+            offset = 0
+            while len(entries) < limit:
+                # Over-fetch so members tied with the cursor's score can be skipped
+                page = await client.zrangebyscore(
+                    key, min_score, max_score, start=offset, num=limit + 1, withscores=True
+                )
+                for card_id, score in page:
+                    if after and (score, card_id) <= after:
+                        continue
+                    entries.append((card_id, score))
+                    if len(entries) == limit:
+                        break
+                if len(page) < limit + 1:
+                    break
+                offset += len(page)
+            return entries
+        except Exception as e:
+            logger.error(f"Due queue read from Redis failed for {user_id}, using Firestore: {e}")
+            return None
+
+    async def _materialize(self, client, user_id: str) -> None:
+        """Load every card's due date into the user's sorted set."""
+        due = await asyncio.to_thread(self._firestore_due_dates, user_id)
+        key = self._key(user_id)
+        pipe = client.pipeline(transaction=True)
+        pipe.delete(key)
+        items = list(due.items())
+        for start in range(0, len(items), MATERIALIZE_CHUNK):
+            pipe.zadd(key, dict(items[start:start + MATERIALIZE_CHUNK]))
+        pipe.expire(key, self.ttl_seconds)
+        pipe.set(self._ready_key(user_id), "1", ex=self.ttl_seconds)
+        await pipe.execute()
+        logger.info(f"Materialized due queue for {user_id}: {len(due)} cards")
+
+    @staticmethod
+    def _firestore_due_dates(user_id: str) -> Dict[str, float]:
+        """All of a user's card due dates (projection; no card content). Blocking."""
+        query = (
+            get_firestore_client().collection("flashcards")
+            .where("user_id", "==", user_id)
+            .select(["next_review"])
+        )
+        due = {}
+        for doc in track_reads(query.stream()):
+            next_review = doc.to_dict().get("next_review")
+            if isinstance(next_review, datetime):
+                due[doc.id] = to_score(next_review)
+        return due
+
+    @staticmethod
+    def _firestore_due(
+        user_id: str,
+        limit: int,
+        after: Optional[Tuple[float, str]],
+        now: datetime,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Due cards straight from the (user_id, next_review) index. Blocking."""
+        query = (
+            get_firestore_client().collection("flashcards")
+            .where("user_id", "==", user_id)
+            .where("next_review", "<=", now)
+            .order_by("next_review")
+            .order_by("__name__")
+        )
+        if after:
+            query = query.start_after({
+                "next_review": datetime.fromtimestamp(after[0], tz=timezone.utc),
+                "__name__": after[1],
+            })
+        query = query.limit(limit)
+
+        cards = []
+        for doc in track_reads(query.stream()):
+            card = doc.to_dict()
+            card["id"] = doc.id
+            cards.append(card)
+
+        next_cursor = None
+        if len(cards) == limit:
+            next_cursor = encode_cursor(to_score(cards[-1]["next_review"]), cards[-1]["id"])
+        return cards, next_cursor
+
+
+# Singleton instance
+_due_queue: Optional[DueQueue] = None
+
+
+def get_due_queue() -> DueQueue:
+    """Get or create the process-wide due queue."""
+    global _due_queue
+    if _due_queue is None:
+        _due_queue = DueQueue(ttl_seconds=get_settings().due_queue_ttl_seconds)
+    return _due_queue
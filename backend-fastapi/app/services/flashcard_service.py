@@ -1,8 +1,22 @@
 """Flashcard service for generation and review scheduling"""
-from datetime import datetime, timedelta, timezone
+import asyncio
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Iterator
+from google.cloud import firestore
 from app.core.firebase import get_firestore_client
 from app.services.llm_service import LLMService
 from app.core.exceptions import NotFoundError, UnauthorizedError
+from app.core.firestore_loader import (
+    forget_document,
+    load_document,
+    load_many_documents,
+    prefetch_documents,
+    track_reads,
+)
+from app.services.due_queue import get_due_queue
+from app.services.interval_features import model_features, review_features
+from app.services.review_stats import average_rating, reviews_in_window, stats_increment, stats_ref
 from app.services.prompt_templates import get_prompt
 from app.services.llm_monitoring import LLMMonitor
 from app.services.ab_experiment import (
@@ -14,6 +28,13 @@ from app.services.ab_experiment import (
 )
 import time
 
+# Firestore allows 500 writes per batch commit
+WRITE_BATCH_SIZE = 450
+
+
+def review_status(interval: int) -> str:
+    return "learning" if interval == 0 else "review"
+
 
 class FlashcardService:
     """Service for flashcard operations"""
@@ -31,7 +52,7 @@ class FlashcardService:
         """
         # 1. Fetch note
         note_ref = self.db.collection("notes").document(note_id)
-        note_doc = note_ref.get()
+        note_doc = await load_document(note_ref)
         
         if not note_doc.exists:
             raise NotFoundError(f"Note {note_id} not found")
@@ -129,6 +150,7 @@ class FlashcardService:
         print(f"[DEBUG] LLM Output: {cards_data}")  # Debug logging
 
         created_cards = []
+        due = {}
         for card in cards_data:
             try:
                 new_card_ref = flashcards_collection.document()
@@ -143,10 +165,12 @@ class FlashcardService:
                     "ease_factor": 2.5,
                     "next_review": datetime.now(timezone.utc),
                     "created_at": datetime.now(timezone.utc),
+                    "updated_at": firestore.SERVER_TIMESTAMP,  # Incremental BigQuery export watermark
                     "category": "vocabulary"
                 }
                 batch.set(new_card_ref, card_doc)
                 created_cards.append(card)
+                due[new_card_ref.id] = card_doc["next_review"]
             except KeyError as e:
                 print(f"[ERROR] Missing key in flashcard data: {e}, Data: {card}")
                 continue
@@ -155,6 +179,7 @@ class FlashcardService:
                 continue
             
         batch.commit()
+        await get_due_queue().schedule(user_id, due)
         
         return {
             "flashcards": created_cards,
@@ -169,9 +194,11 @@ class FlashcardService:
         import logging
         logger = logging.getLogger(__name__)
         
-        # 1. Fetch flashcard
+        # 1. Fetch flashcard and the user's running review stats in one batch
         card_ref = self.db.collection("flashcards").document(flashcard_id)
-        card_doc = card_ref.get()
+        user_stats_ref = stats_ref(self.db, user_id)
+        prefetch_documents([card_ref, user_stats_ref])
+        card_doc = await load_document(card_ref)
         
         if not card_doc.exists:
             raise NotFoundError(f"Flashcard {flashcard_id} not found")
@@ -180,107 +207,78 @@ class FlashcardService:
         if card_data.get("user_id") != user_id:
             raise UnauthorizedError("Unauthorized access to flashcard")
             
-        # 2. Calculate SM-2 interval as fallback
-        current_interval = card_data.get("interval", 0)
-        current_ease = card_data.get("ease_factor", 2.5)
-        
-        if rating == 1:  # Again
-            sm2_interval = 0
-            new_ease = max(1.3, current_ease - 0.2)
-        else:
-            if current_interval == 0:
-                sm2_interval = 1
-            elif current_interval == 1:
-                sm2_interval = 6
-            else:
-                sm2_interval = int(current_interval * current_ease)
-            
-            # Adjust ease factor
-            # SM-2 formula: EF' = EF + (0.1 - (5-q) * (0.08 + (5-q) * 0.02))
-            # Mapping our 1-4 to SM-2's 0-5 scale roughly:
-            # 1->0 (Fail), 2->3 (Pass hard), 3->4 (Pass good), 4->5 (Pass easy)
-            q = 0
-            if rating == 2: q = 3
-            elif rating == 3: q = 4
-            elif rating == 4: q = 5
-            
-            new_ease = current_ease + (0.1 - (5 - q) * (0.08 + (5 - q) * 0.02))
-            new_ease = max(1.3, new_ease)
+        # 2. Build ML features from the running aggregates (see app.services.review_stats)
+        now = datetime.now(timezone.utc)
+        stats_doc = await load_document(user_stats_ref)
+        user_stats = stats_doc.to_dict() if stats_doc.exists else {}
+        ml_features = review_features(
+            card_data,
+            rating,
+            card_data.get("review_count", 0),
+            average_rating(user_stats),
+            reviews_in_window(user_stats, now),
+            reviewed_at=now
+        )
 
         # 3. Try ML prediction
-        new_interval = sm2_interval  # Default to SM-2
-        ml_used = False
-        
+        ml_interval = None
+        model_version = None
         try:
-            # Get review count for this flashcard
-            reviews_ref = self.db.collection("flashcard_reviews").where("flashcard_id", "==", flashcard_id)
-            review_count = len(list(reviews_ref.stream()))
-            
-            # Get user's average rating
-            user_reviews_ref = self.db.collection("flashcard_reviews").where("user_id", "==", user_id)
-            user_ratings = [r.to_dict().get("rating", 3) for r in user_reviews_ref.stream()]
-            user_avg_rating = sum(user_ratings) / len(user_ratings) if user_ratings else 3.0
-            
-            # Calculate word count from term + definition
-            term = card_data.get("term", "")
-            definition = card_data.get("definition", "")
-            word_count = len(term.split()) + len(definition.split())
-            
-            # Prepare ML features
             from app.services.ml_prediction_service import MLPredictionService
             ml_service = MLPredictionService()
-            
-            ml_features = {
-                'category': card_data.get('category', 'vocabulary'),
-                'word_count': word_count,
-                'rating': rating,
-                'review_sequence_number': review_count + 1,
-                'current_interval': current_interval,
-                'user_avg_rating': user_avg_rating
-            }
-            
             ml_interval = await ml_service.predict_next_interval(ml_features)
-            
-            if ml_interval is not None:
-                new_interval = ml_interval
-                ml_used = True
-                logger.info(f"Using ML prediction: {ml_interval} days (SM-2 would be: {sm2_interval})")
-            else:
-                logger.warning(f"ML returned None, falling back to SM-2: {sm2_interval} days")
-                
+            model_version = ml_service.model_version
         except Exception as e:
-            logger.error(f"ML prediction failed: {e}, falling back to SM-2: {sm2_interval} days")
+            logger.error(f"ML prediction failed: {e}, falling back to SM-2")
 
-        # Calculate next review date
-        if new_interval == 0:
-            # If failed, review again in 10 minutes (or same day)
-            next_review = datetime.now(timezone.utc) + timedelta(minutes=10)
+        # SM-2 fallback and ease update (shared scheduling engine)
+        from app.services import scheduling
+        outcome = scheduling.as_lists(scheduling.apply_predictions(
+            scheduling.ReviewArrays.from_features([ml_features], ease=[card_data.get("ease_factor", 2.5)]),
+            [ml_interval]
+        ))[0]
+        new_interval, new_ease = outcome["interval"], outcome["ease_factor"]
+        sm2_interval, ml_used = outcome["sm2_interval"], outcome["ml_used"]
+        if ml_used:
+            logger.info(f"Using ML prediction: {ml_interval} days (SM-2 would be: {sm2_interval})")
         else:
-            next_review = datetime.now(timezone.utc) + timedelta(days=new_interval)
+            logger.warning(f"ML returned None, falling back to SM-2: {sm2_interval} days")
+
+        # Calculate next review date
+        next_review = scheduling.next_review_at(now, new_interval)
             
-        # 4. Update Firestore
-        update_data = {
+        # 4. Update card, store review and bump aggregates in one atomic commit
+        batch = self.db.batch()
+        batch.update(card_ref, {
             "interval": new_interval,
             "ease_factor": new_ease,
             "next_review": next_review,
-            "last_reviewed": datetime.now(timezone.utc),
-            "status": "learning" if new_interval == 0 else "review",
-            "ml_scheduled": ml_used  # Track if ML was used
-        }
-        
-        card_ref.update(update_data)
+            "last_reviewed": now,
+            "review_count": firestore.Increment(1),
+            "status": review_status(new_interval),
+            "ml_scheduled": ml_used,  # Track if ML was used
+            "updated_at": firestore.SERVER_TIMESTAMP
+        })
         
         # 5. Store review
         review_ref = self.db.collection("flashcard_reviews").document()
-        review_ref.set({
+        batch.set(review_ref, {
             "flashcard_id": flashcard_id,
             "user_id": user_id,
             "rating": rating,
-            "reviewed_at": datetime.now(timezone.utc),
+            "reviewed_at": now,
             "scheduled_interval": new_interval,
             "ml_used": ml_used,
-            "sm2_interval": sm2_interval  # Log SM-2 for comparison
+            "model_version": model_version if ml_used else None,
+            "sm2_interval": sm2_interval,  # Log SM-2 for comparison
+            "ml_features": model_features(ml_features),  # Online learner input
+            "recorded_at": firestore.SERVER_TIMESTAMP
         })
+        batch.set(user_stats_ref, stats_increment(user_stats, [rating], [now], now), merge=True)
+        await asyncio.to_thread(batch.commit)
+        forget_document(card_ref)
+        forget_document(user_stats_ref)
+        await get_due_queue().schedule(user_id, {flashcard_id: next_review})
         
         # Invalidate analytics cache for this user
         await self.analytics_service.invalidate_user_cache(user_id)
@@ -294,14 +292,234 @@ class FlashcardService:
             "ease_factor": new_ease
         }
 
-    async def get_all_flashcards(self, user_id: str) -> list[dict]:
+    async def review_flashcards_batch(self, user_id: str, reviews: list[dict]) -> dict:
         """
-        Get all flashcards for a user.
+        Apply a batch of reviews (e.g. an offline study session replayed).
+
+        Reviews are applied in submission order per card, each scheduled from
+        its own `reviewed_at`. ML inference runs as one vectorized call per
+        round (the k-th review of every card in the batch), writes go out in
+        batched commits and caches are invalidated once.
+
+        Args:
+            reviews: Dicts with flashcard_id, rating and optional reviewed_at
+
+        Returns:
+            Per-review results (same order) and the number applied
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+        from app.services import scheduling
+        from app.services.ml_prediction_service import MLPredictionService
+
+        now = datetime.now(timezone.utc)
+
+        # 1. Fetch every card and the user's review stats in one get_all
+        card_refs = {
+            review["flashcard_id"]: self.db.collection("flashcards").document(review["flashcard_id"])
+            for review in reviews
+        }
+        user_stats_ref = stats_ref(self.db, user_id)
+        snapshots = await load_many_documents([*card_refs.values(), user_stats_ref])
+        stats_doc = snapshots[-1]
+        user_stats = stats_doc.to_dict() if stats_doc.exists else {}
+
+        results: list = [None] * len(reviews)
+        cards = {}
+        for flashcard_id, card_doc in zip(card_refs, snapshots):
+            card_data = card_doc.to_dict() if card_doc.exists else None
+            if card_data is None:
+                error = f"Flashcard {flashcard_id} not found"
+            elif card_data.get("user_id") != user_id:
+                error = "Unauthorized access to flashcard"
+            else:
+                cards[flashcard_id] = {**card_data, "review_count": card_data.get("review_count", 0)}
+                continue
+            for index, review in enumerate(reviews):
+                if review["flashcard_id"] == flashcard_id:
+                    results[index] = {"flashcard_id": flashcard_id, "success": False, "error": error}
+
+        # 2. Queue reviews per card, preserving submission order
+        queues: dict = {}
+        for index, review in enumerate(reviews):
+            if review["flashcard_id"] in cards:
+                reviewed_at = min(review.get("reviewed_at") or now, now)
+                queues.setdefault(review["flashcard_id"], []).append((index, review["rating"], reviewed_at))
+
+        # 3. Schedule round by round: one vectorized ML call per round
+        ml_service = MLPredictionService()
+        rating_sum = user_stats.get("rating_sum", 0)
+        rating_count = user_stats.get("rating_count", 0)
+        reviews_7d = reviews_in_window(user_stats, now)
+        applied: Counter = Counter()
+        review_docs = []
+        rounds = 0
+        while queues:
+            rounds += 1
+            batch_round = [(flashcard_id, queue.pop(0)) for flashcard_id, queue in queues.items()]
+            queues = {flashcard_id: queue for flashcard_id, queue in queues.items() if queue}
+
+            user_avg_rating = rating_sum / rating_count if rating_count else average_rating({})
+            features = [
+                review_features(
+                    cards[flashcard_id], rating, cards[flashcard_id]["review_count"], user_avg_rating, reviews_7d,
+                    reviewed_at=reviewed_at
+                )
+                for flashcard_id, (_, rating, reviewed_at) in batch_round
+            ]
+            try:
+                predictions = await ml_service.predict_next_intervals(features)
+                model_version = ml_service.model_version
+            except Exception as e:
+                logger.error(f"ML batch prediction failed: {e}, falling back to SM-2")
+                predictions = [None] * len(batch_round)
+                model_version = None
+            outcomes = scheduling.as_lists(scheduling.apply_predictions(
+                scheduling.ReviewArrays.from_features(
+                    features, ease=[cards[flashcard_id].get("ease_factor", 2.5) for flashcard_id, _ in batch_round]
+                ),
+                predictions
+            ))
+
+            for (flashcard_id, (index, rating, reviewed_at)), outcome, feature in zip(batch_round, outcomes, features):
+                card = cards[flashcard_id]
+                new_interval, new_ease = outcome["interval"], outcome["ease_factor"]
+                sm2_interval, ml_used = outcome["sm2_interval"], outcome["ml_used"]
+                next_review = scheduling.next_review_at(reviewed_at, new_interval)
+
+                card.update({
+                    "interval": new_interval,
+                    "ease_factor": new_ease,
+                    "next_review": next_review,
+                    "last_reviewed": reviewed_at,
+                    "review_count": card["review_count"] + 1,
+                    "status": review_status(new_interval),
+                    "ml_scheduled": ml_used
+                })
+                applied[flashcard_id] += 1
+                review_docs.append({
+                    "flashcard_id": flashcard_id,
+                    "user_id": user_id,
+                    "rating": rating,
+                    "reviewed_at": reviewed_at,
+                    "scheduled_interval": new_interval,
+                    "ml_used": ml_used,
+                    "model_version": model_version if ml_used else None,
+                    "sm2_interval": sm2_interval,
+                    "ml_features": model_features(feature),
+                    "recorded_at": firestore.SERVER_TIMESTAMP
+                })
+                results[index] = {
+                    "flashcard_id": flashcard_id,
+                    "success": True,
+                    "next_review": next_review.isoformat(),
+                    "interval": new_interval,
+                    "ease_factor": new_ease
+                }
+                rating_sum += rating
+                rating_count += 1
+
+        # 4. Final card states, review docs and stats in batched commits
+        writes = []
+        for flashcard_id, count in applied.items():
+            card = cards[flashcard_id]
+            writes.append(("update", card_refs[flashcard_id], {
+                "interval": card["interval"],
+                "ease_factor": card["ease_factor"],
+                "next_review": card["next_review"],
+                "last_reviewed": card["last_reviewed"],
+                "review_count": firestore.Increment(count),
+                "status": card["status"],
+                "ml_scheduled": card["ml_scheduled"],
+                "updated_at": firestore.SERVER_TIMESTAMP
+            }))
+        for review_doc in review_docs:
+            writes.append(("set", self.db.collection("flashcard_reviews").document(), review_doc))
+        if review_docs:
+            writes.append(("merge", user_stats_ref, stats_increment(
+                user_stats,
+                [review_doc["rating"] for review_doc in review_docs],
+                [review_doc["reviewed_at"] for review_doc in review_docs],
+                now
+            )))
+        await asyncio.to_thread(self._commit_writes, writes)
+        for ref in [*card_refs.values(), user_stats_ref]:
+            forget_document(ref)
+        await get_due_queue().schedule(
+            user_id, {flashcard_id: cards[flashcard_id]["next_review"] for flashcard_id in applied}
+        )
+
+        # 5. Invalidate analytics cache once for the whole batch
+        if review_docs:
+            await self.analytics_service.invalidate_user_cache(user_id)
+        logger.info(f"Applied {len(review_docs)}/{len(reviews)} reviews in {rounds} ML rounds")
+
+        return {"results": results, "reviewed": len(review_docs)}
+
+    async def spread_overdue_flashcards(self, user_id: str, days: int) -> dict:
+        """
+        Spread a user's overdue cards over the next `days` days, most overdue
+        first (e.g. when returning from a break), so the backlog doesn't land
+        on a single day.
+
+        Returns:
+            Number of cards rescheduled
+        """
+        from app.services import scheduling
+        import numpy as np
+
+        def load_due_dates():
+            query = self.db.collection("flashcards").where("user_id", "==", user_id).select(["next_review"])
+            ids, due = [], []
+            for doc in track_reads(query.stream()):
+                next_review = doc.to_dict().get("next_review")
+                if isinstance(next_review, datetime):
+                    ids.append(doc.id)
+                    due.append(next_review.timestamp())
+            return ids, np.array(due, dtype=np.float64)
+
+        ids, due = await asyncio.to_thread(load_due_dates)
+        now = datetime.now(timezone.utc)
+        spread = scheduling.spread_overdue(due, now.timestamp(), days)
+        changed = np.flatnonzero(spread != due)
+
+        rescheduled = {
+            ids[i]: datetime.fromtimestamp(spread[i], tz=timezone.utc) for i in changed
+        }
+        writes = [
+            ("update", self.db.collection("flashcards").document(card_id),
+             {"next_review": next_review, "updated_at": firestore.SERVER_TIMESTAMP})
+            for card_id, next_review in rescheduled.items()
+        ]
+        await asyncio.to_thread(self._commit_writes, writes)
+        await get_due_queue().schedule(user_id, rescheduled)
+        return {"rescheduled": len(rescheduled), "days": days}
+
+    def _commit_writes(self, writes: list) -> None:
+        """Apply (kind, ref, data) writes in as few batch commits as possible."""
+        for start in range(0, len(writes), WRITE_BATCH_SIZE):
+            batch = self.db.batch()
+            for kind, ref, data in writes[start:start + WRITE_BATCH_SIZE]:
+                if kind == "update":
+                    batch.update(ref, data)
+                else:
+                    batch.set(ref, data, merge=(kind == "merge"))
+            batch.commit()
+
+    def iter_flashcards(self, user_id: str) -> Iterator[dict]:
+        """
+        Lazily yield all flashcards for a user as Firestore pages arrive.
+
+        Blocking: consume from a worker thread (see app.core.responses).
         """
         cards_ref = self.db.collection("flashcards").where("user_id", "==", user_id)
-        cards = []
-        for doc in cards_ref.stream():
+        for doc in track_reads(cards_ref.stream()):
             card_data = doc.to_dict()
             card_data["id"] = doc.id
-            cards.append(card_data)
-        return cards
+            yield card_data
+
+    async def get_all_flashcards(self, user_id: str) -> list[dict]:
+        """
+        Get all flashcards for a user.
+        """
+        return list(self.iter_flashcards(user_id))
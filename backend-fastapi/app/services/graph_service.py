@@ -1,8 +1,9 @@
 import json
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 from firebase_admin import firestore
 from app.core.firebase import get_firebase_app
+from app.core.firestore_loader import track_reads
 from app.models.graph import GraphNode, GraphEdge, GraphData
 from app.services.llm_service import LLMService
 
@@ -146,32 +147,32 @@ class GraphService:
             
         batch.commit()
 
-    async def get_graph(self, user_id: str) -> GraphData:
+    def iter_graph_nodes(self, user_id: str) -> Iterator[Dict[str, Any]]:
+        """Lazily yield the user's graph nodes in API (GraphNode) shape."""
         nodes_ref = self.db.collection("users").document(user_id).collection("kg_nodes")
-        edges_ref = self.db.collection("users").document(user_id).collection("kg_edges")
-        
-        nodes_snap = nodes_ref.stream()
-        edges_snap = edges_ref.stream()
-        
-        nodes = []
-        for doc in nodes_snap:
+        for doc in track_reads(nodes_ref.stream()):
             data = doc.to_dict()
-            nodes.append(GraphNode(
-                id=doc.id,
-                label=data.get("label", ""),
-                type=data.get("type", "concept"),
-                source_ids=data.get("source_ids", [])
-            ))
-            
-        edges = []
-        for doc in edges_snap:
+            yield {
+                "id": doc.id,
+                "label": data.get("label", ""),
+                "type": data.get("type", "concept"),
+                "source_ids": data.get("source_ids", [])
+            }
+
+    def iter_graph_edges(self, user_id: str) -> Iterator[Dict[str, Any]]:
+        """Lazily yield the user's graph edges in API (GraphEdge, by alias) shape."""
+        edges_ref = self.db.collection("users").document(user_id).collection("kg_edges")
+        for doc in track_reads(edges_ref.stream()):
             data = doc.to_dict()
-            edges.append(GraphEdge(
-                id=doc.id,
-                from_node=data.get("from", ""),
-                to_node=data.get("to", ""),
-                relation=data.get("relation", ""),
-                source_id=data.get("source_id", "")
-            ))
-            
+            yield {
+                "id": doc.id,
+                "from": data.get("from", ""),
+                "to": data.get("to", ""),
+                "relation": data.get("relation", ""),
+                "source_id": data.get("source_id", "")
+            }
+
+    async def get_graph(self, user_id: str) -> GraphData:
+        nodes = [GraphNode(**node) for node in self.iter_graph_nodes(user_id)]
+        edges = [GraphEdge(**edge) for edge in self.iter_graph_edges(user_id)]
         return GraphData(nodes=nodes, edges=edges)
@@ -0,0 +1,168 @@
+"""
+Interval-model features, shared by serving and training.
+
+The API (FlashcardService, MLPredictionService) and the training scripts
+(ml/flashcard_interval_model) build model rows with the functions below, so
+feature names, order, encodings and labels cannot drift apart:
+
+- `review_features` describes a review from the card document and the user's
+  running stats, as the API sees them at review time.
+- `training_examples` rebuilds the same dicts from exported review history
+  (flashcard_training_view rows), replaying each user's running average.
+- `feature_row` encodes a feature dict in FEATURE_COLUMNS order;
+  `interval_bucket` turns a scheduled interval into the training label.
+- `model_features` is what review documents log (`ml_features`) for the
+  online learner (app.services.online_learning).
+
+Pure Python (no NumPy), so it is safe to import on request paths and from
+training code without the API's dependencies.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Model input columns, in training order
+FEATURE_COLUMNS = [
+    "category", "word_count", "rating", "review_sequence_number", "days_since_last_review", "user_avg_rating",
+]
+
+# Categories: code, concept, definition, vocabulary (sorted, as LabelEncoder would)
+CATEGORY_CODES = {
+    "code": 0,
+    "concept": 1,
+    "definition": 2,
+    "vocabulary": 3,
+    "General": 3  # Default to vocabulary/general
+}
+DEFAULT_CATEGORY = "vocabulary"
+
+# User mean rating before their first review
+DEFAULT_AVG_RATING = 3.0
+
+# Map bucket to days
+# 1: 1 day
+# 2: 2-3 days -> 2
+# 3: 4-7 days -> 5
+# 4: >7 days -> 14 (conservative estimate)
+BUCKET_DAYS = {
+    1: 1,
+    2: 2,
+    3: 5,
+    4: 14
+}
+
+SECONDS_PER_DAY = 86400
+
+
+def encode_category(category: Any) -> int:
+    """Model code for a card category (unknown categories count as vocabulary)."""
+    return CATEGORY_CODES.get(str(category), CATEGORY_CODES[DEFAULT_CATEGORY])
+
+
+def word_count(term: Optional[str], definition: Optional[str]) -> int:
+    """Words in term + definition."""
+    return len((term or "").split()) + len((definition or "").split())
+
+
+def days_between(earlier: Optional[datetime], later: Optional[datetime]) -> int:
+    """Whole days from `earlier` to `later` (0 without a previous review)."""
+    if not isinstance(earlier, datetime) or not isinstance(later, datetime):
+        return 0
+    if earlier.tzinfo is None:
+        earlier = earlier.replace(tzinfo=timezone.utc)
+    if later.tzinfo is None:
+        later = later.replace(tzinfo=timezone.utc)
+    return max(0, int((later - earlier).total_seconds() // SECONDS_PER_DAY))
+
+
+def interval_bucket(days: int) -> int:
+    """Training label for a scheduled interval (see BUCKET_DAYS)."""
+    if days <= 1:
+        return 1
+    if days <= 3:
+        return 2
+    if days <= 7:
+        return 3
+    return 4
+
+
+def review_features(
+    card_data: dict,
+    rating: int,
+    review_count: int,
+    user_avg_rating: float,
+    user_review_count_7d: int,
+    reviewed_at: Optional[datetime] = None,
+) -> dict:
+    """ML features for reviewing a card (see MLPredictionService)."""
+    interval = card_data.get("interval", 0)
+    return {
+        'category': card_data.get('category', DEFAULT_CATEGORY),
+        'word_count': word_count(card_data.get("term"), card_data.get("definition")),
+        'rating': rating,
+        'review_sequence_number': review_count + 1,
+        'current_interval': interval,
+        # Elapsed time, as in training; the scheduled interval stands in when unknown
+        'days_since_last_review': (
+            days_between(card_data.get("last_reviewed"), reviewed_at) if reviewed_at else interval
+        ),
+        'user_avg_rating': user_avg_rating,
+        'user_review_count_7d': user_review_count_7d
+    }
+
+
+def model_features(features: Dict[str, Any]) -> Dict[str, Any]:
+    """The FEATURE_COLUMNS subset of a feature dict, as logged with each review."""
+    row = feature_row(features)
+    return {"category": features.get("category", DEFAULT_CATEGORY), **dict(zip(FEATURE_COLUMNS[1:], row[1:]))}
+
+
+def feature_row(features: Dict[str, Any]) -> List[float]:
+    """Model input for one feature dict, columns as in FEATURE_COLUMNS."""
+    return [
+        float(encode_category(features.get("category", DEFAULT_CATEGORY))),
+        float(features.get("word_count", 0)),
+        float(features.get("rating", 3)),
+        float(features.get("review_sequence_number", 1)),
+        float(features.get("days_since_last_review", features.get("current_interval", 0))),
+        float(features.get("user_avg_rating", DEFAULT_AVG_RATING)),
+    ]
+
+
+def training_examples(rows: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[int]]:
+    """
+    Feature dicts and labels from review history.
+
+    Rows are flashcard_training_view records (one per review, with
+    `reviewed_at`, `prev_reviewed_at`, `word_count` and `scheduled_interval`).
+    They are replayed in review order so `user_avg_rating` is the user's mean
+    rating *before* each review, as `user_review_stats` holds it at serving
+    time.
+
+    Returns:
+        (feature dicts as review_features builds them, interval buckets)
+    """
+    rating_sums: Dict[str, float] = {}
+    rating_counts: Dict[str, int] = {}
+    features, labels = [], []
+    for row in sorted(rows, key=lambda r: (r["reviewed_at"], r["review_id"])):
+        user_id, rating = row["user_id"], int(row["rating"])
+        count = rating_counts.get(user_id, 0)
+        card = {
+            "category": row.get("category") or DEFAULT_CATEGORY,
+            "last_reviewed": row.get("prev_reviewed_at"),
+        }
+        example = review_features(
+            card,
+            rating,
+            int(row["review_sequence_number"]) - 1,
+            rating_sums[user_id] / count if count else DEFAULT_AVG_RATING,
+            0,  # Not a model feature
+            reviewed_at=row["reviewed_at"],
+        )
+        # Exported with word_count() (term and definition stay in Firestore)
+        example["word_count"] = int(row.get("word_count") or 0)
+        features.append(example)
+        labels.append(interval_bucket(int(row["scheduled_interval"])))
+        rating_sums[user_id] = rating_sums.get(user_id, 0) + rating
+        rating_counts[user_id] = count + 1
+    return features, labels
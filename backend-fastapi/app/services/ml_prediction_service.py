@@ -1,37 +1,36 @@
 
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from app.config import get_settings
+# Shared with training (re-exported for existing importers)
+from app.services.interval_features import BUCKET_DAYS, CATEGORY_CODES  # noqa: F401
+from app.services.model_registry import get_model_registry
+from app.services.prediction_batcher import PredictionBatcher
 
 logger = logging.getLogger(__name__)
 
 class MLPredictionService:
-    """Service for interacting with Vertex AI ML models."""
+    """Service for interval predictions from the local ML model."""
     
     def __init__(self):
         self.settings = get_settings()
-        self.model = None
-        
-        # Load local model artifacts
-        try:
-            import joblib
-            import os
-            
-            # Path relative to this file: ../../local_model_artifacts
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            backend_dir = os.path.dirname(os.path.dirname(current_dir))
-            model_path = os.path.join(backend_dir, "local_model_artifacts", "model.joblib")
-            
-            if os.path.exists(model_path):
-                logger.info(f"Loading local ML model from {model_path}")
-                self.model = joblib.load(model_path)
-                logger.info("Local ML model loaded successfully")
-            else:
-                logger.warning(f"Local model not found at {model_path}")
-                
-        except Exception as e:
-            logger.error(f"Failed to load local ML model: {e}")
+        # Loaded once per process and hot-reloaded (see app.services.model_registry)
+        self.registry = get_model_registry()
+        # Concurrent predictions share one model call off the event loop
+        self.batcher = get_prediction_batcher()
+
+    @property
+    def model(self) -> Optional[Any]:
+        """Currently loaded model, or None if not loaded (yet)."""
+        loaded = self.registry.current
+        return loaded.model if loaded else None
+
+    @property
+    def model_version(self) -> Optional[str]:
+        """Version of the currently loaded model."""
+        loaded = self.registry.current
+        return loaded.version if loaded else None
 
     async def predict_next_interval(self, features: Dict[str, Any]) -> Optional[int]:
         """
@@ -43,69 +42,73 @@ class MLPredictionService:
         Returns:
             Predicted interval in days, or None if prediction fails.
         """
-        if not self.model:
-            logger.warning("No local ML model loaded. Skipping prediction.")
-            return None
-            
-        try:
-            # Prepare instance for prediction
-            # The model was trained with a DataFrame and ColumnTransformer using column names.
-            # We pass a dictionary which Vertex AI sklearn container converts to a DataFrame.
-            # Manual label encoding to match training (sorted unique values)
-            # Categories: code, concept, definition, vocabulary
-            category_map = {
-                "code": 0,
-                "concept": 1,
-                "definition": 2,
-                "vocabulary": 3,
-                "General": 3 # Default to vocabulary/general
-            }
-            cat_val = category_map.get(str(features.get('category', 'vocabulary')), 3)
+        return (await self.predict_next_intervals([features]))[0]
 
-            # Create list of values in exact order of feature_cols in training script
-            # ['category', 'word_count', 'rating', 'review_sequence_number', 'days_since_last_review', 'user_avg_rating']
-            instance = [
-                cat_val,
-                int(features.get('word_count', 0)),
-                int(features.get('rating', 3)),
-                int(features.get('review_sequence_number', 1)),
-                int(features.get('current_interval', 0)),
-                float(features.get('user_avg_rating', 3.0))
-            ]
-            
-            # Run prediction locally
-            # Scikit-learn expects 2D array [n_samples, n_features]
-            prediction = self.model.predict([instance])
-            
-            # Parse prediction result
-            # Model returns buckets: 1, 2, 3, 4
-            predicted_bucket = int(prediction[0])
+    async def predict_next_intervals(self, features_list: List[Dict[str, Any]]) -> List[Optional[int]]:
+        """
+        Predict next intervals for many reviews with a single model call.
+        
+        Args:
+            features_list: Feature dicts, one per review.
             
-            # Map bucket to days
-            # 1: 1 day
-            # 2: 2-3 days -> 2
-            # 3: 4-7 days -> 5
-            # 4: >7 days -> 14 (conservative estimate)
-            mapping = {
-                1: 1,
-                2: 2,
-                3: 5,
-                4: 14
-            }
+        Returns:
+            Predicted intervals in days (same order), all None if prediction fails.
+        """
+        loaded = await self.registry.ensure_loaded()
+        if loaded is None:
+            logger.warning("No local ML model loaded. Skipping prediction.")
+            return [None] * len(features_list)
+        if not features_list:
+            return []
             
-            result = mapping.get(predicted_bucket, 1)
+        try:
+            # Micro-batched with concurrent requests into one model.predict
+            results = await self.batcher.submit(features_list)
             
             # Log prediction for monitoring
             log_payload = {
                 "event": "ml_prediction_local",
-                "features": instance,
-                "predicted_bucket": predicted_bucket,
-                "predicted_days": result
+                "model_version": loaded.version,
+                "batch_size": len(features_list),
+                "features": features_list[0] if len(features_list) == 1 else None,
+                "predicted_days": results
             }
             logger.info(f"ML Prediction: {log_payload}")
             
-            return result
+            return results
             
         except Exception as e:
             logger.error(f"ML prediction failed: {e}")
-            return None
+            return [None] * len(features_list)
+
+
+def predict_intervals_blocking(features_list: List[Dict[str, Any]]) -> List[int]:
+    """
+    Predict intervals (days) with the registry's current model. Blocking.
+
+    Vectorized: one model.predict over a [n_samples, n_features] matrix.
+    """
+    loaded = get_model_registry().current
+    if loaded is None:
+        raise RuntimeError("No local ML model loaded")
+    from app.services.scheduling import ModelPolicy, ReviewArrays
+    reviews = ReviewArrays.from_features(features_list)
+    return [int(days) for days in ModelPolicy(loaded.model).predict(reviews)]
+
+
+# Singleton instance
+_prediction_batcher: Optional[PredictionBatcher] = None
+
+
+def get_prediction_batcher() -> PredictionBatcher:
+    """Get or create the process-wide micro-batcher for interval predictions."""
+    global _prediction_batcher
+    if _prediction_batcher is None:
+        settings = get_settings()
+        _prediction_batcher = PredictionBatcher(
+            predict_intervals_blocking,
+            max_batch_size=settings.ml_batch_max_size,
+            max_wait_ms=settings.ml_batch_max_wait_ms,
+            max_workers=settings.ml_batch_workers,
+        )
+    return _prediction_batcher
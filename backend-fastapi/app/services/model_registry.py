@@ -0,0 +1,190 @@
+"""
+Process-wide registry for the local interval model.
+
+The model artifact is loaded once per process (in the background after
+startup, or on first use) instead of on every MLPredictionService
+construction. `joblib.load(..., mmap_mode="r")` memory-maps the NumPy arrays
+stored in the artifact, so the workers on a host share those pages through
+the OS page cache instead of each holding a private copy. (Estimators whose
+state is not NumPy arrays, such as XGBoost boosters, are loaded normally.)
+
+The registry polls the artifact and hot-reloads it when it is replaced.
+Deploy new models with an atomic swap (write to a temporary file, then
+`os.replace` it over the artifact); a failed load keeps serving the previous
+model. Every loaded model carries a version (content hash) that predictions
+and logs report.
+
+The artifact is either a joblib file or a compiled model directory (see
+app.services.compiled_model and scripts/compile_model.py). A compiled model is
+preferred when `local_model_artifacts/model.compiled` exists. When a
+prediction table built for the same model version exists (see
+app.services.prediction_table), predictions are looked up in it first.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Optional, Tuple
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+ARTIFACTS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "local_model_artifacts",
+)
+DEFAULT_MODEL_PATH = os.path.join(ARTIFACTS_DIR, "model.joblib")
+DEFAULT_COMPILED_MODEL_PATH = os.path.join(ARTIFACTS_DIR, "model.compiled")
+DEFAULT_PREDICTION_TABLE_PATH = os.path.join(ARTIFACTS_DIR, "model.table.npz")
+
+
+def default_model_path() -> str:
+    """The compiled model if one was built, else the joblib artifact."""
+    if os.path.isdir(DEFAULT_COMPILED_MODEL_PATH):
+        return DEFAULT_COMPILED_MODEL_PATH
+    return DEFAULT_MODEL_PATH
+
+
+def artifact_version(path: str) -> str:
+    """Version of a joblib artifact: first 12 hex chars of its SHA-256."""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """A loaded model and where it came from."""
+    model: Any
+    version: str  # See artifact_version; compiled models keep their source's version
+    path: str
+    loaded_at: datetime
+    tabulated: bool = False  # Predictions come from a prediction table first
+
+
+class ModelRegistry:
+    """Holds the current model; swaps it when the artifact changes."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_MODEL_PATH,
+        reload_interval_seconds: int = 30,
+        table_path: Optional[str] = None,
+    ):
+        self.path = path
+        self.table_path = table_path
+        self.reload_interval_seconds = reload_interval_seconds
+        self._current: Optional[LoadedModel] = None
+        self._signature: Optional[Tuple] = None
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> Optional[LoadedModel]:
+        """The loaded model, or None before the first successful load."""
+        return self._current
+
+    async def ensure_loaded(self) -> Optional[LoadedModel]:
+        """Current model, loading it in a worker thread on first use."""
+        if self._current is None:
+            await asyncio.to_thread(self.reload_if_changed)
+        return self._current
+
+    def reload_if_changed(self) -> bool:
+        """
+        Load the artifact if it changed since the last load. Blocking.
+
+        Returns:
+            True if a new model was swapped in
+        """
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                if self._signature is None:
+                    logger.warning(f"Local model not found at {self.path}")
+                    self._signature = (0, 0, 0)
+                return False
+
+            signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size, self._table_signature())
+            if signature == self._signature:
+                return False
+            self._signature = signature
+
+            try:
+                loaded = self._load()
+            except Exception as e:
+                logger.error(f"Failed to load local ML model from {self.path}: {e}")
+                return False
+
+            previous = self._current
+            if previous is not None and (previous.version, previous.tabulated) == (loaded.version, loaded.tabulated):
+                return False
+            self._current = loaded
+            logger.info(
+                f"Local ML model loaded: version={loaded.version}"
+                + (" with prediction table" if loaded.tabulated else "")
+                + (f" (replaces {previous.version})" if previous else "")
+            )
+            return True
+
+    def _table_signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.table_path) if self.table_path else None
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size) if stat else None
+
+    def _load(self) -> LoadedModel:
+        if os.path.isdir(self.path):
+            from app.services.compiled_model import CompiledForest
+            model = CompiledForest.load(self.path, mmap_mode="r")
+            version = model.version
+        else:
+            import joblib
+            version = artifact_version(self.path)
+            model = joblib.load(self.path, mmap_mode="r")
+
+        tabulated = False
+        if self.table_path and os.path.exists(self.table_path):
+            from app.services.prediction_table import PredictionTable, TabulatedModel
+            table = PredictionTable.load(self.table_path)
+            if table.version == version:
+                model, tabulated = TabulatedModel(table, fallback=model), True
+            else:
+                logger.warning(
+                    f"Ignoring prediction table {self.table_path}: built for model {table.version}, loaded {version}"
+                )
+        return LoadedModel(
+            model=model,
+            version=version,
+            path=self.path,
+            loaded_at=datetime.now(timezone.utc),
+            tabulated=tabulated,
+        )
+
+    async def watch(self) -> None:
+        """Background task: load the model, then hot-reload it on changes until cancelled."""
+        while True:
+            await asyncio.to_thread(self.reload_if_changed)
+            if self.reload_interval_seconds <= 0:
+                return
+            await asyncio.sleep(self.reload_interval_seconds)
+
+
+# Singleton instance
+_model_registry: Optional[ModelRegistry] = None
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get or create the process-wide model registry."""
+    global _model_registry
+    if _model_registry is None:
+        settings = get_settings()
+        _model_registry = ModelRegistry(
+            path=settings.ml_model_path or default_model_path(),
+            reload_interval_seconds=settings.ml_model_reload_interval_seconds,
+            table_path=settings.ml_prediction_table_path or DEFAULT_PREDICTION_TABLE_PATH,
+        )
+    return _model_registry
@@ -1,9 +1,14 @@
 """Note service for note operations and reindexing"""
-from typing import Optional
+from typing import Iterator, Optional
 from app.core.firebase import get_firestore_client
 from app.services.llm_service import LLMService
 from app.services.vector_service import VectorService
 from app.core.exceptions import NotFoundError, UnauthorizedError
+from app.core.firestore_loader import forget_document, load_document, track_reads
+
+
+# Fields fetched for list views; content is loaded per note on demand
+NOTE_SUMMARY_FIELDS = ["title", "folder_id", "created_at", "updated_at", "word_count"]
 
 
 class NoteService:
@@ -14,6 +19,10 @@ class NoteService:
         self.llm_service = LLMService()
         self.vector_service = VectorService()
     
+    def note_ref(self, note_id: str):
+        """Reference to a note document."""
+        return self.db.collection("notes").document(note_id)
+
     async def reindex_all_notes(self, user_id: str) -> dict:
         """
         Reindex all notes for a user.
@@ -47,8 +56,8 @@ class NoteService:
             Dict with success status and chunks_created count
         """
         # 1. Fetch note from Firestore
-        note_ref = self.db.collection("notes").document(note_id)
-        note_doc = note_ref.get()
+        note_ref = self.note_ref(note_id)
+        note_doc = await load_document(note_ref)
         
         if not note_doc.exists:
             raise NotFoundError(f"Note {note_id} not found")
@@ -132,8 +141,8 @@ class NoteService:
         Translate note content.
         """
         # 1. Fetch note
-        note_ref = self.db.collection("notes").document(note_id)
-        note_doc = note_ref.get()
+        note_ref = self.note_ref(note_id)
+        note_doc = await load_document(note_ref)
         
         if not note_doc.exists:
             raise NotFoundError(f"Note {note_id} not found")
@@ -167,6 +176,7 @@ class NoteService:
         # 4. Update Firestore
         field_to_update = "content_md_en" if target_lang == "en" else "content_md_zh"
         note_ref.update({field_to_update: translated_text})
+        forget_document(note_ref)
         
         return {
             "note_id": note_id,
@@ -179,8 +189,8 @@ class NoteService:
         Extract terminology from note.
         """
         # 1. Fetch note
-        note_ref = self.db.collection("notes").document(note_id)
-        note_doc = note_ref.get()
+        note_ref = self.note_ref(note_id)
+        note_doc = await load_document(note_ref)
         
         if not note_doc.exists:
             raise NotFoundError(f"Note {note_id} not found")
@@ -199,14 +209,57 @@ class NoteService:
         # For now just return them
         return terms
 
-    async def get_all_notes(self, user_id: str) -> list[dict]:
+    def iter_note_summaries(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Iterator[dict]:
         """
-        Get all notes for a user.
+        Lazily yield note metadata (NOTE_SUMMARY_FIELDS) for a user, ordered by ID.
+
+        Uses a Firestore projection, so note content never leaves Firestore.
+
+        Args:
+            user_id: Owner of the notes
+            limit: Maximum notes to return (all if None)
+            cursor: ID of the last note of the previous page
+
+        Blocking: consume from a worker thread (see app.core.responses).
         """
-        notes_ref = self.db.collection("notes").where("user_id", "==", user_id)
-        notes = []
-        for doc in notes_ref.stream():
+        query = (
+            self.db.collection("notes")
+            .where("user_id", "==", user_id)
+            .order_by("__name__")
+            .select(NOTE_SUMMARY_FIELDS)
+        )
+        if cursor:
+            query = query.start_after({"__name__": cursor})
+        if limit:
+            query = query.limit(limit)
+
+        for doc in track_reads(query.stream()):
             note_data = doc.to_dict()
             note_data["id"] = doc.id
-            notes.append(note_data)
-        return notes
+            yield note_data
+
+    async def get_note_content(self, user_id: str, note_id: str) -> dict:
+        """
+        Get a single note including its bilingual content.
+
+        Raises:
+            NotFoundError: Note does not exist
+            UnauthorizedError: Note belongs to another user
+        """
+        note_doc = await load_document(self.note_ref(note_id))
+
+        if not note_doc.exists:
+            raise NotFoundError(f"Note {note_id} not found")
+
+        note_data = note_doc.to_dict()
+
+        if note_data.get("user_id") != user_id:
+            raise UnauthorizedError("Unauthorized access to note")
+
+        note_data["id"] = note_doc.id
+        return note_data
@@ -0,0 +1,321 @@
+"""
+Online updates for the interval model.
+
+Batch retraining (ml/flashcard_interval_model) needs a BigQuery export, the
+training view and a pipeline run, so the scheduler lags user behaviour by
+days. The online learner closes the gap between those runs:
+
+- Review documents carry `ml_features`, the model inputs at review time
+  (interval_features.model_features). A review source yields them in commit
+  order, labelled with `interval_bucket(scheduled_interval)`:
+  `FirestoreReviewSource` reads new `flashcard_reviews` documents and
+  `EventLogSource` reads a local JSONL log (for development and replays).
+- `OnlineIntervalModel` (standardized features + SGD logistic regression)
+  learns from each mini-batch with `partial_fit`.
+- A fixed ~10% of reviews (chosen by hashing the review id) never reach the
+  learner. The most recent of them form the holdout. After each
+  mini-batch, `OnlineLearner.step` scores the learner and the model
+  MLPredictionService currently serves on the holdout. It publishes only
+  when the learner is not worse by more than `max_regression`. A served
+  model the holdout cannot score (other classes, e.g. a batch model) is
+  only replaced with `replace_incomparable`.
+- `publish_model` writes a versioned copy to `<artifact dir>/versions/` and
+  appends to `versions/manifest.jsonl`. It then swaps the copy over the
+  served artifact, and the model registry hot-reloads it.
+
+scripts/online_learner.py runs the loop. NumPy and scikit-learn are imported
+by this module, so import it lazily from request paths (see
+scripts/benchmark_startup.py).
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import numpy as np
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+from app.services.interval_features import BUCKET_DAYS, CATEGORY_CODES, feature_row, interval_bucket
+from app.services.model_registry import ModelRegistry, artifact_version
+
+logger = logging.getLogger(__name__)
+
+HOLDOUT_FRACTION = 0.1
+HOLDOUT_SIZE = 5000
+MIN_HOLDOUT = 200  # Nothing is published before the holdout has this many reviews
+MAX_REGRESSION = 0.0  # Holdout accuracy the learner may lose against the served model
+KEEP_VERSIONS = 10
+MANIFEST_FILE = "manifest.jsonl"
+
+# Firestore commit timestamps become visible slightly out of order; stay behind
+SETTLE_DELAY = timedelta(seconds=5)
+
+
+class OnlineIntervalModel:
+    """
+    Interval-bucket classifier that learns incrementally.
+
+    Same interface as the batch models: `predict` takes rows in
+    FEATURE_COLUMNS order and returns buckets (see BUCKET_DAYS).
+    """
+
+    classes_ = np.array(sorted(BUCKET_DAYS))
+    n_categories = max(CATEGORY_CODES.values()) + 1
+
+    def __init__(self, alpha: float = 1e-4, random_state: int = 0):
+        self.scaler = StandardScaler()
+        self.classifier = SGDClassifier(loss="log_loss", alpha=alpha, random_state=random_state)
+        self.n_seen = 0
+
+    def _expand(self, X: Any) -> np.ndarray:
+        """One-hot category and rating, log-scaled counts."""
+        X = np.asarray(X, dtype=np.float64)
+        category = np.clip(X[:, 0].astype(np.int64), 0, self.n_categories - 1)
+        rating = np.clip(X[:, 2].astype(np.int64), 1, 4)
+        return np.column_stack([
+            np.eye(self.n_categories)[category],
+            np.eye(4)[rating - 1],
+            np.log1p(np.maximum(X[:, [1, 3, 4]], 0)),
+            X[:, 5],
+        ])
+
+    def partial_fit(self, X: Any, y: Any) -> "OnlineIntervalModel":
+        Z = self._expand(X)
+        self.scaler.partial_fit(Z)
+        self.classifier.partial_fit(self.scaler.transform(Z), np.asarray(y), classes=self.classes_)
+        self.n_seen += len(Z)
+        return self
+
+    def predict(self, X: Any) -> np.ndarray:
+        return self.classifier.predict(self.scaler.transform(self._expand(X)))
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        return self.classifier.predict_proba(self.scaler.transform(self._expand(X)))
+
+
+@dataclass
+class ReviewEvent:
+    """One logged review: model inputs and the interval that was scheduled."""
+    review_id: str
+    features: Dict[str, Any]
+    scheduled_interval: int
+
+    @property
+    def label(self) -> int:
+        return interval_bucket(self.scheduled_interval)
+
+
+def is_holdout(review_id: str, fraction: float = HOLDOUT_FRACTION) -> bool:
+    """Stable split: a review is in the holdout in every run, or in none."""
+    digest = hashlib.sha256(review_id.encode()).digest()
+    return int.from_bytes(digest[:4], "big") < fraction * 2**32
+
+
+class EventLogSource:
+    """
+    Reviews from a JSONL log; the cursor is a byte offset.
+
+    `read` returns (events, cursor, lines scanned); a source is caught up
+    when it scans fewer than `limit` records, however many were events.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def read(self, cursor: Optional[int], limit: int) -> Tuple[List[ReviewEvent], Optional[int], int]:
+        events: List[ReviewEvent] = []
+        offset = cursor or 0
+        scanned = 0
+        if not os.path.exists(self.path):
+            return events, cursor, scanned
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            while scanned < limit:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break  # Partial line still being written
+                offset += len(line)
+                scanned += 1
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record.get("features") is None:
+                    continue
+                events.append(ReviewEvent(
+                    str(record["review_id"]), record["features"], int(record["scheduled_interval"])
+                ))
+        return events, offset, scanned
+
+
+class FirestoreReviewSource:
+    """
+    New `flashcard_reviews` documents, in commit order (`recorded_at`).
+
+    The cursor is [recorded_at (ISO), document id]. Reviews written before
+    documents carried `ml_features` are skipped, but count as scanned.
+    """
+
+    def __init__(self, db: Any):
+        self.db = db
+
+    def read(
+        self, cursor: Optional[List[str]], limit: int
+    ) -> Tuple[List[ReviewEvent], Optional[List[str]], int]:
+        query = (
+            self.db.collection("flashcard_reviews")
+            .where("recorded_at", "<", datetime.now(timezone.utc) - SETTLE_DELAY)
+            .order_by("recorded_at")
+            .order_by("__name__")
+        )
+        if cursor:
+            query = query.start_after({"recorded_at": datetime.fromisoformat(cursor[0]), "__name__": cursor[1]})
+        events = []
+        scanned = 0
+        for doc in query.limit(limit).stream():
+            scanned += 1
+            data = doc.to_dict()
+            cursor = [data["recorded_at"].isoformat(), doc.id]
+            if data.get("ml_features") and data.get("scheduled_interval") is not None:
+                events.append(ReviewEvent(doc.id, data["ml_features"], int(data["scheduled_interval"])))
+        return events, cursor, scanned
+
+
+def holdout_accuracy(model: Any, holdout: Deque[Tuple[List[float], int]]) -> float:
+    X = np.array([row for row, _ in holdout], dtype=np.float64)
+    y = np.array([label for _, label in holdout])
+    return float(np.mean(np.asarray(model.predict(X)) == y))
+
+
+def publish_model(model: Any, path: str, record: Dict[str, Any], keep: int = KEEP_VERSIONS) -> str:
+    """
+    Write `model` to `<dir of path>/versions/`, then swap it over `path`.
+
+    Returns:
+        The published version (artifact hash, as the registry reports it)
+    """
+    import joblib
+
+    versions_dir = os.path.join(os.path.dirname(path), "versions")
+    os.makedirs(versions_dir, exist_ok=True)
+    staging = os.path.join(versions_dir, ".staging.joblib")
+    joblib.dump(model, staging)
+    version = artifact_version(staging)
+    versioned = os.path.join(versions_dir, f"model-{version}.joblib")
+    os.replace(staging, versioned)
+
+    # Copy next to the served artifact, then swap atomically
+    shutil.copyfile(versioned, f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+
+    with open(os.path.join(versions_dir, MANIFEST_FILE), "a") as f:
+        f.write(json.dumps({
+            "version": version, "published_at": datetime.now(timezone.utc).isoformat(), **record
+        }) + "\n")
+
+    published = sorted(
+        (os.path.join(versions_dir, name) for name in os.listdir(versions_dir) if name.startswith("model-")),
+        key=os.path.getmtime,
+    )
+    for stale in published[:-keep]:
+        os.remove(stale)
+    return version
+
+
+@dataclass
+class StepResult:
+    """What one mini-batch did."""
+    trained: int
+    held_out: int
+    learner_accuracy: Optional[float] = None
+    served_accuracy: Optional[float] = None
+    published_version: Optional[str] = None
+    rejected: bool = False
+    incomparable: bool = False  # The served model could not be scored on the holdout
+
+
+@dataclass
+class OnlineLearner:
+    """Learner, holdout and source cursor; pickled between runs."""
+    model: OnlineIntervalModel = field(default_factory=OnlineIntervalModel)
+    holdout: Deque[Tuple[List[float], int]] = field(default_factory=lambda: deque(maxlen=HOLDOUT_SIZE))
+    cursor: Any = None
+    published_version: Optional[str] = None
+
+    def step(
+        self,
+        events: List[ReviewEvent],
+        model_path: str,
+        max_regression: float = MAX_REGRESSION,
+        min_holdout: int = MIN_HOLDOUT,
+        replace_incomparable: bool = False,
+    ) -> StepResult:
+        """
+        Learn from one mini-batch and publish the learner if it passes the guard.
+
+        Args:
+            events: New reviews, oldest first
+            model_path: Artifact MLPredictionService loads (a joblib file)
+            replace_incomparable: Publish over a served model the holdout
+                cannot score (other classes, or predict fails); otherwise
+                such a model is never replaced
+        """
+        train = [event for event in events if not is_holdout(event.review_id)]
+        for event in events:
+            if is_holdout(event.review_id):
+                self.holdout.append((feature_row(event.features), event.label))
+        if train:
+            self.model.partial_fit([feature_row(event.features) for event in train], [event.label for event in train])
+
+        result = StepResult(trained=len(train), held_out=len(events) - len(train))
+        if not train or self.model.n_seen == 0 or len(self.holdout) < min_holdout:
+            return result
+
+        result.learner_accuracy = holdout_accuracy(self.model, self.holdout)
+        served = ModelRegistry(model_path, reload_interval_seconds=0)
+        if served.reload_if_changed():
+            served_classes = getattr(served.current.model, "classes_", None)
+            if served_classes is None or not np.array_equal(served_classes, self.model.classes_):
+                # E.g. a batch model with 0-based labels: its accuracy would not be comparable
+                reason = f"predicts classes {served_classes}, not buckets {self.model.classes_.tolist()}"
+            else:
+                try:
+                    result.served_accuracy = holdout_accuracy(served.current.model, self.holdout)
+                    reason = None
+                except Exception as e:
+                    reason = f"could not score the holdout: {e}"
+            if reason:
+                result.incomparable = True
+                if not replace_incomparable:
+                    logger.warning(f"Served model {served.current.version} {reason}; not replacing it")
+                    result.rejected = True
+                    return result
+                logger.warning(f"Served model {served.current.version} {reason}; replacing it as requested")
+        if result.served_accuracy is not None and result.learner_accuracy < result.served_accuracy - max_regression:
+            result.rejected = True
+            return result
+
+        result.published_version = publish_model(self.model, model_path, {
+            "holdout_accuracy": result.learner_accuracy,
+            "served_accuracy": result.served_accuracy,
+            "holdout_size": len(self.holdout),
+            "examples_seen": self.model.n_seen,
+            "replaces": served.current.version if served.current else None,
+        })
+        self.published_version = result.published_version
+        return result
+
+    def save(self, path: str) -> None:
+        import joblib
+        joblib.dump(self, f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def load(cls, path: str) -> "OnlineLearner":
+        import joblib
+        if not os.path.exists(path):
+            return cls()
+        return joblib.load(path)
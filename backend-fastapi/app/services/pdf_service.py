@@ -1,5 +1,4 @@
 """PDF parsing service"""
-from PyPDF2 import PdfReader
 import io
 
 
@@ -16,6 +15,8 @@ class PDFService:
         Returns:
             Extracted text content
         """
+        from PyPDF2 import PdfReader  # Lazy: only upload paths parse PDFs
+
         reader = PdfReader(pdf_path)
         text_parts = []
         
@@ -36,6 +37,8 @@ class PDFService:
         Returns:
             Extracted text content
         """
+        from PyPDF2 import PdfReader  # Lazy: only upload paths parse PDFs
+
         reader = PdfReader(io.BytesIO(pdf_bytes))
         text_parts = []
         
@@ -0,0 +1,124 @@
+"""
+Async micro-batching for model inference.
+
+A single-row `model.predict` is dominated by per-call overhead (input
+validation, thread dispatch, booster setup), so predicting one review at a
+time wastes most of the work, and calling it on the event loop blocks every
+other request. The batcher collects concurrent prediction requests for up to
+`max_wait_ms` (or until `max_batch_size` rows are queued), runs them as one
+`predict_fn` call on a small thread pool, and hands each caller its slice of
+the results.
+
+While a worker thread is idle, queued rows are dispatched on the next
+event-loop tick (so a lone request does not wait for the timer); once all
+workers are busy, rows accumulate until a worker frees up, the batch is full,
+or `max_wait_ms` passes.
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionBatcher:
+    """Coalesces concurrent `submit` calls into batched `predict_fn` calls."""
+
+    def __init__(
+        self,
+        predict_fn: Callable[[List[Any]], Sequence[Any]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        max_workers: int = 2,
+    ):
+        """
+        Args:
+            predict_fn: Blocking function mapping a list of rows to one result per row
+            max_batch_size: Rows that trigger an immediate flush
+            max_wait_ms: Longest time queued rows wait while every worker is busy
+            max_workers: Threads running `predict_fn`
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_workers = max_workers
+        self.batches = 0
+        self.rows = 0
+        self._queue: List[Tuple[List[Any], asyncio.Future]] = []
+        self._queued_rows = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tasks: set = set()
+
+    async def submit(self, rows: Sequence[Any]) -> List[Any]:
+        """Results for `rows` (same order), computed in a shared batch."""
+        if not rows:
+            return []
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((list(rows), future))
+        self._queued_rows += len(rows)
+
+        if self._queued_rows >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            delay = 0 if self._in_flight < self.max_workers else self.max_wait_ms / 1000
+            self._timer = loop.call_later(delay, self._flush)
+        return await future
+
+    def shutdown(self) -> None:
+        """Stop the worker threads (queued batches are not run)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._queue, self._queued_rows = self._queue, [], 0
+        if not batch:
+            return
+        self._in_flight += 1
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[List[Any], asyncio.Future]]) -> None:
+        rows = [row for chunk, _ in batch for row in chunk]
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="prediction-batcher")
+
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self._executor, self.predict_fn, rows)
+            if len(results) != len(rows):
+                raise ValueError(f"predict_fn returned {len(results)} results for {len(rows)} rows")
+        except Exception as e:
+            logger.error(f"Batched prediction of {len(rows)} rows failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._finished()
+
+        self.batches += 1
+        self.rows += len(rows)
+        offset = 0
+        for chunk, future in batch:
+            # Callers that were cancelled (e.g. client disconnected) are skipped
+            if not future.done():
+                future.set_result(list(results[offset:offset + len(chunk)]))
+            offset += len(chunk)
+
+    def _finished(self) -> None:
+        """A worker freed up: dispatch rows that queued up meanwhile."""
+        self._in_flight -= 1
+        if self._queue:
+            self._flush()
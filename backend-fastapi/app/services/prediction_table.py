@@ -0,0 +1,205 @@
+"""
+Precomputed interval-model predictions over the bounded feature space.
+
+A tree ensemble's output only changes where a feature crosses one of the
+model's split thresholds. Within per-feature bounds (FEATURE_BOUNDS), the
+thresholds cut each feature into a few bins, and the model is constant on
+every cell of the resulting grid. `build_prediction_table` evaluates the
+model once per cell; `TabulatedModel.predict` then turns each row into a
+cell index (one `searchsorted` per feature) and reads the prediction from a
+small uint8 array. The table is exact, not an approximation: rows outside the
+bounds (or with missing values) are predicted by the live model.
+
+NumPy is imported by this module, so import it lazily from request paths
+(see scripts/benchmark_startup.py).
+"""
+import bisect
+import json
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.services.compiled_model import CompiledForest, compile_model
+
+# Inclusive bounds per model feature (ReviewArrays.feature_matrix columns)
+FEATURE_BOUNDS: Dict[str, Tuple[float, float]] = {
+    "category": (0, 3),
+    "word_count": (0, 1000),
+    "rating": (1, 4),
+    "review_sequence_number": (1, 1000),
+    "days_since_last_review": (0, 3650),
+    "user_avg_rating": (1, 4),
+}
+
+MAX_CELLS = 50_000_000
+
+
+class PredictionTable:
+    """Model predictions (class indexes) for every cell of the feature grid."""
+
+    def __init__(
+        self,
+        edges: List[np.ndarray],
+        lower: np.ndarray,
+        upper: np.ndarray,
+        cells: np.ndarray,
+        classes: np.ndarray,
+        left_if_equal: bool,
+        version: str,
+    ):
+        self.edges = [np.asarray(e, dtype=np.float32) for e in edges]
+        self.lower = np.asarray(lower, dtype=np.float32)
+        self.upper = np.asarray(upper, dtype=np.float32)
+        self.cells = np.asarray(cells, dtype=np.uint8)
+        self.classes = np.asarray(classes)
+        self.left_if_equal = left_if_equal
+        self.version = version
+        # Row-major strides: the last feature varies fastest
+        sizes = [len(e) + 1 for e in self.edges]
+        self.strides = np.cumprod([1] + sizes[:0:-1])[::-1].astype(np.int64)
+        # Plain-Python copies for single-row lookups, where NumPy call overhead dominates
+        self._bisect = bisect.bisect_left if left_if_equal else bisect.bisect_right
+        self._scalar = list(zip(
+            [e.tolist() for e in self.edges], self.lower.tolist(), self.upper.tolist(), self.strides.tolist()
+        ))
+
+    @property
+    def n_features(self) -> int:
+        return len(self.edges)
+
+    def cell_index(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(cell index per row, whether the row is inside the bounds)."""
+        inside = np.all((X >= self.lower) & (X <= self.upper), axis=1)  # NaN compares False
+        # Same bins as the trees: XGBoost sends x >= t right, scikit-learn x > t
+        side = "left" if self.left_if_equal else "right"
+        index = np.zeros(len(X), dtype=np.int64)
+        for feature, edges in enumerate(self.edges):
+            if len(edges):
+                index += np.searchsorted(edges, X[:, feature], side=side) * self.strides[feature]
+        return np.where(inside, index, 0), inside
+
+    def lookup(self, row: List[float]) -> Optional[int]:
+        """Class index for one row, or None outside the bounds."""
+        index = 0
+        for x, (edges, lower, upper, stride) in zip(row, self._scalar):
+            if not lower <= x <= upper:  # Also rejects NaN
+                return None
+            index += self._bisect(edges, x) * stride
+        return int(self.cells[index])
+
+    def save(self, path: str) -> None:
+        meta = {"left_if_equal": self.left_if_equal, "version": self.version}
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                cells=self.cells,
+                classes=self.classes,
+                lower=self.lower,
+                upper=self.upper,
+                meta=np.array(json.dumps(meta)),
+                **{f"edges_{i}": edges for i, edges in enumerate(self.edges)},
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "PredictionTable":
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            n_features = len(data["lower"])
+            return cls(
+                edges=[data[f"edges_{i}"] for i in range(n_features)],
+                lower=data["lower"],
+                upper=data["upper"],
+                cells=data["cells"],
+                classes=data["classes"],
+                left_if_equal=meta["left_if_equal"],
+                version=meta["version"],
+            )
+
+
+class TabulatedModel:
+    """Looks predictions up in a PredictionTable; the live model handles the rest."""
+
+    def __init__(self, table: PredictionTable, fallback: Any):
+        self.table = table
+        self.fallback = fallback
+
+    def predict(self, X: Any) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if len(X) == 1:
+            cell = self.table.lookup(X[0].tolist())
+            if cell is not None:
+                return self.table.classes[[cell]]
+        index, inside = self.table.cell_index(X)
+        result = self.table.classes[self.table.cells[index]]
+        if not inside.all():
+            result[~inside] = np.asarray(self.fallback.predict(X[~inside]))
+        return result
+
+
+def build_prediction_table(
+    model: Any,
+    feature_names: List[str],
+    version: str,
+    bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+    max_cells: int = MAX_CELLS,
+) -> PredictionTable:
+    """
+    Evaluate `model` once per cell of the bounded feature grid.
+
+    Args:
+        model: Tree ensemble (CompiledForest, or anything compile_model accepts)
+        feature_names: Model feature order, to look up bounds
+        version: Version of `model`; the table is only used with that version
+        bounds: Inclusive (lower, upper) per feature (defaults to FEATURE_BOUNDS)
+
+    Raises:
+        ValueError: Unsupported model, unknown feature or too many cells
+    """
+    bounds = bounds or FEATURE_BOUNDS
+    compiled = model if isinstance(model, CompiledForest) else compile_model(model)
+    missing = [name for name in feature_names if name not in bounds]
+    if missing:
+        raise ValueError(f"No bounds for features: {missing}")
+
+    left_if_equal = bool(compiled.meta["left_if_equal"])
+    lower = np.array([bounds[name][0] for name in feature_names], dtype=np.float32)
+    upper = np.array([bounds[name][1] for name in feature_names], dtype=np.float32)
+    edges, representatives = [], []
+    for feature in range(len(feature_names)):
+        thresholds = _split_thresholds(compiled, feature)
+        inside = thresholds[(thresholds >= lower[feature]) & (thresholds <= upper[feature])]
+        edges.append(inside)
+        representatives.append(_bin_representatives(inside, lower[feature], left_if_equal))
+
+    n_cells = int(np.prod([len(r) for r in representatives], dtype=np.float64))
+    if n_cells > max_cells:
+        raise ValueError(f"Feature grid has {n_cells:,} cells (limit {max_cells:,}); tighten the bounds")
+
+    grid = np.stack(np.meshgrid(*representatives, indexing="ij"), axis=-1).reshape(-1, len(feature_names))
+    predictions = np.asarray(compiled.predict(grid))
+    classes = np.asarray(compiled.classes)
+    cells = np.searchsorted(classes, predictions)
+    if len(classes) > 256 or not np.array_equal(classes[cells], predictions):
+        raise ValueError("Model predictions are not among its classes")
+    return PredictionTable(edges, lower, upper, cells.astype(np.uint8), classes, left_if_equal, version)
+
+
+def _split_thresholds(compiled: CompiledForest, feature: int) -> np.ndarray:
+    left = np.asarray(compiled.arrays["left"])
+    split = left != np.arange(len(left))
+    on_feature = split & (np.asarray(compiled.arrays["feature"]) == feature)
+    return np.unique(np.asarray(compiled.arrays["threshold"])[on_feature]).astype(np.float32)
+
+
+def _bin_representatives(edges: np.ndarray, lower: np.float32, left_if_equal: bool) -> np.ndarray:
+    """
+    One value per bin (bin k: k edges send the value right).
+
+    Bins that are empty within the bounds get a value outside them; those
+    cells are never read.
+    """
+    if len(edges) == 0:
+        return np.array([lower], dtype=np.float32)
+    if left_if_equal:
+        # Bin k holds (edges[k-1], edges[k]]; the last bin is above every edge
+        return np.append(edges, np.nextafter(edges[-1], np.float32(np.inf))).astype(np.float32)
+    # Bin k holds [edges[k-1], edges[k]); the first bin is below every edge
+    return np.insert(edges, 0, np.nextafter(edges[0], np.float32(-np.inf))).astype(np.float32)
@@ -0,0 +1,86 @@
+"""Two-level cache for user profiles (in-process L1 + Redis L2)."""
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import orjson
+from app.config import get_settings
+from app.core.responses import dumps
+from app.services.cache_service import get_cache_service
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileCache:
+    """
+    Cache of `profiles/{uid}` documents.
+
+    L1 is a bounded in-process LRU with a short TTL; L2 is Redis with a longer
+    TTL shared by all replicas. Profile writes go through
+    UserService.update_user_settings, which deletes both levels. Other
+    replicas' L1 entries are not notified, so they may serve the old profile
+    for at most `l1_ttl_seconds` after a write.
+    """
+
+    KEY_PREFIX = "profile:"
+
+    def __init__(self, l1_ttl_seconds: int = 15, l2_ttl_seconds: int = 300, max_size: int = 10000):
+        self.l1_ttl_seconds = l1_ttl_seconds
+        self.l2_ttl_seconds = l2_ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+
+    async def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Return the cached profile ({} for a user without one), or None on a miss."""
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            profile, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(user_id)
+                return profile
+            del self._entries[user_id]
+
+        profile = await get_cache_service().get(self.KEY_PREFIX + user_id)
+        if profile is not None:
+            self._put_local(user_id, profile)
+        return profile
+
+    async def set(self, user_id: str, profile: Dict[str, Any]) -> None:
+        """Cache a profile in both levels (Firestore timestamps become ISO strings)."""
+        profile = orjson.loads(dumps(profile))
+        self._put_local(user_id, profile)
+        await get_cache_service().set(self.KEY_PREFIX + user_id, profile, ttl_seconds=self.l2_ttl_seconds)
+
+    async def invalidate(self, user_id: str) -> None:
+        """Drop a user's profile from both levels."""
+        self._entries.pop(user_id, None)
+        await get_cache_service().delete(self.KEY_PREFIX + user_id)
+
+    def clear(self) -> None:
+        """Drop all L1 entries."""
+        self._entries.clear()
+
+    def _put_local(self, user_id: str, profile: Dict[str, Any]) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[user_id] = (profile, time.monotonic() + self.l1_ttl_seconds)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+# Singleton instance
+_profile_cache: Optional[ProfileCache] = None
+
+
+def get_profile_cache() -> ProfileCache:
+    """Get or create the process-wide profile cache."""
+    global _profile_cache
+    if _profile_cache is None:
+        settings = get_settings()
+        _profile_cache = ProfileCache(
+            l1_ttl_seconds=settings.profile_cache_l1_ttl_seconds,
+            l2_ttl_seconds=settings.profile_cache_ttl_seconds,
+            max_size=settings.profile_cache_size,
+        )
+    return _profile_cache
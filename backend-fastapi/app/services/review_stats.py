@@ -0,0 +1,104 @@
+"""
+Running review aggregates for flashcard scheduling.
+
+Scheduling features used to be computed by streaming review history on every
+review (all reviews of the card, all reviews of the user). Instead, each review
+write now carries server-side increments that keep the aggregates current:
+
+- on the flashcard: `review_count` and `last_reviewed`
+- on `user_review_stats/{user_id}`: `rating_sum`, `rating_count` and
+  `reviews_by_day`, a {"YYYY-MM-DD": count} histogram trimmed to the last
+  HISTOGRAM_DAYS days
+
+scripts/backfill_review_aggregates.py rebuilds both from `flashcard_reviews`.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional
+from google.cloud import firestore
+from app.services.interval_features import DEFAULT_AVG_RATING
+
+STATS_COLLECTION = "user_review_stats"
+HISTOGRAM_DAYS = 7
+
+
+def day_key(when: datetime) -> str:
+    """Histogram bucket (UTC date) for a timestamp."""
+    return when.astimezone(timezone.utc).strftime("%Y-%m-%d")
+
+
+def window_days(now: datetime) -> list[str]:
+    """Bucket keys inside the rolling window ending at `now`, oldest first."""
+    return [day_key(now - timedelta(days=offset)) for offset in reversed(range(HISTOGRAM_DAYS))]
+
+
+def average_rating(stats: Optional[Dict[str, Any]]) -> float:
+    """User's mean rating, or DEFAULT_AVG_RATING before their first review."""
+    count = (stats or {}).get("rating_count", 0)
+    if not count:
+        return DEFAULT_AVG_RATING
+    return stats.get("rating_sum", 0) / count
+
+
+def reviews_in_window(stats: Optional[Dict[str, Any]], now: datetime) -> int:
+    """Reviews in the last HISTOGRAM_DAYS days (including today)."""
+    histogram = (stats or {}).get("reviews_by_day") or {}
+    return sum(histogram.get(day, 0) for day in window_days(now))
+
+
+def stats_increment(
+    stats: Optional[Dict[str, Any]],
+    ratings: Iterable[int],
+    reviewed_at: Iterable[datetime],
+    now: datetime,
+) -> Dict[str, Any]:
+    """
+    Merge payload for `user_review_stats/{user_id}` recording new reviews.
+
+    Counters use server-side increments, so concurrent writers don't lose
+    updates. Reviews older than the window only count towards the rating
+    totals; buckets that fell out of the window in the previously read
+    `stats` are deleted in the same write.
+
+    Use with `set(..., merge=True)`.
+    """
+    ratings = list(ratings)
+    current = set(window_days(now))
+    buckets: Dict[str, Any] = {}
+    for when in reviewed_at:
+        key = day_key(when)
+        if key in current:
+            buckets[key] = buckets.get(key, 0) + 1
+
+    histogram: Dict[str, Any] = {
+        key: firestore.DELETE_FIELD
+        for key in ((stats or {}).get("reviews_by_day") or {})
+        if key not in current and key not in buckets
+    }
+    histogram.update({key: firestore.Increment(count) for key, count in buckets.items()})
+
+    return {
+        "rating_sum": firestore.Increment(sum(ratings)),
+        "rating_count": firestore.Increment(len(ratings)),
+        "reviews_by_day": histogram,
+        "updated_at": now,
+    }
+
+
+def build_stats(reviews: Iterable[Dict[str, Any]], now: datetime) -> Dict[str, Any]:
+    """Aggregates for one user computed from scratch (used by the backfill)."""
+    current = set(window_days(now))
+    stats = {"rating_sum": 0, "rating_count": 0, "reviews_by_day": {}, "updated_at": now}
+    for review in reviews:
+        stats["rating_sum"] += review.get("rating", 3)
+        stats["rating_count"] += 1
+        reviewed_at = review.get("reviewed_at")
+        if isinstance(reviewed_at, datetime):
+            key = day_key(reviewed_at)
+            if key in current:
+                stats["reviews_by_day"][key] = stats["reviews_by_day"].get(key, 0) + 1
+    return stats
+
+
+def stats_ref(db, user_id: str):
+    """Reference to a user's review stats document."""
+    return db.collection(STATS_COLLECTION).document(user_id)
@@ -0,0 +1,212 @@
+"""
+Vectorized spaced-repetition scheduling.
+
+One implementation of the scheduling rules, operating on NumPy arrays so the
+same code serves a single review (arrays of length 1), batch reviews, bulk
+rescheduling and workload simulations.
+
+- `sm2_step` computes SM-2 intervals and ease factors for many cards at once.
+- A `SchedulingPolicy` proposes intervals (NaN = no opinion). `SM2Policy`
+  never overrides SM-2; `ModelPolicy` wraps the interval model.
+- `schedule` applies a policy with SM-2 as the fallback wherever the policy
+  has no prediction.
+
+NumPy is imported by this module, so import it lazily from request paths
+(see scripts/benchmark_startup.py).
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from app.services.interval_features import BUCKET_DAYS, encode_category
+
+MIN_EASE = 1.3
+DEFAULT_EASE = 2.5
+
+# Failed cards come back after this delay instead of a whole day
+LAPSE_DELAY = timedelta(minutes=10)
+SECONDS_PER_DAY = 86400.0
+
+# Rating (1-4) -> SM-2 quality (0-5): 1->0 (Fail), 2->3 (Pass hard), 3->4 (Pass good), 4->5 (Pass easy)
+RATING_TO_QUALITY = np.array([0, 0, 3, 4, 5])
+
+# Model bucket -> interval in days (indexable by bucket)
+BUCKET_TO_DAYS = np.array([BUCKET_DAYS.get(bucket, 1) for bucket in range(max(BUCKET_DAYS) + 1)])
+
+
+@dataclass
+class ReviewArrays:
+    """
+    Column-oriented reviews: element i of every array describes review i.
+
+    Feature columns are only needed by model-backed policies.
+    """
+    interval: np.ndarray  # Current interval (days)
+    ease: np.ndarray  # Current ease factor
+    rating: np.ndarray  # 1 (Again) .. 4 (Easy)
+    category: Optional[np.ndarray] = None  # Encoded with interval_features.encode_category
+    word_count: Optional[np.ndarray] = None
+    review_sequence_number: Optional[np.ndarray] = None
+    days_since_last_review: Optional[np.ndarray] = None  # Defaults to the interval
+    user_avg_rating: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.rating)
+
+    @classmethod
+    def from_features(cls, features: Sequence[Dict[str, Any]], ease: Optional[Sequence[float]] = None) -> "ReviewArrays":
+        """Build from MLPredictionService-style feature dicts."""
+        return cls(
+            interval=np.array([int(f.get("current_interval", 0)) for f in features], dtype=np.int64),
+            ease=np.array(ease if ease is not None else [DEFAULT_EASE] * len(features), dtype=np.float64),
+            rating=np.array([int(f.get("rating", 3)) for f in features], dtype=np.int64),
+            category=np.array([encode_category(f.get("category", "vocabulary")) for f in features], dtype=np.int64),
+            word_count=np.array([int(f.get("word_count", 0)) for f in features], dtype=np.int64),
+            review_sequence_number=np.array([int(f.get("review_sequence_number", 1)) for f in features], dtype=np.int64),
+            days_since_last_review=np.array(
+                [int(f.get("days_since_last_review", f.get("current_interval", 0))) for f in features], dtype=np.int64
+            ),
+            user_avg_rating=np.array([float(f.get("user_avg_rating", 3.0)) for f in features], dtype=np.float64),
+        )
+
+    def feature_matrix(self) -> np.ndarray:
+        """Model input, one row per review, columns as in FEATURE_COLUMNS."""
+        n = len(self)
+        return np.column_stack([
+            self.category if self.category is not None else np.full(n, 3),
+            self.word_count if self.word_count is not None else np.zeros(n),
+            self.rating,
+            self.review_sequence_number if self.review_sequence_number is not None else np.ones(n),
+            self.days_since_last_review if self.days_since_last_review is not None else self.interval,
+            self.user_avg_rating if self.user_avg_rating is not None else np.full(n, 3.0),
+        ]).astype(np.float64)
+
+
+@dataclass
+class Schedule:
+    """Scheduling outcome per review."""
+    interval: np.ndarray  # Chosen interval (days)
+    ease: np.ndarray  # New ease factor
+    sm2_interval: np.ndarray  # SM-2 interval, logged for comparison
+    ml_used: np.ndarray  # True where the policy's prediction was used
+
+
+def sm2_step(interval: np.ndarray, ease: np.ndarray, rating: np.ndarray):
+    """
+    SM-2 next interval (days) and ease factor for every card.
+
+    Returns:
+        (intervals as int64, ease factors as float64)
+    """
+    interval = np.asarray(interval, dtype=np.int64)
+    ease = np.asarray(ease, dtype=np.float64)
+    rating = np.asarray(rating, dtype=np.int64)
+    failed = rating == 1
+
+    grown = (interval * ease).astype(np.int64)
+    next_interval = np.where(interval == 0, 1, np.where(interval == 1, 6, grown))
+    next_interval = np.where(failed, 0, next_interval)
+
+    # SM-2 formula: EF' = EF + (0.1 - (5-q) * (0.08 + (5-q) * 0.02))
+    miss = 5 - RATING_TO_QUALITY[rating]
+    passed_ease = ease + (0.1 - miss * (0.08 + miss * 0.02))
+    next_ease = np.maximum(MIN_EASE, np.where(failed, ease - 0.2, passed_ease))
+    return next_interval, next_ease
+
+
+class SchedulingPolicy(ABC):
+    """Proposes next intervals; NaN entries fall back to SM-2."""
+
+    name = "base"
+
+    @abstractmethod
+    def predict(self, reviews: ReviewArrays) -> np.ndarray:
+        """Interval in days per review, NaN where the policy has no opinion."""
+
+
+class SM2Policy(SchedulingPolicy):
+    """Plain SM-2."""
+
+    name = "sm2"
+
+    def predict(self, reviews: ReviewArrays) -> np.ndarray:
+        return np.full(len(reviews), np.nan)
+
+
+class ModelPolicy(SchedulingPolicy):
+    """Interval model predicting buckets (see BUCKET_DAYS) from ReviewArrays.feature_matrix."""
+
+    name = "ml"
+
+    def __init__(self, model: Any):
+        self.model = model
+
+    def predict(self, reviews: ReviewArrays) -> np.ndarray:
+        if len(reviews) == 0:
+            return np.empty(0)
+        buckets = np.asarray(self.model.predict(reviews.feature_matrix())).astype(np.int64)
+        known = (buckets >= 0) & (buckets < len(BUCKET_TO_DAYS))
+        return np.where(known, BUCKET_TO_DAYS[np.clip(buckets, 0, len(BUCKET_TO_DAYS) - 1)], 1).astype(np.float64)
+
+
+def schedule(reviews: ReviewArrays, policy: Optional[SchedulingPolicy] = None) -> Schedule:
+    """Schedule every review with `policy`, falling back to SM-2."""
+    predicted = (policy or SM2Policy()).predict(reviews)
+    return apply_predictions(reviews, predicted)
+
+
+def apply_predictions(reviews: ReviewArrays, predicted: Any) -> Schedule:
+    """
+    Schedule with precomputed predictions (days; None/NaN = use SM-2).
+
+    Ease always follows SM-2; the prediction only replaces the interval.
+    """
+    sm2_interval, ease = sm2_step(reviews.interval, reviews.ease, reviews.rating)
+    if not isinstance(predicted, np.ndarray):
+        predicted = [np.nan if p is None else p for p in predicted]
+    predicted = np.asarray(predicted, dtype=np.float64)
+    ml_used = np.isfinite(predicted)
+    interval = np.where(ml_used, np.nan_to_num(predicted), sm2_interval).astype(np.int64)
+    return Schedule(interval=interval, ease=ease, sm2_interval=sm2_interval, ml_used=ml_used)
+
+
+def due_seconds(reviewed_at: np.ndarray, interval: np.ndarray) -> np.ndarray:
+    """Due times (epoch seconds) for reviews at `reviewed_at` (epoch seconds)."""
+    interval = np.asarray(interval)
+    return np.asarray(reviewed_at, dtype=np.float64) + np.where(
+        interval == 0, LAPSE_DELAY.total_seconds(), interval * SECONDS_PER_DAY
+    )
+
+
+def next_review_at(reviewed_at: datetime, interval: int) -> datetime:
+    """Due date after a single review; failed cards come back after LAPSE_DELAY."""
+    if interval == 0:
+        return reviewed_at + LAPSE_DELAY
+    return reviewed_at + timedelta(days=int(interval))
+
+
+def spread_overdue(due: np.ndarray, now: float, days: int) -> np.ndarray:
+    """
+    Spread overdue cards evenly over the next `days` days (e.g. after a vacation).
+
+    The most overdue cards come first; cards that are not overdue keep their
+    due time. Times are epoch seconds.
+    """
+    due = np.asarray(due, dtype=np.float64)
+    overdue = np.flatnonzero(due <= now)
+    if overdue.size == 0 or days <= 0:
+        return due
+    order = overdue[np.argsort(due[overdue], kind="stable")]
+    day = (np.arange(order.size) * days) // order.size
+    spread = due.copy()
+    spread[order] = now + day * SECONDS_PER_DAY
+    return spread
+
+
+def as_lists(result: Schedule) -> List[Dict[str, Any]]:
+    """Per-review dicts with plain Python values."""
+    return [
+        {"interval": int(i), "ease_factor": float(e), "sm2_interval": int(s), "ml_used": bool(m)}
+        for i, e, s, m in zip(result.interval, result.ease, result.sm2_interval, result.ml_used)
+    ]
@@ -1,46 +1,70 @@
 """User service for user profile and settings operations"""
+import asyncio
+import logging
 from typing import Optional, Dict, Any
 from app.core.firebase import get_firestore_client
+from app.core.firestore_loader import forget_document, load_document
+from app.services.profile_cache import get_profile_cache
 from app.config import get_settings
 
+logger = logging.getLogger(__name__)
+
+
 class UserService:
     """Service for user-related operations"""
-    
+
     def __init__(self):
         self.db = get_firestore_client()
         self.settings = get_settings()
-    
+        self.profile_cache = get_profile_cache()
+
+    def profile_ref(self, user_id: str):
+        """Reference to a user's profile document."""
+        return self.db.collection("profiles").document(user_id)
+
     async def get_user_settings(self, user_id: str) -> Dict[str, Any]:
         """
-        Fetch user settings from Firestore profile.
-        
+        Fetch user settings from the profile cache, falling back to Firestore.
+
         Args:
             user_id: User ID
-            
+
         Returns:
             Dict containing user settings (llm_model, etc.)
         """
-        import asyncio
+        cached = await self.profile_cache.get(user_id)
+        if cached is not None:
+            return cached
+
         try:
-            doc_ref = self.db.collection("profiles").document(user_id)
-            # Run blocking I/O in threadpool
-            doc = await asyncio.to_thread(doc_ref.get)
-            
-            if doc.exists:
-                data = doc.to_dict()
-                print(f"[UserService] Fetched settings for {user_id}: {data}")
-                return data
-            print(f"[UserService] No profile found for {user_id}")
-            return {}
+            # Deduplicated per request; runs blocking I/O in threadpool
+            doc = await load_document(self.profile_ref(user_id))
+            data = doc.to_dict() if doc.exists else {}
+            if not doc.exists:
+                logger.debug(f"[UserService] No profile found for {user_id}")
         except Exception as e:
             print(f"[UserService] Error fetching user settings: {e}")
             return {}
 
+        await self.profile_cache.set(user_id, data)
+        return data
+
+    async def update_user_settings(self, user_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Merge `updates` into the user's profile and invalidate cached copies.
+
+        Returns:
+            The updated settings
+        """
+        profile_ref = self.profile_ref(user_id)
+        await asyncio.to_thread(profile_ref.set, updates, merge=True)
+        forget_document(profile_ref)
+        await self.profile_cache.invalidate(user_id)
+        return await self.get_user_settings(user_id)
+
     async def get_preferred_model(self, user_id: str) -> str:
         """
         Get user's preferred LLM model, falling back to default.
         """
         settings = await self.get_user_settings(user_id)
-        model = settings.get("llm_model") or self.settings.llm_model
-        print(f"[UserService] Preferred model for {user_id}: {model}")
-        return model
+        return settings.get("llm_model") or self.settings.llm_model
@@ -1,6 +1,5 @@
 """Vector database service for embeddings storage and retrieval"""
 from typing import List, Dict, Any, Optional
-from pinecone import Pinecone, ServerlessSpec
 from app.config import get_settings
 
 
@@ -20,6 +19,9 @@ class VectorService:
         self.settings = get_settings()
         
         if self.settings.vector_db_provider == "pinecone":
+            # Lazy: keep the Pinecone SDK out of app startup
+            from pinecone import Pinecone, ServerlessSpec
+
             self.pc = Pinecone(api_key=self.settings.pinecone_api_key)
             
             # Ensure index exists (only create if needed)
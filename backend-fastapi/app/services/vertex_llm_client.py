@@ -8,6 +8,9 @@ class VertexLLMClient:
     
     def __init__(self):
         self.settings = get_settings()
+        # Project and location for the SDK; a no-op once the warm-up has run
+        from app.core.vertex import init_vertex_ai
+        init_vertex_ai()
         # Import here to avoid dependency if not using Vertex AI
         from vertexai.generative_models import GenerativeModel
         from vertexai.language_models import TextEmbeddingModel
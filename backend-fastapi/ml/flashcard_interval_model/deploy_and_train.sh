@@ -1,5 +1,6 @@
 #!/bin/bash
 set -e
+cd "$(dirname "$0")"
 
 # Configuration
 PROJECT_ID="learningaier-lab"
@@ -14,6 +15,10 @@ MODEL_OUTPUT_DIR="gs://${PROJECT_ID}-ml-models/flashcard-model"
 # gsutil mb -p ${PROJECT_ID} -l ${REGION} gs://${PROJECT_ID}-ml-models || true
 
 echo "🔨 Building Docker image..."
+# Features are built by the API's module, so training matches serving; the
+# compiled model is what model selection times
+cp ../../app/services/interval_features.py ../../app/services/compiled_model.py .
+trap 'rm -f interval_features.py compiled_model.py' EXIT
 gcloud builds submit --tag ${IMAGE_URI} . --project ${PROJECT_ID}
 
 echo "🚀 Submitting Custom Job..."
@@ -0,0 +1,283 @@
+"""
+Latency-aware model selection for the flashcard interval model.
+
+Training used to keep a fixed 100-tree forest, whatever it cost per
+prediction. The training entry points now sweep a small hyperparameter grid
+instead:
+
+  - candidates are fitted in a process pool (`workers`), each fit using
+    `fit_jobs` cores
+  - every candidate is scored on the held-out split and measured: pickled
+    artifact size and single-row / batch predict latency (p50, p99), both of
+    the compiled forest the API serves (`compile_model`) and of the raw
+    estimator. Timings run one candidate at a time after the sweep, so they
+    are not skewed by concurrent fits
+  - `select_model` keeps the candidates whose compiled latency is within the
+    budget and picks the fastest one whose accuracy is within
+    `accuracy_tolerance` of the best
+  - `write_report` saves the comparison (JSON and Markdown) next to the model
+
+Usage from a training script:
+
+    results = sweep(default_grid(), X_train, y_train, X_test, y_test, workers=4)
+    best = select_model(results, latency_budget_ms=2.0)
+    write_report(results, best, output_dir)
+    joblib.dump(best.model, "model.joblib")
+"""
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+import joblib
+import numpy as np
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.metrics import accuracy_score
+
+try:
+    from app.services.compiled_model import compile_model
+except ImportError:
+    # Trainer image: deploy_and_train.sh ships a copy next to this module
+    from compiled_model import compile_model
+
+ESTIMATORS = {
+    "random_forest": RandomForestClassifier,
+    "extra_trees": ExtraTreesClassifier,
+}
+
+DEFAULT_LATENCY_BUDGET_MS = 2.0  # Single-row p99, the review path
+DEFAULT_BATCH_SIZE = 64  # Matches ml_batch_max_size in the API
+DEFAULT_ACCURACY_TOLERANCE = 0.005
+REPORT_NAME = "model_selection"
+
+
+@dataclass
+class Candidate:
+    """One point of the hyperparameter grid."""
+    kind: str  # Key of ESTIMATORS, or "xgboost"
+    params: Dict[str, Any]
+
+    @property
+    def name(self) -> str:
+        return self.kind + "(" + ", ".join(f"{key}={value}" for key, value in sorted(self.params.items())) + ")"
+
+    def build(self, fit_jobs: int) -> Any:
+        if self.kind == "xgboost":
+            from xgboost import XGBClassifier
+            return XGBClassifier(**self.params, n_jobs=fit_jobs, random_state=42)
+        return ESTIMATORS[self.kind](**self.params, n_jobs=fit_jobs, random_state=42)
+
+
+@dataclass
+class CandidateResult:
+    """Accuracy, size and latency of one fitted candidate (compiled, as served; raw_*: estimator)."""
+    name: str
+    kind: str
+    params: Dict[str, Any]
+    accuracy: float
+    fit_seconds: float
+    artifact_bytes: int = 0
+    compiled_bytes: int = 0
+    single_p50_ms: float = 0.0
+    single_p99_ms: float = 0.0
+    batch_p50_ms: float = 0.0
+    batch_p99_ms: float = 0.0
+    raw_single_p50_ms: float = 0.0
+    raw_single_p99_ms: float = 0.0
+    raw_batch_p50_ms: float = 0.0
+    raw_batch_p99_ms: float = 0.0
+    within_budget: bool = False
+    model: Any = field(default=None, repr=False)
+
+    def summary(self) -> Dict[str, Any]:
+        return {key: value for key, value in asdict(self).items() if key != "model"}
+
+
+def default_grid(include_xgboost: bool = False) -> List[Candidate]:
+    """
+    Forests from a few trees to the previous 100-tree default.
+
+    XGBoost candidates need labels 0..n_classes-1 (LabelEncoder-ed targets).
+    """
+    grid = [
+        Candidate(kind, {"n_estimators": trees, "max_depth": depth, "min_samples_leaf": 5})
+        for kind in ("random_forest", "extra_trees")
+        for trees in (10, 30, 100)
+        for depth in (6, 10, 12)
+    ]
+    if include_xgboost:
+        grid += [
+            Candidate("xgboost", {"n_estimators": trees, "max_depth": depth, "learning_rate": 0.1})
+            for trees in (20, 50, 100)
+            for depth in (3, 5)
+        ]
+    return grid
+
+
+def _fit(candidate: Candidate, fit_jobs: int, X_train, y_train, X_test, y_test) -> CandidateResult:
+    model = candidate.build(fit_jobs)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    # Serving predicts a handful of rows at a time; thread dispatch would dominate
+    model.set_params(n_jobs=1)
+    return CandidateResult(
+        name=candidate.name,
+        kind=candidate.kind,
+        params=candidate.params,
+        accuracy=float(accuracy_score(y_test, model.predict(X_test))),
+        fit_seconds=fit_seconds,
+        model=model,
+    )
+
+
+def _percentiles_ms(predict, X: np.ndarray, repeat: int) -> List[float]:
+    predict(X)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predict(X)
+        timings.append(time.perf_counter() - start)
+    return [float(v) * 1000 for v in np.percentile(timings, [50, 99])]
+
+
+def measure(result: CandidateResult, X: np.ndarray, batch_size: int = DEFAULT_BATCH_SIZE, repeat: int = 200) -> None:
+    """Fill in artifact sizes and predict latency (compiled and raw) for a fitted candidate."""
+    buffer = io.BytesIO()
+    joblib.dump(result.model, buffer)
+    result.artifact_bytes = buffer.tell()
+    compiled = compile_model(result.model)
+    result.compiled_bytes = compiled.nbytes
+    batch = X[np.arange(batch_size) % len(X)]
+    batch_repeat = max(repeat // 4, 10)
+    result.single_p50_ms, result.single_p99_ms = _percentiles_ms(compiled.predict, X[:1], repeat)
+    result.batch_p50_ms, result.batch_p99_ms = _percentiles_ms(compiled.predict, batch, batch_repeat)
+    result.raw_single_p50_ms, result.raw_single_p99_ms = _percentiles_ms(result.model.predict, X[:1], repeat)
+    result.raw_batch_p50_ms, result.raw_batch_p99_ms = _percentiles_ms(result.model.predict, batch, batch_repeat)
+
+
+def sweep(
+    candidates: List[Candidate],
+    X_train,
+    y_train,
+    X_test,
+    y_test,
+    workers: int = 1,
+    fit_jobs: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> List[CandidateResult]:
+    """
+    Fit every candidate in a process pool, then measure each one in turn.
+
+    Args:
+        workers: Candidates fitted concurrently (1 fits in this process)
+        fit_jobs: Cores per fit (estimator n_jobs)
+        batch_size: Rows per batch for the batch latency figures
+    """
+    arguments = [(candidate, fit_jobs, X_train, y_train, X_test, y_test) for candidate in candidates]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_fit, *zip(*arguments)))
+    else:
+        results = [_fit(*args) for args in arguments]
+
+    X = np.asarray(X_test, dtype=np.float32)
+    for result in results:
+        measure(result, X, batch_size)
+    return results
+
+
+def select_model(
+    results: List[CandidateResult],
+    latency_budget_ms: float = DEFAULT_LATENCY_BUDGET_MS,
+    batch_budget_ms: Optional[float] = None,
+    accuracy_tolerance: float = DEFAULT_ACCURACY_TOLERANCE,
+) -> CandidateResult:
+    """
+    Fastest candidate within the latency budget whose accuracy is within
+    `accuracy_tolerance` of the best one in budget. Budgets apply to the
+    compiled timings, the path the API serves.
+
+    With nothing in budget, the fastest candidate overall is returned (its
+    `within_budget` stays False, so callers can warn).
+    """
+    for result in results:
+        result.within_budget = result.single_p99_ms <= latency_budget_ms and (
+            batch_budget_ms is None or result.batch_p99_ms <= batch_budget_ms
+        )
+    eligible = [result for result in results if result.within_budget]
+    if not eligible:
+        return min(results, key=lambda result: result.single_p99_ms)
+    best_accuracy = max(result.accuracy for result in eligible)
+    close = [result for result in eligible if result.accuracy >= best_accuracy - accuracy_tolerance]
+    return min(close, key=lambda result: (result.single_p99_ms, -result.accuracy))
+
+
+def write_report(results: List[CandidateResult], chosen: CandidateResult, output_dir: str, **settings) -> str:
+    """Write model_selection.json and .md to `output_dir`. Returns the Markdown table."""
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, f"{REPORT_NAME}.json"), "w") as f:
+        json.dump({
+            "chosen": chosen.name,
+            "settings": settings,
+            "candidates": [result.summary() for result in results],
+        }, f, indent=2)
+
+    lines = [
+        "| candidate | accuracy | size (KB) | compiled (KB) | single p50 / p99 (ms) | batch p50 / p99 (ms) "
+        "| raw single p50 / p99 (ms) | raw batch p50 / p99 (ms) | fit (s) | in budget |",
+        "| :--- | ---: | ---: | ---: | ---: | ---: | ---: | ---: | ---: | :---: |",
+    ]
+    for result in sorted(results, key=lambda result: -result.accuracy):
+        marker = " **(chosen)**" if result is chosen else ""
+        lines.append(
+            f"| {result.name}{marker} | {result.accuracy:.4f} | {result.artifact_bytes / 1024:.0f} "
+            f"| {result.compiled_bytes / 1024:.0f} "
+            f"| {result.single_p50_ms:.2f} / {result.single_p99_ms:.2f} "
+            f"| {result.batch_p50_ms:.2f} / {result.batch_p99_ms:.2f} "
+            f"| {result.raw_single_p50_ms:.2f} / {result.raw_single_p99_ms:.2f} "
+            f"| {result.raw_batch_p50_ms:.2f} / {result.raw_batch_p99_ms:.2f} "
+            f"| {result.fit_seconds:.1f} | {'yes' if result.within_budget else 'no'} |"
+        )
+    table = "\n".join(lines)
+    with open(os.path.join(output_dir, f"{REPORT_NAME}.md"), "w") as f:
+        f.write(f"# Model selection\n\nSettings: {json.dumps(settings)}\n\n{table}\n")
+    return table
+
+
+def add_arguments(parser) -> None:
+    """Sweep options shared by the training entry points."""
+    parser.add_argument("--workers", type=int, default=max((os.cpu_count() or 1) // 2, 1),
+                        help="Candidates fitted in parallel (process pool)")
+    parser.add_argument("--fit-jobs", type=int, default=1, help="Cores per fit (estimator n_jobs)")
+    parser.add_argument("--latency-budget-ms", type=float, default=DEFAULT_LATENCY_BUDGET_MS,
+                        help="Single-row compiled predict p99 budget")
+    parser.add_argument("--batch-budget-ms", type=float, default=None, help="Batch compiled predict p99 budget (optional)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per batch when timing")
+    parser.add_argument("--accuracy-tolerance", type=float, default=DEFAULT_ACCURACY_TOLERANCE,
+                        help="Accuracy a faster model may give up")
+
+
+def run(X_train, y_train, X_test, y_test, args, output_dir: str, include_xgboost: bool = False) -> CandidateResult:
+    """Sweep, select and report with the options from `add_arguments`."""
+    candidates = default_grid(include_xgboost)
+    print(f"⏳ Sweeping {len(candidates)} candidates ({args.workers} workers x {args.fit_jobs} jobs)...")
+    results = sweep(
+        candidates, X_train, y_train, X_test, y_test,
+        workers=args.workers, fit_jobs=args.fit_jobs, batch_size=args.batch_size,
+    )
+    chosen = select_model(results, args.latency_budget_ms, args.batch_budget_ms, args.accuracy_tolerance)
+    print(write_report(
+        results, chosen, output_dir,
+        latency_budget_ms=args.latency_budget_ms,
+        batch_budget_ms=args.batch_budget_ms,
+        batch_size=args.batch_size,
+        accuracy_tolerance=args.accuracy_tolerance,
+    ))
+    if not chosen.within_budget:
+        print(f"⚠ No candidate meets the latency budget; keeping the fastest: {chosen.name}")
+    else:
+        print(f"✅ Chosen: {chosen.name} (accuracy {chosen.accuracy:.4f}, compiled single p99 {chosen.single_p99_ms:.2f} ms)")
+    return chosen
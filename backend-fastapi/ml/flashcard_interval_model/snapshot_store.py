@@ -0,0 +1,146 @@
+"""
+Local Parquet snapshot of flashcard_training_view.
+
+Retraining used to re-read the whole view from BigQuery. The snapshot keeps
+every exported review on disk and only pulls the rows reviewed after its
+watermark (the newest `reviewed_at` it holds):
+
+    <root>/part-000000.parquet, part-000001.parquet, ...  one per sync
+    <root>/_watermark.json                                 {"watermark", "rows", "parts"}
+
+Reviews can reach BigQuery after newer ones (batch reviews carry their own
+`reviewed_at`, exports run periodically), so each sync re-reads a lookback
+window before the watermark; duplicates are dropped by `review_id` on read
+(the latest copy wins). `compact` folds the parts into one file.
+
+Requires pyarrow (and google-cloud-bigquery for `sync`).
+"""
+import json
+import os
+import shutil
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DEFAULT_SNAPSHOT_DIR = os.path.join(BACKEND_ROOT, "ml_data", "flashcard_training_view")
+WATERMARK_FILE = "_watermark.json"
+DEFAULT_LOOKBACK = timedelta(days=2)
+DEFAULT_COMPACT_PARTS = 30  # Trainers compact past this many parts (about a month of daily syncs)
+
+# View columns kept in the snapshot (see scripts/create_training_view.sql)
+COLUMNS = [
+    "review_id", "user_id", "flashcard_id", "category", "word_count", "rating",
+    "review_sequence_number", "reviewed_at", "prev_reviewed_at", "scheduled_interval",
+]
+
+
+class SnapshotStore:
+    """Append-only Parquet copy of the training view, synced by watermark."""
+
+    def __init__(self, root: str = DEFAULT_SNAPSHOT_DIR):
+        self.root = root
+
+    def _state(self) -> Dict[str, Any]:
+        path = os.path.join(self.root, WATERMARK_FILE)
+        if not os.path.exists(path):
+            return {"watermark": None, "rows": 0, "parts": 0}
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_state(self, state: Dict[str, Any]) -> None:
+        path = os.path.join(self.root, WATERMARK_FILE)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(f"{path}.tmp", path)
+
+    def _parts(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            os.path.join(self.root, name) for name in os.listdir(self.root)
+            if name.startswith("part-") and name.endswith(".parquet")
+        )
+
+    def part_count(self) -> int:
+        """Parquet parts on disk (one per sync until `compact`)."""
+        return len(self._parts())
+
+    def watermark(self) -> Optional[datetime]:
+        """Newest `reviewed_at` in the snapshot, or None if it is empty."""
+        value = self._state()["watermark"]
+        return datetime.fromisoformat(value) if value else None
+
+    def append(self, table: pa.Table) -> int:
+        """Write `table` as a new part and advance the watermark. Returns rows written."""
+        if table.num_rows == 0:
+            return 0
+        os.makedirs(self.root, exist_ok=True)
+        state = self._state()
+        path = os.path.join(self.root, f"part-{state['parts']:06d}.parquet")
+        pq.write_table(table.select(COLUMNS), f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+
+        newest = pc.max(table["reviewed_at"]).as_py()
+        watermark = self.watermark()
+        state.update(
+            watermark=max(newest, watermark).isoformat() if watermark else newest.isoformat(),
+            rows=state["rows"] + table.num_rows,
+            parts=state["parts"] + 1,
+        )
+        self._write_state(state)
+        return table.num_rows
+
+    def sync(self, client: Any, view_ref: str, lookback: timedelta = DEFAULT_LOOKBACK) -> int:
+        """
+        Pull reviews newer than the watermark (minus `lookback`) from BigQuery.
+
+        Args:
+            client: google.cloud.bigquery.Client
+            view_ref: `project.dataset.flashcard_training_view`
+
+        Returns:
+            Rows appended (including re-read duplicates)
+        """
+        from google.cloud import bigquery
+
+        query = f"SELECT {', '.join(COLUMNS)} FROM `{view_ref}`"
+        parameters = []
+        watermark = self.watermark()
+        if watermark is not None:
+            query += " WHERE reviewed_at > @since"
+            parameters.append(bigquery.ScalarQueryParameter("since", "TIMESTAMP", watermark - lookback))
+        job = client.query(query, job_config=bigquery.QueryJobConfig(query_parameters=parameters))
+        return self.append(job.to_arrow())
+
+    def read(self) -> List[Dict[str, Any]]:
+        """All snapshot rows as dicts, one per review_id."""
+        parts = self._parts()
+        if not parts:
+            return []
+        rows: Dict[str, Dict[str, Any]] = {}
+        for row in pa.concat_tables([pq.read_table(path) for path in parts]).to_pylist():
+            rows[row["review_id"]] = row
+        return list(rows.values())
+
+    def compact(self) -> int:
+        """Rewrite all parts as one deduplicated part. Returns rows kept."""
+        rows = self.read()
+        if not rows:
+            return 0
+        staging = f"{self.root}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        compacted = SnapshotStore(staging)
+        compacted.append(pa.Table.from_pylist(rows, schema=pq.read_schema(self._parts()[0])))
+        previous = f"{self.root}.old"
+        shutil.rmtree(previous, ignore_errors=True)
+        os.replace(self.root, previous)
+        os.replace(staging, self.root)
+        shutil.rmtree(previous, ignore_errors=True)
+        return len(rows)
+
+    def clear(self) -> None:
+        """Delete the snapshot (the next sync re-reads the whole view)."""
+        shutil.rmtree(self.root, ignore_errors=True)
@@ -1,15 +1,22 @@
 
 import os
+import sys
 import argparse
 import logging
 import joblib
-import pandas as pd
+import numpy as np
 from google.cloud import bigquery
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report
 
+# Backend root, for the shared feature module (the trainer image ships a copy)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+try:
+    from app.services.interval_features import FEATURE_COLUMNS, feature_row, training_examples
+except ImportError:
+    from interval_features import FEATURE_COLUMNS, feature_row, training_examples
+import model_selection
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,59 +28,27 @@ def get_data(project_id, dataset_id, view_name):
     SELECT * FROM `{project_id}.{dataset_id}.{view_name}`
     """
     logger.info(f"Fetching data from {project_id}.{dataset_id}.{view_name}...")
-    df = client.query(query).to_dataframe()
-    logger.info(f"Data fetched successfully. Shape: {df.shape}")
-    return df
+    rows = [dict(row) for row in client.query(query).result()]
+    logger.info(f"Data fetched successfully. Rows: {len(rows)}")
+    return rows
 
-def preprocess_data(df):
-    """Preprocess features and target."""
-    # Drop rows with missing values
-    df = df.dropna()
-    
-    # Features to use
-    feature_cols = [
-        'category', 
-        'word_count', 
-        'rating', 
-        'review_sequence_number', 
-        'days_since_last_review', 
-        'user_avg_rating'
-    ]
-    
-    # Target
-    target_col = 'label_next_interval_bucket'
-    
-    X = df[feature_cols].copy()
-    y = df[target_col].copy()
-    
-    # Encode categorical features
-    le_category = LabelEncoder()
-    X['category'] = le_category.fit_transform(X['category'].astype(str))
-    
-    # Encode target
-    le_target = LabelEncoder()
-    y = le_target.fit_transform(y)
-    
-    logger.info(f"Target classes: {le_target.classes_}")
-    
-    return X, y, le_category, le_target
+def preprocess_data(rows):
+    """Model inputs (FEATURE_COLUMNS) and bucket labels, built as the API builds them."""
+    features, labels = training_examples(rows)
+    X = np.array([feature_row(f) for f in features], dtype=np.float32).reshape(-1, len(FEATURE_COLUMNS))
+    y = np.array(labels, dtype=np.int64)
+    logger.info(f"Target classes: {np.unique(y)}")
+    return X, y
 
-def train_model(X, y):
-    """Train RandomForest classifier."""
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    
-    # Use RandomForestClassifier for sklearn serving container compatibility
-    model = RandomForestClassifier(
-        n_estimators=100,
-        max_depth=10,
-        min_samples_split=5,
-        min_samples_leaf=2,
-        random_state=42,
-        n_jobs=-1  # Use all CPU cores
-    )
+def train_model(X, y, args):
+    """Sweep RandomForest/ExtraTrees candidates; keep the best within the latency budget."""
+    # Split by time: evaluate on the most recent 20% of reviews
+    split = int(len(X) * 0.8)
+    X_train, X_test, y_train, y_test = X[:split], X[split:], y[:split], y[split:]
     
-    logger.info("Training RandomForest model...")
-    model.fit(X_train, y_train)
+    # scikit-learn forests only, for sklearn serving container compatibility
+    logger.info("Training candidate models...")
+    model = model_selection.run(X_train, y_train, X_test, y_test, args, args.output_dir).model
     
     # Evaluate
     y_pred = model.predict(X_test)
@@ -83,13 +58,11 @@ def train_model(X, y):
     
     return model
 
-def save_artifacts(model, le_category, le_target, output_dir):
-    """Save model and encoders."""
+def save_artifacts(model, output_dir):
+    """Save the model (it predicts interval buckets directly, no encoders)."""
     os.makedirs(output_dir, exist_ok=True)
     
     joblib.dump(model, os.path.join(output_dir, 'model.joblib'))
-    joblib.dump(le_category, os.path.join(output_dir, 'le_category.joblib'))
-    joblib.dump(le_target, os.path.join(output_dir, 'le_target.joblib'))
     
     logger.info(f"Artifacts saved to {output_dir}")
 
@@ -99,18 +72,19 @@ def main():
     parser.add_argument('--dataset-id', type=str, default='learningaier_analytics', help='BigQuery Dataset ID')
     parser.add_argument('--view-name', type=str, default='flashcard_training_view', help='BigQuery View Name')
     parser.add_argument('--output-dir', type=str, default='model_artifacts', help='Directory to save model artifacts')
+    model_selection.add_arguments(parser)
     args = parser.parse_args()
     
     try:
-        df = get_data(args.project_id, args.dataset_id, args.view_name)
+        rows = get_data(args.project_id, args.dataset_id, args.view_name)
         
-        if len(df) < 10:
+        if len(rows) < 10:
             logger.warning("Not enough data to train. Need at least 10 rows.")
             return
 
-        X, y, le_category, le_target = preprocess_data(df)
-        model = train_model(X, y)
-        save_artifacts(model, le_category, le_target, args.output_dir)
+        X, y = preprocess_data(rows)
+        model = train_model(X, y, args)
+        save_artifacts(model, args.output_dir)
         
     except Exception as e:
         logger.error(f"Training failed: {e}")
@@ -1,13 +1,20 @@
 import os
+import sys
 import argparse
 import joblib
-import pandas as pd
+import numpy as np
 from google.cloud import bigquery
 from google.cloud import storage
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report, accuracy_score
+from sklearn.metrics import accuracy_score
+
+# Backend root, for the shared feature module (the trainer image ships a copy)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+try:
+    from app.services.interval_features import FEATURE_COLUMNS, feature_row, training_examples
+except ImportError:
+    from interval_features import FEATURE_COLUMNS, feature_row, training_examples
+import model_selection
 
 def load_data(project_id, dataset_id, view_name):
     """Load data from BigQuery view."""
@@ -16,50 +23,20 @@ def load_data(project_id, dataset_id, view_name):
     SELECT * FROM `{project_id}.{dataset_id}.{view_name}`
     """
     print(f"⏳ Loading data from BigQuery: {project_id}.{dataset_id}.{view_name}...")
-    df = client.query(query).to_dataframe()
-    print(f"✅ Loaded {len(df)} rows.")
-    return df
+    rows = [dict(row) for row in client.query(query).result()]
+    print(f"✅ Loaded {len(rows)} rows.")
+    return rows
 
-def preprocess_data(df):
-    """Preprocess features and split data."""
-    # Use exact column names from BigQuery view
-    feature_cols = [
-        'category',               # matches BigQuery
-        'word_count',            # matches BigQuery  
-        'rating',                # matches BigQuery
-        'review_sequence_number', # matches BigQuery
-        'days_since_last_review', # matches BigQuery
-        'user_avg_rating'        # matches BigQuery
-    ]
-    target_col = 'label_next_interval_bucket'
-    
-    X = df[feature_cols].copy()
-    y = df[target_col].copy()
-    
-    # Encode categorical features (category column)
-    from sklearn.preprocessing import LabelEncoder
-    le_category = LabelEncoder()
-    X['category'] = le_category.fit_transform(X['category'].astype(str))
-    
-    # Encode target
-    le_target = LabelEncoder()
-    y = le_target.fit_transform(y)
-    
-    return X, y, le_category, le_target
+def preprocess_data(rows):
+    """Model inputs (FEATURE_COLUMNS) and bucket labels, built as the API builds them."""
+    features, labels = training_examples(rows)
+    X = np.array([feature_row(f) for f in features], dtype=np.float32).reshape(-1, len(FEATURE_COLUMNS))
+    return X, np.array(labels, dtype=np.int64)
 
-def train_model(X_train, y_train):
-    """Train RandomForest model."""
-    model = RandomForestClassifier(
-        n_estimators=100,
-        max_depth=10,
-        min_samples_split=5,
-        min_samples_leaf=2,
-        random_state=42,
-        n_jobs=-1
-    )
-    
-    print("⏳ Training model...")
-    model.fit(X_train, y_train)
+def train_model(X_train, y_train, X_test, y_test, args):
+    """Sweep forest candidates; keep the best within the latency budget."""
+    print("⏳ Training candidate models...")
+    model = model_selection.run(X_train, y_train, X_test, y_test, args, ".").model
     print("✅ Model trained.")
     return model
 
@@ -87,48 +64,46 @@ def main():
     parser.add_argument("--dataset-id", default="learningaier_analytics", help="BigQuery Dataset ID")
     parser.add_argument("--view-name", default="flashcard_training_view", help="BigQuery View Name")
     parser.add_argument("--model-dir", required=True, help="GCS path to save model artifact (e.g., gs://bucket/model/)")
+    model_selection.add_arguments(parser)
     
     args = parser.parse_args()
     
     # 1. Load Data
     try:
-        df = load_data(args.project_id, args.dataset_id, args.view_name)
+        rows = load_data(args.project_id, args.dataset_id, args.view_name)
     except Exception as e:
         print(f"❌ Error loading data: {e}")
         return
 
-    if len(df) < 10:
+    if len(rows) < 10:
         print("⚠ Not enough data to train (need at least 10 rows).")
         return
 
-    # 2. Preprocess
-    X, y, le_category, le_target = preprocess_data(df)
+    # 2. Features (shared with serving)
+    X, y = preprocess_data(rows)
     
-    # 3. Split
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    # 3. Split by time: evaluate on the most recent 20% of reviews
+    split = int(len(X) * 0.8)
+    X_train, X_test, y_train, y_test = X[:split], X[split:], y[:split], y[split:]
     
     # 4. Train
-    model = train_model(X_train, y_train)
+    model = train_model(X_train, y_train, X_test, y_test, args)
     
     # 5. Evaluate
     y_pred = model.predict(X_test)
     print(f"Accuracy: {accuracy_score(y_test, y_pred):.4f}")
     
-    # 6. Save model and encoders
+    # 6. Save the model (it predicts interval buckets directly, no encoders)
     local_model_path = "model.joblib"
     joblib.dump(model, local_model_path)
     
-    # Also save the label encoders for prediction time
-    joblib.dump(le_category, "le_category.joblib")
-    joblib.dump(le_target, "le_target.joblib")
-    
-    # Upload all artifacts to GCS
+    # Upload to GCS
     gcs_model_path = os.path.join(args.model_dir, "model.joblib")
     upload_to_gcs(local_model_path, gcs_model_path)
-    
-    # Upload encoders too
-    upload_to_gcs("le_category.joblib", os.path.join(args.model_dir, "le_category.joblib"))
-    upload_to_gcs("le_target.joblib", os.path.join(args.model_dir, "le_target.joblib"))
+
+    # And the candidate comparison
+    for report in (f"{model_selection.REPORT_NAME}.json", f"{model_selection.REPORT_NAME}.md"):
+        upload_to_gcs(report, os.path.join(args.model_dir, report))
 
 if __name__ == "__main__":
     main()
@@ -1,120 +1,134 @@
+"""
+Train the flashcard interval model locally.
+
+Training rows come from a local Parquet snapshot of flashcard_training_view
+(snapshot_store.py): each run pulls only the reviews newer than the snapshot's
+watermark from BigQuery, then trains on the whole snapshot. Features and
+labels are built by app.services.interval_features, the module the API uses
+at review time, so training and serving see the same columns and encodings.
+The model is chosen by a latency-aware sweep (model_selection.py); the
+comparison is written next to model.joblib.
+
+Usage:
+    python ml/flashcard_interval_model/train_local.py
+    python ml/flashcard_interval_model/train_local.py --offline  # Snapshot only, no BigQuery
+    python ml/flashcard_interval_model/train_local.py --full-refresh
+    python ml/flashcard_interval_model/train_local.py --latency-budget-ms 1 --workers 4
+"""
 import os
+import sys
 import argparse
+import time
+from datetime import timedelta
 import joblib
-import pandas as pd
 import numpy as np
-from google.cloud import bigquery
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 
-def load_data(project_id, dataset_id, view_name="flashcard_training_view"):
-    """Load data from BigQuery view."""
-    client = bigquery.Client(project=project_id)
-    query = f"""
-    SELECT * FROM `{project_id}.{dataset_id}.{view_name}`
-    """
-    print(f"⏳ Loading data from BigQuery: {project_id}.{dataset_id}.{view_name}...")
-    df = client.query(query).to_dataframe()
-    print(f"✅ Loaded {len(df)} rows.")
-    return df
-
-def preprocess_data(df):
-    """Preprocess features and split data."""
-    # Features and Target
-    feature_cols = ['card_category', 'note_length', 'response', 'current_interval', 'user_review_count_7d']
-    target_col = 'label_next_interval_bucket'
-    
-    X = df[feature_cols]
-    y = df[target_col]
-    
-    # Define preprocessing for numeric and categorical columns
-    numeric_features = ['note_length', 'response', 'current_interval', 'user_review_count_7d']
-    categorical_features = ['card_category']
-    
-    preprocessor = ColumnTransformer(
-        transformers=[
-            ('num', StandardScaler(), numeric_features),
-            ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_features)
-        ])
-    
-    return X, y, preprocessor
-
-def train_model(X_train, y_train, preprocessor):
-    """Train the model pipeline."""
-    # Using XGBoost Classifier
-    # Note: Classes are 1, 2, 3, 4. XGBoost expects 0-indexed classes usually, 
-    # but sklearn wrapper handles it or we might need to map.
-    # Let's use RandomForest for simplicity and robustness first, or XGBClassifier with label encoder.
-    
-    # Using RandomForest for simplicity in this phase
-    clf = Pipeline(steps=[
-        ('preprocessor', preprocessor),
-        ('classifier', RandomForestClassifier(n_estimators=100, random_state=42))
-    ])
-    
-    print("⏳ Training model...")
-    clf.fit(X_train, y_train)
-    print("✅ Model trained.")
-    return clf
+# Backend root, for the shared feature module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.services.interval_features import FEATURE_COLUMNS, feature_row, training_examples
+import model_selection
+from snapshot_store import DEFAULT_COMPACT_PARTS, DEFAULT_SNAPSHOT_DIR, SnapshotStore
+
+
+def load_data(args):
+    """Sync the snapshot (unless offline) and return its rows."""
+    store = SnapshotStore(args.snapshot_dir)
+    if args.full_refresh:
+        store.clear()
+    if not args.offline:
+        from google.cloud import bigquery
+        view_ref = f"{args.project_id}.{args.dataset_id}.flashcard_training_view"
+        print(f"⏳ Syncing {view_ref} since {store.watermark() or 'the beginning'}...")
+        start = time.perf_counter()
+        appended = store.sync(
+            bigquery.Client(project=args.project_id), view_ref, lookback=timedelta(hours=args.lookback_hours)
+        )
+        print(f"✅ Pulled {appended} rows in {time.perf_counter() - start:.1f}s.")
+    if store.part_count() > args.compact_parts:
+        start = time.perf_counter()
+        kept = store.compact()
+        print(f"✅ Compacted the snapshot to {kept} rows in {time.perf_counter() - start:.1f}s.")
+    start = time.perf_counter()
+    rows = store.read()
+    print(f"✅ Read {len(rows)} reviews from {args.snapshot_dir} in {time.perf_counter() - start:.1f}s.")
+    return rows
+
+
+def build_matrix(rows):
+    """Model inputs (FEATURE_COLUMNS) and bucket labels, in review order."""
+    features, labels = training_examples(rows)
+    X = np.array([feature_row(f) for f in features], dtype=np.float32).reshape(-1, len(FEATURE_COLUMNS))
+    return X, np.array(labels, dtype=np.int64)
+
 
 def evaluate_model(clf, X_test, y_test):
     """Evaluate the model."""
     print("\n📊 Evaluation Metrics:")
     y_pred = clf.predict(X_test)
-    
+
     print(f"Accuracy: {accuracy_score(y_test, y_pred):.4f}")
     print("\nClassification Report:")
     print(classification_report(y_test, y_pred))
-    
+
     print("\nConfusion Matrix:")
     print(confusion_matrix(y_test, y_pred))
 
+
 def save_model(clf, output_path):
     """Save the trained model."""
     joblib.dump(clf, output_path)
     print(f"\n💾 Model saved to {output_path}")
 
+
 def main():
     parser = argparse.ArgumentParser(description="Train Flashcard Interval Model Locally")
     parser.add_argument("--project-id", default="learningaier-lab", help="GCP Project ID")
     parser.add_argument("--dataset-id", default="learningaier_analytics", help="BigQuery Dataset ID")
+    parser.add_argument("--snapshot-dir", default=DEFAULT_SNAPSHOT_DIR, help="Parquet snapshot of the training view")
+    parser.add_argument("--lookback-hours", type=float, default=48, help="Re-read window for late-arriving reviews")
+    parser.add_argument("--offline", action="store_true", help="Train on the snapshot without syncing")
+    parser.add_argument("--full-refresh", action="store_true", help="Rebuild the snapshot from the whole view")
+    parser.add_argument("--compact-parts", type=int, default=DEFAULT_COMPACT_PARTS,
+                        help="Fold the snapshot into one part once it has more parts than this")
     parser.add_argument("--output-dir", default=".", help="Output directory for model artifact")
-    
+    model_selection.add_arguments(parser)
+
     args = parser.parse_args()
-    
+
     # 1. Load Data
     try:
-        df = load_data(args.project_id, args.dataset_id)
+        rows = load_data(args)
     except Exception as e:
         print(f"❌ Error loading data: {e}")
         return
 
-    if len(df) < 10:
+    if len(rows) < 10:
         print("⚠ Not enough data to train (need at least 10 rows).")
         return
 
-    # 2. Preprocess
-    X, y, preprocessor = preprocess_data(df)
-    
-    # 3. Split
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    # 2. Features (shared with serving)
+    X, y = build_matrix(rows)
+
+    # 3. Split by time: evaluate on the most recent 20% of reviews
+    split = int(len(X) * 0.8)
+    X_train, X_test, y_train, y_test = X[:split], X[split:], y[:split], y[split:]
     print(f"Training set: {len(X_train)} samples")
     print(f"Test set: {len(X_test)} samples")
-    
-    # 4. Train
-    clf = train_model(X_train, y_train, preprocessor)
-    
+
+    # 4. Train candidates, keep the best within the latency budget
+    clf = model_selection.run(X_train, y_train, X_test, y_test, args, args.output_dir).model
+
     # 5. Evaluate
     evaluate_model(clf, X_test, y_test)
-    
+
     # 6. Save
     os.makedirs(args.output_dir, exist_ok=True)
     model_path = os.path.join(args.output_dir, "model.joblib")
     save_model(clf, model_path)
+    print("Next: copy it to local_model_artifacts/, then run scripts/compile_model.py "
+          "and scripts/build_prediction_table.py")
 
 if __name__ == "__main__":
     main()
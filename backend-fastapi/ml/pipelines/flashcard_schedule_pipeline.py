@@ -5,33 +5,31 @@ from kfp import compiler
 from google_cloud_pipeline_components.v1.endpoint import EndpointCreateOp, ModelDeployOp
 from google_cloud_pipeline_components.v1.model import ModelUploadOp
 
-@dsl.component(
-    base_image="python:3.9",
-    packages_to_install=[
-        "google-cloud-bigquery>=3.11.0",
-        "pandas>=2.0.0",
-        "scikit-learn>=1.3.0",
-        "xgboost==1.7.6",
-        "db-dtypes>=1.2.0",
-        "joblib>=1.3.0"
-    ]
-)
+# Built by ml/flashcard_interval_model/deploy_and_train.sh; ships interval_features.py,
+# compiled_model.py and model_selection.py, so the component trains exactly like train_cloud.py
+TRAINER_IMAGE = "gcr.io/learningaier-lab/flashcard-trainer:latest"
+
+@dsl.component(base_image=TRAINER_IMAGE)
 def train_flashcard_model(
     project_id: str,
     dataset_id: str,
     view_name: str,
     model_artifact: dsl.Output[dsl.Model],
-    metrics: dsl.Output[dsl.Metrics]
+    metrics: dsl.Output[dsl.Metrics],
+    selection_report: dsl.Output[dsl.Markdown],
+    latency_budget_ms: float = 2.0,
+    accuracy_tolerance: float = 0.005,
+    sweep_workers: int = 2
 ) -> NamedTuple("Outputs", [("accuracy", float)]):
     import logging
     import os
+    import shutil
+    import tempfile
     import joblib
-    import pandas as pd
+    import numpy as np
     from google.cloud import bigquery
-    from sklearn.model_selection import train_test_split
-    from sklearn.preprocessing import LabelEncoder
-    from xgboost import XGBClassifier
-    from sklearn.metrics import accuracy_score, classification_report
+    from interval_features import FEATURE_COLUMNS, feature_row, training_examples
+    import model_selection
 
     # Configure logging
     logging.basicConfig(level=logging.INFO)
@@ -40,66 +38,49 @@ def train_flashcard_model(
     logger.info(f"Fetching data from {project_id}.{dataset_id}.{view_name}...")
     client = bigquery.Client(project=project_id)
     query = f"SELECT * FROM `{project_id}.{dataset_id}.{view_name}`"
-    df = client.query(query).to_dataframe()
-    logger.info(f"Data fetched successfully. Shape: {df.shape}")
+    rows = [dict(row) for row in client.query(query).result()]
+    logger.info(f"Data fetched successfully. Rows: {len(rows)}")
     
-    if len(df) < 10:
+    if len(rows) < 10:
         raise ValueError("Not enough data to train. Need at least 10 rows.")
 
-    # Preprocess
-    df = df.dropna()
-    feature_cols = [
-        'category', 
-        'word_count', 
-        'rating', 
-        'review_sequence_number', 
-        'days_since_last_review', 
-        'user_avg_rating'
-    ]
-    target_col = 'label_next_interval_bucket'
-    
-    X = df[feature_cols].copy()
-    y = df[target_col].copy()
-    
-    # Encode categorical features
-    le_category = LabelEncoder()
-    X['category'] = le_category.fit_transform(X['category'].astype(str))
-    
-    # Encode target
-    le_target = LabelEncoder()
-    y = le_target.fit_transform(y)
-    
-    # Train
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    
-    model = XGBClassifier(
-        n_estimators=100,
-        learning_rate=0.1,
-        max_depth=5,
-        random_state=42,
-        use_label_encoder=False,
-        eval_metric='mlogloss'
+    # Features and bucket labels, built as the API builds them
+    features, labels = training_examples(rows)
+    X = np.array([feature_row(f) for f in features], dtype=np.float32).reshape(-1, len(FEATURE_COLUMNS))
+    y = np.array(labels, dtype=np.int64)
+    
+    # Split by time: evaluate on the most recent 20% of reviews
+    split = int(len(X) * 0.8)
+    X_train, X_test, y_train, y_test = X[:split], X[split:], y[:split], y[split:]
+    
+    # Latency-aware sweep, shared with the training scripts (model_selection.py)
+    candidates = model_selection.default_grid()
+    logger.info(f"Training {len(candidates)} candidate models...")
+    results = model_selection.sweep(candidates, X_train, y_train, X_test, y_test, workers=sweep_workers)
+    chosen = model_selection.select_model(results, latency_budget_ms, accuracy_tolerance=accuracy_tolerance)
+    if not chosen.within_budget:
+        logger.warning("No candidate meets the latency budget; keeping the fastest")
+    logger.info(f"Chosen: {chosen.name}")
+
+    report_dir = tempfile.mkdtemp()
+    model_selection.write_report(
+        results, chosen, report_dir, latency_budget_ms=latency_budget_ms, accuracy_tolerance=accuracy_tolerance
     )
-    
-    logger.info("Training model...")
-    model.fit(X_train, y_train)
+    shutil.copyfile(os.path.join(report_dir, f"{model_selection.REPORT_NAME}.md"), selection_report.path)
     
     # Evaluate
-    y_pred = model.predict(X_test)
-    accuracy = accuracy_score(y_test, y_pred)
+    accuracy = chosen.accuracy
     logger.info(f"Model Accuracy: {accuracy:.4f}")
     
     # Log metrics
     metrics.log_metric("accuracy", accuracy)
+    metrics.log_metric("single_p99_ms", chosen.single_p99_ms)
+    metrics.log_metric("batch_p99_ms", chosen.batch_p99_ms)
+    metrics.log_metric("model_size_kb", chosen.artifact_bytes / 1024)
     
-    # Save artifacts
+    # Save artifacts (the model predicts interval buckets directly, no encoders)
     os.makedirs(model_artifact.path, exist_ok=True)
-    model.save_model(os.path.join(model_artifact.path, 'model.bst'))
-    joblib.dump(le_category, os.path.join(model_artifact.path, 'le_category.joblib'))
-    joblib.dump(le_target, os.path.join(model_artifact.path, 'le_target.joblib'))
-    
-    # Save encoders as separate files for easy loading in serving
-    # Note: In a real prod scenario, we'd bundle these better or use a custom container
+    joblib.dump(chosen.model, os.path.join(model_artifact.path, 'model.joblib'))
     
     return (accuracy,)
 
@@ -177,13 +158,20 @@ def flashcard_pipeline(
     location: str = "us-central1",
     dataset_id: str = "learningaier_analytics",
     view_name: str = "flashcard_training_view",
-    serving_container_image_uri: str = "us-docker.pkg.dev/vertex-ai/prediction/xgboost-cpu.1-7:latest"
+    # Matches scikit-learn==1.3.2 in the trainer image
+    serving_container_image_uri: str = "us-docker.pkg.dev/vertex-ai/prediction/sklearn-cpu.1-3:latest",
+    latency_budget_ms: float = 2.0,
+    accuracy_tolerance: float = 0.005,
+    sweep_workers: int = 2
 ):
     # Train
     train_task = train_flashcard_model(
         project_id=project_id,
         dataset_id=dataset_id,
-        view_name=view_name
+        view_name=view_name,
+        latency_budget_ms=latency_budget_ms,
+        accuracy_tolerance=accuracy_tolerance,
+        sweep_workers=sweep_workers
     )
     
     # Upload Model (Custom Component)
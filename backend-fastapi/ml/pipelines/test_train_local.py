@@ -1,12 +1,17 @@
 import logging
 import os
+import sys
+from datetime import datetime, timedelta, timezone
 import joblib
-import pandas as pd
+import numpy as np
 from google.cloud import bigquery
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
 from xgboost import XGBClassifier
-from sklearn.metrics import accuracy_score, classification_report
+from sklearn.metrics import accuracy_score
+
+# Backend root, for the shared feature module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.services.interval_features import FEATURE_COLUMNS, feature_row, training_examples
 
 # Configuration
 PROJECT_ID = "learningaier-lab"
@@ -22,49 +27,38 @@ def train_local():
     logger.info(f"Fetching data from {PROJECT_ID}.{DATASET_ID}.{VIEW_NAME}...")
     client = bigquery.Client(project=PROJECT_ID)
     query = f"SELECT * FROM `{PROJECT_ID}.{DATASET_ID}.{VIEW_NAME}`"
-    df = client.query(query).to_dataframe()
-    logger.info(f"Data fetched successfully. Shape: {df.shape}")
+    rows = [dict(row) for row in client.query(query).result()]
+    logger.info(f"Data fetched successfully. Rows: {len(rows)}")
     
-    if len(df) < 10:
+    if len(rows) < 10:
         logger.warning("Not enough data to train. Need at least 10 rows. Using dummy data for testing.")
-        # Create dummy data if real data is insufficient
-        data = {
-            'category': ['A', 'B', 'A', 'B', 'A'] * 4,
-            'word_count': [10, 20, 15, 25, 30] * 4,
-            'rating': [1, 2, 3, 4, 5] * 4,
-            'review_sequence_number': [1, 2, 3, 4, 5] * 4,
-            'days_since_last_review': [1, 2, 3, 4, 5] * 4,
-            'user_avg_rating': [3.0, 3.5, 4.0, 4.5, 5.0] * 4,
-            'label_next_interval_bucket': ['short', 'medium', 'long', 'medium', 'short'] * 4
-        }
-        df = pd.DataFrame(data)
-        logger.info(f"Created dummy data. Shape: {df.shape}")
+        # Create dummy view rows if real data is insufficient
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        rows = [
+            {
+                'review_id': f'r{i}',
+                'user_id': 'u1',
+                'reviewed_at': start + timedelta(days=i),
+                'prev_reviewed_at': start + timedelta(days=i - 1) if i else None,
+                'scheduled_interval': [1, 3, 7, 14][i % 4],
+                'category': ['vocabulary', 'concept'][i % 2],
+                'word_count': [10, 20, 15, 25, 30][i % 5],
+                'rating': [1, 2, 3, 4][i % 4],
+                'review_sequence_number': i + 1,
+            }
+            for i in range(20)
+        ]
+        logger.info(f"Created dummy data. Rows: {len(rows)}")
 
-    # Preprocess
-    df = df.dropna()
-    feature_cols = [
-        'category', 
-        'word_count', 
-        'rating', 
-        'review_sequence_number', 
-        'days_since_last_review', 
-        'user_avg_rating'
-    ]
-    target_col = 'label_next_interval_bucket'
-    
-    X = df[feature_cols].copy()
-    y = df[target_col].copy()
-    
-    # Encode categorical features
-    le_category = LabelEncoder()
-    X['category'] = le_category.fit_transform(X['category'].astype(str))
-    
-    # Encode target
-    le_target = LabelEncoder()
-    y = le_target.fit_transform(y)
+    # Features and bucket labels, built as the API builds them
+    features, labels = training_examples(rows)
+    X = np.array([feature_row(f) for f in features], dtype=np.float32).reshape(-1, len(FEATURE_COLUMNS))
+    # XGBoost wants classes 0..n-1: the model predicts bucket - 1
+    y = np.array(labels, dtype=np.int64) - 1
     
-    # Train
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    # Train, evaluating on the most recent 20% of reviews
+    split = int(len(X) * 0.8)
+    X_train, X_test, y_train, y_test = X[:split], X[split:], y[:split], y[split:]
     
     model = XGBClassifier(
         n_estimators=100,
@@ -86,8 +80,6 @@ def train_local():
     # Save artifacts
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     joblib.dump(model, os.path.join(OUTPUT_DIR, 'model.joblib'))
-    joblib.dump(le_category, os.path.join(OUTPUT_DIR, 'le_category.joblib'))
-    joblib.dump(le_target, os.path.join(OUTPUT_DIR, 'le_target.joblib'))
     
     logger.info(f"Artifacts saved to {OUTPUT_DIR}")
     
@@ -96,7 +88,7 @@ def train_local():
     logger.info("Model loaded successfully")
     
     # Verify prediction
-    sample_input = X_test.iloc[[0]]
+    sample_input = X_test[:1]
     prediction = loaded_model.predict(sample_input)
     logger.info(f"Sample prediction: {prediction}")
 
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Backfill running review aggregates from `flashcard_reviews`.
+
+Rebuilds, from the full review history:
+  - flashcards/{id}: review_count, last_reviewed
+  - user_review_stats/{user_id}: rating_sum, rating_count, reviews_by_day
+
+Reviews written while the backfill runs can be overwritten by its results, so
+run it during low traffic (or re-run it); the result is idempotent.
+
+Usage:
+    python scripts/backfill_review_aggregates.py --dry-run
+    python scripts/backfill_review_aggregates.py --user-id <user_id>
+"""
+import argparse
+import os
+import sys
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from google.api_core.exceptions import NotFound
+from app.core.firebase import get_firestore_client
+from app.services.review_stats import build_stats, stats_ref
+
+# Firestore allows 500 writes per batch
+BATCH_SIZE = 400
+
+
+def scan_reviews(db, user_id: Optional[str] = None):
+    """Aggregate review history per card and per user in one pass."""
+    query = db.collection("flashcard_reviews")
+    if user_id:
+        query = query.where("user_id", "==", user_id)
+    query = query.select(["flashcard_id", "user_id", "rating", "reviewed_at"])
+
+    cards: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"review_count": 0, "last_reviewed": None})
+    users: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    scanned = 0
+
+    for doc in query.stream():
+        review = doc.to_dict()
+        scanned += 1
+        reviewed_at = review.get("reviewed_at")
+
+        card = cards[review.get("flashcard_id")]
+        card["review_count"] += 1
+        if isinstance(reviewed_at, datetime) and (card["last_reviewed"] is None or reviewed_at > card["last_reviewed"]):
+            card["last_reviewed"] = reviewed_at
+
+        users[review.get("user_id")].append({"rating": review.get("rating", 3), "reviewed_at": reviewed_at})
+
+        if scanned % 10000 == 0:
+            print(f"  ...scanned {scanned} reviews")
+
+    cards.pop(None, None)
+    users.pop(None, None)
+    return cards, users, scanned
+
+
+def commit_writes(db, writes: list, dry_run: bool) -> int:
+    """Apply (kind, ref, data) writes in batches; returns the number applied."""
+    applied = 0
+    for start in range(0, len(writes), BATCH_SIZE):
+        chunk = writes[start:start + BATCH_SIZE]
+        if dry_run:
+            applied += len(chunk)
+            continue
+
+        batch = db.batch()
+        for kind, ref, data in chunk:
+            if kind == "update":
+                batch.update(ref, data)
+            else:
+                batch.set(ref, data)
+        try:
+            batch.commit()
+            applied += len(chunk)
+        except NotFound:
+            # A reviewed card was deleted; apply the chunk one by one and skip it
+            for kind, ref, data in chunk:
+                try:
+                    if kind == "update":
+                        ref.update(data)
+                    else:
+                        ref.set(data)
+                    applied += 1
+                except NotFound:
+                    print(f"  ⚠ Skipping missing document {ref.path}")
+    return applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill flashcard review aggregates")
+    parser.add_argument("--user-id", help="Only backfill this user")
+    parser.add_argument("--dry-run", action="store_true", help="Compute aggregates without writing")
+    args = parser.parse_args()
+
+    db = get_firestore_client()
+    now = datetime.now(timezone.utc)
+
+    print("📊 Scanning flashcard_reviews...")
+    cards, users, scanned = scan_reviews(db, args.user_id)
+    print(f"✓ {scanned} reviews, {len(cards)} cards, {len(users)} users")
+
+    writes = []
+    for card_id, aggregate in cards.items():
+        data = {"review_count": aggregate["review_count"]}
+        if aggregate["last_reviewed"] is not None:
+            data["last_reviewed"] = aggregate["last_reviewed"]
+        writes.append(("update", db.collection("flashcards").document(card_id), data))
+    for user_id, reviews in users.items():
+        writes.append(("set", stats_ref(db, user_id), build_stats(reviews, now)))
+
+    applied = commit_writes(db, writes, args.dry_run)
+    verb = "Would write" if args.dry_run else "Wrote"
+    print(f"✅ {verb} {applied} documents")
+
+
+if __name__ == "__main__":
+    main()
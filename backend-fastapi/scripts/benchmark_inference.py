@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark interval-prediction throughput with and without micro-batching.
+
+Simulates 1, 10 and 100 concurrent reviewers, each requesting predictions one
+review at a time (like POST /api/flashcards/review), against the local model:
+  - direct: one `model.predict` per review on the event loop (the old path)
+  - batched: PredictionBatcher, the path MLPredictionService uses
+
+Reports predictions/s, per-prediction latency (p50/p99) and the mean batch
+size.
+
+Usage:
+    python scripts/benchmark_inference.py
+    python scripts/benchmark_inference.py --concurrency 1,10,100,500 --predictions 2000 --max-wait-ms 2
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import List
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from app.services.model_registry import ModelRegistry, default_model_path
+from app.services.prediction_batcher import PredictionBatcher
+from app.services.scheduling import ModelPolicy, ReviewArrays
+
+
+def random_features(rng: random.Random) -> dict:
+    return {
+        "category": rng.choice(["code", "concept", "definition", "vocabulary"]),
+        "word_count": rng.randint(2, 40),
+        "rating": rng.randint(1, 4),
+        "review_sequence_number": rng.randint(1, 20),
+        "current_interval": rng.choice([0, 1, 2, 5, 14]),
+        "user_avg_rating": rng.uniform(1.5, 4.0),
+    }
+
+
+async def run(concurrency: int, predictions: int, predict_one) -> dict:
+    """`concurrency` reviewers issue `predictions` requests in total, one at a time each."""
+    rng = random.Random(0)
+    per_reviewer = max(predictions // concurrency, 1)
+    latencies: List[float] = []
+
+    async def reviewer():
+        for _ in range(per_reviewer):
+            features = random_features(rng)
+            start = time.perf_counter()
+            await predict_one(features)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(reviewer() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    ms = np.asarray(latencies) * 1000
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50": float(np.percentile(ms, 50)),
+        "p99": float(np.percentile(ms, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark micro-batched interval predictions")
+    parser.add_argument("--model", default=default_model_path())
+    parser.add_argument("--concurrency", default="1,10,100", help="Comma-separated reviewer counts")
+    parser.add_argument("--predictions", type=int, default=1000, help="Predictions per run")
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.model, reload_interval_seconds=0)
+    if not registry.reload_if_changed():
+        sys.exit(f"❌ Could not load model from {args.model}")
+    policy = ModelPolicy(registry.current.model)
+    print(f"📊 Model {registry.current.version} ({type(registry.current.model).__name__})")
+
+    def predict_rows(rows):
+        return policy.predict(ReviewArrays.from_features(rows)).tolist()
+
+    async def direct(features):
+        return predict_rows([features])[0]
+
+    async def benchmark(concurrency: int):
+        batcher = PredictionBatcher(
+            predict_rows,
+            max_batch_size=args.max_batch_size,
+            max_wait_ms=args.max_wait_ms,
+            max_workers=args.workers,
+        )
+
+        async def batched(features):
+            return (await batcher.submit([features]))[0]
+
+        try:
+            await batched(random_features(random.Random(1)))  # Start the worker threads
+            batcher.batches = batcher.rows = 0
+            direct_stats = await run(concurrency, args.predictions, direct)
+            batched_stats = await run(concurrency, args.predictions, batched)
+        finally:
+            batcher.shutdown()
+        return direct_stats, batched_stats, batcher.rows / max(batcher.batches, 1)
+
+    print(f"\n{'reviewers':>9}  {'mode':<8} {'pred/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'batch':>6}")
+    for concurrency in (int(c) for c in args.concurrency.split(",")):
+        direct_stats, batched_stats, mean_batch = asyncio.run(benchmark(concurrency))
+        for mode, stats, batch in (("direct", direct_stats, 1.0), ("batched", batched_stats, mean_batch)):
+            print(f"{concurrency:>9}  {mode:<8} {stats['throughput']:>10,.0f} "
+                  f"{stats['p50']:>8.2f} {stats['p99']:>8.2f} {batch:>6.1f}")
+        print(f"{'':>9}  speedup  {batched_stats['throughput'] / direct_stats['throughput']:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark the large list endpoints (GET /api/notes/, /api/flashcards/).
+
+Simulates a heavy user (5k notes, 20k flashcards) with in-memory documents
+and compares, on minimal FastAPI apps driven in-process:
+  - baseline:    response_model=list[...] + default JSONResponse, uncompressed
+                 (the previous implementation; notes include full content)
+  - streamed:    project() + json_array_response (orjson, streamed; notes are
+                 NoteSummary metadata, content is fetched per note)
+  - streamed+gz: the same behind CompressionMiddleware, gzip negotiated
+  - streamed+br: the same, brotli negotiated (skipped if brotli is missing)
+
+Reports median latency and bytes on the wire.
+
+Usage:
+    python scripts/benchmark_list_endpoints.py
+    python scripts/benchmark_list_endpoints.py --notes 5000 --cards 20000 --runs 7
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+from fastapi import FastAPI
+from app.core.responses import json_array_response, project
+from app.middleware.compression import CompressionMiddleware, brotli
+from app.models.notes import NoteContent, NoteSummary
+from app.models.flashcards import FlashcardItem
+
+
+def make_notes(count: int) -> list[dict]:
+    return [
+        {
+            "id": f"note_{i:06d}",
+            "title": f"Lecture {i}: spaced repetition and memory consolidation",
+            "content_md_en": "## Summary\n" + "Retrieval practice strengthens recall. " * 40,
+            "content_md_zh": "## 摘要\n" + "检索练习可以增强记忆。" * 30,
+            "user_id": "bench_user",
+            "folder_id": f"folder_{i % 20}",
+            "word_count": 420,
+            "created_at": "2025-01-01T00:00:00Z",
+            "updated_at": "2025-01-02T00:00:00Z",
+        }
+        for i in range(count)
+    ]
+
+
+def make_cards(count: int) -> list[dict]:
+    return [
+        {
+            "id": f"card_{i:06d}",
+            "term": f"Term {i}",
+            "definition": "A concise definition used for active recall practice. " * 3,
+            "context": "Appears in the lecture on memory consolidation.",
+            "user_id": "bench_user",
+            "note_id": f"note_{i % 5000:06d}",
+            "interval": i % 30,
+            "ease_factor": 2.5,
+        }
+        for i in range(count)
+    ]
+
+
+def build_app(variant: str, notes: list[dict], cards: list[dict]) -> FastAPI:
+    app = FastAPI()
+
+    if variant == "baseline":
+        @app.get("/api/notes/", response_model=list[NoteContent])
+        async def get_notes():
+            return list(notes)
+
+        @app.get("/api/flashcards/", response_model=list[FlashcardItem])
+        async def get_flashcards():
+            return list(cards)
+    else:
+        @app.get("/api/notes/", response_model=list[NoteSummary])
+        async def get_notes():
+            return await json_array_response(project(note, NoteSummary) for note in iter(notes))
+
+        @app.get("/api/flashcards/", response_model=list[FlashcardItem])
+        async def get_flashcards():
+            return await json_array_response(project(card, FlashcardItem) for card in iter(cards))
+
+        if variant != "streamed":
+            app.add_middleware(CompressionMiddleware)
+
+    return app
+
+
+async def measure(app: FastAPI, path: str, encoding: str, runs: int) -> tuple[float, int]:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Accept-Encoding": encoding}
+    timings = []
+    wire_bytes = 0
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get(path, headers=headers)  # Warm up
+        for _ in range(runs):
+            start = time.perf_counter()
+            async with client.stream("GET", path, headers=headers) as response:
+                wire_bytes = sum([len(chunk) async for chunk in response.aiter_raw()])
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, wire_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark large list endpoints")
+    parser.add_argument("--notes", type=int, default=5000, help="Notes for the simulated user")
+    parser.add_argument("--cards", type=int, default=20000, help="Flashcards for the simulated user")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per variant")
+    args = parser.parse_args()
+
+    notes = make_notes(args.notes)
+    cards = make_cards(args.cards)
+
+    variants = [("baseline", "identity"), ("streamed", "identity"), ("streamed+gz", "gzip")]
+    if brotli is not None:
+        variants.append(("streamed+br", "br"))
+
+    print(f"📊 {args.notes} notes, {args.cards} flashcards, median of {args.runs} runs")
+    for path in ("/api/notes/", "/api/flashcards/"):
+        print(f"\n{path}")
+        baseline_ms = None
+        for variant, encoding in variants:
+            app = build_app(variant, notes, cards)
+            ms, size = asyncio.run(measure(app, path, encoding, args.runs))
+            baseline_ms = baseline_ms or ms
+            print(f"  {variant:<12} {ms:8.1f} ms  {size / 1024:9.1f} KiB  ({baseline_ms / ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark request logging middleware overhead (requests/sec).
+
+Compares, on the same minimal FastAPI app driven in-process:
+  - none:        no logging middleware
+  - legacy:      the previous @app.middleware("http") log_requests
+                 (BaseHTTPMiddleware, pretty-printed headers, body re-parse, ~15 prints)
+  - structured:  RequestLoggingMiddleware (pure ASGI, one JSON line)
+
+Log output goes to /dev/null so only the middleware cost is measured.
+
+Usage:
+    python scripts/benchmark_request_logging.py
+    python scripts/benchmark_request_logging.py --requests 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import sys
+import time
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+from fastapi import FastAPI, Request
+from app.middleware.request_logging import RequestLoggingMiddleware, get_access_logger
+
+
+PAYLOAD = {"note_id": "note_123", "question": "What is spaced repetition?", "top_k": 5}
+
+
+def build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"id": item_id, "title": "Item"}
+
+    @app.post("/api/items/{item_id}/ask")
+    async def ask(item_id: str, request: Request):
+        body = await request.json()
+        return {"id": item_id, "question": body["question"]}
+
+    if variant == "legacy":
+        @app.middleware("http")
+        async def log_requests(request: Request, call_next):
+            start_time = time.time()
+            print(f"\n{'='*80}")
+            print("🔵 INCOMING REQUEST")
+            print(f"{'='*80}")
+            print(f"📍 Method: {request.method}")
+            print(f"🔗 URL: {request.url}")
+            print(f"👤 Client: {request.client.host if request.client else 'Unknown'}")
+            headers_to_log = {k: v for k, v in request.headers.items() if k.lower() not in ['authorization']}
+            if 'authorization' in dict(request.headers):
+                headers_to_log['authorization'] = 'Bearer ***'
+            print(f"📋 Headers: {json.dumps(headers_to_log, indent=2)}")
+            if request.method in ["POST", "PUT", "PATCH"]:
+                body = await request.body()
+                if body:
+                    try:
+                        print("📦 Request Body:")
+                        print(json.dumps(json.loads(body.decode()), indent=2))
+                    except Exception:
+                        print(f"📦 Request Body (raw): {body.decode()[:500]}")
+
+                    async def receive():
+                        return {"type": "http.request", "body": body}
+                    request._receive = receive
+            response = await call_next(request)
+            duration = time.time() - start_time
+            print(f"\n{'='*80}")
+            print("🟢 OUTGOING RESPONSE")
+            print(f"{'='*80}")
+            print(f"📊 Status Code: {response.status_code}")
+            print(f"⏱️  Duration: {duration:.3f}s")
+            print(f"{'='*80}\n")
+            return response
+    elif variant == "structured":
+        app.add_middleware(RequestLoggingMiddleware, sample_rate=1.0)
+
+    return app
+
+
+async def run(app: FastAPI, total: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": "Bearer token", "User-Agent": "bench"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i: int):
+            if i % 2:
+                await client.post(f"/api/items/{i}/ask", json=PAYLOAD, headers=headers)
+            else:
+                await client.get(f"/api/items/{i}", headers=headers)
+
+        # Warm up
+        await asyncio.gather(*(one(i) for i in range(concurrency)))
+
+        start = time.perf_counter()
+        for offset in range(0, total, concurrency):
+            await asyncio.gather(*(one(i) for i in range(offset, min(total, offset + concurrency))))
+        elapsed = time.perf_counter() - start
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark request logging middleware")
+    parser.add_argument("--requests", type=int, default=3000, help="Requests per variant")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent requests")
+    args = parser.parse_args()
+
+    devnull = open(os.devnull, "w")
+    access_logger = get_access_logger()
+    for handler in access_logger.handlers:
+        handler.setStream(devnull)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = {}
+    for variant in ("none", "legacy", "structured"):
+        app = build_app(variant)
+        with contextlib.redirect_stdout(devnull):
+            results[variant] = asyncio.run(run(app, args.requests, args.concurrency))
+
+    baseline = results["none"]
+    print(f"📊 {args.requests} requests, concurrency {args.concurrency}")
+    for variant, rps in results.items():
+        overhead = (1 - rps / baseline) * 100
+        print(f"  {variant:<11} {rps:8.0f} req/s  ({overhead:.1f}% overhead)")
+
+
+if __name__ == "__main__":
+    main()
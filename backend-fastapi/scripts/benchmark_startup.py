@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark app startup (import) time with `python -X importtime`.
+
+Imports `app.main` in fresh interpreters, reports the median cumulative import
+time, the slowest top-level packages, and any heavy SDK that was loaded
+eagerly even though it should only load on first use (LAZY_MODULES).
+
+Exits non-zero if the median exceeds the budget or a lazy module is imported
+at startup; tests/test_startup.py runs the same check.
+
+Usage:
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --runs 7 --budget-ms 2500 --top 20
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Heavy SDKs that must not be imported by `import app.main`
+LAZY_MODULES = [
+    "google.cloud.bigquery",
+    "google.generativeai",
+    "google.cloud.aiplatform",
+    "vertexai",
+    "pinecone",
+    "PyPDF2",
+    "joblib",
+    "sklearn",
+    "xgboost",
+    "numpy",
+    "pandas",
+]
+
+# Median `import app.main` budget; override with STARTUP_IMPORT_BUDGET_MS
+DEFAULT_BUDGET_MS = float(os.environ.get("STARTUP_IMPORT_BUDGET_MS", 2500))
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Parse -X importtime output into (module, self_us, cumulative_us) rows."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative)))
+    return rows
+
+
+def measure_once(module: str = "app.main") -> Tuple[float, Dict[str, float], List[str]]:
+    """
+    Import `module` in a fresh interpreter.
+
+    Returns:
+        (total_ms, {top-level package: summed self ms}, eagerly imported LAZY_MODULES)
+    """
+    code = (
+        f"import sys, json; import {module}; "
+        f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = parse_importtime(result.stderr)
+    total_us = next(cumulative for name, _, cumulative in rows if name == module)
+
+    packages: Dict[str, float] = {}
+    for name, self_us, _ in rows:
+        top = ".".join(name.split(".")[:2]) if name.startswith("google.") else name.split(".")[0]
+        packages[top] = packages.get(top, 0.0) + self_us / 1000
+
+    eager = json.loads(result.stdout.strip().splitlines()[-1])
+    return total_us / 1000, packages, eager
+
+
+def measure(runs: int = 5, module: str = "app.main") -> Tuple[float, Dict[str, float], List[str]]:
+    """Median import time over `runs` fresh interpreters (after one warm-up run for .pyc files)."""
+    measure_once(module)
+    samples = [measure_once(module) for _ in range(runs)]
+    median_ms = statistics.median(total for total, _, _ in samples)
+    _, packages, eager = samples[-1]
+    return median_ms, packages, eager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app startup import time")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Median budget in ms")
+    parser.add_argument("--top", type=int, default=15, help="Slowest packages to show")
+    args = parser.parse_args()
+
+    median_ms, packages, eager = measure(args.runs)
+
+    print(f"📊 import app.main: {median_ms:.0f} ms median over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print("\nSlowest packages (own import time, last run):")
+    for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<28} {ms:8.1f} ms")
+
+    failed = False
+    if eager:
+        print(f"\n❌ Loaded eagerly (should be lazy): {', '.join(eager)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"\n❌ Over budget by {median_ms - args.budget_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print("\n✅ Within budget, no heavy SDKs loaded at startup")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
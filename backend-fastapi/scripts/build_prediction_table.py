@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Build the interval model's prediction table.
+
+Run after scripts/compile_model.py (or after copying a new model.joblib). The
+script does the following:
+  - loads the model the API serves (model.compiled, else model.joblib)
+  - evaluates it once per cell of the bounded feature grid
+    (app.services.prediction_table)
+  - checks that table lookups agree with the model on random in-bounds
+    rows, split-threshold values and out-of-bounds rows; nothing is written
+    on a disagreement
+  - writes local_model_artifacts/model.table.npz; the registry picks it up on
+    its next poll
+
+A table is only used with the model version it was built from, so rebuild it
+after every model update.
+
+Usage:
+    python scripts/build_prediction_table.py
+    python scripts/build_prediction_table.py --model path/to/model.compiled --output path/to/model.table.npz
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from app.services.model_registry import DEFAULT_PREDICTION_TABLE_PATH, ModelRegistry, default_model_path
+from app.services.prediction_table import PredictionTable, TabulatedModel, build_prediction_table
+from app.services.interval_features import FEATURE_COLUMNS
+
+
+def check_rows(table: PredictionTable, rows: int, seed: int = 0) -> np.ndarray:
+    """In-bounds rows (integers, split-threshold values), plus 5% out of bounds or missing."""
+    rng = np.random.default_rng(seed)
+    X = np.empty((rows, table.n_features), dtype=np.float32)
+    for feature in range(table.n_features):
+        low, high = table.lower[feature], table.upper[feature]
+        candidates = np.concatenate([
+            table.edges[feature],
+            np.nextafter(table.edges[feature], np.float32(-np.inf)),
+            np.nextafter(table.edges[feature], np.float32(np.inf)),
+            np.arange(low, min(high, low + 100) + 1, dtype=np.float32),
+            rng.uniform(low, high, size=100).astype(np.float32),
+        ])
+        X[:, feature] = np.clip(rng.choice(candidates, size=rows), low, high)
+    outside = rng.random(rows) < 0.05
+    X[outside, rng.integers(0, table.n_features, outside.sum())] = np.nan
+    X[outside & (rng.random(rows) < 0.5), 0] = table.upper[0] + 1
+    return X
+
+
+def latency_us(predict, X: np.ndarray, repeat: int = 200) -> float:
+    predict(X)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        predict(X)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the interval model's prediction table")
+    parser.add_argument("--model", default=default_model_path(), help="Compiled model directory or joblib artifact")
+    parser.add_argument("--output", default=DEFAULT_PREDICTION_TABLE_PATH)
+    parser.add_argument("--check-rows", type=int, default=500000)
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.model, reload_interval_seconds=0)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        if not registry.reload_if_changed():
+            sys.exit(f"❌ Could not load model from {args.model}")
+    model, version = registry.current.model, registry.current.version
+    print(f"🔧 Tabulating {type(model).__name__} {version} from {args.model}...")
+
+    start = time.perf_counter()
+    try:
+        table = build_prediction_table(model, FEATURE_COLUMNS, version)
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+    print(f"  {len(table.cells):,} cells ({table.cells.nbytes / 1024:.1f} KB) in {time.perf_counter() - start:.2f} s")
+    for name, edges, low, high in zip(FEATURE_COLUMNS, table.edges, table.lower, table.upper):
+        print(f"    {name:<24} [{low:g}, {high:g}]  {len(edges) + 1} bins")
+
+    print("🔍 Checking agreement...")
+    tabulated = TabulatedModel(table, fallback=model)
+    X = check_rows(table, args.check_rows)
+    mismatches = int(np.count_nonzero(tabulated.predict(X) != np.asarray(model.predict(X))))
+    _, inside = table.cell_index(X)
+    print(f"  {mismatches} mismatches in {len(X):,} rows ({inside.mean():.1%} answered by the table)")
+    if mismatches:
+        sys.exit("❌ Table disagrees with the model; nothing written")
+
+    table.save(args.output)
+    print(f"✅ Prediction table written to {args.output}")
+
+    grid = X[inside]
+    print(f"\n{'':<20} {'model':>12} {'table':>12}")
+    for batch in (1, 64, 4096):
+        before, after = latency_us(model.predict, grid[:batch]), latency_us(tabulated.predict, grid[:batch])
+        label = f"batch of {batch}"
+        print(f"{label:<20} {before:>10.1f}µs {after:>10.1f}µs  ({before / after:.0f}x, "
+              f"{after * 1000 / batch:.0f} ns/row)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Compile the interval model into flat NumPy arrays.
+
+Run after training (ml/flashcard_interval_model/train.py or train_local.py)
+and copying the artifact to local_model_artifacts/. It does the following:
+  - flattens the tree ensemble (XGBoost or scikit-learn) with
+    app.services.compiled_model
+  - verifies that predictions match the original model exactly on generated
+    rows that hit every split threshold, the values just around them, and
+    missing values; nothing is written on a mismatch
+  - writes the artifact directory, replacing the previous one; the model
+    registry picks it up on its next poll
+  - compares load time, memory and prediction latency of both artifacts
+
+The compiled model keeps the joblib artifact's version, so prediction logs
+and review documents report the same model version either way.
+
+Usage:
+    python scripts/compile_model.py
+    python scripts/compile_model.py --model path/to/model.joblib --output path/to/model.compiled
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import warnings
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import joblib
+import numpy as np
+from app.services.compiled_model import CompiledForest, compile_model
+from app.services.model_registry import DEFAULT_COMPILED_MODEL_PATH, DEFAULT_MODEL_PATH, artifact_version
+
+# Measured in a fresh interpreter, so imports count towards the cost.
+# RSS is read from /proc (Linux); ru_maxrss would include the parent's peak.
+LOAD_PROBE = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+def rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize()
+before = rss()
+start = time.perf_counter()
+{load}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"load_ms": elapsed * 1000, "rss_mb": (rss() - before) / 2**20}}))
+"""
+LOADERS = {
+    "joblib": "import joblib; model = joblib.load({path!r})",
+    "compiled": "from app.services.compiled_model import CompiledForest; model = CompiledForest.load({path!r})",
+}
+
+
+def verification_rows(compiled: CompiledForest, rows: int, seed: int = 0) -> np.ndarray:
+    """Rows whose values sit on, just below and just above every split threshold."""
+    rng = np.random.default_rng(seed)
+    feature = compiled.arrays["feature"]
+    threshold = compiled.arrays["threshold"]
+    split = np.asarray(compiled.arrays["left"]) != np.arange(len(feature))
+
+    X = np.empty((rows, compiled.n_features), dtype=np.float32)
+    for column in range(compiled.n_features):
+        points = np.unique(threshold[split & (feature == column)])
+        if points.size == 0:
+            X[:, column] = rng.normal(size=rows)
+            continue
+        candidates = np.concatenate([
+            points,
+            np.nextafter(points, np.float32(-np.inf)),
+            np.nextafter(points, np.float32(np.inf)),
+            rng.uniform(points.min() - 1, points.max() + 1, size=points.size).astype(np.float32),
+        ])
+        X[:, column] = rng.choice(candidates, size=rows)
+    X[rng.random(X.shape) < 0.02] = np.nan
+    return X
+
+
+def verify(model, compiled: CompiledForest, rows: int) -> bool:
+    X = verification_rows(compiled, rows)
+    expected, actual = np.asarray(model.predict(X)), compiled.predict(X)
+    mismatches = int(np.count_nonzero(expected != actual))
+    proba_error = float(np.abs(np.asarray(model.predict_proba(X)) - compiled.predict_proba(X)).max())
+    print(f"  predict: {mismatches} mismatches in {rows:,} rows; predict_proba max abs error {proba_error:.2e}")
+    return mismatches == 0
+
+
+def probe(kind: str, path: str) -> dict:
+    code = LOAD_PROBE.format(
+        root=os.path.abspath(os.path.join(os.path.dirname(__file__), '..')),
+        load=LOADERS[kind].format(path=path),
+    )
+    output = subprocess.run([sys.executable, "-W", "ignore", "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def latency_ms(predict, X: np.ndarray, repeat: int) -> float:
+    predict(X)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predict(X)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+
+def compare(model, compiled: CompiledForest, model_path: str, output: str) -> None:
+    joblib_size = os.path.getsize(model_path)
+    compiled_size = sum(os.path.getsize(os.path.join(output, name)) for name in os.listdir(output))
+    joblib_load, compiled_load = probe("joblib", model_path), probe("compiled", output)
+
+    print(f"\n{'':<28} {'joblib':>12} {'compiled':>12}")
+    print(f"{'artifact size':<28} {joblib_size / 1024:>10.0f}KB {compiled_size / 1024:>10.0f}KB")
+    print(f"{'load time (incl. imports)':<28} {joblib_load['load_ms']:>10.0f}ms {compiled_load['load_ms']:>10.0f}ms")
+    print(f"{'RSS growth (incl. imports)':<28} {joblib_load['rss_mb']:>10.1f}MB {compiled_load['rss_mb']:>10.1f}MB")
+
+    X = verification_rows(compiled, 4096, seed=1)
+    X[np.isnan(X)] = 0
+    for batch in (1, 64, 4096):
+        repeat = 200 if batch < 4096 else 10
+        before = latency_ms(model.predict, X[:batch], repeat)
+        after = latency_ms(compiled.predict, X[:batch], repeat)
+        label = f"predict, batch of {batch}"
+        print(f"{label:<28} {before:>10.3f}ms {after:>10.3f}ms  ({before / after:.1f}x)")
+
+
+def write_artifact(compiled: CompiledForest, output: str) -> None:
+    """Write next to `output`, then swap it in (the registry keeps the old model meanwhile)."""
+    staging, previous = f"{output}.tmp", f"{output}.old"
+    shutil.rmtree(staging, ignore_errors=True)
+    compiled.save(staging)
+    if os.path.exists(output):
+        shutil.rmtree(previous, ignore_errors=True)
+        os.replace(output, previous)
+    os.replace(staging, output)
+    shutil.rmtree(previous, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the interval model into NumPy arrays")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH, help="joblib artifact to compile")
+    parser.add_argument("--output", default=DEFAULT_COMPILED_MODEL_PATH, help="Compiled artifact directory")
+    parser.add_argument("--verify-rows", type=int, default=200000)
+    parser.add_argument("--skip-benchmark", action="store_true")
+    args = parser.parse_args()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        model = joblib.load(args.model)
+    version = artifact_version(args.model)
+
+    print(f"🔧 Compiling {type(model).__name__} from {args.model} (version {version})...")
+    try:
+        compiled = compile_model(model, version=version)
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+    print(f"  {compiled.n_trees} trees, {len(compiled.arrays['feature']):,} nodes, "
+          f"max depth {compiled.max_depth}, {compiled.nbytes / 1024:.0f} KB of arrays")
+
+    print("🔍 Verifying predictions...")
+    if not verify(model, compiled, args.verify_rows):
+        sys.exit("❌ Compiled model does not match the original; nothing written")
+
+    write_artifact(compiled, args.output)
+    print(f"✅ Compiled model written to {args.output}")
+
+    if not args.skip_benchmark:
+        compare(model, compiled, args.model, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,11 +19,10 @@ CardFeatures AS (
     f.id AS flashcard_id,
     f.category,
     f.note_id,
-    n.word_count
+    -- Words in term + definition (interval_features.word_count, computed on export)
+    f.word_count
   FROM
     `learningaier-lab.learningaier_analytics.flashcards` f
-  LEFT JOIN
-    `learningaier-lab.learningaier_analytics.notes` n ON f.note_id = n.id
 ),
 UserStats AS (
   -- Compute rolling user stats (e.g. average rating in last 30 days)
@@ -41,6 +40,11 @@ SELECT
   rh.review_id,
   rh.user_id,
   rh.flashcard_id,
+  -- Raw inputs for app.services.interval_features.training_examples, which
+  -- derives the serving-time features from them (and the snapshot watermark)
+  rh.reviewed_at,
+  rh.prev_reviewed_at,
+  rh.next_interval AS scheduled_interval,
   
   -- Features
   cf.category,
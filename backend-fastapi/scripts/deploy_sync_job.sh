@@ -75,7 +75,7 @@ echo "🚀 Deploying Cloud Run Job: ${JOB_NAME}..."
 gcloud run jobs create ${JOB_NAME} \
     --image ${IMAGE_NAME} \
     --command "python" \
-    --args "scripts/export_firestore_to_bq.py,--env,lab" \
+    --args "scripts/export_firestore_to_bq.py,--env,lab,--incremental" \
     --tasks 1 \
     --max-retries 0 \
     --region ${REGION} \
@@ -93,7 +93,7 @@ gcloud run jobs create ${JOB_NAME} \
     --execute-now || gcloud run jobs update ${JOB_NAME} \
         --image ${IMAGE_NAME} \
         --command "python" \
-        --args "scripts/export_firestore_to_bq.py,--env,lab" \
+        --args "scripts/export_firestore_to_bq.py,--env,lab,--incremental" \
         --region ${REGION} \
         --project ${PROJECT_ID} \
         --set-env-vars "APP_ENV=lab" \
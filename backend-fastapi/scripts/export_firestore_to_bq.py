@@ -2,23 +2,536 @@
 """
 Export Firestore data to BigQuery for analytics.
 
+Collections are exported in parallel, each as a resumable stream:
+
+1. Documents are read in pages (`order_by("__name__")` + `start_after`), so
+   no collection is ever held in memory.
+2. Rows go to shard files of at most --shard-rows rows (NDJSON, or Parquet
+   with --format parquet) under --workdir.
+3. Each finished shard is loaded into a staging table with a BigQuery load
+   job (no streaming-insert quotas). Job ids are derived from the run and the
+   shard, so a retried shard is never loaded twice.
+4. When the collection is done, the staging table replaces the target table
+   (with --user-id, only that user's rows are replaced), so re-running the
+   export does not duplicate rows.
+
+Note chunks are read with collection-group queries (top-level `note_chunks`
+and `notes/{note_id}/chunks`). They carry no user_id, so --user-id reads
+them with `note_id in` batches of the user's note ids instead of scanning
+every chunk.
+
+`<workdir>/<scope>/<collection>/checkpoint.json` records the run, the last
+document read and the shards written and loaded. An interrupted export picks
+up from there on the next run (--fresh starts over).
+
+With --incremental, only documents whose watermark field (`updated_at`, or
+`reviewed_at` for reviews) is newer than the collection's stored watermark
+(minus --lookback-hours) are read, and the staging table is MERGEd into the
+target by id. Watermarks are kept per collection and scope in the
+`export_watermarks` table and advance to the start of each finished run.
+Without a watermark yet, the collection is exported in full.
+
+--dry-run writes the shards and checkpoints under `<workdir>/dry-run` without
+touching BigQuery. With --local-source it also reads a JSON file instead of
+Firestore ({"collection": {"doc_id": {fields}}}, subcollections as
+"notes/<note_id>/chunks"), so it needs no credentials.
+
 Usage:
     python scripts/export_firestore_to_bq.py --user-id <user_id>
     python scripts/export_firestore_to_bq.py --collections notes,flashcards --dry-run
+    python scripts/export_firestore_to_bq.py --incremental
+    python scripts/export_firestore_to_bq.py --dry-run --local-source firestore.json
 """
 import argparse
-import sys
+import importlib.util
+import json
 import os
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import re
+import sys
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 # Add parent directory to path to import app modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from google.api_core.exceptions import Conflict, NotFound
 from google.cloud import bigquery
-from app.core.firebase import get_firestore_client
 from app.config import get_settings
+from app.services import interval_features
+
+DEFAULT_WORKDIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "export_data"))
+DEFAULT_SHARD_ROWS = 50_000
+DEFAULT_PAGE_SIZE = 1_000
+IN_QUERY_LIMIT = 30  # Values per Firestore `in` filter
+DEFAULT_LOOKBACK_HOURS = 48  # Re-read window for late writes (offline batch reviews keep their reviewed_at)
+CHECKPOINT_FILE = "checkpoint.json"
+WATERMARKS_TABLE = "export_watermarks"
+STAGING_EXPIRATION = timedelta(days=1)  # Staging tables of abandoned runs clean themselves up
+
+
+@dataclass
+class CollectionExport:
+    """How one Firestore collection maps to a BigQuery table."""
+    name: str
+    schema: List[bigquery.SchemaField]
+    to_row: Callable[[Any], Optional[Dict[str, Any]]]
+    # Firestore field (and BigQuery column) that moves forward on every write
+    watermark_field: str = "updated_at"
+    # Restricts the Firestore query with --user-id. Without one, --user-id
+    # reads `note_id in` batches of the user's note ids (see `read_sources`)
+    user_field: Optional[str] = "user_id"
+    # Collection-group ids to read instead of the top-level collection
+    collection_groups: Tuple[str, ...] = ()
+    # Groups that are notes/{note_id}/<group> subcollections: with --user-id
+    # they are read note by note, so their documents need no note_id field
+    note_subcollections: Tuple[str, ...] = ()
+
+
+def convert_timestamp(ts) -> Optional[str]:
+    """Convert Firestore timestamp to BigQuery-compatible ISO string."""
+    if ts is None:
+        return None
+
+    if hasattr(ts, 'timestamp'):
+        # Firestore timestamp
+        return datetime.fromtimestamp(ts.timestamp(), tz=timezone.utc).isoformat()
+    elif isinstance(ts, datetime):
+        return ts.isoformat()
+    elif isinstance(ts, str):
+        return ts
+    else:
+        return None
+
+
+def note_row(doc) -> Optional[Dict[str, Any]]:
+    data = doc.to_dict()
+    content_zh = data.get("content_md_zh", "")
+    content_en = data.get("content_md_en", "")
+    return {
+        "id": doc.id,
+        "user_id": data.get("user_id"),
+        "title": data.get("title", ""),
+        "word_count": len(content_zh.split()) + len(content_en.split()),
+        "folder_id": data.get("folder_id"),
+        "created_at": convert_timestamp(data.get("created_at")),
+        "updated_at": convert_timestamp(data.get("updated_at")),
+    }
+
+
+def flashcard_row(doc) -> Optional[Dict[str, Any]]:
+    data = doc.to_dict()
+    # Skip if user_id is missing (required field in BigQuery)
+    if not data.get("user_id"):
+        return None
+    return {
+        "id": doc.id,
+        "user_id": data.get("user_id"),
+        "note_id": data.get("note_id"),
+        "category": data.get("category", "vocabulary"),
+        # Same count the interval model sees at review time
+        "word_count": interval_features.word_count(data.get("term"), data.get("definition")),
+        "status": data.get("status", "new"),
+        "created_at": convert_timestamp(data.get("created_at")),
+        "next_due_at": convert_timestamp(data.get("next_review")),
+        "interval": data.get("interval", 0),
+        "ease_factor": data.get("ease_factor", 2.5),
+        "updated_at": convert_timestamp(data.get("updated_at")),
+    }
+
+
+def review_row(doc) -> Optional[Dict[str, Any]]:
+    data = doc.to_dict()
+    return {
+        "id": doc.id,
+        "flashcard_id": data.get("flashcard_id"),
+        "user_id": data.get("user_id"),
+        "rating": data.get("rating"),
+        "reviewed_at": convert_timestamp(data.get("reviewed_at")),
+        "scheduled_interval": data.get("scheduled_interval", 0),
+    }
+
+
+def note_chunk_row(doc) -> Optional[Dict[str, Any]]:
+    data = doc.to_dict()
+
+    # Try to resolve note_id from document data or path
+    note_id = data.get("note_id")
+    if not note_id:
+        try:
+            # Handles nested path like notes/{note_id}/chunks/{chunk_id}
+            note = doc.reference.parent.parent
+            note_id = note.id if note is not None and note.parent.id == "notes" else None
+        except Exception:
+            note_id = None
+    if not note_id:
+        # Skip records we can't associate to a note
+        return None
+
+    content_preview = data.get("content_preview")
+    if not content_preview:
+        # Fall back to a shortened content field if present
+        content_preview = (data.get("content") or "")[:200]
+
+    return {
+        "id": doc.id,
+        "note_id": note_id,
+        "chunk_index": data.get("chunk_index", 0),
+        "content_preview": content_preview,
+        "created_at": convert_timestamp(data.get("created_at")),
+    }
+
+
+EXPORTS: Dict[str, CollectionExport] = {
+    export.name: export for export in [
+        CollectionExport("notes", [
+            bigquery.SchemaField("id", "STRING", mode="REQUIRED"),
+            bigquery.SchemaField("user_id", "STRING", mode="REQUIRED"),
+            bigquery.SchemaField("title", "STRING"),
+            bigquery.SchemaField("word_count", "INTEGER"),
+            bigquery.SchemaField("folder_id", "STRING"),
+            bigquery.SchemaField("created_at", "TIMESTAMP"),
+            bigquery.SchemaField("updated_at", "TIMESTAMP"),
+        ], note_row),
+        CollectionExport("flashcards", [
+            bigquery.SchemaField("id", "STRING", mode="REQUIRED"),
+            bigquery.SchemaField("user_id", "STRING", mode="REQUIRED"),
+            bigquery.SchemaField("note_id", "STRING"),
+            bigquery.SchemaField("category", "STRING"),
+            bigquery.SchemaField("word_count", "INTEGER"),
+            bigquery.SchemaField("status", "STRING"),
+            bigquery.SchemaField("created_at", "TIMESTAMP"),
+            bigquery.SchemaField("next_due_at", "TIMESTAMP"),
+            bigquery.SchemaField("interval", "INTEGER"),
+            bigquery.SchemaField("ease_factor", "FLOAT"),
+            bigquery.SchemaField("updated_at", "TIMESTAMP"),
+        ], flashcard_row),
+        CollectionExport("flashcard_reviews", [
+            bigquery.SchemaField("id", "STRING", mode="REQUIRED"),
+            bigquery.SchemaField("flashcard_id", "STRING", mode="REQUIRED"),
+            bigquery.SchemaField("user_id", "STRING", mode="REQUIRED"),
+            bigquery.SchemaField("rating", "INTEGER"),
+            bigquery.SchemaField("reviewed_at", "TIMESTAMP"),
+            bigquery.SchemaField("scheduled_interval", "INTEGER"),
+        ], review_row, watermark_field="reviewed_at"),
+        CollectionExport("note_chunks", [
+            bigquery.SchemaField("id", "STRING", mode="REQUIRED"),
+            bigquery.SchemaField("note_id", "STRING", mode="REQUIRED"),
+            bigquery.SchemaField("chunk_index", "INTEGER"),
+            bigquery.SchemaField("content_preview", "STRING"),
+            bigquery.SchemaField("created_at", "TIMESTAMP"),
+        ], note_chunk_row, watermark_field="created_at", user_field=None,
+            # Top-level note_chunks and notes/{note_id}/chunks subcollections
+            collection_groups=("note_chunks", "chunks"), note_subcollections=("chunks",)),
+    ]
+}
+
+
+# =============================================================================
+# Local Firestore stand-in (--dry-run --local-source)
+# =============================================================================
+
+class _LocalReference:
+    def __init__(self, path: str):
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    @property
+    def parent(self) -> Optional["_LocalReference"]:
+        return _LocalReference(self.path.rsplit("/", 1)[0]) if "/" in self.path else None
+
+
+class _LocalDocument:
+    def __init__(self, path: str, data: Dict[str, Any]):
+        self.reference = _LocalReference(path)
+        self.id = self.reference.id
+        self._data = data
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self._data)
+
+    def get(self, field: str) -> Any:
+        return self.reference.path if field == "__name__" else self._data.get(field)
+
 
+def _comparable(a: Any, b: Any) -> bool:
+    # Firestore range filters only match values of the filter's type
+    return isinstance(a, datetime) and isinstance(b, datetime) or isinstance(a, str) and isinstance(b, str)
+
+
+class _LocalQuery:
+    """The subset of the Firestore query API the exporter uses."""
+
+    _OPERATORS = {
+        "==": lambda a, b: a == b,
+        "<": lambda a, b: _comparable(a, b) and a < b,
+        ">": lambda a, b: _comparable(a, b) and a > b,
+        "in": lambda a, b: a in b,
+    }
+
+    def __init__(self, documents: List[_LocalDocument], filters=(), orders=(), after=None, count=None):
+        self._documents = documents
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._after = after
+        self._count = count
+
+    def _copy(self, **changes) -> "_LocalQuery":
+        state = {"filters": self._filters, "orders": self._orders, "after": self._after, "count": self._count}
+        state.update(changes)
+        return _LocalQuery(self._documents, **state)
+
+    def where(self, field: str, op: str, value: Any) -> "_LocalQuery":
+        return self._copy(filters=self._filters + ((field, self._OPERATORS[op], value),))
+
+    def order_by(self, field: str) -> "_LocalQuery":
+        return self._copy(orders=self._orders + (field,))
+
+    def select(self, field_paths: List[str]) -> "_LocalQuery":
+        return self
+
+    def start_after(self, values: Dict[str, Any]) -> "_LocalQuery":
+        after = tuple(getattr(values[field], "path", values[field]) for field in self._orders)
+        return self._copy(after=after)
+
+    def limit(self, count: int) -> "_LocalQuery":
+        return self._copy(count=count)
+
+    def stream(self) -> Iterator[_LocalDocument]:
+        documents = [
+            doc for doc in self._documents
+            if all(match(doc.get(field), value) for field, match, value in self._filters)
+        ]
+        key = lambda doc: tuple(doc.get(field) for field in self._orders)
+        documents.sort(key=key)
+        if self._after is not None:
+            documents = [doc for doc in documents if key(doc) > self._after]
+        return iter(documents[:self._count] if self._count is not None else documents)
+
+
+class LocalFirestore:
+    """Firestore stand-in backed by {"collection path": {"doc_id": {fields}}}."""
+
+    def __init__(self, collections: Dict[str, Dict[str, Dict[str, Any]]]):
+        self._collections = collections
+
+    @classmethod
+    def from_file(cls, path: str) -> "LocalFirestore":
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def collection(self, path: str) -> _LocalQuery:
+        documents = self._collections.get(path, {})
+        return _LocalQuery([_LocalDocument(f"{path}/{doc_id}", data) for doc_id, data in documents.items()])
+
+    def collection_group(self, collection_id: str) -> _LocalQuery:
+        return _LocalQuery([
+            _LocalDocument(f"{path}/{doc_id}", data)
+            for path, documents in self._collections.items() if path.rsplit("/", 1)[-1] == collection_id
+            for doc_id, data in documents.items()
+        ])
+
+    def document(self, path: str) -> _LocalReference:
+        return _LocalReference(path)
+
+
+# =============================================================================
+# Shards and checkpoints
+# =============================================================================
+
+_ARROW_TYPES = {"STRING": "string", "INTEGER": "int64", "FLOAT": "float64"}
+
+
+class ShardWriter:
+    """Writes rows to one shard file at a time; only Parquet buffers (one shard)."""
+
+    def __init__(self, directory: str, schema: List[bigquery.SchemaField], file_format: str, first_index: int):
+        self.directory = directory
+        self.schema = schema
+        self.file_format = file_format
+        self.index = first_index
+        self.rows = 0
+        self._file = None
+        self._buffer: List[Dict[str, Any]] = []
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, f"shard-{self.index:05d}.{self.file_format}")
+
+    def write(self, row: Dict[str, Any]) -> None:
+        if self.file_format == "parquet":
+            self._buffer.append(row)
+        else:
+            if self._file is None:
+                self._file = open(f"{self.path}.part", "w")
+            self._file.write(json.dumps(row, default=str) + "\n")
+        self.rows += 1
+
+    def close(self) -> Optional[Dict[str, Any]]:
+        """Finish the current shard. Returns its checkpoint entry (None if empty)."""
+        if not self.rows:
+            return None
+        if self.file_format == "parquet":
+            self._write_parquet(f"{self.path}.part")
+            self._buffer = []
+        else:
+            self._file.close()
+            self._file = None
+        os.replace(f"{self.path}.part", self.path)
+        shard = {"file": os.path.basename(self.path), "rows": self.rows, "loaded": False}
+        self.index += 1
+        self.rows = 0
+        return shard
+
+    def _write_parquet(self, path: str) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        fields = []
+        for column in self.schema:
+            if column.field_type == "TIMESTAMP":
+                fields.append(pa.field(column.name, pa.timestamp("us", tz="UTC")))
+                for row in self._buffer:
+                    if isinstance(row.get(column.name), str):
+                        row[column.name] = datetime.fromisoformat(row[column.name])
+            else:
+                fields.append(pa.field(column.name, pa.type_for_alias(_ARROW_TYPES[column.field_type])))
+        pq.write_table(pa.Table.from_pylist(self._buffer, schema=pa.schema(fields)), path)
+
+
+def load_checkpoint(directory: str) -> Optional[Dict[str, Any]]:
+    path = os.path.join(directory, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(directory: str, checkpoint: Dict[str, Any]) -> None:
+    path = os.path.join(directory, CHECKPOINT_FILE)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def new_checkpoint(directory: str, collection: str, user_id: Optional[str],
+                   since: Optional[datetime], sources: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Start a run reading `sources` (see `read_sources`), removing the shards of the previous one."""
+    for name in os.listdir(directory):
+        if name.startswith("shard-"):
+            os.remove(os.path.join(directory, name))
+    now = datetime.now(timezone.utc)
+    return {
+        "collection": collection,
+        "user_id": user_id,
+        "run_id": f"{now:%Y%m%d%H%M%S}_{uuid.uuid4().hex[:6]}",
+        "started_at": now.isoformat(),
+        "mode": "incremental" if since else "full",
+        "since": since.isoformat() if since else None,
+        # Firestore range filters match one type; timestamps written by the
+        # frontend are ISO strings, so incremental runs read both
+        "passes": [
+            {"name": name, "source": source, "cursor": None, "done": False}
+            for source in sources
+            for name in (["timestamp", "string"] if since else ["all"])
+        ],
+        "done": False,
+        "shards": [],
+    }
+
+
+def scope_directory(workdir: str, user_id: Optional[str], dry_run: bool) -> str:
+    root = os.path.join(workdir, "dry-run") if dry_run else workdir
+    return os.path.join(root, f"user-{user_id}" if user_id else "all")
+
+
+def iso_string(value: datetime) -> str:
+    """`value` the way JavaScript's toISOString() writes it."""
+    value = value.astimezone(timezone.utc)
+    return f"{value:%Y-%m-%dT%H:%M:%S}.{value.microsecond // 1000:03d}Z"
+
+
+def read_sources(export: CollectionExport, db, user_id: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    Collections or collection groups to read, each optionally limited to a
+    batch of note ids.
+
+    Documents without a user field (note chunks) are scoped to a user by
+    `note_id in` batches of the user's note ids, or, for note subcollections,
+    by reading each of the user's notes/{note_id}/<group> collections. The
+    sources are fixed when the run starts and kept in its checkpoint, so a
+    resumed run reads the same ones.
+    """
+    roots = [{"group": group} for group in export.collection_groups] or [{"collection": export.name}]
+    if not user_id or export.user_field:
+        return roots
+    notes = db.collection("notes").where("user_id", "==", user_id).select([])
+    note_ids = sorted(doc.id for doc in notes.stream())
+    print(f"  [{export.name}] User {user_id} has {len(note_ids)} notes")
+    batches = [note_ids[i:i + IN_QUERY_LIMIT] for i in range(0, len(note_ids), IN_QUERY_LIMIT)]
+    sources = []
+    for root in roots:
+        if root.get("group") in export.note_subcollections:
+            sources += [{"collection": f"notes/{note_id}/{root['group']}", "note_id": note_id} for note_id in note_ids]
+        else:
+            sources += [{**root, "note_ids": batch} for batch in batches]
+    return sources
+
+
+def source_note_ids(source: Dict[str, Any]) -> List[str]:
+    """Note ids a read source is limited to (empty: not limited by note)."""
+    return [source["note_id"]] if "note_id" in source else source.get("note_ids", [])
+
+
+def pass_query(export: CollectionExport, db, user_id: Optional[str], checkpoint: Dict[str, Any],
+               read_pass: Dict[str, Any]):
+    """Query for one read pass, and the field it is ordered by (None: document path only)."""
+    source, name = read_pass["source"], read_pass["name"]
+    query = db.collection_group(source["group"]) if "group" in source else db.collection(source["collection"])
+    if source.get("note_ids"):
+        query = query.where("note_id", "in", source["note_ids"])
+    if user_id and export.user_field:
+        query = query.where(export.user_field, "==", user_id)
+    if name == "all":
+        return query, None
+    since = datetime.fromisoformat(checkpoint["since"])
+    bound = since if name == "timestamp" else iso_string(since)
+    return query.where(export.watermark_field, ">", bound).order_by(export.watermark_field), export.watermark_field
+
+
+def doc_cursor(doc, order_field: Optional[str]) -> Dict[str, Any]:
+    """JSON cursor for the checkpoint."""
+    # Collection-group cursors need the full path; ids repeat across parents
+    if order_field is None:
+        return {"path": doc.reference.path}
+    value = doc.get(order_field)
+    return {"path": doc.reference.path, "value": value.isoformat() if isinstance(value, datetime) else value}
+
+
+def paginate(db, query, order_field: Optional[str], cursor: Optional[Dict[str, Any]], page_size: int,
+             timestamps: bool = False) -> Iterator[Any]:
+    """Stream `query` page by page in (`order_field`, document path) order, after `cursor`."""
+    query = query.order_by("__name__")
+    while True:
+        page = query
+        if cursor:
+            values = {"__name__": db.document(cursor["path"])}
+            if order_field:
+                values[order_field] = datetime.fromisoformat(cursor["value"]) if timestamps else cursor["value"]
+            page = query.start_after(values)
+        documents = list(page.limit(page_size).stream())
+        yield from documents
+        if len(documents) < page_size:
+            return
+        cursor = doc_cursor(documents[-1], order_field)
+
+
+# =============================================================================
+# BigQuery
+# =============================================================================
 
 def create_dataset_if_not_exists(client: bigquery.Client, dataset_id: str, project_id: str):
     """Create BigQuery dataset if it doesn't exist."""
@@ -35,279 +548,342 @@ def create_dataset_if_not_exists(client: bigquery.Client, dataset_id: str, proje
 
 def create_tables_if_not_exist(client: bigquery.Client, dataset_ref: str):
     """Create BigQuery tables if they don't exist."""
-    
-    # Notes table
-    notes_schema = [
-        bigquery.SchemaField("id", "STRING", mode="REQUIRED"),
-        bigquery.SchemaField("user_id", "STRING", mode="REQUIRED"),
-        bigquery.SchemaField("title", "STRING"),
-        bigquery.SchemaField("word_count", "INTEGER"),
-        bigquery.SchemaField("folder_id", "STRING"),
-        bigquery.SchemaField("created_at", "TIMESTAMP"),
-        bigquery.SchemaField("updated_at", "TIMESTAMP"),
-    ]
-    create_table(client, dataset_ref, "notes", notes_schema)
-    
-    # Flashcards table
-    flashcards_schema = [
-        bigquery.SchemaField("id", "STRING", mode="REQUIRED"),
-        bigquery.SchemaField("user_id", "STRING", mode="REQUIRED"),
-        bigquery.SchemaField("note_id", "STRING"),
-        bigquery.SchemaField("category", "STRING"),
-        bigquery.SchemaField("status", "STRING"),
-        bigquery.SchemaField("created_at", "TIMESTAMP"),
-        bigquery.SchemaField("next_due_at", "TIMESTAMP"),
-        bigquery.SchemaField("interval", "INTEGER"),
-        bigquery.SchemaField("ease_factor", "FLOAT"),
-    ]
-    create_table(client, dataset_ref, "flashcards", flashcards_schema)
-    
-    # Flashcard reviews table
-    reviews_schema = [
-        bigquery.SchemaField("id", "STRING", mode="REQUIRED"),
-        bigquery.SchemaField("flashcard_id", "STRING", mode="REQUIRED"),
-        bigquery.SchemaField("user_id", "STRING", mode="REQUIRED"),
-        bigquery.SchemaField("rating", "INTEGER"),
-        bigquery.SchemaField("reviewed_at", "TIMESTAMP"),
-        bigquery.SchemaField("scheduled_interval", "INTEGER"),
-    ]
-    create_table(client, dataset_ref, "flashcard_reviews", reviews_schema)
-    
-    # Note chunks table (optional)
-    chunks_schema = [
-        bigquery.SchemaField("id", "STRING", mode="REQUIRED"),
-        bigquery.SchemaField("note_id", "STRING", mode="REQUIRED"),
-        bigquery.SchemaField("chunk_index", "INTEGER"),
-        bigquery.SchemaField("content_preview", "STRING"),
-        bigquery.SchemaField("created_at", "TIMESTAMP"),
-    ]
-    create_table(client, dataset_ref, "note_chunks", chunks_schema)
+    for export in EXPORTS.values():
+        create_table(client, dataset_ref, export.name, export.schema)
+    create_table(client, dataset_ref, WATERMARKS_TABLE, WATERMARKS_SCHEMA)
 
 
 def create_table(client: bigquery.Client, dataset_ref: str, table_name: str, schema: List[bigquery.SchemaField]):
-    """Create a single table if it doesn't exist."""
+    """Create a single table if it doesn't exist, or add the columns it lacks."""
     table_ref = f"{dataset_ref}.{table_name}"
     try:
-        client.get_table(table_ref)
-        print(f"✓ Table {table_name} already exists")
+        table = client.get_table(table_ref)
     except Exception:
         table = bigquery.Table(table_ref, schema=schema)
         table = client.create_table(table)
         print(f"✓ Created table {table_name}")
+        return
+    existing = {field.name for field in table.schema}
+    missing = [field for field in schema if field.name not in existing]
+    if missing:
+        # MERGE names every column, so older tables need the new ones first
+        table.schema = list(table.schema) + missing
+        client.update_table(table, ["schema"])
+        print(f"✓ Table {table_name}: added {', '.join(field.name for field in missing)}")
+    else:
+        print(f"✓ Table {table_name} already exists")
 
 
-def export_notes(db, bq_client, dataset_ref: str, user_id: Optional[str] = None, dry_run: bool = False) -> int:
-    """Export notes collection to BigQuery."""
-    print("\n📝 Exporting notes...")
-    
-    query = db.collection("notes")
-    if user_id:
-        query = query.where("user_id", "==", user_id)
-    
-    rows = []
-    for doc in query.stream():
-        data = doc.to_dict()
-        
-        # Calculate word count
-        content_zh = data.get("content_md_zh", "")
-        content_en = data.get("content_md_en", "")
-        word_count = len(content_zh.split()) + len(content_en.split())
-        
-        row = {
-            "id": doc.id,
-            "user_id": data.get("user_id"),
-            "title": data.get("title", ""),
-            "word_count": word_count,
-            "folder_id": data.get("folder_id"),
-            "created_at": convert_timestamp(data.get("created_at")),
-            "updated_at": convert_timestamp(data.get("updated_at")),
-        }
-        rows.append(row)
-    
-    if dry_run:
-        print(f"  [DRY RUN] Would insert {len(rows)} notes")
-        if rows:
-            print(f"  Sample: {rows[0]}")
+def job_id(checkpoint: Dict[str, Any], step: str) -> str:
+    """Deterministic per run and step, so a retried step finds its earlier job."""
+    scope = checkpoint["user_id"] or "all"
+    return re.sub(r"[^A-Za-z0-9_-]", "_", f"export_{checkpoint['collection']}_{scope}_{checkpoint['run_id']}_{step}")
+
+
+def run_job(bq_client: bigquery.Client, job_id: str, submit: Callable[[], Any]) -> Any:
+    """Submit a job, or wait for the one an interrupted run already submitted."""
+    try:
+        job = submit()
+    except Conflict:
+        job = bq_client.get_job(job_id)
+    return job.result()
+
+
+def staging_intact(bq_client: bigquery.Client, staging_ref: str, checkpoint: Dict[str, Any]) -> bool:
+    """True if the staging table holds exactly the rows of the shards the checkpoint loaded."""
+    loaded = sum(shard["rows"] for shard in checkpoint["shards"] if shard["loaded"])
+    try:
+        table = bq_client.get_table(staging_ref)
+    except NotFound:
+        return loaded == 0
+    return table.num_rows == loaded
+
+
+def load_shard(bq_client: bigquery.Client, path: str, staging_ref: str, schema, job_id: str) -> None:
+    """Append one shard to the staging table with a load job."""
+    if path.endswith(".parquet"):
+        config = bigquery.LoadJobConfig(source_format=bigquery.SourceFormat.PARQUET)
     else:
-        if rows:
-            table_ref = f"{dataset_ref}.notes"
-            errors = bq_client.insert_rows_json(table_ref, rows)
-            if errors:
-                print(f"  ❌ Errors: {errors}")
-            else:
-                print(f"  ✓ Inserted {len(rows)} notes")
-        else:
-            print(f"  ⚠ No notes found")
-    
-    return len(rows)
-
-
-def export_flashcards(db, bq_client, dataset_ref: str, user_id: Optional[str] = None, dry_run: bool = False) -> int:
-    """Export flashcards collection to BigQuery."""
-    print("\n🎴 Exporting flashcards...")
-    
-    query = db.collection("flashcards")
-    if user_id:
-        query = query.where("user_id", "==", user_id)
-    
-    rows = []
-    for doc in query.stream():
-        data = doc.to_dict()
-        
-        # Skip if user_id is missing (required field in BigQuery)
-        if not data.get("user_id"):
-            continue
-            
-        row = {
-            "id": doc.id,
-            "user_id": data.get("user_id"),
-            "note_id": data.get("note_id"),
-            "category": data.get("category", "vocabulary"),
-            "status": data.get("status", "new"),
-            "created_at": convert_timestamp(data.get("created_at")),
-            "next_due_at": convert_timestamp(data.get("next_review")),
-            "interval": data.get("interval", 0),
-            "ease_factor": data.get("ease_factor", 2.5),
-        }
-        rows.append(row)
-    
-    if dry_run:
-        print(f"  [DRY RUN] Would insert {len(rows)} flashcards")
-        if rows:
-            print(f"  Sample: {rows[0]}")
+        config = bigquery.LoadJobConfig(source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON, schema=schema)
+    config.write_disposition = bigquery.WriteDisposition.WRITE_APPEND
+
+    def submit():
+        with open(path, "rb") as f:
+            return bq_client.load_table_from_file(f, staging_ref, job_id=job_id, job_config=config)
+
+    run_job(bq_client, job_id, submit)
+
+
+def publish(bq_client: bigquery.Client, export: CollectionExport, staging_ref: str, target_ref: str,
+            user_id: Optional[str], job_id: str, note_ids: Optional[List[str]] = None) -> None:
+    """Replace the target table with the staging table (with --user-id, only that user's rows)."""
+    if user_id is None:
+        config = bigquery.CopyJobConfig(write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE)
+        run_job(bq_client, job_id, lambda: bq_client.copy_table(
+            staging_ref, target_ref, job_id=job_id, job_config=config
+        ))
+        return
+    if export.user_field:
+        scope = f"`{export.user_field}` = @user_id"
     else:
-        if rows:
-            table_ref = f"{dataset_ref}.flashcards"
-            errors = bq_client.insert_rows_json(table_ref, rows)
-            if errors:
-                print(f"  ❌ Errors: {errors}")
+        scope = "note_id IN UNNEST(@note_ids)"
+    columns = ", ".join(f"`{field.name}`" for field in export.schema)
+    sql = f"""
+        BEGIN TRANSACTION;
+        DELETE FROM `{target_ref}` WHERE {scope};
+        INSERT INTO `{target_ref}` ({columns}) SELECT {columns} FROM `{staging_ref}`;
+        COMMIT TRANSACTION;
+    """
+    config = bigquery.QueryJobConfig(query_parameters=[
+        bigquery.ScalarQueryParameter("user_id", "STRING", user_id),
+        bigquery.ArrayQueryParameter("note_ids", "STRING", note_ids or []),
+    ])
+    run_job(bq_client, job_id, lambda: bq_client.query(sql, job_config=config, job_id=job_id))
+
+
+def merge(bq_client: bigquery.Client, export: CollectionExport, staging_ref: str, target_ref: str, job_id: str) -> None:
+    """Upsert the staging table into the target by id (latest version of each document wins)."""
+    columns = [f"`{field.name}`" for field in export.schema]
+    sql = f"""
+        MERGE `{target_ref}` T
+        USING (
+            SELECT * EXCEPT(_version) FROM (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY id ORDER BY `{export.watermark_field}` DESC
+                ) AS _version
+                FROM `{staging_ref}`
+            )
+            WHERE _version = 1
+        ) S
+        ON T.id = S.id
+        WHEN MATCHED THEN
+            UPDATE SET {", ".join(f"{column} = S.{column}" for column in columns if column != "`id`")}
+        WHEN NOT MATCHED THEN
+            INSERT ({", ".join(columns)}) VALUES ({", ".join(f"S.{column}" for column in columns)})
+    """
+    run_job(bq_client, job_id, lambda: bq_client.query(sql, job_id=job_id))
+
+
+WATERMARKS_SCHEMA = [
+    bigquery.SchemaField("collection", "STRING", mode="REQUIRED"),
+    bigquery.SchemaField("scope", "STRING", mode="REQUIRED"),
+    bigquery.SchemaField("watermark", "TIMESTAMP", mode="REQUIRED"),
+    bigquery.SchemaField("run_id", "STRING"),
+    bigquery.SchemaField("updated_at", "TIMESTAMP"),
+]
+
+
+class BigQueryWatermarks:
+    """Export watermarks in the `export_watermarks` table, one row per collection and scope."""
+
+    def __init__(self, bq_client: bigquery.Client, dataset_ref: str):
+        self.client = bq_client
+        self.table_ref = f"{dataset_ref}.{WATERMARKS_TABLE}"
+
+    @staticmethod
+    def _parameters(collection: str, scope: str, *extra) -> bigquery.QueryJobConfig:
+        return bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ScalarQueryParameter("collection", "STRING", collection),
+            bigquery.ScalarQueryParameter("scope", "STRING", scope),
+            *extra,
+        ])
+
+    def get(self, collection: str, scope: str) -> Optional[datetime]:
+        rows = list(self.client.query(
+            f"SELECT watermark FROM `{self.table_ref}` WHERE collection = @collection AND scope = @scope",
+            job_config=self._parameters(collection, scope),
+        ).result())
+        return rows[0].watermark if rows else None
+
+    def set(self, collection: str, scope: str, watermark: datetime, run_id: str) -> None:
+        sql = f"""
+            MERGE `{self.table_ref}` T
+            USING (SELECT @collection AS collection, @scope AS scope) S
+            ON T.collection = S.collection AND T.scope = S.scope
+            WHEN MATCHED THEN
+                UPDATE SET watermark = GREATEST(T.watermark, @watermark), run_id = @run_id,
+                           updated_at = CURRENT_TIMESTAMP()
+            WHEN NOT MATCHED THEN
+                INSERT (collection, scope, watermark, run_id, updated_at)
+                VALUES (@collection, @scope, @watermark, @run_id, CURRENT_TIMESTAMP())
+        """
+        self.client.query(sql, job_config=self._parameters(
+            collection, scope,
+            bigquery.ScalarQueryParameter("watermark", "TIMESTAMP", watermark),
+            bigquery.ScalarQueryParameter("run_id", "STRING", run_id),
+        )).result()
+
+
+class LocalWatermarks:
+    """Export watermarks in a JSON file (dry runs)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, str]:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path) as f:
+            return json.load(f)
+
+    def get(self, collection: str, scope: str) -> Optional[datetime]:
+        with self._lock:
+            value = self._read().get(f"{scope}/{collection}")
+        return datetime.fromisoformat(value) if value else None
+
+    def set(self, collection: str, scope: str, watermark: datetime, run_id: str) -> None:
+        with self._lock:
+            watermarks = self._read()
+            key = f"{scope}/{collection}"
+            if key not in watermarks or datetime.fromisoformat(watermarks[key]) < watermark:
+                watermarks[key] = watermark.isoformat()
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(f"{self.path}.tmp", "w") as f:
+                json.dump(watermarks, f, indent=2)
+            os.replace(f"{self.path}.tmp", self.path)
+
+
+# =============================================================================
+# Export
+# =============================================================================
+
+def export_collection(
+    export: CollectionExport,
+    db,
+    bq_client: Optional[bigquery.Client],
+    dataset_ref: Optional[str],
+    workdir: str,
+    user_id: Optional[str] = None,
+    dry_run: bool = False,
+    file_format: str = "ndjson",
+    shard_rows: int = DEFAULT_SHARD_ROWS,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    fresh: bool = False,
+    watermarks: Any = None,
+    incremental: bool = False,
+    lookback: timedelta = timedelta(hours=DEFAULT_LOOKBACK_HOURS),
+) -> int:
+    """
+    Export one collection, resuming an interrupted run from its checkpoint.
+
+    Args:
+        watermarks: BigQueryWatermarks or LocalWatermarks; advanced when the run finishes
+        incremental: Read only documents changed since the stored watermark
+            (minus `lookback`) and MERGE them into the target
+
+    Returns:
+        Number of rows exported
+    """
+    directory = os.path.join(scope_directory(workdir, user_id, dry_run), export.name)
+    scope = os.path.basename(os.path.dirname(directory))
+    os.makedirs(directory, exist_ok=True)
+    staging_name = lambda checkpoint: f"{dataset_ref}.{export.name}__export_{checkpoint['run_id']}"
+
+    def start_run() -> Dict[str, Any]:
+        since = None
+        if incremental:
+            watermark = watermarks.get(export.name, scope)
+            if watermark is None:
+                print(f"  [{export.name}] No watermark yet: exporting in full")
             else:
-                print(f"  ✓ Inserted {len(rows)} flashcards")
-        else:
-            print(f"  ⚠ No flashcards found")
-    
-    return len(rows)
-
-
-def export_flashcard_reviews(db, bq_client, dataset_ref: str, user_id: Optional[str] = None, dry_run: bool = False) -> int:
-    """Export flashcard reviews collection to BigQuery."""
-    print("\n📊 Exporting flashcard reviews...")
-    
-    query = db.collection("flashcard_reviews")
-    if user_id:
-        query = query.where("user_id", "==", user_id)
-    
-    rows = []
-    for doc in query.stream():
-        data = doc.to_dict()
-        row = {
-            "id": doc.id,
-            "flashcard_id": data.get("flashcard_id"),
-            "user_id": data.get("user_id"),
-            "rating": data.get("rating"),
-            "reviewed_at": convert_timestamp(data.get("reviewed_at")),
-            "scheduled_interval": data.get("scheduled_interval", 0),
-        }
-        rows.append(row)
-    
-    if dry_run:
-        print(f"  [DRY RUN] Would insert {len(rows)} reviews")
-        if rows:
-            print(f"  Sample: {rows[0]}")
+                since = watermark - lookback
+        checkpoint = new_checkpoint(directory, export.name, user_id, since, read_sources(export, db, user_id))
+        save_checkpoint(directory, checkpoint)
+        if since:
+            print(f"  [{export.name}] Reading {export.watermark_field} > {since.isoformat()}")
+        return checkpoint
+
+    checkpoint = load_checkpoint(directory)
+    if checkpoint is None or checkpoint["done"] or fresh:
+        checkpoint = start_run()
+    elif not dry_run and not staging_intact(bq_client, staging_name(checkpoint), checkpoint):
+        # Loaded shards are deleted locally, so their rows only live in staging
+        print(f"  [{export.name}] Staging table of run {checkpoint['run_id']} expired or is incomplete: "
+              f"starting over")
+        checkpoint = start_run()
     else:
-        if rows:
-            table_ref = f"{dataset_ref}.flashcard_reviews"
-            errors = bq_client.insert_rows_json(table_ref, rows)
-            if errors:
-                print(f"  ❌ Errors: {errors}")
-            else:
-                print(f"  ✓ Inserted {len(rows)} reviews")
-        else:
-            print(f"  ⚠ No reviews found")
-    
-    return len(rows)
-
-def export_note_chunks(db, bq_client, dataset_ref: str, user_id: Optional[str] = None, dry_run: bool = False) -> int:
-    """Export note chunks collection (for RAG) to BigQuery."""
-    print("\n🧩 Exporting note chunks...")
-
-    # If a user filter is provided, precompute that user's note ids for filtering
-    allowed_note_ids = None
-    if user_id:
-        allowed_note_ids = set()
-        for note_doc in db.collection("notes").where("user_id", "==", user_id).stream():
-            allowed_note_ids.add(note_doc.id)
-        print(f"  User {user_id} has {len(allowed_note_ids)} notes for chunk export")
-
-    rows = []
-    for doc in db.collection("note_chunks").stream():
-        data = doc.to_dict()
-
-        # Try to resolve note_id from document data or path
-        note_id = data.get("note_id")
-        if not note_id:
-            try:
-                # Handles nested path like notes/{note_id}/chunks/{chunk_id}
-                note_id = doc.reference.parent.parent.id if doc.reference.parent and doc.reference.parent.parent else None
-            except Exception:
-                note_id = None
-
-        if not note_id:
-            # Skip records we can't associate to a note
+        print(f"  [{export.name}] Resuming {checkpoint['mode']} run {checkpoint['run_id']} "
+              f"({len(checkpoint['shards'])} shards written)")
+
+    staging_ref = staging_name(checkpoint)
+    if not dry_run:
+        staging = bigquery.Table(staging_ref, schema=export.schema)
+        staging.expires = datetime.now(timezone.utc) + STAGING_EXPIRATION
+        table = bq_client.create_table(staging, exists_ok=True)
+        table.expires = staging.expires  # A resumed run gets a full day again
+        bq_client.update_table(table, ["expires"])
+
+    def load_pending():
+        for shard in checkpoint["shards"]:
+            if dry_run or shard["loaded"]:
+                continue
+            path = os.path.join(directory, shard["file"])
+            load_shard(bq_client, path, staging_ref, export.schema, job_id(checkpoint, shard["file"].split(".")[0]))
+            shard["loaded"] = True
+            save_checkpoint(directory, checkpoint)
+            os.remove(path)
+            print(f"  [{export.name}] Loaded {shard['file']} ({shard['rows']} rows)")
+
+    load_pending()  # Shards written before an interruption
+
+    writer = ShardWriter(directory, export.schema, file_format, first_index=len(checkpoint["shards"]))
+
+    for read_pass in checkpoint["passes"]:
+        if read_pass["done"]:
             continue
-
-        if allowed_note_ids is not None and note_id not in allowed_note_ids:
-            continue
-
-        content_preview = data.get("content_preview")
-        if not content_preview:
-            # Fall back to a shortened content field if present
-            content_preview = (data.get("content") or "")[:200]
-
-        row = {
-            "id": doc.id,
-            "note_id": note_id,
-            "chunk_index": data.get("chunk_index", 0),
-            "content_preview": content_preview,
-            "created_at": convert_timestamp(data.get("created_at")),
-        }
-        rows.append(row)
-
+        query, order_field = pass_query(export, db, user_id, checkpoint, read_pass)
+
+        def finish_shard(done: bool):
+            shard = writer.close()
+            if shard:
+                checkpoint["shards"].append(shard)
+            read_pass["done"] = done
+            save_checkpoint(directory, checkpoint)
+            load_pending()
+
+        documents = paginate(
+            db, query, order_field, read_pass["cursor"], page_size, timestamps=read_pass["name"] == "timestamp"
+        )
+        for doc in documents:
+            row = export.to_row(doc)
+            read_pass["cursor"] = doc_cursor(doc, order_field)
+            if row is None:
+                continue
+            writer.write(row)
+            if writer.rows >= shard_rows:
+                finish_shard(done=False)
+        finish_shard(done=True)
+
+    total = sum(shard["rows"] for shard in checkpoint["shards"])
     if dry_run:
-        print(f"  [DRY RUN] Would insert {len(rows)} note chunks")
-        if rows:
-            print(f"  Sample: {rows[0]}")
+        print(f"  [{export.name}] [DRY RUN] Would load {total} rows from "
+              f"{len(checkpoint['shards'])} shards in {directory}")
+        if checkpoint["shards"]:
+            with open(os.path.join(directory, checkpoint["shards"][0]["file"]), "rb") as f:
+                if checkpoint["shards"][0]["file"].endswith(".ndjson"):
+                    print(f"  [{export.name}] Sample: {f.readline().decode().strip()}")
     else:
-        if rows:
-            table_ref = f"{dataset_ref}.note_chunks"
-            errors = bq_client.insert_rows_json(table_ref, rows)
-            if errors:
-                print(f"  ❌ Errors: {errors}")
-            else:
-                print(f"  ✓ Inserted {len(rows)} note chunks")
+        target_ref = f"{dataset_ref}.{export.name}"
+        if checkpoint["mode"] == "incremental":
+            merge(bq_client, export, staging_ref, target_ref, job_id(checkpoint, "merge"))
         else:
-            print("  ⚠ No note chunks found")
-
-    return len(rows)
-
-
-def convert_timestamp(ts) -> Optional[str]:
-    """Convert Firestore timestamp to BigQuery-compatible ISO string."""
-    if ts is None:
-        return None
-    
-    if hasattr(ts, 'timestamp'):
-        # Firestore timestamp
-        return datetime.fromtimestamp(ts.timestamp()).isoformat()
-    elif isinstance(ts, datetime):
-        return ts.isoformat()
-    elif isinstance(ts, str):
-        return ts
-    else:
-        return None
-
-
-def main():
+            note_ids = sorted({
+                note_id for read_pass in checkpoint["passes"] for note_id in source_note_ids(read_pass["source"])
+            })
+            publish(bq_client, export, staging_ref, target_ref, user_id, job_id(checkpoint, "publish"), note_ids)
+        bq_client.delete_table(staging_ref, not_found_ok=True)
+        print(f"  [{export.name}] ✓ Published {total} rows ({checkpoint['mode']})")
+
+    # Everything written before the run started has been read
+    if watermarks is not None:
+        watermarks.set(export.name, scope, datetime.fromisoformat(checkpoint["started_at"]), checkpoint["run_id"])
+    checkpoint["done"] = True
+    save_checkpoint(directory, checkpoint)
+    return total
+
+
+def main(argv: Optional[List[str]] = None) -> int:
     parser = argparse.ArgumentParser(description="Export Firestore data to BigQuery")
     parser.add_argument("--user-id", help="Filter by specific user ID")
     parser.add_argument(
@@ -315,56 +891,90 @@ def main():
         default="notes,flashcards,flashcard_reviews,note_chunks",
         help="Comma-separated list of collections to export"
     )
-    parser.add_argument("--dry-run", action="store_true", help="Preview data without inserting")
+    parser.add_argument("--dry-run", action="store_true", help="Write shards locally without loading them")
     parser.add_argument("--env", default="local.lab", help="Environment (e.g., local.lab)")
-    
-    args = parser.parse_args()
-    
+    parser.add_argument("--workdir", default=DEFAULT_WORKDIR, help="Shards and checkpoints")
+    parser.add_argument("--format", dest="file_format", choices=["ndjson", "parquet"], default="ndjson",
+                        help="Shard file format (parquet needs pyarrow)")
+    parser.add_argument("--shard-rows", type=int, default=DEFAULT_SHARD_ROWS, help="Rows per shard / load job")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="Documents per Firestore read")
+    parser.add_argument("--workers", type=int, default=4, help="Collections exported in parallel")
+    parser.add_argument("--fresh", action="store_true", help="Discard unfinished runs instead of resuming")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Export only documents changed since the last run and MERGE them by id")
+    parser.add_argument("--lookback-hours", type=float, default=DEFAULT_LOOKBACK_HOURS,
+                        help="Re-read window before the watermark, for late writes")
+    parser.add_argument("--local-source", help="JSON file to read instead of Firestore (dry runs)")
+
+    args = parser.parse_args(argv)
+
     # Set ENV environment variable
     os.environ["ENV"] = args.env.replace("local.", "")
-    
-    # Load settings
-    settings = get_settings()
-    
+
+    collections = [c.strip() for c in args.collections.split(",") if c.strip()]
+    unknown = [c for c in collections if c not in EXPORTS]
+    if unknown:
+        parser.error(f"unknown collections: {', '.join(unknown)} (choose from {', '.join(EXPORTS)})")
+    # Checked up front: shards are only written after Firestore has been read
+    if args.file_format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        parser.error("--format parquet needs pyarrow (pip install pyarrow), or use --format ndjson")
+
     # Initialize clients
     print("🔧 Initializing clients...")
-    db = get_firestore_client()
-    
-    bq_project = settings.bigquery_project_id or settings.firebase_project_id
-    bq_client = bigquery.Client(project=bq_project)
-    
-    print(f"  BigQuery Project: {bq_project}")
-    print(f"  Dataset: {settings.bigquery_dataset_id}")
-    if args.user_id:
-        print(f"  User Filter: {args.user_id}")
-    
-    dataset_ref = f"{bq_project}.{settings.bigquery_dataset_id}"
-    
-    # Create dataset and tables
+    if args.local_source:
+        db = LocalFirestore.from_file(args.local_source)
+        print(f"  Firestore: {args.local_source} (local)")
+    else:
+        from app.core.firebase import get_firestore_client
+        db = get_firestore_client()
+
+    bq_client = dataset_ref = None
     if not args.dry_run:
+        settings = get_settings()
+        bq_project = settings.bigquery_project_id or settings.firebase_project_id
+        bq_client = bigquery.Client(project=bq_project)
+        dataset_ref = f"{bq_project}.{settings.bigquery_dataset_id}"
+        print(f"  BigQuery Project: {bq_project}")
+        print(f"  Dataset: {settings.bigquery_dataset_id}")
         create_dataset_if_not_exists(bq_client, settings.bigquery_dataset_id, bq_project)
         create_tables_if_not_exist(bq_client, dataset_ref)
-    
+        watermarks = BigQueryWatermarks(bq_client, dataset_ref)
+    else:
+        watermarks = LocalWatermarks(os.path.join(args.workdir, "dry-run", "watermarks.json"))
+    if args.user_id:
+        print(f"  User Filter: {args.user_id}")
+
     # Export collections
-    collections = [c.strip() for c in args.collections.split(",")]
-    total_exported = 0
-    
-    if "notes" in collections:
-        total_exported += export_notes(db, bq_client, dataset_ref, args.user_id, args.dry_run)
-    
-    if "flashcards" in collections:
-        total_exported += export_flashcards(db, bq_client, dataset_ref, args.user_id, args.dry_run)
-    
-    if "flashcard_reviews" in collections:
-        total_exported += export_flashcard_reviews(db, bq_client, dataset_ref, args.user_id, args.dry_run)
-
-    if "note_chunks" in collections:
-        total_exported += export_note_chunks(db, bq_client, dataset_ref, args.user_id, args.dry_run)
-    
-    print(f"\n✅ Export complete! Total records: {total_exported}")
+    mode = "incremental" if args.incremental else "full"
+    print(f"\n📦 Exporting {', '.join(collections)} ({mode}, {args.workers} workers)...")
+    results: Dict[str, int] = {}
+    failed: Dict[str, Exception] = {}
+    with ThreadPoolExecutor(max_workers=max(args.workers, 1)) as pool:
+        futures = {
+            name: pool.submit(
+                export_collection, EXPORTS[name], db, bq_client, dataset_ref, args.workdir,
+                user_id=args.user_id, dry_run=args.dry_run, file_format=args.file_format,
+                shard_rows=args.shard_rows, page_size=args.page_size, fresh=args.fresh,
+                watermarks=watermarks, incremental=args.incremental,
+                lookback=timedelta(hours=args.lookback_hours),
+            )
+            for name in collections
+        }
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                failed[name] = e
+                print(f"  [{name}] ❌ Export failed: {e} (re-run to resume)")
+
+    if failed:
+        print(f"\n❌ Export incomplete: {', '.join(failed)} failed")
+        return 1
+    print(f"\n✅ Export complete! Total records: {sum(results.values())}")
     if args.dry_run:
         print("   (Dry run - no data was actually inserted)")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Update the interval model online from new reviews.
+
+Polls new reviews (Firestore `flashcard_reviews`, or a local JSONL event log)
+in mini-batches and feeds them to app.services.online_learning.OnlineLearner.
+After each mini-batch the learner is published to the artifact
+MLPredictionService loads, unless it scores worse than the served model on
+the holdout. The learner, its holdout and the source cursor are saved after
+every mini-batch, so the script can be stopped and restarted at any time.
+
+The served artifact must be a joblib file. Point the API and this script at
+the same path, e.g. ML_MODEL_PATH=local_model_artifacts/online/model.joblib
+(a compiled model directory, the default when one exists, is rejected).
+
+Event log lines (--event-log) look like:
+    {"review_id": "r1", "features": {"category": "code", "word_count": 4, ...}, "scheduled_interval": 6}
+
+Usage:
+    python scripts/online_learner.py --model-path local_model_artifacts/online/model.joblib
+    python scripts/online_learner.py --event-log reviews.jsonl --once
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import get_settings
+from app.services.model_registry import default_model_path
+from app.services.online_learning import MAX_REGRESSION, MIN_HOLDOUT, EventLogSource, OnlineLearner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update the interval model online from new reviews")
+    parser.add_argument("--model-path", default=get_settings().ml_model_path or default_model_path(),
+                        help="joblib artifact the API serves (ML_MODEL_PATH)")
+    parser.add_argument("--state", default=None, help="Learner state file (default: next to the model)")
+    parser.add_argument("--event-log", default=None, help="Read a JSONL event log instead of Firestore")
+    parser.add_argument("--batch-size", type=int, default=500, help="Reviews per mini-batch")
+    parser.add_argument("--poll-seconds", type=float, default=30, help="Wait when no new reviews")
+    parser.add_argument("--max-regression", type=float, default=MAX_REGRESSION,
+                        help="Holdout accuracy the learner may lose against the served model")
+    parser.add_argument("--min-holdout", type=int, default=MIN_HOLDOUT)
+    parser.add_argument("--replace-incomparable", action="store_true",
+                        help="Replace a served model the holdout cannot score (e.g. a batch model)")
+    parser.add_argument("--once", action="store_true", help="Stop when caught up")
+    args = parser.parse_args()
+
+    if os.path.isdir(args.model_path):
+        sys.exit(f"❌ {args.model_path} is a compiled model; set ML_MODEL_PATH (and --model-path) to a joblib file")
+    os.makedirs(os.path.dirname(os.path.abspath(args.model_path)), exist_ok=True)
+    state_path = args.state or os.path.join(os.path.dirname(os.path.abspath(args.model_path)), "online_learner.joblib")
+
+    if args.event_log:
+        source = EventLogSource(args.event_log)
+    else:
+        from app.core.firebase import get_firestore_client
+        from app.services.online_learning import FirestoreReviewSource
+        source = FirestoreReviewSource(get_firestore_client())
+
+    learner = OnlineLearner.load(state_path)
+    print(f"🧠 Online learner: {learner.model.n_seen} reviews seen, {len(learner.holdout)} held out, "
+          f"publishing to {args.model_path}")
+
+    while True:
+        events, cursor, scanned = source.read(learner.cursor, args.batch_size)
+        if events:
+            result = learner.step(
+                events, args.model_path, args.max_regression, args.min_holdout, args.replace_incomparable
+            )
+            if result.published_version:
+                outcome = f"published {result.published_version}"
+            elif result.incomparable:
+                outcome = "rejected (served model not comparable; see --replace-incomparable)"
+            elif result.rejected:
+                outcome = "rejected (regression)"
+            else:
+                outcome = f"not published (holdout {len(learner.holdout)}/{args.min_holdout})"
+            accuracy = ""
+            if result.learner_accuracy is not None:
+                served = f"{result.served_accuracy:.4f}" if result.served_accuracy is not None else "n/a"
+                accuracy = f", holdout accuracy {result.learner_accuracy:.4f} vs served {served}"
+            print(f"  {result.trained} trained, {result.held_out} held out{accuracy}: {outcome}")
+        learner.cursor = cursor
+        learner.save(state_path)
+
+        # Skipped records count: a page of them is not the end of the source
+        if scanned < args.batch_size:
+            if args.once:
+                break
+            time.sleep(args.poll_seconds)
+
+    print(f"✅ Caught up: {learner.model.n_seen} reviews seen, current version {learner.published_version}")
+
+
+if __name__ == "__main__":
+    main()
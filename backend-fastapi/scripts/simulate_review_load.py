@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Simulate spaced-repetition review load for capacity planning.
+
+Simulates N users x M cards over D days with the scheduling engine used by the
+API (app.services.scheduling), vectorized over every card of every user:
+  - each user adds --new-per-day cards until they own M cards
+  - every due card is reviewed once a day; ratings are drawn from --ratings
+    (Again, Hard, Good, Easy); uniform by default, like
+    scripts/generate_dummy_reviews.py
+  - failed cards (interval 0) come back after 10 minutes, so they are
+    re-reviewed the same day, up to --relearn-steps times
+  - --policy sm2 uses SM-2; --policy ml uses the local model
+    (local_model_artifacts/model.joblib) with SM-2 fallback, like the API
+
+Reports daily review volume, backend QPS (single /review calls and
+/review-batch sessions), and Firestore reads/writes per day based on the
+documents each endpoint touches.
+
+Usage:
+    python scripts/simulate_review_load.py --users 1000 --cards 2000 --days 365
+    python scripts/simulate_review_load.py --policy ml --ratings 0.1,0.15,0.55,0.2 --csv load.csv
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from app.services.scheduling import DEFAULT_EASE, ModelPolicy, ReviewArrays, SM2Policy, SchedulingPolicy, schedule
+
+# Firestore documents touched per review (FlashcardService.review_flashcard):
+# reads card + user_review_stats; writes card, review doc, user_review_stats
+SINGLE_READS, SINGLE_WRITES = 2, 3
+
+# List prices (USD per 100k operations, Firestore standard edition)
+READ_PRICE, WRITE_PRICE = 0.06, 0.18
+
+
+@dataclass
+class DailyLoad:
+    """Per-day series produced by simulate()."""
+    reviews: List[int] = field(default_factory=list)
+    new_cards: List[int] = field(default_factory=list)
+    active_users: List[int] = field(default_factory=list)
+    failed: List[int] = field(default_factory=list)
+
+
+def load_policy(name: str) -> SchedulingPolicy:
+    if name == "sm2":
+        return SM2Policy()
+    import joblib
+    model_path = os.path.join(os.path.dirname(__file__), "..", "local_model_artifacts", "model.joblib")
+    return ModelPolicy(joblib.load(model_path))
+
+
+def simulate(
+    users: int,
+    cards: int,
+    days: int,
+    policy: Optional[SchedulingPolicy] = None,
+    ratings: tuple = (0.25, 0.25, 0.25, 0.25),
+    new_per_day: int = 20,
+    relearn_steps: int = 3,
+    seed: int = 0,
+) -> DailyLoad:
+    """
+    Run the simulation; every array holds one entry per card of every user.
+
+    Returns:
+        Daily review volume and related series
+    """
+    rng = np.random.default_rng(seed)
+    policy = policy or SM2Policy()
+    n = users * cards
+    probabilities = np.asarray(ratings, dtype=np.float64)
+    probabilities = probabilities / probabilities.sum()
+
+    owner = np.repeat(np.arange(users), cards)
+    position = np.tile(np.arange(cards), users)
+    # Card k of a user is added on day k // new_per_day
+    added_on = position // max(new_per_day, 1)
+    due_day = added_on.astype(np.float64)
+    interval = np.zeros(n, dtype=np.int64)
+    ease = np.full(n, DEFAULT_EASE)
+    review_count = np.zeros(n, dtype=np.int64)
+    category = rng.integers(0, 4, n)
+    word_count = rng.integers(2, 40, n)
+    rating_sum = np.zeros(users)
+    rating_total = np.zeros(users)
+
+    load = DailyLoad()
+    for day in range(days):
+        due = np.flatnonzero(due_day <= day)
+        load.new_cards.append(int(np.count_nonzero(added_on == day)))
+        load.active_users.append(int(np.count_nonzero(np.bincount(owner[due], minlength=users))))
+        reviews_today = failed_today = 0
+
+        for _ in range(relearn_steps + 1):
+            if due.size == 0:
+                break
+            rating = rng.choice(4, size=due.size, p=probabilities) + 1
+            totals = rating_total[owner[due]]
+            user_avg = np.where(totals > 0, rating_sum[owner[due]] / np.maximum(totals, 1), 3.0)
+            result = schedule(ReviewArrays(
+                interval=interval[due],
+                ease=ease[due],
+                rating=rating,
+                category=category[due],
+                word_count=word_count[due],
+                review_sequence_number=review_count[due] + 1,
+                user_avg_rating=user_avg,
+            ), policy)
+
+            interval[due] = result.interval
+            ease[due] = result.ease
+            review_count[due] += 1
+            np.add.at(rating_sum, owner[due], rating)
+            np.add.at(rating_total, owner[due], 1)
+            due_day[due] = day + np.maximum(result.interval, 1)
+            reviews_today += due.size
+
+            # Lapsed cards come back in 10 minutes: review them again today
+            lapsed = result.interval == 0
+            failed_today += int(np.count_nonzero(lapsed))
+            due = due[lapsed]
+
+        load.reviews.append(reviews_today)
+        load.failed.append(failed_today)
+    return load
+
+
+def summarize(load: DailyLoad, users: int, batch_size: int, peak_factor: float) -> None:
+    reviews = np.asarray(load.reviews, dtype=np.float64)
+    steady = reviews[-min(30, len(reviews)):]
+    peak_day = reviews.max()
+
+    print(f"\nDaily reviews: mean {reviews.mean():,.0f}, p95 {np.percentile(reviews, 95):,.0f}, "
+          f"max {peak_day:,.0f} (day {int(reviews.argmax())}), last 30 days {steady.mean():,.0f}")
+    print(f"Per user per day (last 30 days): {steady.mean() / users:.1f} reviews")
+    print(f"Lapses (same-day re-reviews): {sum(load.failed) / max(reviews.sum(), 1):.1%} of reviews")
+
+    # QPS: mean over the day, and peak assuming `peak_factor` x the mean rate
+    print("\nBackend load on the busiest day:")
+    for label, calls in (
+        ("POST /review (one call per rating)", peak_day),
+        (f"POST /review-batch ({batch_size} per call)", np.ceil(peak_day / batch_size)),
+    ):
+        mean_qps = calls / 86400
+        print(f"  {label:<40} {calls:12,.0f} calls/day  {mean_qps:8.2f} QPS mean  {mean_qps * peak_factor:8.2f} QPS peak")
+
+    reads_single, writes_single = peak_day * SINGLE_READS, peak_day * SINGLE_WRITES
+    batches = np.ceil(peak_day / batch_size)
+    # Batch: one get_all over the cards + stats; writes cards, review docs, stats once per batch
+    reads_batch, writes_batch = peak_day + batches, 2 * peak_day + batches
+    print("\nFirestore on the busiest day:")
+    for label, reads, writes in (("single reviews", reads_single, writes_single), ("batched reviews", reads_batch, writes_batch)):
+        cost = reads / 100000 * READ_PRICE + writes / 100000 * WRITE_PRICE
+        print(f"  {label:<16} {reads:14,.0f} reads  {writes:14,.0f} writes  ~${cost:,.2f}/day  ~${cost * 30:,.0f}/month")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate spaced-repetition review load")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--cards", type=int, default=1000, help="Cards per user once the deck is complete")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--policy", choices=["sm2", "ml"], default="sm2")
+    parser.add_argument("--ratings", default="0.25,0.25,0.25,0.25", help="Again,Hard,Good,Easy probabilities")
+    parser.add_argument("--new-per-day", type=int, default=20, help="New cards per user per day")
+    parser.add_argument("--relearn-steps", type=int, default=3, help="Same-day re-reviews of lapsed cards")
+    parser.add_argument("--batch-size", type=int, default=20, help="Reviews per /review-batch call")
+    parser.add_argument("--peak-factor", type=float, default=3.0, help="Peak-to-mean request rate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", help="Write the daily series to this CSV file")
+    args = parser.parse_args()
+
+    ratings = tuple(float(p) for p in args.ratings.split(","))
+    if len(ratings) != 4:
+        parser.error("--ratings needs four probabilities")
+
+    policy = load_policy(args.policy)
+    print(f"📊 {args.users} users x {args.cards} cards x {args.days} days, policy={policy.name}, ratings={ratings}")
+
+    start = time.perf_counter()
+    load = simulate(
+        args.users, args.cards, args.days, policy, ratings,
+        new_per_day=args.new_per_day, relearn_steps=args.relearn_steps, seed=args.seed,
+    )
+    elapsed = time.perf_counter() - start
+    card_days = args.users * args.cards * args.days
+    print(f"Simulated {card_days:,} card-days in {elapsed:.2f} s ({card_days / elapsed:,.0f} card-days/s)")
+
+    summarize(load, args.users, args.batch_size, args.peak_factor)
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["day", "reviews", "lapses", "new_cards", "active_users"])
+            for day, row in enumerate(zip(load.reviews, load.failed, load.new_cards, load.active_users)):
+                writer.writerow([day, *row])
+        print(f"\n✓ Daily series written to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
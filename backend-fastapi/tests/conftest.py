@@ -52,12 +52,13 @@ def mock_firestore_global():
     # Patch get_firestore_client in all modules where it is imported
     targets = [
         'app.core.firebase.get_firestore_client',
+        'app.core.firestore_loader.get_firestore_client',
         'app.services.note_service.get_firestore_client',
         'app.services.user_service.get_firestore_client',
         'app.services.flashcard_service.get_firestore_client',
         'app.services.document_service.get_firestore_client',
-        'app.api.chat.get_firestore_client',
-        'app.services.chat_service.get_firestore_client'
+        'app.services.chat_service.get_firestore_client',
+        'app.services.due_queue.get_firestore_client'
     ]
     
     patches = [patch(t) for t in targets]
@@ -256,6 +257,7 @@ def mock_ml_prediction_global():
     try:
         service = AsyncMock()
         service.predict_next_interval.return_value = 12  # Match test expectation
+        service.predict_next_intervals.side_effect = lambda features: [12] * len(features)
         
         for m in mocks:
             m.return_value = service
@@ -292,6 +294,13 @@ def mock_vertex_ai_global():
         yield endpoint
 
 
+@pytest.fixture(autouse=True)
+def reset_profile_cache_global():
+    """Start every test with an empty in-process profile cache"""
+    with patch('app.services.profile_cache._profile_cache', None):
+        yield
+
+
 # =============================================================================
 # OPTIONAL FIXTURES (use when needed)
 # =============================================================================
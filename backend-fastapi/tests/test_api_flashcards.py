@@ -2,7 +2,7 @@
 Integration tests for Flashcards API endpoints.
 """
 import pytest
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
 
 
 class TestFlashcardsAPI:
@@ -76,6 +76,7 @@ class TestFlashcardsAPI:
         assert "sm2_interval" in data
         assert "difference" in data
         assert data["ml_interval"] in [1, 2, 5, 14]  # Valid bucket mappings
+        assert len(data["model_version"]) == 12  # Artifact content hash
     
     def test_generate_flashcards_invalid_count(self, client, auth_headers):
         """Test generating flashcards with invalid count"""
@@ -114,3 +115,56 @@ class TestFlashcardsAPI:
         # Assert
         assert response.status_code == 422  # Validation error
 
+    def test_review_batch_applies_reviews_in_order(
+        self,
+        client,
+        mock_firestore_global,
+        mock_ml_prediction_global
+    ):
+        """Test batch review: per-card ordering, one ML call per round, one commit"""
+        def fake_get_all(refs):
+            for ref in refs:
+                snapshot = MagicMock(exists=True, id=ref.id)
+                snapshot.reference.path = ref.path
+                owner = "someone_else" if ref.id == "card_foreign" else "test_user_123"
+                snapshot.to_dict.return_value = {
+                    "user_id": owner, "term": "AI", "definition": "Artificial Intelligence",
+                    "interval": 0, "ease_factor": 2.5
+                }
+                yield snapshot
+        mock_firestore_global.get_all.side_effect = fake_get_all
+
+        # Act
+        response = client.post(
+            "/api/flashcards/review-batch",
+            json={"reviews": [
+                {"flashcard_id": "card_a", "rating": 3, "reviewed_at": "2025-06-01T10:00:00Z"},
+                {"flashcard_id": "card_b", "rating": 1},
+                {"flashcard_id": "card_a", "rating": 4, "reviewed_at": "2025-06-01T10:05:00Z"},
+                {"flashcard_id": "card_foreign", "rating": 3}
+            ]}
+        )
+
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        assert data["reviewed"] == 3
+        assert [r["success"] for r in data["results"]] == [True, True, True, False]
+        assert data["results"][3]["error"] == "Unauthorized access to flashcard"
+
+        calls = mock_ml_prediction_global.predict_next_intervals.call_args_list
+        assert [len(call.args[0]) for call in calls] == [2, 1]
+        second_review = calls[1].args[0][0]
+        assert second_review["review_sequence_number"] == 2
+        assert second_review["current_interval"] == 12
+        assert mock_firestore_global.batch.return_value.commit.call_count == 1
+
+    def test_recommend_next_uses_card_ease(self, client):
+        """SM-2 estimate honours the card's ease factor"""
+        response = client.post(
+            "/api/flashcards/recommend-next",
+            json={"flashcard_id": "card_123", "rating": 3, "current_interval": 10, "ease_factor": 1.5}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["sm2_interval"] == 15
@@ -2,7 +2,7 @@
 Integration tests for Notes API endpoints.
 """
 import pytest
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
 
 
 class TestNotesAPI:
@@ -170,3 +170,58 @@ class TestNotesAPI:
         
         # Assert
         assert response.status_code == 403  # Forbidden (HTTPBearer auto_error=True)
+
+    def test_list_notes_paginated(self, client, mock_firestore_global):
+        """Test cursor pagination of the metadata-only notes listing"""
+        # Arrange
+        query = mock_firestore_global.collection.return_value.where.return_value
+        query.select.return_value = query
+        query.start_after.return_value = query
+        docs = []
+        for i in range(2):
+            doc = MagicMock()
+            doc.id = f"note_{i}"
+            doc.to_dict.return_value = {"title": f"Note {i}", "word_count": 10}
+            docs.append(doc)
+        query.stream.return_value = docs
+
+        # Act
+        response = client.get("/api/notes/?limit=2&cursor=note_prev")
+
+        # Assert
+        assert response.status_code == 200
+        assert [n["id"] for n in response.json()] == ["note_0", "note_1"]
+        assert "content_md_en" not in response.json()[0]
+        assert response.headers["X-Next-Cursor"] == "note_1"
+        query.start_after.assert_called_once_with({"__name__": "note_prev"})
+        query.limit.assert_called_with(2)
+
+    def test_note_content_etag(self, client, mock_firestore_global):
+        """Test note content endpoint returns 304 for a matching If-None-Match"""
+        # Act
+        first = client.get("/api/notes/note_123/content")
+        second = client.get(
+            "/api/notes/note_123/content",
+            headers={"If-None-Match": first.headers["ETag"]}
+        )
+
+        # Assert
+        assert first.status_code == 200
+        assert first.json()["content_md_en"] == "Test content"
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["ETag"] == first.headers["ETag"]
+
+    def test_note_content_other_user_forbidden(self, client, mock_firestore_global):
+        """Test note content endpoint rejects notes owned by another user"""
+        # Arrange
+        snapshot = MagicMock(exists=True, id="note_123")
+        snapshot.to_dict.return_value = {"user_id": "someone_else", "title": "Private"}
+        mock_firestore_global.collection.return_value.document.side_effect = None
+        mock_firestore_global.collection.return_value.document.return_value.get.return_value = snapshot
+
+        # Act
+        response = client.get("/api/notes/note_123/content")
+
+        # Assert
+        assert response.status_code == 403
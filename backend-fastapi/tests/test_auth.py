@@ -0,0 +1,110 @@
+"""
+Tests for Firebase ID token verification and the verified token cache.
+"""
+import logging
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from app.core import auth as auth_module
+from app.core.auth import VerifiedTokenCache, prefetch_public_certs, verify_firebase_token
+
+
+def _credentials(token: str):
+    creds = MagicMock()
+    creds.credentials = token
+    return creds
+
+
+class TestVerifiedTokenCache:
+    """Test suite for VerifiedTokenCache"""
+
+    def test_hit_returns_cached_user(self):
+        cache = VerifiedTokenCache(max_size=10)
+        cache.put("token_a", "user_a", "a@example.com", time.time() + 3600)
+
+        user = cache.get("token_a")
+
+        assert user is not None
+        assert user.uid == "user_a"
+        assert user.email == "a@example.com"
+
+    def test_expired_entry_is_evicted(self):
+        cache = VerifiedTokenCache(max_size=10)
+        cache.put("token_a", "user_a", None, time.time() + 3600)
+        cache._entries[cache.hash_token("token_a")] = ("user_a", None, time.time() - 1)
+
+        assert cache.get("token_a") is None
+        assert len(cache) == 0
+
+    def test_lru_bound(self):
+        cache = VerifiedTokenCache(max_size=2)
+        exp = time.time() + 3600
+        cache.put("token_a", "user_a", None, exp)
+        cache.put("token_b", "user_b", None, exp)
+        cache.get("token_a")  # token_b becomes least recently used
+        cache.put("token_c", "user_c", None, exp)
+
+        assert len(cache) == 2
+        assert cache.get("token_b") is None
+        assert cache.get("token_a").uid == "user_a"
+
+    def test_raw_token_not_stored(self):
+        cache = VerifiedTokenCache(max_size=10)
+        cache.put("secret_token", "user_a", None, time.time() + 3600)
+
+        assert "secret_token" not in cache._entries
+
+
+class TestVerifyFirebaseToken:
+    """Test suite for verify_firebase_token caching behaviour"""
+
+    @pytest.mark.asyncio
+    async def test_repeat_token_verified_once(self, mock_firebase_auth_global):
+        mock_firebase_auth_global.verify_id_token.return_value = {
+            "uid": "user_a", "email": "a@example.com", "exp": time.time() + 3600
+        }
+
+        with patch("app.core.auth._token_cache", VerifiedTokenCache(max_size=10)):
+            first = await verify_firebase_token(_credentials("token_a"))
+            second = await verify_firebase_token(_credentials("token_a"))
+
+        assert first.uid == second.uid == "user_a"
+        assert mock_firebase_auth_global.verify_id_token.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_check_revoked_bypasses_cache(self, mock_firebase_auth_global):
+        mock_firebase_auth_global.verify_id_token.return_value = {
+            "uid": "user_a", "exp": time.time() + 3600
+        }
+        settings = MagicMock(auth_check_revoked=True)
+
+        with patch("app.core.auth._token_cache", VerifiedTokenCache(max_size=10)), \
+             patch("app.core.auth.get_settings", return_value=settings):
+            await verify_firebase_token(_credentials("token_a"))
+            await verify_firebase_token(_credentials("token_a"))
+
+        assert mock_firebase_auth_global.verify_id_token.call_count == 2
+        mock_firebase_auth_global.verify_id_token.assert_called_with("token_a", check_revoked=True)
+
+
+class TestPrefetchPublicCerts:
+    """Test suite for prefetch_public_certs"""
+
+    def test_warms_firebase_cert_transport(self):
+        request = MagicMock()
+        with patch("app.core.auth._firebase_cert_request", return_value=request):
+            assert prefetch_public_certs() is True
+
+        request.assert_called_once_with(url=auth_module.ID_TOKEN_CERT_URL, method="GET")
+
+    def test_missing_internals_fall_back_and_log_once(self, caplog, monkeypatch):
+        monkeypatch.setattr(auth_module, "_cert_request_fallback_logged", False)
+        with patch("app.core.auth._firebase_cert_request", side_effect=AttributeError("_token_verifier")), \
+             patch("google.auth.transport.requests.Request") as plain_request, \
+             caplog.at_level(logging.WARNING, logger="app.core.auth"):
+            results = [prefetch_public_certs() for _ in range(3)]
+
+        assert results == [True, True, True]
+        assert plain_request.return_value.call_args.kwargs["url"] == auth_module.ID_TOKEN_CERT_URL
+        assert len([r for r in caplog.records if "cert transport" in r.getMessage()]) == 1
+
@@ -0,0 +1,78 @@
+"""
+Tests for tree ensembles compiled to NumPy arrays.
+"""
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+from xgboost import XGBClassifier
+from app.services.compiled_model import CompiledForest, compile_model, is_compiled_artifact
+from app.services.model_registry import ModelRegistry
+
+
+def training_data(classes=3, rows=600, missing=False, seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([
+        rng.integers(0, 4, rows),
+        rng.integers(2, 40, rows),
+        rng.integers(1, 5, rows),
+        rng.uniform(1, 4, rows),
+    ]).astype(np.float32)
+    y = (X[:, 2] + X[:, 0] * (X[:, 1] > 20) + rng.integers(0, 2, rows)).astype(int) % classes
+    if missing:
+        X[rng.random(X.shape) < 0.05] = np.nan
+    return X, y
+
+
+def probe_rows(X, seed=1):
+    """Training rows plus values exactly on the split points (integers)."""
+    rng = np.random.default_rng(seed)
+    on_splits = np.round(X[rng.integers(0, len(X), 2000)] * 2) / 2
+    return np.concatenate([X, on_splits]).astype(np.float32)
+
+
+class TestCompiledModel:
+    """Test suite for compile_model / CompiledForest"""
+
+    @pytest.mark.parametrize("model, classes, missing", [
+        (XGBClassifier(n_estimators=30, max_depth=4), 2, True),
+        (XGBClassifier(n_estimators=20, max_depth=3), 4, False),
+        (RandomForestClassifier(n_estimators=15, max_depth=5, random_state=0), 3, True),
+        (DecisionTreeClassifier(random_state=0), 3, False),  # > 64 leaves: walks the tree
+    ])
+    def test_predictions_match_source_model(self, model, classes, missing):
+        X, y = training_data(classes, missing=missing)
+        model.fit(X, y)
+        compiled = compile_model(model)
+        rows = probe_rows(X)
+
+        np.testing.assert_array_equal(compiled.predict(rows), model.predict(rows))
+        np.testing.assert_allclose(compiled.predict_proba(rows), model.predict_proba(rows), atol=1e-6)
+
+    def test_xgboost_margins_are_bit_identical(self):
+        X, y = training_data(2, missing=True)
+        model = XGBClassifier(n_estimators=50, max_depth=5).fit(X, y)
+        compiled = compile_model(model)
+        rows = probe_rows(X)
+
+        expected = model.predict(rows, output_margin=True)
+        np.testing.assert_array_equal(compiled.decision_function(rows)[:, 0], expected)
+
+    def test_saved_artifact_is_memory_mapped_and_hot_loadable(self, tmp_path):
+        X, y = training_data(2)
+        model = XGBClassifier(n_estimators=10, max_depth=3).fit(X, y)
+        path = str(tmp_path / "model.compiled")
+        compile_model(model, version="abc123").save(path)
+
+        loaded = CompiledForest.load(path)
+        assert is_compiled_artifact(path)
+        assert isinstance(loaded.arrays["threshold"], np.memmap)
+        np.testing.assert_array_equal(loaded.predict(X), model.predict(X))
+
+        registry = ModelRegistry(path)
+        assert registry.reload_if_changed() is True
+        assert registry.current.version == "abc123"
+
+    def test_rejects_unsupported_models(self):
+        with pytest.raises(ValueError):
+            compile_model(object())
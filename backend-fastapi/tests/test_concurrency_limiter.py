@@ -0,0 +1,112 @@
+"""
+Tests for the LLM concurrency admission controller.
+"""
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.core.auth import VerifiedTokenCache
+from starlette.datastructures import Headers
+from app.middleware.concurrency_limiter import ConcurrencyLimiterMiddleware, RedisLeaseSemaphore, client_address
+
+
+@pytest.fixture
+def verified_token():
+    """Token already present in the verified token cache"""
+    cache = VerifiedTokenCache(max_size=10)
+    cache.put("mock_token_123", "test_user_123", "test@example.com", time.time() + 3600)
+    with patch("app.core.auth._token_cache", cache):
+        yield "mock_token_123"
+
+
+class TestRedisLeaseSemaphore:
+    """Test suite for RedisLeaseSemaphore"""
+
+    @pytest.mark.asyncio
+    async def test_local_fallback_enforces_limit(self):
+        with patch("app.middleware.concurrency_limiter.get_cache_service",
+                   return_value=MagicMock(enabled=False)):
+            semaphore = RedisLeaseSemaphore()
+
+        first = await semaphore.acquire("inflight:llm:user_a", limit=2, timeout=0)
+        second = await semaphore.acquire("inflight:llm:user_a", limit=2, timeout=0)
+        third = await semaphore.acquire("inflight:llm:user_a", limit=2, timeout=0)
+
+        assert first and second
+        assert third is None
+
+        await semaphore.release("inflight:llm:user_a", first)
+        assert await semaphore.acquire("inflight:llm:user_a", limit=2, timeout=0)
+
+
+class TestConcurrencyLimiter:
+    """Test suite for ConcurrencyLimiterMiddleware"""
+
+    def test_user_at_cap_gets_429(self, client, verified_token):
+        with patch.object(RedisLeaseSemaphore, "acquire", AsyncMock(return_value=None)):
+            response = client.post(
+                "/api/flashcards/generate",
+                json={"note_id": "note_1", "count": 5},
+                headers={"Authorization": f"Bearer {verified_token}"}
+            )
+
+        assert response.status_code == 429
+        assert response.json()["scope"] == "user"
+        assert response.headers["Retry-After"] == "1"
+
+    def test_lease_released_after_response(self, client, verified_token):
+        with patch.object(RedisLeaseSemaphore, "acquire", AsyncMock(return_value="lease_1")) as acquire, \
+             patch.object(RedisLeaseSemaphore, "release", AsyncMock()) as release:
+            response = client.post(
+                "/api/flashcards/generate",
+                json={"note_id": "note_1", "count": 5},
+                headers={"Authorization": f"Bearer {verified_token}"}
+            )
+
+        assert response.status_code == 200
+        assert acquire.call_args.args[0] == "inflight:llm:test_user_123"
+        release.assert_called_once_with("inflight:llm:test_user_123", "lease_1")
+
+    def test_unverified_token_counts_against_client_address(self, client):
+        with patch.object(RedisLeaseSemaphore, "acquire", AsyncMock(return_value=None)) as acquire:
+            response = client.post(
+                "/api/flashcards/generate",
+                json={"note_id": "note_1", "count": 5},
+                # GCLB: "<client-supplied...>, <client-ip>, <lb-ip>"
+                headers={"Authorization": "Bearer not_cached_yet", "X-Forwarded-For": "10.0.0.1, 203.0.113.7, 34.1.2.3"}
+            )
+
+        assert response.status_code == 429
+        assert acquire.call_args.args[0] == "inflight:llm:ip:203.0.113.7"
+
+    def test_client_address_at_trusted_depth(self):
+        def address(forwarded, hops):
+            headers = Headers(headers={"x-forwarded-for": forwarded} if forwarded else {})
+            return client_address({"client": ("10.8.0.5", 5000)}, headers, hops)
+
+        assert address("198.51.100.4, 34.1.2.3", 1) == "198.51.100.4"  # GCE Ingress
+        assert address("1.1.1.1, 198.51.100.4, 34.1.2.3", 1) == "198.51.100.4"  # Forged prefix ignored
+        assert address("198.51.100.4", 0) == "198.51.100.4"
+        assert address("198.51.100.4", 1) == "198.51.100.4"  # Fewer entries than hops
+        assert address(None, 1) == "10.8.0.5"
+
+    def test_undeclared_route_not_limited(self, client, verified_token):
+        with patch.object(RedisLeaseSemaphore, "acquire", AsyncMock()) as acquire:
+            response = client.get(
+                "/api/flashcards/",
+                headers={"Authorization": f"Bearer {verified_token}"}
+            )
+
+        assert response.status_code == 200
+        acquire.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_full_replica_fails_fast(self):
+        semaphore = asyncio.Semaphore(1)
+        await semaphore.acquire()
+
+        assert await ConcurrencyLimiterMiddleware._acquire_replica_slot(semaphore, 0) is False
+        assert await ConcurrencyLimiterMiddleware._acquire_replica_slot(semaphore, 0.01) is False
+
+        semaphore.release()
+        assert await ConcurrencyLimiterMiddleware._acquire_replica_slot(semaphore, 0) is True
@@ -0,0 +1,107 @@
+"""
+Tests for the due-card queue (Firestore index + Redis sorted-set mirror).
+"""
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.services.due_queue import DueQueue, encode_cursor, to_score
+
+NOW = datetime(2025, 6, 10, 12, 0, tzinfo=timezone.utc)
+EARLY = datetime(2025, 6, 9, 8, 0, tzinfo=timezone.utc)
+
+
+def make_card(card_id, next_review, user_id="test_user_123"):
+    snapshot = MagicMock(exists=True, id=card_id)
+    snapshot.to_dict.return_value = {
+        "user_id": user_id, "term": card_id, "definition": "Definition", "next_review": next_review
+    }
+    return snapshot
+
+
+@pytest.fixture
+def redis_client():
+    """Stand-in for a Redis client whose due queue is already materialized"""
+    client = MagicMock()
+    client.exists = AsyncMock(return_value=1)
+    client.zrangebyscore = AsyncMock(return_value=[])
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[])
+    client.pipeline.return_value = pipe
+    cache = MagicMock(client=client)
+    cache.delete = AsyncMock(return_value=True)
+    with patch("app.services.due_queue.get_cache_service", return_value=cache):
+        yield client
+
+
+@pytest.fixture
+def cards_by_id(mock_firestore_global):
+    """Firestore get_all serving the cards registered in the returned dict"""
+    cards = {}
+
+    def fake_get_all(refs):
+        for ref in refs:
+            snapshot = cards[ref.id]
+            snapshot.reference.path = ref.path
+            yield snapshot
+
+    mock_firestore_global.get_all.side_effect = fake_get_all
+    return cards
+
+
+class TestDueQueue:
+    """Test suite for DueQueue"""
+
+    @pytest.mark.asyncio
+    async def test_redis_page_skips_cursor_ties_and_drops_stale(self, redis_client, cards_by_id):
+        score = to_score(EARLY)
+        redis_client.zrangebyscore.return_value = [("a", score), ("b", score), ("c", score)]
+        cards_by_id["b"] = make_card("b", EARLY)
+        cards_by_id["c"] = make_card("c", NOW.replace(day=20))  # Rescheduled outside the API
+
+        cards, next_cursor = await DueQueue().get_due(
+            "test_user_123", limit=2, cursor=encode_cursor(score, "a"), now=NOW
+        )
+
+        assert [card["id"] for card in cards] == ["b"]
+        assert next_cursor == encode_cursor(score, "c")
+        zadd_args = redis_client.pipeline.return_value.zadd.call_args.args
+        assert zadd_args == ("due:test_user_123", {"c": to_score(NOW.replace(day=20))})
+
+    @pytest.mark.asyncio
+    async def test_schedule_skips_unmaterialized_queue(self, redis_client):
+        redis_client.exists.return_value = 0
+
+        await DueQueue().schedule("test_user_123", {"a": NOW})
+
+        redis_client.pipeline.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_firestore_fallback_without_redis(self, mock_firestore_global):
+        query = mock_firestore_global.collection.return_value.where.return_value
+        query.stream.return_value = [make_card("a", EARLY), make_card("b", EARLY)]
+
+        with patch("app.services.due_queue.get_cache_service", return_value=MagicMock(client=None)):
+            cards, next_cursor = await DueQueue().get_due("test_user_123", limit=2, now=NOW)
+
+        assert [card["id"] for card in cards] == ["a", "b"]
+        assert next_cursor == encode_cursor(to_score(EARLY), "b")
+        query.where.assert_called_with("next_review", "<=", NOW)
+
+
+class TestDueEndpoint:
+    """Test suite for GET /api/flashcards/due"""
+
+    def test_due_cards_with_next_cursor(self, client, redis_client, cards_by_id):
+        redis_client.zrangebyscore.return_value = [("a", to_score(EARLY))]
+        cards_by_id["a"] = make_card("a", EARLY)
+
+        response = client.get("/api/flashcards/due?limit=1")
+
+        assert response.status_code == 200
+        assert [card["id"] for card in response.json()] == ["a"]
+        assert response.headers["X-Next-Cursor"] == encode_cursor(to_score(EARLY), "a")
+
+    def test_invalid_cursor(self, client, redis_client):
+        response = client.get("/api/flashcards/due?cursor=garbage")
+
+        assert response.status_code == 400
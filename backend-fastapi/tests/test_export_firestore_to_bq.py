@@ -0,0 +1,264 @@
+"""
+Tests for the streaming Firestore -> BigQuery export (scripts/export_firestore_to_bq.py).
+"""
+import importlib.util
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+import pytest
+from google.api_core.exceptions import Conflict
+
+SCRIPT_PATH = os.path.join(os.path.dirname(__file__), "..", "scripts", "export_firestore_to_bq.py")
+
+
+@pytest.fixture(scope="module")
+def exporter():
+    spec = importlib.util.spec_from_file_location("export_firestore_to_bq", SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def firestore_data():
+    return {
+        "notes": {
+            f"n{i:02d}": {"user_id": "u1" if i % 2 else "u2", "title": f"Note {i}", "content_md_en": "a b c"}
+            for i in range(10)
+        },
+        "flashcards": {
+            f"c{i:02d}": {"user_id": "u1", "term": "term", "definition": "one two", "category": "code"}
+            for i in range(7)
+        },
+        "note_chunks": {
+            f"k{i:02d}": {"note_id": f"n{i:02d}", "chunk_index": 0, "content": "chunk text"} for i in range(10)
+        },
+    }
+
+
+def shard_rows(directory):
+    rows = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".ndjson"):
+            with open(os.path.join(directory, name)) as f:
+                rows += [json.loads(line) for line in f]
+    return rows
+
+
+class TestExportFirestoreToBigQuery:
+    """Test suite for scripts/export_firestore_to_bq.py"""
+
+    def test_dry_run_against_local_source(self, exporter, tmp_path):
+        source = tmp_path / "firestore.json"
+        source.write_text(json.dumps(firestore_data()))
+
+        code = exporter.main([
+            "--dry-run", "--local-source", str(source), "--workdir", str(tmp_path / "work"),
+            "--user-id", "u1", "--shard-rows", "2", "--page-size", "3",
+        ])
+
+        scope = tmp_path / "work" / "dry-run" / "user-u1"
+        assert code == 0
+        assert [row["id"] for row in shard_rows(scope / "notes")] == ["n01", "n03", "n05", "n07", "n09"]
+        assert [row["id"] for row in shard_rows(scope / "note_chunks")] == ["k01", "k03", "k05", "k07", "k09"]
+        assert shard_rows(scope / "flashcards")[0]["word_count"] == 3
+        checkpoint = json.loads((scope / "notes" / "checkpoint.json").read_text())
+        assert checkpoint["done"] and [shard["rows"] for shard in checkpoint["shards"]] == [2, 2, 1]
+
+    def test_parquet_without_pyarrow_fails_before_reading(self, exporter, tmp_path, monkeypatch, capsys):
+        monkeypatch.setattr(exporter.importlib.util, "find_spec", lambda name: None)
+
+        with pytest.raises(SystemExit):
+            exporter.main(["--dry-run", "--local-source", str(tmp_path / "missing.json"), "--format", "parquet"])
+
+        assert "needs pyarrow" in capsys.readouterr().err
+
+    def test_interrupted_export_resumes(self, exporter, tmp_path):
+        db = exporter.LocalFirestore(firestore_data())
+        export = exporter.EXPORTS["notes"]
+        calls = []
+
+        def failing_row(doc):
+            calls.append(doc.id)
+            if doc.id == "n07":
+                raise RuntimeError("connection reset")
+            return exporter.note_row(doc)
+
+        interrupted = exporter.CollectionExport("notes", export.schema, failing_row)
+        with pytest.raises(RuntimeError):
+            exporter.export_collection(interrupted, db, None, None, str(tmp_path), dry_run=True, shard_rows=3)
+        calls.clear()
+        resumed = exporter.CollectionExport("notes", export.schema, lambda doc: calls.append(doc.id) or export.to_row(doc))
+        total = exporter.export_collection(resumed, db, None, None, str(tmp_path), dry_run=True, shard_rows=3)
+
+        rows = shard_rows(tmp_path / "dry-run" / "all" / "notes")
+        assert total == 10
+        assert [row["id"] for row in rows] == [f"n{i:02d}" for i in range(10)]
+        assert calls == ["n06", "n07", "n08", "n09"]  # Resumed after the last finished shard
+
+    def test_shards_load_into_staging_then_replace_target(self, exporter, tmp_path):
+        db = exporter.LocalFirestore(firestore_data())
+        bq_client = MagicMock()
+        loaded = []
+        bq_client.load_table_from_file.side_effect = lambda f, table, job_id, job_config: loaded.append(job_id) or MagicMock()
+        total = exporter.export_collection(
+            exporter.EXPORTS["notes"], db, bq_client, "proj.ds", str(tmp_path), shard_rows=4
+        )
+
+        assert total == 10 and len(loaded) == 3 and len(set(loaded)) == 3
+        staging = bq_client.load_table_from_file.call_args.args[1]
+        assert staging.startswith("proj.ds.notes__export_")
+        copy = bq_client.copy_table.call_args
+        assert copy.args == (staging, "proj.ds.notes")
+        assert copy.kwargs["job_config"].write_disposition == "WRITE_TRUNCATE"
+        bq_client.delete_table.assert_called_once_with(staging, not_found_ok=True)
+        assert not [name for name in os.listdir(tmp_path / "all" / "notes") if name.startswith("shard-")]
+
+    def test_retried_load_waits_for_the_earlier_job(self, exporter, tmp_path):
+        bq_client = MagicMock()
+        bq_client.load_table_from_file.side_effect = Conflict("Already Exists")
+        shard = tmp_path / "shard-00000.ndjson"
+        shard.write_text('{"id": "n1"}\n')
+
+        exporter.load_shard(bq_client, str(shard), "proj.ds.staging", [], "export_notes_all_run_shard-00000")
+
+        bq_client.get_job.assert_called_once_with("export_notes_all_run_shard-00000")
+        bq_client.get_job.return_value.result.assert_called_once()
+
+    def test_incremental_run_reads_only_changes_since_watermark(self, exporter, tmp_path):
+        data = firestore_data()
+        old = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        for i, note in enumerate(data["notes"].values()):
+            note["updated_at"] = old if i % 2 else "2024-01-01T00:00:00.000Z"  # Frontend writes ISO strings
+        db = exporter.LocalFirestore(data)
+        watermarks = exporter.LocalWatermarks(str(tmp_path / "watermarks.json"))
+        run = lambda: exporter.export_collection(
+            exporter.EXPORTS["notes"], db, None, None, str(tmp_path), dry_run=True,
+            watermarks=watermarks, incremental=True, lookback=timedelta(0), page_size=2,
+        )
+
+        assert run() == 10  # No watermark yet: full export
+        first = watermarks.get("notes", "all")
+        later = datetime.now(timezone.utc) + timedelta(hours=1)
+        data["notes"]["n03"]["updated_at"] = later
+        data["notes"]["n04"]["updated_at"] = exporter.iso_string(later)
+        data["notes"]["n10"] = {"user_id": "u1", "updated_at": later}
+
+        assert run() == 3
+        assert sorted(row["id"] for row in shard_rows(tmp_path / "dry-run" / "all" / "notes")) == ["n03", "n04", "n10"]
+        assert watermarks.get("notes", "all") > first
+
+    def test_incremental_run_merges_by_id(self, exporter, tmp_path):
+        db = exporter.LocalFirestore({"flashcard_reviews": {
+            "r1": {"user_id": "u1", "flashcard_id": "c1", "rating": 3, "reviewed_at": datetime.now(timezone.utc)},
+        }})
+        bq_client = MagicMock()
+        watermarks = MagicMock()
+        watermarks.get.return_value = datetime.now(timezone.utc) - timedelta(days=1)
+
+        total = exporter.export_collection(
+            exporter.EXPORTS["flashcard_reviews"], db, bq_client, "proj.ds", str(tmp_path),
+            watermarks=watermarks, incremental=True,
+        )
+
+        sql = bq_client.query.call_args.args[0]
+        assert total == 1
+        assert "MERGE `proj.ds.flashcard_reviews` T" in sql and "PARTITION BY id ORDER BY `reviewed_at` DESC" in sql
+        assert bq_client.query.call_args.kwargs["job_id"].endswith("_merge")
+        bq_client.copy_table.assert_not_called()
+        watermarks.set.assert_called_once()
+
+    def test_user_chunk_export_reads_only_that_users_chunks(self, exporter, tmp_path, monkeypatch):
+        data = {"notes": {f"n{i:02d}": {"user_id": "u1" if i < 40 else "u2"} for i in range(80)}}
+        data["note_chunks"] = {f"k{i:02d}": {"note_id": f"n{i:02d}", "content": "top-level"} for i in range(80)}
+        for i in range(80):
+            data[f"notes/n{i:02d}/chunks"] = {f"n{i:02d}-0": {"note_id": f"n{i:02d}", "content": "nested"}}
+        data["documents/d1/chunks"] = {"d1-0": {"content": "not a note chunk"}}
+        streamed = []
+        stream = exporter._LocalQuery.stream
+
+        def recording_stream(query):
+            documents = list(stream(query))
+            streamed.extend(documents)
+            return iter(documents)
+
+        monkeypatch.setattr(exporter._LocalQuery, "stream", recording_stream)
+        db = exporter.LocalFirestore(data)
+
+        total = exporter.export_collection(
+            exporter.EXPORTS["note_chunks"], db, None, None, str(tmp_path), user_id="u1", dry_run=True
+        )
+
+        rows = shard_rows(tmp_path / "dry-run" / "user-u1" / "note_chunks")
+        assert total == 80 and {row["note_id"] for row in rows} == {f"n{i:02d}" for i in range(40)}
+        chunks = [doc for doc in streamed if "chunk" in doc.reference.path]
+        assert len(chunks) == 80  # No other user's chunk was read
+        checkpoint = json.loads((tmp_path / "dry-run" / "user-u1" / "note_chunks" / "checkpoint.json").read_text())
+        sources = [read_pass["source"] for read_pass in checkpoint["passes"]]
+        assert [len(source["note_ids"]) for source in sources[:2]] == [30, 10]  # Top-level, by note_id
+        assert [source["collection"] for source in sources[2:]] == [f"notes/n{i:02d}/chunks" for i in range(40)]
+
+        exporter.export_collection(exporter.EXPORTS["note_chunks"], db, None, None, str(tmp_path), dry_run=True)
+        rows = shard_rows(tmp_path / "dry-run" / "all" / "note_chunks")
+        assert len(rows) == 160 and "d1-0" not in {row["id"] for row in rows}
+
+    def test_user_chunk_export_reads_nested_chunks_without_note_id(self, exporter, tmp_path):
+        db = exporter.LocalFirestore({
+            "notes": {"n1": {"user_id": "u1"}, "n2": {"user_id": "u2"}},
+            "notes/n1/chunks": {"n1-0": {"chunk_index": 0, "content": "no note_id field"}},
+            "notes/n2/chunks": {"n2-0": {"chunk_index": 0, "content": "another user"}},
+        })
+        bq_client = MagicMock()
+
+        total = exporter.export_collection(
+            exporter.EXPORTS["note_chunks"], db, bq_client, "proj.ds", str(tmp_path), user_id="u1"
+        )
+
+        assert total == 1
+        publish = bq_client.query.call_args.kwargs["job_config"].query_parameters
+        assert {parameter.name: parameter.values for parameter in publish if parameter.name == "note_ids"} == {
+            "note_ids": ["n1"]
+        }
+
+    def test_resume_starts_over_when_staging_table_expired(self, exporter, tmp_path):
+        db = exporter.LocalFirestore(firestore_data())
+        export = exporter.EXPORTS["notes"]
+
+        def failing_row(doc):
+            if doc.id == "n07":
+                raise RuntimeError("connection reset")
+            return exporter.note_row(doc)
+
+        bq_client = MagicMock()
+        loaded = []
+        bq_client.load_table_from_file.side_effect = (
+            lambda f, table, job_id, job_config: loaded.append(len(f.readlines())) or MagicMock()
+        )
+        interrupted = exporter.CollectionExport("notes", export.schema, failing_row)
+        with pytest.raises(RuntimeError):
+            exporter.export_collection(interrupted, db, bq_client, "proj.ds", str(tmp_path), shard_rows=3)
+        first_run = json.loads((tmp_path / "all" / "notes" / "checkpoint.json").read_text())["run_id"]
+        assert loaded == [3, 3]
+
+        bq_client.get_table.side_effect = exporter.NotFound("expired")  # More than a day later
+        loaded.clear()
+        total = exporter.export_collection(export, db, bq_client, "proj.ds", str(tmp_path), shard_rows=3)
+
+        checkpoint = json.loads((tmp_path / "all" / "notes" / "checkpoint.json").read_text())
+        assert total == 10 and sum(loaded) == 10
+        assert checkpoint["run_id"] != first_run
+        assert bq_client.copy_table.call_args.args[0].endswith(checkpoint["run_id"])
+
+    def test_resume_keeps_run_when_staging_table_is_intact(self, exporter, tmp_path):
+        db = exporter.LocalFirestore(firestore_data())
+        checkpoint_path = tmp_path / "all" / "notes" / "checkpoint.json"
+        bq_client = MagicMock()
+        exporter.export_collection(exporter.EXPORTS["notes"], db, bq_client, "proj.ds", str(tmp_path), shard_rows=3)
+        checkpoint = json.loads(checkpoint_path.read_text())
+        checkpoint["done"] = False  # Interrupted just before publishing
+        checkpoint_path.write_text(json.dumps(checkpoint))
+        bq_client.get_table.return_value.num_rows = 10
+
+        exporter.export_collection(exporter.EXPORTS["notes"], db, bq_client, "proj.ds", str(tmp_path), shard_rows=3)
+
+        assert json.loads(checkpoint_path.read_text())["run_id"] == checkpoint["run_id"]
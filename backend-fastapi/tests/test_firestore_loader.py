@@ -0,0 +1,85 @@
+"""
+Tests for the request-scoped Firestore DocumentLoader.
+"""
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from app.core.exceptions import ReadBudgetExceededError
+from app.core.firestore_loader import DocumentLoader
+
+
+def make_ref(path):
+    ref = MagicMock(id=path.split("/")[-1])
+    ref.path = path
+    return ref
+
+
+@pytest.fixture
+def get_all(mock_firestore_global):
+    """Firestore get_all returning an existing snapshot per requested ref"""
+    def fake_get_all(refs):
+        for ref in refs:
+            snapshot = MagicMock(exists=True, id=ref.id)
+            snapshot.reference.path = ref.path
+            snapshot.to_dict.return_value = {"user_id": "test_user_123", "title": "Note"}
+            yield snapshot
+
+    mock_firestore_global.get_all.side_effect = fake_get_all
+    return mock_firestore_global.get_all
+
+
+class TestDocumentLoader:
+    """Test suite for DocumentLoader"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_loads_are_batched_and_deduplicated(self, get_all):
+        loader = DocumentLoader()
+        profile, note = make_ref("profiles/u1"), make_ref("notes/n1")
+
+        results = await asyncio.gather(loader.load(profile), loader.load(note), loader.load(profile))
+
+        assert get_all.call_count == 1
+        assert [ref.path for ref in get_all.call_args.args[0]] == ["profiles/u1", "notes/n1"]
+        assert results[0] is results[2]
+        assert loader.reads == 2
+
+    @pytest.mark.asyncio
+    async def test_loads_are_memoized_and_clearable(self, get_all):
+        loader = DocumentLoader()
+        ref = make_ref("profiles/u1")
+
+        first = await loader.load(ref)
+        second = await loader.load(ref)
+        loader.clear(ref)
+        third = await loader.load(ref)
+
+        assert first is second
+        assert third is not first
+        assert get_all.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_prefetch_joins_next_batch(self, get_all):
+        loader = DocumentLoader()
+        profile, note = make_ref("profiles/u1"), make_ref("notes/n1")
+
+        loader.prefetch([profile, note])
+        await loader.load(note)
+        await loader.load(profile)
+
+        assert get_all.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_read_budget_enforced(self, get_all):
+        loader = DocumentLoader(max_reads=1)
+
+        with pytest.raises(ReadBudgetExceededError):
+            await loader.load_many([make_ref("notes/a"), make_ref("notes/b")])
+
+    def test_reads_reported_in_header(self, client, get_all):
+        response = client.get(
+            "/api/notes/note_123/content",
+            headers={"Authorization": "Bearer mock_token_123"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["X-Firestore-Reads"] == "1"
@@ -0,0 +1,73 @@
+"""
+Tests for the interval-model features shared by serving and training.
+"""
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from app.services.interval_features import (
+    BUCKET_DAYS,
+    FEATURE_COLUMNS,
+    days_between,
+    feature_row,
+    interval_bucket,
+    review_features,
+    training_examples,
+    word_count,
+)
+from app.services.review_stats import average_rating
+from app.services.scheduling import ReviewArrays
+
+NOW = datetime(2025, 6, 10, 12, 0, tzinfo=timezone.utc)
+
+
+class TestIntervalFeatures:
+    """Test suite for app.services.interval_features"""
+
+    def test_days_between_counts_whole_days(self):
+        assert days_between(NOW - timedelta(days=2, hours=23), NOW) == 2
+        assert days_between(None, NOW) == 0
+        assert days_between(NOW.replace(tzinfo=None) - timedelta(days=1), NOW) == 1
+
+    def test_buckets_match_bucket_days(self):
+        assert [interval_bucket(days) for days in (0, 1, 3, 4, 7, 8, 60)] == [1, 1, 2, 3, 3, 4, 4]
+        assert set(interval_bucket(days) for days in range(100)) == set(BUCKET_DAYS)
+
+    def test_training_rows_match_serving_rows(self):
+        """A review replayed from the exported history encodes like the live review did."""
+        card = {
+            "category": "concept", "term": "Big O", "definition": "Upper bound on growth",
+            "interval": 6, "last_reviewed": NOW - timedelta(days=4, hours=1),
+        }
+        stats = {"rating_sum": 7, "rating_count": 2}
+        served = review_features(card, 4, 1, average_rating(stats), 3, reviewed_at=NOW)
+
+        history = [
+            {"review_id": "r1", "user_id": "u1", "rating": 3, "reviewed_at": NOW - timedelta(days=20),
+             "prev_reviewed_at": None, "review_sequence_number": 1, "scheduled_interval": 1},
+            {"review_id": "r2", "user_id": "u1", "rating": 4, "reviewed_at": card["last_reviewed"],
+             "prev_reviewed_at": NOW - timedelta(days=20), "review_sequence_number": 1, "scheduled_interval": 6},
+            {"review_id": "r3", "user_id": "u1", "rating": 4, "reviewed_at": NOW,
+             "prev_reviewed_at": card["last_reviewed"], "review_sequence_number": 2, "scheduled_interval": 14},
+        ]
+        history = [
+            {**row, "flashcard_id": "c1", "category": card["category"],
+             "word_count": word_count(card["term"], card["definition"])}
+            for row in reversed(history)
+        ]
+        features, labels = training_examples(history)
+
+        assert feature_row(features[-1]) == feature_row(served)
+        assert served["days_since_last_review"] == 4
+        assert [f["user_avg_rating"] for f in features] == [3.0, 3.0, 3.5]  # Excludes the review itself
+        assert labels == [1, 3, 4]
+
+    def test_review_arrays_use_the_same_columns(self):
+        features = [
+            review_features({"category": "code", "term": "a b", "interval": 9}, 2, 4, 2.5, 0),
+            review_features({"category": "unknown", "last_reviewed": NOW - timedelta(days=3)}, 3, 0, 3.0, 0,
+                            reviewed_at=NOW),
+        ]
+
+        matrix = ReviewArrays.from_features(features).feature_matrix()
+
+        assert matrix.shape == (2, len(FEATURE_COLUMNS))
+        np.testing.assert_array_equal(matrix, [feature_row(f) for f in features])
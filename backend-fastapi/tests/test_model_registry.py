@@ -0,0 +1,62 @@
+"""
+Tests for the process-wide model registry.
+"""
+import os
+import joblib
+import numpy as np
+import pytest
+from app.services.model_registry import ModelRegistry
+
+
+def write_artifact(path, value):
+    """Atomic swap, the way new models are deployed"""
+    tmp = f"{path}.tmp"
+    joblib.dump({"weights": np.arange(1000) * value}, tmp)
+    os.replace(tmp, path)
+
+
+class TestModelRegistry:
+    """Test suite for ModelRegistry"""
+
+    def test_loads_once_and_memory_maps_arrays(self, tmp_path):
+        path = str(tmp_path / "model.joblib")
+        write_artifact(path, 1)
+        registry = ModelRegistry(path)
+
+        assert registry.reload_if_changed() is True
+        assert registry.reload_if_changed() is False
+        assert isinstance(registry.current.model["weights"], np.memmap)
+        assert len(registry.current.version) == 12
+
+    def test_hot_reload_on_atomic_swap(self, tmp_path):
+        path = str(tmp_path / "model.joblib")
+        write_artifact(path, 1)
+        registry = ModelRegistry(path)
+        registry.reload_if_changed()
+        first = registry.current
+
+        write_artifact(path, 2)
+
+        assert registry.reload_if_changed() is True
+        assert registry.current.version != first.version
+        assert registry.current.model["weights"][1] == 2
+
+    def test_broken_artifact_keeps_previous_model(self, tmp_path):
+        path = str(tmp_path / "model.joblib")
+        write_artifact(path, 1)
+        registry = ModelRegistry(path)
+        registry.reload_if_changed()
+        first = registry.current
+
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(b"not a model")
+        os.replace(f"{path}.tmp", path)
+
+        assert registry.reload_if_changed() is False
+        assert registry.current is first
+
+    @pytest.mark.asyncio
+    async def test_missing_artifact(self, tmp_path):
+        registry = ModelRegistry(str(tmp_path / "missing.joblib"))
+
+        assert await registry.ensure_loaded() is None
@@ -0,0 +1,102 @@
+"""
+Tests for latency-aware model selection (ml/flashcard_interval_model/model_selection.py).
+"""
+import importlib.util
+import os
+import pytest
+
+SCRIPT_PATH = os.path.join(os.path.dirname(__file__), "..", "ml", "flashcard_interval_model", "model_selection.py")
+
+
+@pytest.fixture(scope="module")
+def model_selection():
+    spec = importlib.util.spec_from_file_location("model_selection", SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def result(model_selection, name, accuracy, single_p99_ms, batch_p99_ms=0.0):
+    return model_selection.CandidateResult(
+        name=name, kind="random_forest", params={}, accuracy=accuracy, fit_seconds=0.0,
+        single_p99_ms=single_p99_ms, batch_p99_ms=batch_p99_ms,
+    )
+
+
+class TestSelectModel:
+    """Test suite for model_selection.select_model"""
+
+    def test_best_accuracy_within_budget(self, model_selection):
+        results = [
+            result(model_selection, "small", 0.80, 0.5),
+            result(model_selection, "medium", 0.90, 1.5),
+            result(model_selection, "large", 0.95, 4.0),  # Most accurate, over budget
+        ]
+
+        chosen = model_selection.select_model(results, latency_budget_ms=2.0, accuracy_tolerance=0.0)
+
+        assert chosen.name == "medium" and chosen.within_budget
+        assert [r.within_budget for r in results] == [True, True, False]
+
+    def test_fastest_when_nothing_fits(self, model_selection):
+        results = [
+            result(model_selection, "accurate", 0.95, 9.0),
+            result(model_selection, "fast", 0.70, 3.0),
+        ]
+
+        chosen = model_selection.select_model(results, latency_budget_ms=2.0)
+
+        assert chosen.name == "fast" and not chosen.within_budget
+
+    def test_batch_budget_also_applies(self, model_selection):
+        results = [
+            result(model_selection, "slow_batches", 0.95, 1.0, batch_p99_ms=20.0),
+            result(model_selection, "fast_batches", 0.90, 1.5, batch_p99_ms=5.0),
+        ]
+
+        chosen = model_selection.select_model(results, latency_budget_ms=2.0, batch_budget_ms=10.0)
+
+        assert chosen.name == "fast_batches"
+
+    def test_tolerance_prefers_a_faster_close_model(self, model_selection):
+        results = [
+            result(model_selection, "best", 0.900, 1.8),
+            result(model_selection, "close", 0.897, 0.6),
+            result(model_selection, "closer_but_slower", 0.899, 1.2),
+            result(model_selection, "too_far", 0.880, 0.1),
+        ]
+
+        assert model_selection.select_model(results, 2.0, accuracy_tolerance=0.005).name == "close"
+        assert model_selection.select_model(results, 2.0, accuracy_tolerance=0.0).name == "best"
+
+    def test_tie_on_latency_keeps_the_more_accurate(self, model_selection):
+        results = [
+            result(model_selection, "a", 0.898, 1.0),
+            result(model_selection, "b", 0.900, 1.0),
+        ]
+
+        assert model_selection.select_model(results, 2.0, accuracy_tolerance=0.005).name == "b"
+
+
+class TestMeasure:
+    """Test suite for model_selection.measure"""
+
+    def test_times_the_compiled_and_the_raw_model(self, model_selection, tmp_path):
+        import numpy as np
+        from sklearn.ensemble import RandomForestClassifier
+
+        rng = np.random.default_rng(0)
+        X = rng.random((50, 4), dtype=np.float32)
+        y = (X[:, 0] > 0.5).astype(int) + 1
+        model = RandomForestClassifier(n_estimators=5, max_depth=3, random_state=0).fit(X, y)
+        candidate = result(model_selection, "rf", 0.9, 0.0)
+        candidate.model = model
+
+        model_selection.measure(candidate, X, batch_size=8, repeat=10)
+
+        assert candidate.artifact_bytes > 0 and candidate.compiled_bytes > 0
+        assert candidate.single_p99_ms > 0 and candidate.batch_p99_ms > 0
+        assert candidate.raw_single_p99_ms > 0 and candidate.raw_batch_p99_ms > 0
+        table = model_selection.write_report([candidate], candidate, str(tmp_path))
+        assert "raw single p50 / p99" in table.splitlines()[0]
+        assert f"{candidate.raw_batch_p99_ms:.2f}" in table.splitlines()[2]
@@ -0,0 +1,160 @@
+"""
+Tests for online interval-model updates.
+"""
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+import joblib
+import numpy as np
+from sklearn.dummy import DummyClassifier
+from app.services.model_registry import ModelRegistry
+from app.services.online_learning import EventLogSource, FirestoreReviewSource, OnlineLearner, ReviewEvent
+
+# Rating decides the schedule: Again -> 1 day, Hard -> 3, Good -> 6, Easy -> 20
+SCHEDULED = {1: 1, 2: 3, 3: 6, 4: 20}
+
+
+class BrokenModel:
+    """Served model with the learner's classes whose predict fails."""
+    classes_ = np.array([1, 2, 3, 4])
+
+    def predict(self, X):
+        raise ValueError("expected 7 features")
+
+
+def review_events(n, seed=0, start=0):
+    rng = np.random.default_rng(seed)
+    events = []
+    for i in range(start, start + n):
+        rating = int(rng.integers(1, 5))
+        features = {
+            "category": str(rng.choice(["code", "concept", "vocabulary"])),
+            "word_count": int(rng.integers(1, 40)),
+            "rating": rating,
+            "review_sequence_number": int(rng.integers(1, 20)),
+            "days_since_last_review": int(rng.integers(0, 30)),
+            "user_avg_rating": float(rng.uniform(1, 4)),
+        }
+        events.append(ReviewEvent(f"review-{i}", features, SCHEDULED[rating]))
+    return events
+
+
+class TestOnlineLearning:
+    """Test suite for app.services.online_learning"""
+
+    def test_learner_publishes_versions_the_registry_serves(self, tmp_path):
+        model_path = str(tmp_path / "model.joblib")
+        learner = OnlineLearner()
+        events = review_events(6000)
+
+        results = [learner.step(events[i:i + 500], model_path, min_holdout=100) for i in range(0, 6000, 500)]
+
+        published = [r.published_version for r in results if r.published_version]
+        assert published and results[-1].learner_accuracy > 0.95
+        assert all(r.held_out for r in results)  # ~10% never trained on
+        manifest = (tmp_path / "versions" / "manifest.jsonl").read_text().splitlines()
+        assert [json.loads(line)["version"] for line in manifest] == published
+
+        registry = ModelRegistry(model_path)
+        assert registry.reload_if_changed() is True
+        assert registry.current.version == published[-1]
+        rows = [[0, 5, rating, 2, 3, 3.0] for rating in (1, 2, 3, 4)]
+        np.testing.assert_array_equal(registry.current.model.predict(rows), [1, 2, 3, 4])
+
+    def test_regression_is_not_published(self, tmp_path):
+        model_path = str(tmp_path / "model.joblib")
+        learner = OnlineLearner()
+        for i in range(0, 6000, 500):
+            learner.step(review_events(500, seed=i, start=i), model_path, min_holdout=100)
+        served = open(model_path, "rb").read()
+
+        # Everyone starts rating "Again": the learner drifts, the holdout still holds old reviews
+        drifted = [ReviewEvent(e.review_id, e.features, 1) for e in review_events(300, seed=99, start=10000)]
+        result = learner.step(drifted, model_path, min_holdout=100)
+
+        assert result.rejected and result.published_version is None
+        assert open(model_path, "rb").read() == served
+
+    def test_learner_replaces_a_worse_served_model(self, tmp_path):
+        model_path = str(tmp_path / "model.joblib")
+        events = review_events(3000)
+        X = np.array([[0, 0, e.features["rating"], 0, 0, 0] for e in events])
+        joblib.dump(DummyClassifier(strategy="constant", constant=4).fit(X, [e.label for e in events]), model_path)
+
+        result = OnlineLearner().step(events, model_path, min_holdout=100)
+
+        assert result.served_accuracy is not None
+        assert result.published_version is not None  # Learner beats a constant model
+        assert result.learner_accuracy >= result.served_accuracy
+
+    def test_event_log_resumes_from_cursor(self, tmp_path):
+        path = tmp_path / "reviews.jsonl"
+        lines = [json.dumps({"review_id": e.review_id, "features": e.features, "scheduled_interval": 6})
+                 for e in review_events(5)]
+        path.write_text("\n".join(lines) + "\n" + lines[0][:10])  # Last line still being written
+        source = EventLogSource(str(path))
+
+        first, cursor, scanned = source.read(None, 3)
+        rest, cursor, _ = source.read(cursor, 10)
+        again, same, none = source.read(cursor, 10)
+
+        assert [e.review_id for e in first + rest] == [f"review-{i}" for i in range(5)]
+        assert scanned == 3 and none == 0
+        assert again == [] and same == cursor < os.path.getsize(path)
+
+    def test_incomparable_served_model_is_not_replaced(self, tmp_path, caplog):
+        model_path = str(tmp_path / "model.joblib")
+        events = review_events(3000)
+        X = np.array([[0, 0, e.features["rating"], 0, 0, 0] for e in events])
+        # Batch model trained on 0-based labels: buckets 1-4 predicted as 0-3
+        joblib.dump(DummyClassifier(strategy="constant", constant=0).fit(X, [e.label - 1 for e in events]), model_path)
+        served = open(model_path, "rb").read()
+
+        with caplog.at_level(logging.WARNING, logger="app.services.online_learning"):
+            result = OnlineLearner().step(events, model_path, min_holdout=100)
+
+        assert result.rejected and result.incomparable and result.published_version is None
+        assert open(model_path, "rb").read() == served
+        assert "not replacing it" in caplog.text
+
+    def test_unscorable_served_model_is_not_replaced(self, tmp_path):
+        model_path = str(tmp_path / "model.joblib")
+        joblib.dump(BrokenModel(), model_path)
+
+        result = OnlineLearner().step(review_events(3000), model_path, min_holdout=100)
+
+        assert result.rejected and result.incomparable and result.published_version is None
+
+    def test_incomparable_served_model_replaced_on_request(self, tmp_path):
+        model_path = str(tmp_path / "model.joblib")
+        joblib.dump(BrokenModel(), model_path)
+
+        result = OnlineLearner().step(review_events(3000), model_path, min_holdout=100, replace_incomparable=True)
+
+        assert result.incomparable and result.served_accuracy is None
+        assert result.published_version is not None
+        assert ModelRegistry(model_path).reload_if_changed() is True
+
+    def test_sources_report_skipped_records_as_scanned(self, tmp_path):
+        path = tmp_path / "reviews.jsonl"
+        path.write_text("".join(json.dumps({"review_id": f"r{i}", "features": None}) + "\n" for i in range(5)))
+
+        events, cursor, scanned = EventLogSource(str(path)).read(None, 3)
+
+        assert events == [] and scanned == 3  # Not caught up, though no events came back
+        assert EventLogSource(str(path)).read(cursor, 3)[2] == 2
+
+        db = MagicMock()
+        docs = []
+        for i in range(3):
+            doc = MagicMock(id=f"r{i}")
+            doc.to_dict.return_value = {"recorded_at": datetime(2024, 1, 1, tzinfo=timezone.utc)}  # No ml_features
+            docs.append(doc)
+        query = db.collection.return_value.where.return_value.order_by.return_value.order_by.return_value
+        query.limit.return_value.stream.return_value = iter(docs)
+
+        events, cursor, scanned = FirestoreReviewSource(db).read(None, 3)
+
+        assert events == [] and scanned == 3 and cursor[1] == "r2"
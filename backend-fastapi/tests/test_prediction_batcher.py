@@ -0,0 +1,53 @@
+"""
+Tests for the inference micro-batcher.
+"""
+import asyncio
+import threading
+import pytest
+from app.services.prediction_batcher import PredictionBatcher
+
+
+class TestPredictionBatcher:
+    """Test suite for PredictionBatcher"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_call_off_the_loop(self):
+        calls = []
+
+        def predict(rows):
+            calls.append((list(rows), threading.current_thread()))
+            return [row * 10 for row in rows]
+
+        batcher = PredictionBatcher(predict, max_batch_size=100, max_wait_ms=5)
+        results = await asyncio.gather(
+            batcher.submit([1]), batcher.submit([2, 3]), batcher.submit([4])
+        )
+
+        assert results == [[10], [20, 30], [40]]
+        assert len(calls) == 1
+        assert calls[0][0] == [1, 2, 3, 4]
+        assert calls[0][1] is not threading.main_thread()
+        assert (batcher.batches, batcher.rows) == (1, 4)
+        batcher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_without_waiting(self):
+        batcher = PredictionBatcher(lambda rows: list(rows), max_batch_size=2, max_wait_ms=10000)
+
+        results = await asyncio.wait_for(asyncio.gather(batcher.submit([1]), batcher.submit([2])), timeout=1)
+
+        assert results == [[1], [2]]
+        batcher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_failure_is_raised_to_every_caller(self):
+        def predict(rows):
+            raise RuntimeError("model exploded")
+
+        batcher = PredictionBatcher(predict, max_wait_ms=1)
+        results = await asyncio.gather(batcher.submit([1]), batcher.submit([2]), return_exceptions=True)
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert batcher.batches == 0
+        assert await batcher.submit([]) == []
+        batcher.shutdown()
@@ -0,0 +1,82 @@
+"""
+Tests for the precomputed prediction table.
+"""
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from xgboost import XGBClassifier
+from app.services.compiled_model import CompiledForest
+from app.services.model_registry import (
+    DEFAULT_COMPILED_MODEL_PATH,
+    DEFAULT_PREDICTION_TABLE_PATH,
+    ModelRegistry,
+)
+from app.services.prediction_table import FEATURE_BOUNDS, PredictionTable, TabulatedModel, build_prediction_table
+from app.services.interval_features import FEATURE_COLUMNS
+
+
+def review_rows(rows=20000, seed=0):
+    """Rows across (and slightly beyond) FEATURE_BOUNDS, with a few missing values."""
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([
+        rng.integers(0, 5, rows),  # 4 is out of bounds
+        rng.integers(0, 300, rows),
+        rng.integers(1, 5, rows),
+        rng.integers(1, 40, rows),
+        rng.choice([0, 1, 2, 5, 6, 14, 30, 4000], rows),
+        np.round(rng.uniform(1, 4, rows), 2),
+    ]).astype(np.float32)
+    X[rng.random(rows) < 0.01, 5] = np.nan
+    return X
+
+
+class TestPredictionTable:
+    """Test suite for PredictionTable / TabulatedModel"""
+
+    @pytest.mark.parametrize("model", [
+        XGBClassifier(n_estimators=40, max_depth=4),
+        RandomForestClassifier(n_estimators=10, max_depth=4, random_state=0),
+    ])
+    def test_table_agrees_with_model(self, model):
+        X = review_rows()
+        y = ((X[:, 2] >= 3) + (X[:, 4] > 5) + (X[:, 5] > 2.5)).astype(int)
+        model.fit(X, y)
+        table = build_prediction_table(model, FEATURE_COLUMNS, version="v1")
+        tabulated = TabulatedModel(table, fallback=model)
+
+        probe = review_rows(seed=1)
+        _, inside = table.cell_index(probe)
+        assert 0.5 < inside.mean() < 1  # Both the table and the fallback are exercised
+        np.testing.assert_array_equal(tabulated.predict(probe), model.predict(probe))
+        for row in probe[:200]:
+            assert tabulated.predict(row[None, :])[0] == model.predict(row[None, :])[0]
+
+    def test_shipped_table_agrees_with_shipped_model(self):
+        model = CompiledForest.load(DEFAULT_COMPILED_MODEL_PATH)
+        table = PredictionTable.load(DEFAULT_PREDICTION_TABLE_PATH)
+        assert table.version == model.version
+
+        probe = review_rows(100000, seed=2)
+        np.testing.assert_array_equal(TabulatedModel(table, model).predict(probe), model.predict(probe))
+
+    def test_registry_uses_table_only_for_its_model_version(self, tmp_path):
+        X = review_rows(2000)
+        model = XGBClassifier(n_estimators=5, max_depth=2).fit(X, (X[:, 2] >= 3).astype(int))
+        table = build_prediction_table(model, FEATURE_COLUMNS, version="someone-else")
+        table_path = str(tmp_path / "model.table.npz")
+        table.save(table_path)
+
+        registry = ModelRegistry(DEFAULT_COMPILED_MODEL_PATH, table_path=table_path)
+        assert registry.reload_if_changed() is True
+        assert registry.current.tabulated is False
+
+        registry = ModelRegistry(DEFAULT_COMPILED_MODEL_PATH, table_path=DEFAULT_PREDICTION_TABLE_PATH)
+        assert registry.reload_if_changed() is True
+        assert registry.current.tabulated is True
+
+    def test_unbounded_feature_is_rejected(self):
+        X = review_rows(500)
+        model = XGBClassifier(n_estimators=2, max_depth=2).fit(X, (X[:, 2] >= 3).astype(int))
+        bounds = {name: bound for name, bound in FEATURE_BOUNDS.items() if name != "rating"}
+        with pytest.raises(ValueError):
+            build_prediction_table(model, FEATURE_COLUMNS, "v1", bounds=bounds)
@@ -0,0 +1,86 @@
+"""
+Tests for the two-level profile cache and profile preference writes.
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.services.profile_cache import ProfileCache
+from app.services.user_service import UserService
+
+
+@pytest.fixture
+def redis_cache():
+    """Stand-in for the Redis CacheService (L2)"""
+    cache = MagicMock()
+    cache.get = AsyncMock(return_value=None)
+    cache.set = AsyncMock(return_value=True)
+    cache.delete = AsyncMock(return_value=True)
+    with patch("app.services.profile_cache.get_cache_service", return_value=cache):
+        yield cache
+
+
+class TestProfileCache:
+    """Test suite for ProfileCache"""
+
+    @pytest.mark.asyncio
+    async def test_l1_hit_skips_redis(self, redis_cache):
+        cache = ProfileCache()
+        await cache.set("u1", {"llm_model": "gemini-2.5-pro"})
+
+        assert await cache.get("u1") == {"llm_model": "gemini-2.5-pro"}
+        redis_cache.get.assert_not_called()
+        redis_cache.set.assert_called_once_with("profile:u1", {"llm_model": "gemini-2.5-pro"}, ttl_seconds=300)
+
+    @pytest.mark.asyncio
+    async def test_l2_hit_fills_l1(self, redis_cache):
+        redis_cache.get.return_value = {"llm_model": "gemini-2.5-pro"}
+        cache = ProfileCache()
+
+        assert await cache.get("u1") == {"llm_model": "gemini-2.5-pro"}
+        assert await cache.get("u1") == {"llm_model": "gemini-2.5-pro"}
+        redis_cache.get.assert_called_once_with("profile:u1")
+
+    @pytest.mark.asyncio
+    async def test_expired_l1_entry_falls_through(self, redis_cache):
+        cache = ProfileCache(l1_ttl_seconds=0)
+        await cache.set("u1", {"llm_model": "a"})
+
+        assert await cache.get("u1") is None
+        redis_cache.get.assert_called_once_with("profile:u1")
+
+
+class TestUserServiceProfile:
+    """Test suite for cached profile lookups in UserService"""
+
+    @pytest.mark.asyncio
+    async def test_preferred_model_reads_firestore_once(self, redis_cache, mock_firestore_global):
+        service = UserService()
+
+        await service.get_preferred_model("test_user_123")
+        await service.get_preferred_model("test_user_123")
+
+        profile_ref = mock_firestore_global.collection.return_value.document
+        assert profile_ref.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_update_invalidates_cache(self, redis_cache):
+        service = UserService()
+        await service.profile_cache.set("test_user_123", {"llm_model": "old"})
+
+        with patch("app.services.user_service.load_document", AsyncMock()) as load:
+            load.return_value = MagicMock(exists=True, **{"to_dict.return_value": {"llm_model": "new"}})
+            updated = await service.update_user_settings("test_user_123", {"llm_model": "new"})
+
+        assert updated == {"llm_model": "new"}
+        redis_cache.delete.assert_called_once_with("profile:test_user_123")
+
+    def test_patch_preferences_endpoint(self, client, redis_cache, mock_firestore_global):
+        response = client.patch(
+            "/api/profile/preferences",
+            json={"llm_model": "gemini-2.5-pro"},
+            headers={"Authorization": "Bearer mock_token_123"}
+        )
+
+        assert response.status_code == 200
+        profile_doc = mock_firestore_global.collection.return_value.document.call_args_list[0]
+        assert profile_doc.args == ("test_user_123",)
+        redis_cache.delete.assert_called_once_with("profile:test_user_123")
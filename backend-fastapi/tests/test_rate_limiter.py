@@ -0,0 +1,147 @@
+"""
+Tests for the GCRA rate limiter middleware.
+"""
+import time
+import uuid
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.core.auth import VerifiedTokenCache
+from app.middleware.rate_limiter import (
+    LocalPreLimiter, RateLimiterMiddleware, RateLimitQuota, RateLimitResult
+)
+
+
+@pytest.fixture
+def verified_user():
+    """(token, uid) already present in the verified token cache.
+
+    Each test gets its own uid so in-process limiter state never leaks between tests.
+    """
+    uid = f"rl_user_{uuid.uuid4().hex[:8]}"
+    cache = VerifiedTokenCache(max_size=10)
+    cache.put("mock_token_123", uid, "test@example.com", time.time() + 3600)
+    with patch("app.core.auth._token_cache", cache):
+        yield "mock_token_123", uid
+
+
+class TestRateLimiter:
+    """Test suite for RateLimiterMiddleware"""
+
+    def test_quota_emission_interval(self):
+        quota = RateLimitQuota(rate=20, burst=5)
+        assert quota.emission_interval_ms == 3000
+
+    def test_allowed_request_has_remaining_header(self, client, verified_user):
+        token, uid = verified_user
+        result = RateLimitResult(allowed=True, remaining=4, retry_after=0, reset_after=3)
+        with patch.object(RateLimiterMiddleware, "_check_rate_limit", AsyncMock(return_value=result)) as check:
+            response = client.get(
+                "/api/chat/conversations",
+                headers={"Authorization": f"Bearer {token}"}
+            )
+
+        assert response.status_code == 200
+        assert response.headers["X-RateLimit-Remaining"] == "4"
+        assert response.headers["X-RateLimit-Limit"] == "20"
+        user_id, category, _ = check.call_args.args
+        assert (user_id, category) == (uid, "rag_chat")
+
+    def test_denied_request_returns_429(self, client, verified_user):
+        token, _ = verified_user
+        result = RateLimitResult(allowed=False, remaining=0, retry_after=3, reset_after=15)
+        with patch.object(RateLimiterMiddleware, "_check_rate_limit", AsyncMock(return_value=result)):
+            response = client.post(
+                "/api/notes/ai-qa",
+                json={"note_id": "note_1", "question": "Test Question"},
+                headers={"Authorization": f"Bearer {token}"}
+            )
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "3"
+        assert response.headers["X-RateLimit-Remaining"] == "0"
+
+    def test_cross_origin_429_carries_cors_headers(self, client, verified_user):
+        token, _ = verified_user
+        result = RateLimitResult(allowed=False, remaining=0, retry_after=3, reset_after=15)
+        with patch.object(RateLimiterMiddleware, "_check_rate_limit", AsyncMock(return_value=result)):
+            response = client.get(
+                "/api/chat/conversations",
+                headers={"Authorization": f"Bearer {token}", "Origin": "http://localhost:5173"}
+            )
+
+        assert response.status_code == 429
+        assert response.headers["Access-Control-Allow-Origin"] == "http://localhost:5173"
+        exposed = {name.strip() for name in response.headers["Access-Control-Expose-Headers"].split(",")}
+        assert {"Retry-After", "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset"} <= exposed
+
+    def test_redis_denial_is_remembered_locally(self, client, verified_user):
+        token, _ = verified_user
+        result = RateLimitResult(allowed=False, remaining=0, retry_after=30, reset_after=30)
+        with patch.object(RateLimiterMiddleware, "_check_rate_limit", AsyncMock(return_value=result)) as check:
+            for _ in range(3):
+                response = client.get(
+                    "/api/chat/conversations",
+                    headers={"Authorization": f"Bearer {token}"}
+                )
+                assert response.status_code == 429
+
+        assert check.call_count == 1
+
+    def test_undeclared_route_not_limited(self, client, verified_user):
+        token, _ = verified_user
+        with patch.object(RateLimiterMiddleware, "_check_rate_limit", AsyncMock()) as check:
+            response = client.get(
+                "/api/flashcards/",
+                headers={"Authorization": f"Bearer {token}"}
+            )
+
+        assert response.status_code == 200
+        check.assert_not_called()
+
+    def test_unverified_token_passes_through(self, client):
+        with patch.object(RateLimiterMiddleware, "_check_rate_limit", AsyncMock()) as check:
+            response = client.get(
+                "/api/chat/conversations",
+                headers={"Authorization": "Bearer never_seen_token"}
+            )
+
+        assert response.status_code == 200
+        check.assert_not_called()
+
+
+class TestLocalPreLimiter:
+    """Test suite for the in-process pre-limiter"""
+
+    def test_sheds_clear_violators(self):
+        limiter = LocalPreLimiter(replicas=2, slack=1.0)
+        quota = RateLimitQuota(rate=20, burst=4)  # 2 local tokens per replica
+
+        assert limiter.check("rag_chat:user_a", quota) is None
+        assert limiter.check("rag_chat:user_a", quota) is None
+        denied = limiter.check("rag_chat:user_a", quota)
+
+        assert denied is not None
+        assert denied.allowed is False
+        assert denied.retry_after >= 1
+        # Other users have their own bucket
+        assert limiter.check("rag_chat:user_b", quota) is None
+
+    def test_block_rejects_until_expiry(self):
+        limiter = LocalPreLimiter(replicas=1, slack=1.5)
+        quota = RateLimitQuota(rate=20, burst=5)
+
+        assert limiter.check("rag_chat:user_a", quota) is None
+        limiter.block("rag_chat:user_a", 10)
+
+        denied = limiter.check("rag_chat:user_a", quota)
+        assert denied is not None
+        assert denied.retry_after == 10
+
+    def test_bounded_number_of_buckets(self):
+        limiter = LocalPreLimiter(max_keys=2)
+        quota = RateLimitQuota(rate=20, burst=5)
+        for user in ("a", "b", "c"):
+            limiter.check(f"rag_chat:{user}", quota)
+
+        assert len(limiter._buckets) == 2
+        assert "rag_chat:a" not in limiter._buckets
@@ -0,0 +1,72 @@
+"""
+Tests for the structured request logging middleware.
+"""
+import json
+import logging
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from app.middleware.request_logging import RequestLoggingMiddleware
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(json.loads(record.getMessage()))
+
+
+@pytest.fixture
+def access_log():
+    handler = _ListHandler()
+    access_logger = logging.getLogger("learningaier.access")
+    access_logger.addHandler(handler)
+    yield handler.lines
+    access_logger.removeHandler(handler)
+
+
+def _build_app(sample_rate: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/api/items/{item_id}")
+    async def echo(item_id: str, payload: dict):
+        return {"id": item_id, **payload}
+
+    @app.get("/api/broken")
+    async def broken():
+        raise HTTPException(status_code=503, detail="down")
+
+    app.add_middleware(RequestLoggingMiddleware, sample_rate=sample_rate)
+    return app
+
+
+class TestRequestLogging:
+    """Test suite for RequestLoggingMiddleware"""
+
+    def test_one_line_with_route_template_and_sizes(self, access_log):
+        client = TestClient(_build_app(sample_rate=1.0))
+        body = b'{"title":"x"}'
+        response = client.post(
+            "/api/items/item_42", content=body, headers={"Content-Type": "application/json"}
+        )
+
+        assert response.status_code == 200
+        assert len(access_log) == 1
+        line = access_log[0]
+        assert line["method"] == "POST"
+        assert line["route"] == "/api/items/{item_id}"
+        assert line["path"] == "/api/items/item_42"
+        assert line["status"] == 200
+        assert line["request_bytes"] == len(body)
+        assert line["response_bytes"] == len(response.content)
+        assert line["duration_ms"] >= 0
+
+    def test_sampling_skips_success_but_keeps_errors(self, access_log):
+        client = TestClient(_build_app(sample_rate=0.0))
+        client.post("/api/items/item_42", json={"title": "x"})
+        client.get("/api/broken")
+
+        assert [line["status"] for line in access_log] == [503]
+        assert access_log[0]["severity"] == "ERROR"
@@ -0,0 +1,170 @@
+"""
+Tests for streamed orjson list responses and response compression.
+"""
+import json
+import pytest
+from unittest.mock import MagicMock
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from app.core.responses import iter_json_object, project
+from app.middleware.compression import CompressionMiddleware, negotiate_encoding
+from app.models.notes import NoteContent
+
+
+def make_doc(doc_id, data):
+    doc = MagicMock()
+    doc.id = doc_id
+    doc.to_dict.return_value = data
+    return doc
+
+
+@pytest.fixture
+def many_notes(mock_firestore_global):
+    """200 notes returned by the notes query"""
+    docs = [
+        make_doc(f"note_{i}", {
+            "title": f"Note {i}",
+            "folder_id": "folder_1",
+            "word_count": 40,
+            "user_id": "test_user_123",
+            "created_at": "2025-01-01T00:00:00Z",
+        })
+        for i in range(200)
+    ]
+    query = mock_firestore_global.collection.return_value.where.return_value
+    query.select.return_value = query
+    query.stream.return_value = docs
+    return docs
+
+
+class TestJsonResponses:
+    """Test suite for app.core.responses"""
+
+    def test_project_matches_response_model(self):
+        data = {"id": "n1", "title": "T", "user_id": "u1", "created_at": "x"}
+
+        assert project(data, NoteContent) == NoteContent(**data).model_dump()
+
+    def test_iter_json_object_is_valid_json(self):
+        body = b"".join(iter_json_object({"nodes": iter([{"id": "a"}]), "edges": iter([])}))
+
+        assert json.loads(body) == {"nodes": [{"id": "a"}], "edges": []}
+
+    def test_get_notes_shape(self, client, many_notes):
+        response = client.get("/api/notes/", headers={"Authorization": "Bearer mock_token_123"})
+
+        assert response.status_code == 200
+        notes = response.json()
+        assert len(notes) == 200
+        assert notes[0] == {
+            "id": "note_0",
+            "title": "Note 0",
+            "folder_id": "folder_1",
+            "created_at": "2025-01-01T00:00:00Z",
+            "updated_at": None,
+            "word_count": 40,
+        }
+
+    def test_get_notes_query_error_returns_500(self, client, mock_firestore_global):
+        query = mock_firestore_global.collection.return_value.where.return_value
+        query.select.return_value = query
+        query.stream.side_effect = RuntimeError("boom")
+
+        response = client.get("/api/notes/", headers={"Authorization": "Bearer mock_token_123"})
+
+        assert response.status_code == 500
+
+
+class TestCompression:
+    """Test suite for CompressionMiddleware"""
+
+    def test_negotiate_encoding(self):
+        assert negotiate_encoding("gzip, deflate") == "gzip"
+        assert negotiate_encoding("gzip;q=0, identity") is None
+        assert negotiate_encoding("") is None
+
+    def test_large_list_is_gzipped(self, client, many_notes):
+        response = client.get(
+            "/api/notes/",
+            headers={"Authorization": "Bearer mock_token_123", "Accept-Encoding": "gzip"}
+        )
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert len(response.json()) == 200
+
+    def test_brotli_preferred_when_available(self, client, many_notes):
+        pytest.importorskip("brotli")
+        response = client.get(
+            "/api/notes/",
+            headers={"Authorization": "Bearer mock_token_123", "Accept-Encoding": "gzip, br"}
+        )
+
+        assert response.headers["Content-Encoding"] == "br"
+        assert len(response.json()) == 200
+
+    def test_small_and_event_stream_bodies_untouched(self):
+        app = FastAPI()
+
+        @app.get("/small")
+        async def small():
+            return PlainTextResponse("ok")
+
+        @app.get("/events")
+        async def events():
+            async def stream():
+                yield "data: " + "x" * 4096 + "\n\n"
+            return StreamingResponse(stream(), media_type="text/event-stream")
+
+        app.add_middleware(CompressionMiddleware, minimum_size=1024)
+        client = TestClient(app)
+
+        small_response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        events_response = client.get("/events", headers={"Accept-Encoding": "gzip"})
+
+        assert "Content-Encoding" not in small_response.headers
+        assert small_response.text == "ok"
+        assert "Content-Encoding" not in events_response.headers
+
+    def test_streamed_chunks_form_one_gzip_member(self):
+        app = FastAPI()
+        chunks = [b"[", b"1," * 2000, b"1]"]
+
+        @app.get("/stream")
+        async def stream():
+            async def body():
+                for chunk in chunks:
+                    yield chunk
+            return StreamingResponse(body(), media_type="application/json")
+
+        app.add_middleware(CompressionMiddleware, minimum_size=1024)
+        response = TestClient(app).get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Content-Length" not in response.headers
+        assert json.loads(response.content) == [1] * 2001
+
+    @pytest.mark.parametrize("method, status", [("GET", 204), ("GET", 304), ("HEAD", 200)])
+    async def test_bodiless_responses_keep_their_headers(self, method, status):
+        start = {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", b"4096"), (b"etag", b'"v1"')],
+        }
+
+        async def app(scope, receive, send):
+            await send(dict(start))
+            await send({"type": "http.response.body", "body": b""})
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": method, "headers": [(b"accept-encoding", b"gzip")]}
+        await CompressionMiddleware(app, minimum_size=1024)(scope, None, send)
+
+        assert sent[0]["headers"] == start["headers"]  # Content-Length still describes the full body
+        assert sent[1]["body"] == b""
+
@@ -0,0 +1,71 @@
+"""
+Tests for running review aggregates used by flashcard scheduling.
+"""
+from datetime import datetime, timedelta, timezone
+from google.cloud import firestore
+from app.services.review_stats import (
+    average_rating,
+    build_stats,
+    reviews_in_window,
+    stats_increment,
+)
+
+NOW = datetime(2025, 6, 10, 12, 0, tzinfo=timezone.utc)
+
+
+class TestReviewStats:
+    """Test suite for review aggregate helpers"""
+
+    def test_average_rating_defaults_before_first_review(self):
+        assert average_rating({}) == 3.0
+        assert average_rating({"rating_sum": 7, "rating_count": 2}) == 3.5
+
+    def test_reviews_in_window_ignores_old_buckets(self):
+        stats = {"reviews_by_day": {"2025-06-10": 2, "2025-06-04": 1, "2025-06-03": 5}}
+
+        assert reviews_in_window(stats, NOW) == 3
+
+    def test_increment_prunes_stale_buckets(self):
+        stats = {"reviews_by_day": {"2025-06-09": 1, "2025-05-01": 4}}
+
+        update = stats_increment(stats, [4, 2], [NOW, NOW], NOW)
+
+        assert isinstance(update["rating_sum"], firestore.Increment)
+        assert update["rating_sum"].value == 6
+        assert update["rating_count"].value == 2
+        assert update["reviews_by_day"]["2025-06-10"].value == 2
+        assert update["reviews_by_day"]["2025-05-01"] is firestore.DELETE_FIELD
+        assert "2025-06-09" not in update["reviews_by_day"]
+
+    def test_build_stats_from_history(self):
+        reviews = [
+            {"rating": 4, "reviewed_at": NOW},
+            {"rating": 1, "reviewed_at": NOW - timedelta(days=1)},
+            {"rating": 3, "reviewed_at": NOW - timedelta(days=30)},
+        ]
+
+        stats = build_stats(reviews, NOW)
+
+        assert stats["rating_sum"] == 8
+        assert stats["rating_count"] == 3
+        assert stats["reviews_by_day"] == {"2025-06-10": 1, "2025-06-09": 1}
+
+
+def test_review_uses_aggregates_instead_of_history(client, mock_firestore_global, mock_ml_prediction_global):
+    response = client.post(
+        "/api/flashcards/review",
+        json={"flashcard_id": "card_123", "rating": 3}
+    )
+
+    assert response.status_code == 200
+    # No review-history scans
+    mock_firestore_global.collection.return_value.where.assert_not_called()
+    features = mock_ml_prediction_global.predict_next_interval.call_args.args[0]
+    assert features["review_sequence_number"] == 1
+    assert features["user_avg_rating"] == 3.0
+    # Card, review and user stats written in one commit
+    batch = mock_firestore_global.batch.return_value
+    assert batch.commit.call_count == 1
+    card_update = batch.update.call_args.args[1]
+    assert isinstance(card_update["review_count"], firestore.Increment)
+    assert batch.set.call_count == 2
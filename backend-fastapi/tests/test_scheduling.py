@@ -0,0 +1,134 @@
+"""
+Tests for the vectorized scheduling engine.
+"""
+import importlib.util
+import os
+import time
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+from app.services.scheduling import (
+    ModelPolicy,
+    ReviewArrays,
+    SM2Policy,
+    SchedulingPolicy,
+    apply_predictions,
+    schedule,
+    sm2_step,
+    spread_overdue,
+)
+
+
+def sm2_reference(interval, ease, rating):
+    """Scalar SM-2 as previously implemented in FlashcardService.review_flashcard"""
+    if rating == 1:
+        return 0, max(1.3, ease - 0.2)
+    if interval == 0:
+        next_interval = 1
+    elif interval == 1:
+        next_interval = 6
+    else:
+        next_interval = int(interval * ease)
+    q = {2: 3, 3: 4, 4: 5}[rating]
+    return next_interval, max(1.3, ease + (0.1 - (5 - q) * (0.08 + (5 - q) * 0.02)))
+
+
+def make_reviews(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return ReviewArrays(
+        interval=rng.integers(0, 60, n),
+        ease=rng.uniform(1.3, 3.0, n),
+        rating=rng.integers(1, 5, n),
+    )
+
+
+class TestScheduling:
+    """Test suite for app.services.scheduling"""
+
+    def test_sm2_matches_scalar_reference(self):
+        reviews = make_reviews(2000)
+
+        intervals, ease = sm2_step(reviews.interval, reviews.ease, reviews.rating)
+
+        for i in range(len(reviews)):
+            expected_interval, expected_ease = sm2_reference(
+                int(reviews.interval[i]), float(reviews.ease[i]), int(reviews.rating[i])
+            )
+            assert intervals[i] == expected_interval
+            assert abs(ease[i] - expected_ease) < 1e-9
+
+    def test_predictions_override_interval_but_not_ease(self):
+        reviews = ReviewArrays(interval=np.array([6, 6]), ease=np.array([2.5, 2.5]), rating=np.array([3, 3]))
+
+        result = apply_predictions(reviews, [14, None])
+
+        assert result.interval.tolist() == [14, 15]
+        assert result.ml_used.tolist() == [True, False]
+        assert result.ease[0] == result.ease[1]
+
+    def test_model_policy_maps_buckets_to_days(self):
+        model = MagicMock()
+        model.predict.return_value = np.array([1, 2, 3, 4, 9])
+        reviews = ReviewArrays.from_features([{"rating": 3}] * 5)
+
+        result = schedule(reviews, ModelPolicy(model))
+
+        assert result.interval.tolist() == [1, 2, 5, 14, 1]
+        assert model.predict.call_args.args[0].shape == (5, 6)
+
+    def test_policy_must_implement_predict(self):
+        class Incomplete(SchedulingPolicy):
+            name = "incomplete"
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    def test_spread_overdue_most_overdue_first(self):
+        now = 1_000_000.0
+        due = np.array([now - 10, now + 50, now - 30, now - 20])
+
+        spread = spread_overdue(due, now, days=3)
+
+        assert spread[1] == now + 50  # Not overdue: untouched
+        assert spread[2] == now  # Most overdue: today
+        assert spread[3] == now + 86400
+        assert spread[0] == now + 2 * 86400
+
+    def test_bulk_schedule_is_fast(self):
+        reviews = make_reviews(100_000)
+
+        start = time.perf_counter()
+        result = schedule(reviews, SM2Policy())
+        elapsed = time.perf_counter() - start
+
+        assert len(result.interval) == 100_000
+        assert elapsed < 0.5
+
+
+def load_simulator():
+    path = os.path.join(os.path.dirname(__file__), "..", "scripts", "simulate_review_load.py")
+    spec = importlib.util.spec_from_file_location("simulate_review_load", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestReviewSimulator:
+    """Test suite for scripts/simulate_review_load.py"""
+
+    def test_new_cards_are_reviewed_on_arrival(self):
+        simulator = load_simulator()
+
+        load = simulator.simulate(users=3, cards=40, days=10, ratings=(0, 0, 1, 0), new_per_day=20)
+
+        assert load.new_cards[:3] == [60, 60, 0]
+        assert load.reviews[0] == 60  # All "Good": no same-day lapses
+        assert sum(load.failed) == 0
+
+    def test_lapses_are_rereviewed_same_day(self):
+        simulator = load_simulator()
+
+        load = simulator.simulate(users=1, cards=10, days=1, ratings=(1, 0, 0, 0), new_per_day=10, relearn_steps=2)
+
+        assert load.reviews == [30]
+        assert load.failed == [30]
@@ -0,0 +1,100 @@
+"""
+Tests for the Parquet snapshot of the training view (ml/flashcard_interval_model/snapshot_store.py).
+"""
+import importlib.util
+import os
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+SCRIPT_PATH = os.path.join(os.path.dirname(__file__), "..", "ml", "flashcard_interval_model", "snapshot_store.py")
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(scope="module")
+def snapshot_store():
+    spec = importlib.util.spec_from_file_location("snapshot_store", SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def reviews(start, count, rating=3):
+    """View rows for reviews r{start}..r{start+count-1}, one hour apart."""
+    return pa.Table.from_pylist([
+        {
+            "review_id": f"r{i}",
+            "user_id": "u1",
+            "flashcard_id": f"c{i % 3}",
+            "category": "code",
+            "word_count": 4,
+            "rating": rating,
+            "review_sequence_number": i // 3 + 1,
+            "reviewed_at": START + timedelta(hours=i),
+            "prev_reviewed_at": None,
+            "scheduled_interval": 1,
+            "label_next_interval": 1,  # Not kept in the snapshot
+        }
+        for i in range(start, start + count)
+    ])
+
+
+class TestSnapshotStore:
+    """Test suite for SnapshotStore"""
+
+    def test_append_writes_a_part_and_advances_the_watermark(self, snapshot_store, tmp_path):
+        store = snapshot_store.SnapshotStore(str(tmp_path / "snapshot"))
+        assert store.watermark() is None and store.read() == []
+
+        assert store.append(reviews(0, 5)) == 5
+        assert store.append(reviews(5, 0)) == 0
+
+        assert store.watermark() == START + timedelta(hours=4)
+        assert store.part_count() == 1
+        rows = store.read()
+        assert [row["review_id"] for row in rows] == [f"r{i}" for i in range(5)]
+        assert set(rows[0]) == set(snapshot_store.COLUMNS)
+
+    def test_sync_rereads_the_lookback_window(self, snapshot_store, tmp_path):
+        store = snapshot_store.SnapshotStore(str(tmp_path / "snapshot"))
+        client = MagicMock()
+        client.query.return_value.to_arrow.return_value = reviews(0, 5)
+
+        assert store.sync(client, "proj.ds.flashcard_training_view") == 5
+        assert "WHERE" not in client.query.call_args.args[0]  # Empty snapshot: whole view
+
+        client.query.return_value.to_arrow.return_value = reviews(3, 4)
+        assert store.sync(client, "proj.ds.flashcard_training_view", lookback=timedelta(hours=2)) == 4
+
+        query = client.query.call_args.args[0]
+        parameter = client.query.call_args.kwargs["job_config"].query_parameters[0]
+        assert query.endswith("WHERE reviewed_at > @since")
+        assert parameter.value == START + timedelta(hours=2)  # Watermark (r4) minus the lookback
+        assert store.watermark() == START + timedelta(hours=6)
+
+    def test_read_keeps_the_latest_copy_of_a_review(self, snapshot_store, tmp_path):
+        store = snapshot_store.SnapshotStore(str(tmp_path / "snapshot"))
+        store.append(reviews(0, 5, rating=3))
+        store.append(reviews(3, 4, rating=1))  # r3 and r4 re-read with new values
+
+        rows = {row["review_id"]: row for row in store.read()}
+
+        assert sorted(rows) == [f"r{i}" for i in range(7)]
+        assert rows["r2"]["rating"] == 3 and rows["r3"]["rating"] == 1 and rows["r4"]["rating"] == 1
+
+    def test_compact_folds_parts_into_one(self, snapshot_store, tmp_path):
+        store = snapshot_store.SnapshotStore(str(tmp_path / "snapshot"))
+        for start in (0, 3, 6):
+            store.append(reviews(start, 5))
+        before = store.read()
+
+        assert store.compact() == 11
+
+        assert store.part_count() == 1
+        assert sorted(row["review_id"] for row in store.read()) == sorted(row["review_id"] for row in before)
+        assert store.watermark() == START + timedelta(hours=10)
+        assert not os.path.exists(f"{store.root}.tmp") and not os.path.exists(f"{store.root}.old")
+        store.append(reviews(11, 1))
+        assert store.part_count() == 2 and len(store.read()) == 12
@@ -0,0 +1,79 @@
+"""
+Startup budget: `import app.main` must stay fast and must not load heavy SDKs.
+
+Uses scripts/benchmark_startup.py (fresh interpreters with -X importtime).
+Override the budget on slow machines with STARTUP_IMPORT_BUDGET_MS.
+"""
+import importlib.util
+import os
+import pytest
+
+SCRIPT_PATH = os.path.join(os.path.dirname(__file__), "..", "scripts", "benchmark_startup.py")
+
+
+@pytest.fixture(scope="module")
+def startup():
+    """One startup measurement shared by the tests in this module"""
+    spec = importlib.util.spec_from_file_location("benchmark_startup", SCRIPT_PATH)
+    benchmark = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(benchmark)
+    median_ms, _, eager = benchmark.measure(runs=3)
+    return benchmark, median_ms, eager
+
+
+class TestStartup:
+    """Test suite for app startup cost"""
+
+    def test_heavy_sdks_are_lazy(self, startup):
+        _, _, eager = startup
+
+        assert eager == []
+
+    def test_import_within_budget(self, startup):
+        benchmark, median_ms, _ = startup
+
+        assert median_ms <= benchmark.DEFAULT_BUDGET_MS
+
+
+class TestDeferredWarmUp:
+    """Test suite for the post-startup warm-up"""
+
+    @pytest.mark.asyncio
+    async def test_failed_import_does_not_raise(self):
+        from unittest.mock import MagicMock, patch
+        from app import main
+
+        settings = MagicMock(llm_provider="google_ai")
+        with patch.object(main.importlib, "import_module", side_effect=ImportError("missing")) as import_module:
+            await main.deferred_warm_up(settings)
+
+        assert import_module.call_count == len(main.DEFERRED_WARM_UP_MODULES["google_ai"]) + len(main.DEFERRED_WARM_UP_COMMON)
+
+
+class TestVertexStartup:
+    """Test suite for Vertex AI initialization"""
+
+    @pytest.mark.asyncio
+    async def test_missing_project_fails_startup(self):
+        from unittest.mock import MagicMock, patch
+        from fastapi import FastAPI
+        from app import main
+
+        settings = MagicMock(llm_provider="vertex_ai", vertex_project_id=None)
+        with patch.object(main, "get_settings", return_value=settings), \
+             patch("app.core.vertex.get_settings", return_value=settings), \
+             patch("app.core.firebase.get_firebase_app"):
+            with pytest.raises(ValueError, match="VERTEX_PROJECT_ID"):
+                async with main.lifespan(FastAPI()):
+                    pass
+
+    def test_client_initializes_the_sdk(self):
+        from unittest.mock import patch
+        from app.services import vertex_llm_client
+
+        with patch("app.core.vertex.init_vertex_ai") as init_vertex_ai, \
+             patch("vertexai.generative_models.GenerativeModel"), \
+             patch("vertexai.language_models.TextEmbeddingModel"):
+            vertex_llm_client.VertexLLMClient()
+
+        init_vertex_ai.assert_called_once_with()
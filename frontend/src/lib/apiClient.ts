@@ -54,7 +54,7 @@ class APIClient {
   async request<TResponse, TBody = unknown>(
     endpoint: string,
     options: {
-      method?: "GET" | "POST" | "PUT" | "DELETE";
+      method?: "GET" | "POST" | "PUT" | "PATCH" | "DELETE";
       body?: TBody;
       requireAuth?: boolean;
     } = {}
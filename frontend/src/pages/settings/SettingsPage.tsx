@@ -12,8 +12,9 @@ import {
   Typography,
 } from "@mui/material";
 import { useEffect, useState } from "react";
-import { doc, getDoc, setDoc } from "firebase/firestore";
+import { doc, getDoc } from "firebase/firestore";
 import { firebaseDb } from "../../lib/firebaseClient";
+import { profileApi } from "../../services/api/profile";
 import { useAuth } from "../../providers/AuthProvider";
 
 export function SettingsPage() {
@@ -68,15 +69,11 @@ export function SettingsPage() {
     if (!user?.uid) return;
     setSaving(true);
     try {
-      await setDoc(
-        doc(firebaseDb, "profiles", user.uid),
-        {
-          llm_provider: provider,
-          llm_model: model,
-          preferred_language: preferredLanguage || null,
-        },
-        { merge: true }
-      );
+      await profileApi.updatePreferences({
+        llm_provider: provider,
+        llm_model: model,
+        preferred_language: preferredLanguage || null,
+      });
 
       setSnackbar({
         open: true,
@@ -4,6 +4,8 @@ import type {
     GenerateFlashcardsResponse,
     ReviewFlashcardRequest,
     ReviewFlashcardResponse,
+    ReviewBatchRequest,
+    ReviewBatchResponse,
     RecommendNextIntervalRequest,
     RecommendNextIntervalResponse,
 } from "./types";
@@ -36,6 +38,18 @@ export const flashcardsApi = {
             }
         ),
 
+    /**
+     * Submit several reviews at once (e.g. replaying an offline session)
+     */
+    reviewBatch: (request: ReviewBatchRequest) =>
+        apiClient.request<ReviewBatchResponse, ReviewBatchRequest>(
+            "/api/flashcards/review-batch",
+            {
+                method: "POST",
+                body: request,
+            }
+        ),
+
     /**
      * Get recommended next interval from ML model
      */
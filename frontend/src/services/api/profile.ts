@@ -0,0 +1,20 @@
+import { apiClient } from "../../lib/apiClient";
+import type { ProfilePreferences } from "./types";
+
+/**
+ * Profile API service
+ */
+export const profileApi = {
+    /**
+     * Update profile preferences (writes through the backend so its
+     * cached copy of the profile is invalidated)
+     */
+    updatePreferences: (request: ProfilePreferences) =>
+        apiClient.request<ProfilePreferences, ProfilePreferences>(
+            "/api/profile/preferences",
+            {
+                method: "PATCH",
+                body: request,
+            }
+        ),
+};
@@ -101,10 +101,35 @@ export interface ReviewFlashcardResponse {
     ease_factor: number;
 }
 
+export interface ReviewBatchItem {
+    flashcard_id: string;
+    rating: 1 | 2 | 3 | 4;
+    reviewed_at?: string; // ISO timestamp with timezone; defaults to submission time
+}
+
+export interface ReviewBatchRequest {
+    reviews: ReviewBatchItem[]; // Applied in order, max 200
+}
+
+export interface ReviewBatchResult {
+    flashcard_id: string;
+    success: boolean;
+    next_review?: string | null;
+    interval?: number | null;
+    ease_factor?: number | null;
+    error?: string | null;
+}
+
+export interface ReviewBatchResponse {
+    results: ReviewBatchResult[];
+    reviewed: number;
+}
+
 export interface RecommendNextIntervalRequest {
     flashcard_id: string;
     rating: 1 | 2 | 3 | 4;
     current_interval: number;
+    ease_factor?: number; // Defaults to 2.5
     category?: string;
     word_count?: number;
     review_sequence_number?: number;
@@ -220,3 +245,9 @@ export interface AnalyticsOverviewResponse {
     activity: DailyReviewActivity[];
 }
 
+// Profile API types
+export interface ProfilePreferences {
+    llm_provider?: string | null;
+    llm_model?: string | null;
+    preferred_language?: string | null;
+}